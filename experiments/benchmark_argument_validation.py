@@ -0,0 +1,146 @@
+import argparse
+import json
+import timeit
+from typing import Callable, Dict, List
+
+import jax
+import jax.numpy as jnp
+
+from src.empirical_risks import NegativeLogLikelihood
+from src.gps import GPRegression
+from src.kernels.standard import ARDKernel
+from src.means import ConstantMean
+from src.utils.validation import ArgumentValidationMode, argument_validation_mode
+
+parser = argparse.ArgumentParser(
+    description="Records the per call time of GP methods in each argument validation mode."
+)
+parser.add_argument(
+    "--number_of_points",
+    type=int,
+    default=100,
+    help="the number of training and test points",
+)
+parser.add_argument(
+    "--number_of_dimensions",
+    type=int,
+    default=2,
+    help="the number of input dimensions",
+)
+parser.add_argument(
+    "--number_of_calls",
+    type=int,
+    default=200,
+    help="the number of calls timed in each repeat",
+)
+parser.add_argument(
+    "--number_of_repeats",
+    type=int,
+    default=5,
+    help="the number of timed repeats, the fastest is recorded",
+)
+parser.add_argument(
+    "--save_path",
+    type=str,
+    default=None,
+    help="a json file the per call times are written to",
+)
+
+
+def build_benchmark_functions(
+    number_of_points: int,
+    number_of_dimensions: int,
+) -> Dict[str, Callable[[], jnp.ndarray]]:
+    """
+    Builds an exact GP regression and the calls of its methods that are benchmarked.
+    Each call blocks until its result is computed, such that dispatch is included in its time.
+    Args:
+        number_of_points: the number of training and test points
+        number_of_dimensions: the number of input dimensions
+
+    Returns: a dictionary of method names to functions calling the method
+
+    """
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    y = jnp.sin(jnp.sum(x, axis=1))
+    gp = GPRegression(
+        mean=ConstantMean(),
+        kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+        x=x,
+        y=y,
+    )
+    parameters = gp.generate_parameters(
+        {
+            "log_observation_noise": jnp.log(0.1),
+            "mean": {"constant": 0.0},
+            "kernel": {
+                "log_scaling": 0.0,
+                "log_lengthscales": jnp.zeros(number_of_dimensions),
+            },
+        }
+    )
+    empirical_risk = NegativeLogLikelihood(gp=gp)
+    return {
+        "calculate_gram": lambda: gp.kernel.calculate_gram(
+            parameters=parameters.kernel, x1=x, x2=x
+        ).block_until_ready(),
+        "predict_probability": lambda: gp.predict_probability(
+            parameters=parameters, x=x
+        ).mean.block_until_ready(),
+        "calculate_empirical_risk": lambda: empirical_risk.calculate_empirical_risk(
+            parameters, x, y
+        ).block_until_ready(),
+    }
+
+
+def benchmark_argument_validation(
+    benchmark_functions: Dict[str, Callable[[], jnp.ndarray]],
+    validation_modes: List[ArgumentValidationMode],
+    number_of_calls: int,
+    number_of_repeats: int,
+) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, benchmark_function in benchmark_functions.items():
+        # compile outside of the timed calls
+        benchmark_function()
+        results[name] = {}
+        for validation_mode in validation_modes:
+            with argument_validation_mode(validation_mode):
+                results[name][validation_mode.value] = (
+                    min(
+                        timeit.repeat(
+                            benchmark_function,
+                            number=number_of_calls,
+                            repeat=number_of_repeats,
+                        )
+                    )
+                    / number_of_calls
+                )
+    return results
+
+
+if __name__ == "__main__":
+    jax.config.update("jax_enable_x64", True)
+    args = parser.parse_args()
+    benchmark_results = benchmark_argument_validation(
+        benchmark_functions=build_benchmark_functions(
+            number_of_points=args.number_of_points,
+            number_of_dimensions=args.number_of_dimensions,
+        ),
+        validation_modes=list(ArgumentValidationMode),
+        number_of_calls=args.number_of_calls,
+        number_of_repeats=args.number_of_repeats,
+    )
+    for name_, result in benchmark_results.items():
+        print(
+            f"{name_}: "
+            + ", ".join(
+                f"{validation_mode} {time * 1e3:.3f}ms"
+                for validation_mode, time in result.items()
+            )
+        )
+    if args.save_path is not None:
+        with open(args.save_path, "w") as file:
+            json.dump(benchmark_results, file, indent=4)
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+parser = argparse.ArgumentParser(
+    description="Records the import time of the entry points with python -X importtime."
+)
+parser.add_argument(
+    "--modules",
+    nargs="+",
+    default=[
+        "src.generalised_variational_inference",
+        "experiments.regression.main",
+        "experiments.toy_curves.main",
+    ],
+    help="the entry point modules to import",
+)
+parser.add_argument(
+    "--number_of_repeats",
+    type=int,
+    default=3,
+    help="the number of imports of each module, the fastest is recorded",
+)
+parser.add_argument(
+    "--number_of_slowest_imports",
+    type=int,
+    default=10,
+    help="the number of slowest imports recorded for each module",
+)
+parser.add_argument(
+    "--save_path",
+    type=str,
+    default=None,
+    help="a json file the import times are written to",
+)
+parser.add_argument(
+    "--budget_path",
+    type=str,
+    default=None,
+    help="a json file of the maximum import time in seconds of each module, "
+    "the benchmark fails if a module exceeds its budget",
+)
+
+_IMPORT_TIME_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_import_times(importtime_output: str) -> Dict[str, float]:
+    """
+    Parses the output of python -X importtime into the cumulative import time of each module.
+    Args:
+        importtime_output: the standard error of a python process run with -X importtime
+
+    Returns: a dictionary of module names to cumulative import times in seconds
+
+    """
+    return {
+        match.group(4): int(match.group(2)) * 1e-6
+        for match in map(_IMPORT_TIME_PATTERN.match, importtime_output.splitlines())
+        if match is not None
+    }
+
+
+def measure_import_time(module: str, repository_path: str) -> Dict[str, float]:
+    """
+    Imports a module in a fresh interpreter and measures the import time of every module it loads.
+    Args:
+        module: the name of the module to import
+        repository_path: the path of the repository, added to the python path
+
+    Returns: a dictionary of module names to cumulative import times in seconds
+
+    """
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=repository_path,
+        env=dict(os.environ, PYTHONPATH=repository_path),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_import_times(completed_process.stderr)
+
+
+def benchmark_import_time(
+    modules: List[str],
+    repository_path: str,
+    number_of_repeats: int,
+    number_of_slowest_imports: int,
+) -> Dict[str, Dict]:
+    results = {}
+    for module in modules:
+        import_times = min(
+            (
+                measure_import_time(module=module, repository_path=repository_path)
+                for _ in range(number_of_repeats)
+            ),
+            key=lambda import_times_: import_times_[module],
+        )
+        results[module] = {
+            "import_time": import_times[module],
+            "slowest_imports": dict(
+                sorted(import_times.items(), key=lambda item: -item[1])[
+                    1 : number_of_slowest_imports + 1
+                ]
+            ),
+        }
+    return results
+
+
+def check_budget(results: Dict[str, Dict], budget: Dict[str, float]) -> List[str]:
+    return [
+        f"{module} took {results[module]['import_time']:.2f}s to import, "
+        f"exceeding its budget of {maximum_import_time:.2f}s"
+        for module, maximum_import_time in budget.items()
+        if module in results and results[module]["import_time"] > maximum_import_time
+    ]
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    benchmark_results = benchmark_import_time(
+        modules=args.modules,
+        repository_path=REPOSITORY_PATH,
+        number_of_repeats=args.number_of_repeats,
+        number_of_slowest_imports=args.number_of_slowest_imports,
+    )
+    for module_, result in benchmark_results.items():
+        print(f"{module_}: {result['import_time']:.2f}s")
+        for imported_module, import_time in result["slowest_imports"].items():
+            print(f"    {imported_module}: {import_time:.2f}s")
+    if args.save_path is not None:
+        with open(args.save_path, "w") as file:
+            json.dump(benchmark_results, file, indent=4)
+    if args.budget_path is not None:
+        with open(args.budget_path, "r") as file:
+            budget_violations = check_budget(
+                results=benchmark_results, budget=json.load(file)
+            )
+        if budget_violations:
+            raise SystemExit("\n".join(budget_violations))
@@ -2,7 +2,6 @@ from typing import Tuple
 
 import jax
 from jax import numpy as jnp
-from sklearn.model_selection import train_test_split
 
 from src.utils.custom_types import PRNGKey
 
@@ -75,6 +74,8 @@ def split_train_test_validation_data(
     total_number_of_intervals: int,
     train_data_percentage: float,
 ):
+    from sklearn.model_selection import train_test_split
+
     (
         x_train_validation,
         y_train_validation,
@@ -10,17 +10,40 @@ from experiments.regression.action_runners import (
     train_approximate,
     train_regulariser,
 )
+from experiments.shared.compilation_cache import initialise_compilation_cache
 from experiments.shared.schemas import ActionSchema
 
 parser = argparse.ArgumentParser(description="Main script for regression experiments.")
 parser.add_argument("--action", choices=[ActionSchema[a].value for a in ActionSchema])
 parser.add_argument("--config_path", type=str)
+parser.add_argument(
+    "--compilation_cache_path",
+    type=str,
+    default=None,
+    help="directory of the persistent compilation cache, defaults to the outputs directory, "
+    "an empty string disables the cache",
+)
+parser.add_argument(
+    "--minimum_compile_time_secs",
+    type=float,
+    default=0.0,
+    help="programs compiling faster than this are not written to the compilation cache",
+)
 
 if __name__ == "__main__":
     jax.config.update("jax_enable_x64", True)
     OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "outputs")
     args = parser.parse_args()
     file_name = args.config_path.split("/")[-1].split(".")[0]
+    compilation_cache_metrics = (
+        initialise_compilation_cache(
+            cache_path=args.compilation_cache_path
+            or os.path.join(OUTPUT_PATH, "compilation_cache"),
+            minimum_compile_time_secs=args.minimum_compile_time_secs,
+        )
+        if args.compilation_cache_path != ""
+        else None
+    )
     # weird bug that needs this initialised to run fast on first iteration
     import matplotlib.pyplot as plt
 
@@ -59,3 +82,5 @@ if __name__ == "__main__":
         )
     else:
         raise ValueError(f"Invalid action {args.action}")
+    if compilation_cache_metrics is not None:
+        print(compilation_cache_metrics)
@@ -72,8 +72,8 @@ def train_regulariser_gp(
         trainer_settings=trainer_settings,
         parameters=gp_parameters,
         data=inducing_data,
-        loss_function=lambda parameters_dict, x, y: empirical_risk.calculate_empirical_risk(
-            parameters=parameters_dict,
+        loss_function=lambda parameters_, x, y: empirical_risk.calculate_empirical_risk(
+            parameters=parameters_,
             x=x,
             y=y,
         ),
@@ -0,0 +1,234 @@
+import math
+import os
+import re
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import jax
+import numpy as np
+
+from src.module import ModuleParameters, get_orbax_checkpointer
+
+
+class Checkpointer:
+    """
+    Saves parameter checkpoints, optionally on a background thread, with a retention policy.
+    The parameters are copied to host memory when a save is requested, so training can continue
+    updating them while the checkpoint is serialised. Checkpoints are written by orbax to a
+    temporary directory and renamed once complete, so a checkpoint path never holds a partial write.
+    An optional state, such as the optimiser state, is written next to the parameters before them,
+    so a checkpoint with parameters on disk always has its complete state. The epochs and metrics of
+    the retained checkpoints are written with the state, such that the retention policy continues
+    with the same ranking after restoring a checkpoint.
+    """
+
+    def __init__(
+        self,
+        checkpoint_path: str,
+        max_to_keep: Optional[int] = None,
+        best_to_keep: int = 0,
+        is_asynchronous: bool = True,
+    ):
+        """
+        Args:
+            checkpoint_path: the directory of the checkpoints
+            max_to_keep: the number of most recent checkpoints to keep, all are kept if None
+            best_to_keep: the number of checkpoints with the lowest metric to keep in addition
+                          to the most recent ones, only used if max_to_keep is not None
+            is_asynchronous: whether checkpoints are serialised on a background thread
+        """
+        self.checkpoint_path = checkpoint_path
+        self.max_to_keep = max_to_keep
+        self.best_to_keep = best_to_keep
+        self.is_asynchronous = is_asynchronous
+        self._orbax_checkpointer = get_orbax_checkpointer()
+        # a single worker keeps the writes and the retention policy in the order of the saves
+        self._executor = ThreadPoolExecutor(max_workers=1) if is_asynchronous else None
+        self._futures: List[Future] = []
+        # the epochs and metrics of the checkpoints on disk, only modified by the writer
+        self._saved_checkpoints: List[Tuple[int, Optional[float]]] = []
+
+    def epoch_path(self, epoch: int) -> str:
+        return os.path.join(self.checkpoint_path, f"epoch-{epoch}.ckpt")
+
+    def epoch_state_path(self, epoch: int) -> str:
+        return os.path.join(self.checkpoint_path, f"epoch-{epoch}.state")
+
+    def save(
+        self,
+        epoch: int,
+        parameters: ModuleParameters,
+        metric: Optional[float] = None,
+        state: Optional[Dict] = None,
+    ) -> None:
+        """
+        Saves the parameters of an epoch. If asynchronous, this returns once the parameters
+        are copied to host memory and the write is queued.
+        Args:
+            epoch: the epoch of the checkpoint
+            parameters: the parameters to save
+            metric: the metric used to rank checkpoints for best_to_keep, lower is better,
+                    None if the parameters were not evaluated
+            state: a pytree saved with the parameters, for example the optimiser state
+
+        """
+        snapshot = jax.device_get(parameters.dict())
+        state_snapshot = jax.device_get(state)
+        if self._executor is None:
+            self._write(
+                epoch=epoch,
+                snapshot=snapshot,
+                metric=metric,
+                state_snapshot=state_snapshot,
+            )
+        else:
+            self._futures.append(
+                self._executor.submit(
+                    self._write, epoch, snapshot, metric, state_snapshot
+                )
+            )
+
+    def _write(
+        self,
+        epoch: int,
+        snapshot: Dict,
+        metric: Optional[float],
+        state_snapshot: Optional[Dict] = None,
+    ) -> None:
+        from flax.training import orbax_utils
+
+        saved_checkpoints = [
+            (saved_epoch, saved_metric)
+            for saved_epoch, saved_metric in self._saved_checkpoints
+            if saved_epoch != epoch
+        ] + [(epoch, metric)]
+        if state_snapshot is not None:
+            # missing metrics are stored as NaN, which the retention policy does not rank
+            checkpoint_state = {
+                "state": state_snapshot,
+                "saved_epochs": np.array(
+                    [saved_epoch for saved_epoch, _ in saved_checkpoints]
+                ),
+                "saved_metrics": np.array(
+                    [
+                        np.nan if saved_metric is None else saved_metric
+                        for _, saved_metric in saved_checkpoints
+                    ],
+                    dtype=float,
+                ),
+            }
+            self._orbax_checkpointer.save(
+                self.epoch_state_path(epoch),
+                checkpoint_state,
+                save_args=orbax_utils.save_args_from_target(checkpoint_state),
+                force=True,
+            )
+        self._orbax_checkpointer.save(
+            self.epoch_path(epoch),
+            snapshot,
+            save_args=orbax_utils.save_args_from_target(snapshot),
+            force=True,
+        )
+        self._saved_checkpoints = saved_checkpoints
+        self._apply_retention_policy()
+
+    def _apply_retention_policy(self) -> None:
+        """
+        Deletes the checkpoints that are neither among the max_to_keep most recent
+        nor among the best_to_keep with the lowest metric.
+        """
+        if self.max_to_keep is None:
+            return
+        epochs_to_keep = {
+            epoch
+            for epoch, _ in self._saved_checkpoints[
+                len(self._saved_checkpoints) - self.max_to_keep :
+            ]
+        }
+        ranked_checkpoints = sorted(
+            (metric, epoch)
+            for epoch, metric in self._saved_checkpoints
+            if metric is not None and not math.isnan(metric)
+        )
+        epochs_to_keep |= {
+            epoch for _, epoch in ranked_checkpoints[: self.best_to_keep]
+        }
+        for epoch, _ in self._saved_checkpoints:
+            if epoch not in epochs_to_keep:
+                shutil.rmtree(self.epoch_path(epoch), ignore_errors=True)
+                shutil.rmtree(self.epoch_state_path(epoch), ignore_errors=True)
+        self._saved_checkpoints = [
+            (epoch, metric)
+            for epoch, metric in self._saved_checkpoints
+            if epoch in epochs_to_keep
+        ]
+
+    def wait_until_finished(self) -> None:
+        """
+        Blocks until all queued checkpoints are written, raising any error from the writer.
+        """
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def restore_latest(
+        self,
+        parameters: ModuleParameters,
+        maximum_epoch: Optional[int] = None,
+    ) -> Optional[Tuple[int, ModuleParameters, Dict]]:
+        """
+        Restores the latest checkpoint with both parameters and state that can be read.
+        Checkpoints that fail to restore are skipped in favour of earlier ones.
+        The retention policy continues from the earlier checkpoints retained with the restored one,
+        ranked by their saved metrics.
+        Args:
+            parameters: parameters of the type to restore
+            maximum_epoch: the latest epoch to consider, all epochs if None
+
+        Returns: the epoch, parameters and state of the checkpoint, or None if there is none
+
+        """
+        if not os.path.isdir(self.checkpoint_path):
+            return None
+        epochs = sorted(
+            (
+                int(match.group(1))
+                for match in map(
+                    re.compile(r"epoch-(\d+)\.ckpt").fullmatch,
+                    os.listdir(self.checkpoint_path),
+                )
+                if match is not None
+            ),
+            reverse=True,
+        )
+        for epoch in epochs:
+            if maximum_epoch is not None and epoch > maximum_epoch:
+                continue
+            if not os.path.isdir(self.epoch_state_path(epoch)):
+                continue
+            try:
+                # the leaves of parameters are ordered as those of their dictionary on disk
+                restored_parameters = jax.tree_util.tree_unflatten(
+                    jax.tree_util.tree_structure(parameters),
+                    jax.tree_util.tree_leaves(parameters.load(self.epoch_path(epoch))),
+                )
+                checkpoint_state = self._orbax_checkpointer.restore(
+                    self.epoch_state_path(epoch)
+                )
+            except (OSError, ValueError):
+                continue
+            # later checkpoints are kept out of the retention policy, they are overwritten on resume
+            self._saved_checkpoints = [
+                (
+                    int(saved_epoch),
+                    None if np.isnan(saved_metric) else float(saved_metric),
+                )
+                for saved_epoch, saved_metric in zip(
+                    np.atleast_1d(checkpoint_state["saved_epochs"]),
+                    np.atleast_1d(checkpoint_state["saved_metrics"]),
+                )
+                if saved_epoch < epoch and saved_epoch in epochs
+            ]
+            return epoch, restored_parameters, checkpoint_state["state"]
+        return None
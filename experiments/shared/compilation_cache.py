@@ -0,0 +1,91 @@
+import os
+import warnings
+from typing import Optional
+
+import jax
+from jax.experimental.compilation_cache import compilation_cache
+
+# the installed JAX only reads and writes the persistent cache for CPU programs with the XLA runtime
+CPU_XLA_RUNTIME_FLAG = "--xla_cpu_use_xla_runtime=true"
+
+_COMPILE_REQUESTS_EVENT = "/jax/compilation_cache/compile_requests_use_cache"
+# hits are recorded under the events of the cache key generation in use
+_CACHE_HITS_EVENTS = {
+    "/jax/compilation_cache/cache_hits",
+    "/jax/compilation_cache/cache_hits_original",
+}
+_COMPILE_TIME_SAVED_EVENTS = {
+    "/jax/compilation_cache/compile_time_saved_sec",
+    "/jax/compilation_cache/original_compile_time_saved_sec",
+}
+
+
+class CompilationCacheMetrics:
+    """
+    Counts the compilations of a run that were looked up in the persistent compilation cache,
+    how many of them were read from the cache and the compile time this saved.
+    """
+
+    def __init__(self):
+        self.number_of_compile_requests = 0
+        self.number_of_cache_hits = 0
+        self.compile_time_saved_secs = 0.0
+        jax.monitoring.register_event_listener(self._record_event)
+        jax.monitoring.register_event_duration_secs_listener(
+            self._record_event_duration
+        )
+
+    def _record_event(self, event: str) -> None:
+        if event == _COMPILE_REQUESTS_EVENT:
+            self.number_of_compile_requests += 1
+        elif event in _CACHE_HITS_EVENTS:
+            self.number_of_cache_hits += 1
+
+    def _record_event_duration(self, event: str, duration_secs: float) -> None:
+        if event in _COMPILE_TIME_SAVED_EVENTS:
+            self.compile_time_saved_secs += duration_secs
+
+    @property
+    def number_of_cache_misses(self) -> int:
+        return self.number_of_compile_requests - self.number_of_cache_hits
+
+    def __str__(self) -> str:
+        return (
+            f"compilation cache: {self.number_of_cache_hits} hits, "
+            f"{self.number_of_cache_misses} misses, "
+            f"{self.compile_time_saved_secs:.2f}s compile time saved"
+        )
+
+
+def initialise_compilation_cache(
+    cache_path: str,
+    minimum_compile_time_secs: float = 0.0,
+) -> Optional[CompilationCacheMetrics]:
+    """
+    Initialises the persistent compilation cache, such that compiled programs are written to disk
+    and reused by later runs, or later iterations of a run, compiling the same programs.
+    On CPU the cache is only used with the XLA runtime, which is enabled by adding
+    --xla_cpu_use_xla_runtime=true to the XLA_FLAGS environment variable before JAX is first used.
+    Without it the cache is not initialised and a warning is raised, such that jitted functions
+    are compiled with jax.jit rather than paying for hoisting constants without any cache hits.
+    Args:
+        cache_path: the directory of the compilation cache
+        minimum_compile_time_secs: programs compiling faster than this are not written to the cache
+
+    Returns: the metrics of the compilations from this point on, None if the cache is not initialised
+
+    """
+    if jax.default_backend() == "cpu" and CPU_XLA_RUNTIME_FLAG not in os.environ.get(
+        "XLA_FLAGS", ""
+    ):
+        warnings.warn(
+            "The persistent compilation cache is not used on CPU without the XLA runtime, "
+            f"set XLA_FLAGS={CPU_XLA_RUNTIME_FLAG} to use it. "
+            "The compilation cache is not initialised."
+        )
+        return None
+    jax.config.update(
+        "jax_persistent_cache_min_compile_time_secs", minimum_compile_time_secs
+    )
+    compilation_cache.initialize_cache(cache_path)
+    return CompilationCacheMetrics()
@@ -4,7 +4,6 @@ from typing import Optional
 
 import jax
 from jax import numpy as jnp
-from sklearn.model_selection import train_test_split
 
 from src.utils.custom_types import PRNGKey
 
@@ -109,6 +108,9 @@ def set_up_experiment(
     validation_data_percentage: float,
     rescale_y: bool = True,
 ) -> ExperimentData:
+    # sklearn is only needed to build data sets, so it is not imported by the other actions
+    from sklearn.model_selection import train_test_split
+
     # adapted from:
     # https://datascience.stackexchange.com/questions/15135/train-test-validation-set-splitting-in-sklearn
     key, subkey = jax.random.split(key)
@@ -0,0 +1,225 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+import optax
+from jax.tree_util import DictKey
+
+from src.kernels.approximate.svgp.cholesky_svgp_kernel import CholeskySVGPKernel
+from src.utils.optimisation import calculate_natural_gradient_gaussian_update
+
+NATURAL_GRADIENT_LABEL = "natural_gradient"
+DEFAULT_LABEL = "default"
+
+KeyPath = Tuple[Any, ...]
+
+
+class GaussianBlock(NamedTuple):
+    """
+    The parameter paths of an inducing space Gaussian, the covariance of a Cholesky SVGP kernel
+    and, if available, the weights of the paired SVGP mean.
+    """
+
+    el_matrix_lower_triangle_path: KeyPath
+    el_matrix_log_diagonal_path: KeyPath
+    weights_path: Optional[KeyPath]
+
+    @property
+    def paths(self) -> List[KeyPath]:
+        paths = [self.el_matrix_lower_triangle_path, self.el_matrix_log_diagonal_path]
+        if self.weights_path is not None:
+            paths.append(self.weights_path)
+        return paths
+
+
+def _mean_path(kernel_path: KeyPath) -> KeyPath:
+    """
+    Maps a path in the kernel parameters to the corresponding path in the mean parameters,
+    following the kernel/mean and kernels/means naming of single and multi-output GPs.
+    """
+    key_map = {
+        DictKey("kernel"): DictKey("mean"),
+        DictKey("kernels"): DictKey("means"),
+    }
+    return tuple(key_map.get(key, key) for key in kernel_path)
+
+
+def find_gaussian_blocks(parameters: Dict) -> List[GaussianBlock]:
+    """
+    Finds the inducing space Gaussians in the parameters of a GP.
+    Every Cholesky SVGP kernel defines a Gaussian through its sigma matrix and is paired
+    with the weights of an SVGP mean at the corresponding position, if there is one.
+    Args:
+        parameters: the parameters of a GP as a dictionary
+
+    Returns: the Gaussian blocks found
+
+    """
+    leaves_with_paths, _ = jax.tree_util.tree_flatten_with_path(parameters)
+    paths = {path for path, _ in leaves_with_paths}
+    gaussian_blocks = []
+    for path, _ in leaves_with_paths:
+        if path[-1] != DictKey("el_matrix_lower_triangle"):
+            continue
+        el_matrix_log_diagonal_path = path[:-1] + (DictKey("el_matrix_log_diagonal"),)
+        if el_matrix_log_diagonal_path not in paths:
+            continue
+        weights_path = _mean_path(path[:-1]) + (DictKey("weights"),)
+        gaussian_blocks.append(
+            GaussianBlock(
+                el_matrix_lower_triangle_path=path,
+                el_matrix_log_diagonal_path=el_matrix_log_diagonal_path,
+                weights_path=weights_path if weights_path in paths else None,
+            )
+        )
+    return gaussian_blocks
+
+
+def natural_gradient_labels(parameters: Dict) -> Dict:
+    """
+    Labels the parameters of the inducing space Gaussians for the natural gradient
+    and all other parameters for the default optimiser.
+    Args:
+        parameters: the parameters of a GP as a dictionary
+
+    Returns: a tree of labels with the same structure as the parameters
+
+    """
+    natural_gradient_paths = {
+        path
+        for gaussian_block in find_gaussian_blocks(parameters)
+        for path in gaussian_block.paths
+    }
+    return jax.tree_util.tree_map_with_path(
+        lambda path, _: NATURAL_GRADIENT_LABEL
+        if path in natural_gradient_paths
+        else DEFAULT_LABEL,
+        parameters,
+    )
+
+
+def _calculate_gaussian_block_updates(
+    gaussian_block: GaussianBlock,
+    parameters: Dict[KeyPath, jnp.ndarray],
+    gradients: Dict[KeyPath, jnp.ndarray],
+    learning_rate: float,
+) -> Dict[KeyPath, jnp.ndarray]:
+    """
+    Calculates the updates of a Gaussian block from a natural gradient step.
+    The gradient with respect to the sigma matrix is recovered from the gradients of the
+    el matrix parameters with the vector-Jacobian product of the inverse parameterisation.
+    Args:
+        gaussian_block: the Gaussian block
+        parameters: the parameters keyed by path
+        gradients: the gradients keyed by path
+        learning_rate: the natural gradient learning rate
+
+    Returns: the updates keyed by path
+
+    """
+    el_matrix_parameters = (
+        parameters[gaussian_block.el_matrix_lower_triangle_path],
+        parameters[gaussian_block.el_matrix_log_diagonal_path],
+    )
+    sigma_matrix = CholeskySVGPKernel._calculate_sigma_matrix_from_el_matrix_parameters(
+        el_matrix_lower_triangle=el_matrix_parameters[0],
+        el_matrix_log_diagonal=el_matrix_parameters[1],
+    )
+    _, el_matrix_parameters_vjp = jax.vjp(
+        CholeskySVGPKernel._calculate_el_matrix_parameters, sigma_matrix
+    )
+    (sigma_matrix_gradient,) = el_matrix_parameters_vjp(
+        (
+            jnp.tril(gradients[gaussian_block.el_matrix_lower_triangle_path], k=-1),
+            gradients[gaussian_block.el_matrix_log_diagonal_path],
+        )
+    )
+    if gaussian_block.weights_path is not None:
+        weights = parameters[gaussian_block.weights_path]
+        weights_gradient = gradients[gaussian_block.weights_path].reshape(-1)
+    else:
+        weights = jnp.zeros((sigma_matrix.shape[0],))
+        weights_gradient = jnp.zeros((sigma_matrix.shape[0],))
+    updated_weights, updated_sigma_matrix = calculate_natural_gradient_gaussian_update(
+        mean=weights.reshape(-1),
+        covariance=sigma_matrix,
+        mean_gradient=weights_gradient,
+        covariance_gradient=sigma_matrix_gradient,
+        learning_rate=learning_rate,
+    )
+    (
+        updated_el_matrix_lower_triangle,
+        updated_el_matrix_log_diagonal,
+    ) = CholeskySVGPKernel._calculate_el_matrix_parameters(updated_sigma_matrix)
+    updates = {
+        gaussian_block.el_matrix_lower_triangle_path: updated_el_matrix_lower_triangle
+        - el_matrix_parameters[0],
+        gaussian_block.el_matrix_log_diagonal_path: updated_el_matrix_log_diagonal
+        - el_matrix_parameters[1],
+    }
+    if gaussian_block.weights_path is not None:
+        updates[gaussian_block.weights_path] = (
+            updated_weights.reshape(weights.shape) - weights
+        )
+    # a step that leaves the positive definite cone is skipped
+    is_finite = jnp.all(
+        jnp.array([jnp.all(jnp.isfinite(update)) for update in updates.values()])
+    )
+    return {
+        path: jnp.where(is_finite, update, jnp.zeros_like(update))
+        for path, update in updates.items()
+    }
+
+
+def svgp_natural_gradient(learning_rate: float) -> optax.GradientTransformation:
+    """
+    A natural gradient optimiser for the inducing space Gaussians of Cholesky SVGP kernels
+    and their SVGP mean weights. Each Gaussian is updated in its natural parameterisation
+    and mapped back to the el matrix parameters.
+    Other parameters in the tree are left unchanged, so this is meant to be combined with
+    another optimiser with optax.multi_transform and natural_gradient_labels.
+    Args:
+        learning_rate: the natural gradient learning rate, values close to one are suitable for
+                       losses conjugate to the Gaussian, smaller values are needed otherwise
+
+    Returns: the gradient transformation
+
+    """
+
+    def init_fn(parameters: Dict) -> optax.EmptyState:
+        return optax.EmptyState()
+
+    def update_fn(
+        gradients: Dict,
+        state: optax.EmptyState,
+        parameters: Optional[Dict] = None,
+    ) -> Tuple[Dict, optax.EmptyState]:
+        if parameters is None:
+            raise ValueError("The natural gradient requires the current parameters.")
+        gradients_with_paths, tree_definition = jax.tree_util.tree_flatten_with_path(
+            gradients
+        )
+        gradients_by_path = dict(gradients_with_paths)
+        parameters_by_path = dict(jax.tree_util.tree_flatten_with_path(parameters)[0])
+        updates_by_path = {}
+        for gaussian_block in find_gaussian_blocks(parameters):
+            updates_by_path.update(
+                _calculate_gaussian_block_updates(
+                    gaussian_block=gaussian_block,
+                    parameters=parameters_by_path,
+                    gradients=gradients_by_path,
+                    learning_rate=learning_rate,
+                )
+            )
+        return (
+            jax.tree_util.tree_unflatten(
+                tree_definition,
+                [
+                    updates_by_path.get(path, jnp.zeros_like(gradient))
+                    for path, gradient in gradients_with_paths
+                ],
+            ),
+            state,
+        )
+
+    return optax.GradientTransformation(init_fn, update_fn)
@@ -1,7 +1,6 @@
 from typing import Dict, Optional, Tuple, Union
 
 import jax.numpy as jnp
-import orbax
 import yaml
 from flax.core.frozen_dict import FrozenDict
 
@@ -47,6 +46,7 @@ from src.kernels.non_stationary import (
 )
 from src.kernels.non_stationary.base import NonStationaryKernelBase
 from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.module import get_orbax_checkpointer
 
 
 def resolve_existing_kernel(
@@ -60,8 +60,7 @@ def resolve_existing_kernel(
     kernel, _ = kernel_resolver(
         kernel_config=loaded_kernel_config["kernel"], data_dimension=data_dimension
     )
-    orbax_checkpointer = orbax.checkpoint.PyTreeCheckpointer()
-    ckpt = orbax_checkpointer.restore(parameter_path)
+    ckpt = get_orbax_checkpointer().restore(parameter_path)
     kernel_parameters = kernel.Parameters.construct(**ckpt["kernel"])
     return kernel, kernel_parameters
 
@@ -3,7 +3,6 @@ from typing import Callable, Dict, Tuple, Union
 import jax
 import jax.numpy as jnp
 from flax.core.frozen_dict import FrozenDict
-from neural_tangents import stax
 
 from experiments.shared.resolvers.nngp_layer import nngp_layer_resolver
 
@@ -11,6 +10,9 @@ from experiments.shared.resolvers.nngp_layer import nngp_layer_resolver
 def nngp_kernel_function_resolver(
     nngp_kernel_function_kwargs: Union[FrozenDict, Dict],
 ) -> Tuple[Callable, Dict]:
+    # neural_tangents imports tensorflow, so it is only imported when an NNGP kernel is resolved
+    from neural_tangents import stax
+
     assert "layers" in nngp_kernel_function_kwargs, "Layers must be specified."
     nn_layers = []
     is_parameterised_array = [False] * len(nngp_kernel_function_kwargs["layers"])
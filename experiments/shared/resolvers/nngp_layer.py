@@ -1,11 +1,15 @@
-from typing import Callable, Dict, Tuple, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, Tuple, Union
 
 import jax.numpy as jnp
 from flax.core.frozen_dict import FrozenDict
-from neural_tangents import stax
 
 from experiments.shared.schemas import NeuralNetworkGaussianProcessLayerSchema
 
+if TYPE_CHECKING:
+    from neural_tangents import stax
+
 
 def nngp_layer_resolver(
     nngp_layer_schema: NeuralNetworkGaussianProcessLayerSchema,
@@ -17,6 +21,8 @@ def nngp_layer_resolver(
     ],
     bool,
 ]:
+    from neural_tangents import stax
+
     if nngp_layer_schema == NeuralNetworkGaussianProcessLayerSchema.convolution:
         assert "features" in nngp_layer_kwargs, "Features must be specified."
         assert "kernel_size" in nngp_layer_kwargs, "Kernel size must be specified."
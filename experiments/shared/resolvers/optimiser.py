@@ -1,15 +1,44 @@
+from typing import Optional
+
 import optax
 
+from experiments.shared.natural_gradient import (
+    DEFAULT_LABEL,
+    NATURAL_GRADIENT_LABEL,
+    natural_gradient_labels,
+    svgp_natural_gradient,
+)
 from experiments.shared.schemas import OptimiserSchema
 
 
 def optimiser_resolver(
-    optimiser_schema: OptimiserSchema, learning_rate: float
+    optimiser_schema: OptimiserSchema,
+    learning_rate: float,
+    natural_gradient_learning_rate: Optional[float] = None,
 ) -> optax.GradientTransformation:
+    # the learning rate is held in the optimiser state, such that optimiser states of
+    # configurations with different learning rates can be stacked and updated together
+    if natural_gradient_learning_rate is not None:
+        return optax.multi_transform(
+            transforms={
+                NATURAL_GRADIENT_LABEL: svgp_natural_gradient(
+                    learning_rate=natural_gradient_learning_rate
+                ),
+                DEFAULT_LABEL: optimiser_resolver(
+                    optimiser_schema=optimiser_schema,
+                    learning_rate=learning_rate,
+                ),
+            },
+            param_labels=natural_gradient_labels,
+        )
     if optimiser_schema == OptimiserSchema.adam:
-        return optax.adam(learning_rate=learning_rate)
+        return optax.inject_hyperparams(optax.adam)(learning_rate=learning_rate)
     if optimiser_schema == OptimiserSchema.adabelief:
-        return optax.adabelief(learning_rate=learning_rate)
+        return optax.inject_hyperparams(optax.adabelief)(learning_rate=learning_rate)
     if optimiser_schema == OptimiserSchema.rmsprop:
-        return optax.rmsprop(learning_rate=learning_rate)
+        return optax.inject_hyperparams(optax.rmsprop)(learning_rate=learning_rate)
+    if optimiser_schema == OptimiserSchema.lbfgs:
+        raise ValueError(
+            f"{optimiser_schema=} is a full-batch optimiser run by the trainer, not an optax transformation"
+        )
     raise ValueError(f"Unknown optimiser: {optimiser_schema=}")
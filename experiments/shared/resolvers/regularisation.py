@@ -12,6 +12,7 @@ from src.regularisations import (
 )
 from src.regularisations.base import RegularisationBase
 from src.regularisations.projected import (
+    CombinedProjectedRegularisation,
     ProjectedBhattacharyyaRegularisation,
     ProjectedGaussianWassersteinRegularisation,
     ProjectedHellingerRegularisation,
@@ -89,6 +90,39 @@ def regularisation_resolver(
             regulariser_parameters=regulariser_parameters,
             **regularisation_kwargs,
         )
+    if regularisation_schema == schemas.RegularisationSchema.combined_projected:
+        assert (
+            "objective" in regularisation_kwargs
+        ), "Objective of the combined projected regularisation must be specified"
+        assert (
+            "projected_regularisation_kwargs" in regularisation_kwargs
+        ), "Projected regularisation kwargs must be specified"
+        # the remaining kwargs, such as the mode, are shared by all the projected regularisations
+        shared_kwargs = {
+            key: value
+            for key, value in regularisation_kwargs.items()
+            if key not in {"objective", "projected_regularisation_kwargs"}
+        }
+        return CombinedProjectedRegularisation(
+            projected_regularisations={
+                name: regularisation_resolver(
+                    regularisation_config={
+                        "regularisation_schema": schemas.RegularisationSchema(name),
+                        "regularisation_kwargs": {
+                            **shared_kwargs,
+                            **(projected_regularisation_kwargs or {}),
+                        },
+                    },
+                    gp=gp,
+                    regulariser=regulariser,
+                    regulariser_parameters=regulariser_parameters,
+                )
+                for name, projected_regularisation_kwargs in regularisation_kwargs[
+                    "projected_regularisation_kwargs"
+                ].items()
+            },
+            objective=regularisation_kwargs["objective"],
+        )
     if regularisation_schema == schemas.RegularisationSchema.multinomial_wasserstein:
         assert isinstance(gp, GPClassificationBase), "GP must be a classification GP"
         assert isinstance(
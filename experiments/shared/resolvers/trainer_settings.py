@@ -2,6 +2,10 @@ from typing import Dict, Union
 
 from flax.core.frozen_dict import FrozenDict
 
+from experiments.shared.schemas import (
+    RegularisationBatchSchema,
+    RegularisationParallelismSchema,
+)
 from experiments.shared.trainer import TrainerSettings
 
 
@@ -35,4 +39,40 @@ def trainer_settings_resolver(
         batch_size=trainer_settings_config["batch_size"],
         batch_shuffle=trainer_settings_config["batch_shuffle"],
         batch_drop_last=trainer_settings_config["batch_drop_last"],
+        regularisation_batch_schema=trainer_settings_config.get(
+            "regularisation_batch_schema", RegularisationBatchSchema.shared
+        ),
+        regularisation_batch_size=trainer_settings_config.get(
+            "regularisation_batch_size", None
+        ),
+        number_of_microbatches=trainer_settings_config.get("number_of_microbatches", 1),
+        on_device=trainer_settings_config.get("on_device", False),
+        number_of_epochs_per_scan=trainer_settings_config.get(
+            "number_of_epochs_per_scan", 1
+        ),
+        convergence_window=trainer_settings_config.get("convergence_window", 0),
+        convergence_relative_tolerance=trainer_settings_config.get(
+            "convergence_relative_tolerance", 0.0
+        ),
+        convergence_gradient_norm=trainer_settings_config.get(
+            "convergence_gradient_norm", 0.0
+        ),
+        validation_metric=trainer_settings_config.get("validation_metric", None),
+        validation_patience=trainer_settings_config.get("validation_patience", 0),
+        lbfgs_tolerance=trainer_settings_config.get("lbfgs_tolerance", 1e-6),
+        lbfgs_history_size=trainer_settings_config.get("lbfgs_history_size", 10),
+        natural_gradient_learning_rate=trainer_settings_config.get(
+            "natural_gradient_learning_rate", None
+        ),
+        evaluation_frequency=trainer_settings_config.get("evaluation_frequency", 1),
+        evaluation_interval=trainer_settings_config.get("evaluation_interval", None),
+        evaluation_chunk_size=trainer_settings_config.get(
+            "evaluation_chunk_size", None
+        ),
+        prefetch_size=trainer_settings_config.get("prefetch_size", 2),
+        number_of_devices=trainer_settings_config.get("number_of_devices", 1),
+        regularisation_parallelism_schema=trainer_settings_config.get(
+            "regularisation_parallelism_schema",
+            RegularisationParallelismSchema.replicated,
+        ),
     )
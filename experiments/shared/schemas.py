@@ -5,6 +5,24 @@ class OptimiserSchema(str, enum.Enum):
     adam = "adam"
     adabelief = "adabelief"
     rmsprop = "rmsprop"
+    lbfgs = "lbfgs"
+
+
+class RegularisationBatchSchema(str, enum.Enum):
+    # the regularisation is evaluated on the empirical risk batch
+    shared = "shared"
+    # the regularisation is evaluated on an independent uniform sample of the training inputs
+    uniform = "uniform"
+    # the regularisation is evaluated on the inducing points and an independent uniform sample
+    inducing = "inducing"
+
+
+class RegularisationParallelismSchema(str, enum.Enum):
+    # every device evaluates the regularisation on all the regularisation inputs of the step
+    replicated = "replicated"
+    # every device evaluates the regularisation on its shard of the regularisation inputs
+    # and the results are averaged, which is exact for regularisations averaging over the inputs
+    sharded = "sharded"
 
 
 class EmpiricalRiskSchema(str, enum.Enum):
@@ -18,6 +36,7 @@ class RegularisationSchema(str, enum.Enum):
     projected_bhattacharyya = "projected_bhattacharyya"
     projected_hellinger = "projected_hellinger"
     projected_renyi = "projected_renyi"
+    combined_projected = "combined_projected"
     gaussian_squared_difference = "gaussian_squared_difference"
     gaussian_wasserstein = "gaussian_wasserstein"
     multinomial_wasserstein = "multinomial_wasserstein"
@@ -0,0 +1,219 @@
+from typing import Callable, Tuple
+
+import jax
+import jax.numpy as jnp
+from jax.flatten_util import ravel_pytree
+from jax.tree_util import DictKey
+
+from src.empirical_risks import NegativeLogLikelihood
+from src.empirical_risks.base import EmpiricalRiskBase
+from src.gps.base.approximate_base import ApproximateGPBase
+from src.gps.base.base import GPBaseParameters, GPPrediction
+from src.gps.base.regression_base import GPRegressionBase
+from src.kernels.base import KernelBaseParameters
+from src.utils.optimisation import minimise_bracketed_scalar
+
+
+def is_tempering_factor_fit_supported(
+    empirical_risk: EmpiricalRiskBase,
+    parameters: GPBaseParameters,
+) -> bool:
+    """
+    Whether the tempering factors of a GP can be fitted from a single prediction.
+    This is the case for approximate GPs, whose predictive covariance is the tempered kernel
+    plus the observation noise, when the only kernel parameters are tempering factors.
+    Args:
+        empirical_risk: the empirical risk of the tempered GP
+        parameters: the parameters of the tempered GP
+
+    Returns: whether fit_tempering_factors can be used
+
+    """
+    leaves_with_paths, _ = jax.tree_util.tree_flatten_with_path(
+        parameters.kernel.dict()
+    )
+    return (
+        isinstance(empirical_risk.gp, ApproximateGPBase)
+        and empirical_risk.supports_shared_prediction
+        and len(leaves_with_paths) > 0
+        and all(
+            path[-1] == DictKey("log_tempering_factor") for path, _ in leaves_with_paths
+        )
+    )
+
+
+def _build_tempered_empirical_risk_function(
+    empirical_risk: EmpiricalRiskBase,
+    prediction: GPPrediction,
+    observation_noise: jnp.ndarray,
+    number_of_tempering_factors: int,
+    y: jnp.ndarray,
+) -> Callable[[jnp.ndarray], jnp.ndarray]:
+    """
+    Builds the empirical risk as a function of the log tempering factors from the prediction
+    with all tempering factors equal to one. Tempering rescales the kernel part of the
+    predictive variance, so the mean and the base variance are reused for every evaluation.
+        - k is the number of output dimensions
+        - n is the number of points
+        - t is the number of tempering factors, either one or k
+    Args:
+        empirical_risk: the empirical risk of the tempered GP
+        prediction: the prediction with all tempering factors equal to one
+        observation_noise: the observation noise of shape (k, n)
+        number_of_tempering_factors: the number of tempering factors t
+        y: the responses
+
+    Returns: a function of the log tempering factors of shape (t,) returning the empirical risk
+
+    """
+    gp = empirical_risk.gp
+    number_output_dimensions = gp.kernel.number_output_dimensions
+    base_covariance = (
+        prediction.covariance.reshape(number_output_dimensions, -1) - observation_noise
+    )
+
+    def calculate_tempered_empirical_risk(
+        log_tempering_factors: jnp.ndarray,
+    ) -> jnp.ndarray:
+        tempering_factors = jnp.broadcast_to(
+            jnp.exp(log_tempering_factors),
+            (number_output_dimensions,)
+            if number_of_tempering_factors == 1
+            else log_tempering_factors.shape,
+        )
+        covariance = (
+            tempering_factors[:, None] * base_covariance + observation_noise
+        ).reshape(prediction.covariance.shape)
+        return empirical_risk._calculate_empirical_risk_from_prediction(
+            prediction=GPPrediction(
+                mean=prediction.mean,
+                covariance=covariance,
+                probabilities=gp._calculate_probabilities_from_prediction_gaussian(
+                    mean=prediction.mean,
+                    covariance_diagonals=covariance,
+                ),
+            ),
+            y=y,
+        )
+
+    return calculate_tempered_empirical_risk
+
+
+def fit_tempering_factors(
+    empirical_risk: EmpiricalRiskBase,
+    parameters: GPBaseParameters,
+    x: jnp.ndarray,
+    y: jnp.ndarray,
+    lower_log_tempering_factor: float = -20.0,
+    upper_log_tempering_factor: float = 20.0,
+    number_of_sweeps: int = 5,
+) -> Tuple[KernelBaseParameters, jnp.ndarray]:
+    """
+    Fits the tempering factors of an approximate GP by minimising the empirical risk.
+    The predictions with all tempering factors one and zero are computed once, giving the mean,
+    the base variance and the observation noise, so each evaluation only rescales the variance.
+    The kernel parameters are either one tempering factor shared by all outputs or one per output.
+    For the Gaussian negative log likelihood without observation noise, the optimal factor is
+    the mean squared residual relative to the base variance, which is used in closed form.
+    Otherwise each factor is found with a bracketed one dimensional search over its logarithm,
+    cycling through the factors number_of_sweeps times if the outputs are coupled by the risk.
+        - k is the number of output dimensions
+        - n is the number of points
+        - d is the number of dimensions
+    Args:
+        empirical_risk: the empirical risk of the tempered GP
+        parameters: the parameters of the tempered GP, only the kernel parameters are fitted
+        x: the design matrix of shape (n, d)
+        y: the responses
+        lower_log_tempering_factor: the lower end of the search interval of the log tempering factors
+        upper_log_tempering_factor: the upper end of the search interval of the log tempering factors
+        number_of_sweeps: the number of cycles through coupled tempering factors
+
+    Returns: the fitted kernel parameters and the empirical risk at the fitted parameters
+
+    """
+    assert is_tempering_factor_fit_supported(
+        empirical_risk=empirical_risk,
+        parameters=parameters,
+    ), "Tempering factors can only be fitted for approximate GPs with tempered kernels."
+    gp = empirical_risk.gp
+    number_output_dimensions = gp.kernel.number_output_dimensions
+    log_tempering_factors, unravel = ravel_pytree(parameters.kernel.dict())
+    number_of_tempering_factors = log_tempering_factors.shape[0]
+    if number_of_tempering_factors not in {1, number_output_dimensions}:
+        raise ValueError(
+            f"Expected one tempering factor or one per output, got {number_of_tempering_factors=} "
+            f"for {number_output_dimensions=}."
+        )
+    prediction, untempered_prediction = [
+        gp.calculate_prediction(
+            parameters=parameters.construct(
+                log_observation_noise=parameters.log_observation_noise,
+                mean=parameters.mean,
+                kernel=gp.kernel.generate_parameters(
+                    unravel(jnp.full_like(log_tempering_factors, log_tempering_factor))
+                ),
+            ),
+            x=x,
+        )
+        for log_tempering_factor in [0.0, -jnp.inf]
+    ]
+    # with a tempering factor of zero, the predictive variance is the observation noise
+    observation_noise = untempered_prediction.covariance.reshape(
+        number_output_dimensions, -1
+    )
+    calculate_tempered_empirical_risk = _build_tempered_empirical_risk_function(
+        empirical_risk=empirical_risk,
+        prediction=prediction,
+        observation_noise=observation_noise,
+        number_of_tempering_factors=number_of_tempering_factors,
+        y=y,
+    )
+    is_gaussian_likelihood = isinstance(
+        empirical_risk, NegativeLogLikelihood
+    ) and isinstance(gp, GPRegressionBase)
+    if is_gaussian_likelihood and bool(jnp.all(observation_noise == 0)):
+        squared_residuals = jnp.square(
+            y.reshape(x.shape[0], -1).T
+            - prediction.mean.reshape(number_output_dimensions, -1)
+        )
+        relative_squared_residuals = squared_residuals / prediction.covariance.reshape(
+            number_output_dimensions, -1
+        )
+        log_tempering_factors = jnp.log(
+            jnp.mean(relative_squared_residuals).reshape(1)
+            if number_of_tempering_factors == 1
+            else jnp.mean(relative_squared_residuals, axis=1)
+        )
+    else:
+        # the outputs of the Gaussian likelihood are independent, so one sweep is exact
+        number_of_sweeps = (
+            1
+            if is_gaussian_likelihood or number_of_tempering_factors == 1
+            else number_of_sweeps
+        )
+
+        def update(iteration: int, log_tempering_factors_: jnp.ndarray) -> jnp.ndarray:
+            index = iteration % number_of_tempering_factors
+            return log_tempering_factors_.at[index].set(
+                minimise_bracketed_scalar(
+                    function=lambda value: calculate_tempered_empirical_risk(
+                        log_tempering_factors_.at[index].set(value)
+                    ),
+                    lower=lower_log_tempering_factor,
+                    upper=upper_log_tempering_factor,
+                )
+            )
+
+        log_tempering_factors = jax.jit(
+            lambda log_tempering_factors_: jax.lax.fori_loop(
+                0,
+                number_of_sweeps * number_of_tempering_factors,
+                update,
+                log_tempering_factors_,
+            )
+        )(log_tempering_factors)
+    return (
+        gp.kernel.generate_parameters(unravel(log_tempering_factors)),
+        calculate_tempered_empirical_risk(log_tempering_factors),
+    )
@@ -1,18 +1,29 @@
 import os
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Tuple
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import jax
 import jax.numpy as jnp
+import numpy as np
 import optax
-from flax.core.frozen_dict import FrozenDict
+from jax.experimental.shard_map import shard_map
+from jax.flatten_util import ravel_pytree
+from jax.sharding import Mesh, NamedSharding
+from jax.sharding import PartitionSpec as P
 from tqdm import tqdm
 
+from experiments.shared.checkpointer import Checkpointer
 from experiments.shared.data import Data
-from experiments.shared.resolvers import optimiser_resolver
-from experiments.shared.schemas import OptimiserSchema
+from experiments.shared.schemas import (
+    OptimiserSchema,
+    RegularisationBatchSchema,
+    RegularisationParallelismSchema,
+)
 from src.module import ModuleParameters
-from src.utils.data import generate_batch
+from src.utils.data import PrefetchedBatchIterator
+from src.utils.jit import jit_hoisting_constants
+from src.utils.optimisation import minimise_lbfgs
 
 
 @dataclass
@@ -24,6 +35,48 @@ class TrainerSettings:
     batch_size: int
     batch_shuffle: bool
     batch_drop_last: bool
+    regularisation_batch_schema: RegularisationBatchSchema = (
+        RegularisationBatchSchema.shared
+    )
+    regularisation_batch_size: Optional[int] = None
+    number_of_microbatches: int = 1
+    on_device: bool = False
+    number_of_epochs_per_scan: int = 1
+    convergence_window: int = 0
+    convergence_relative_tolerance: float = 0.0
+    convergence_gradient_norm: float = 0.0
+    validation_metric: Optional[str] = None
+    validation_patience: int = 0
+    lbfgs_tolerance: float = 1e-6
+    lbfgs_history_size: int = 10
+    natural_gradient_learning_rate: Optional[float] = None
+    evaluation_frequency: int = 1
+    evaluation_interval: Optional[float] = None
+    # the chunk size of the GP prediction shared by the post epoch terms, terms which do not share the
+    # prediction, such as the Gaussian Wasserstein regularisation, are evaluated on all points at once
+    evaluation_chunk_size: Optional[int] = None
+    prefetch_size: int = 2
+    number_of_devices: int = 1
+    regularisation_parallelism_schema: RegularisationParallelismSchema = (
+        RegularisationParallelismSchema.replicated
+    )
+
+
+class TrainingState(NamedTuple):
+    """
+    The state of training at the start of an epoch, checkpointed with the parameters
+    such that training can be resumed exactly.
+    """
+
+    epoch: int
+    key: jnp.ndarray
+    opt_state: optax.OptState
+    loss_window: jnp.ndarray
+    best_validation_metric: float
+    epochs_without_improvement: int
+    post_epoch_history: List[Dict[str, float]]
+    # the epoch at the start of which the parameters were last evaluated, -1 if they never were
+    last_evaluation_epoch: int = -1
 
 
 class Trainer:
@@ -33,68 +86,1508 @@ class Trainer:
         checkpoint_path: str,
         post_epoch_callback: Callable[[ModuleParameters], Dict[str, float]],
         break_condition_function: Callable[[ModuleParameters], bool] = None,
+        checkpoint_max_to_keep: Optional[int] = None,
+        checkpoint_best_to_keep: int = 0,
+        asynchronous_checkpointing: bool = True,
+        resume_from_checkpoint: bool = False,
     ):
+        """
+        Args:
+            save_checkpoint_frequency: the number of epochs between checkpoints, zero for none
+            checkpoint_path: the directory of the checkpoints
+            post_epoch_callback: a function of the parameters evaluated after every epoch
+            break_condition_function: a function of the parameters to stop training early
+            checkpoint_max_to_keep: the number of most recent checkpoints kept, all if None
+            checkpoint_best_to_keep: the number of checkpoints with the lowest validation metric
+                                     kept in addition to the most recent ones
+            asynchronous_checkpointing: whether checkpoints are written on a background thread
+            resume_from_checkpoint: whether training resumes from the latest checkpoint
+                                    in checkpoint_path
+        """
         self.save_checkpoint_frequency = save_checkpoint_frequency
         self.checkpoint_path = checkpoint_path
+        self.checkpointer = Checkpointer(
+            checkpoint_path=checkpoint_path,
+            max_to_keep=checkpoint_max_to_keep,
+            best_to_keep=checkpoint_best_to_keep,
+            is_asynchronous=asynchronous_checkpointing,
+        )
+        self.resume_from_checkpoint = resume_from_checkpoint
         self.post_epoch_callback = post_epoch_callback
         self.break_condition_function = break_condition_function
+        # the losses of every training step of the last call to train
+        self.step_losses = jnp.zeros((0,))
 
-    def train(
+    @staticmethod
+    def _sample_regularisation_batch(
+        key: jnp.ndarray,
+        trainer_settings: TrainerSettings,
+        data: Data,
+        regularisation_anchor: Optional[jnp.ndarray],
+    ) -> jnp.ndarray:
+        """
+        Samples the inputs for the regularisation of a training step.
+        Args:
+            key: the random key for the sample
+            trainer_settings: the trainer settings defining the regularisation batch schema and size
+            data: the training data
+            regularisation_anchor: points included in every regularisation batch, such as the inducing points
+
+        Returns: the regularisation inputs
+
+        """
+        assert (
+            trainer_settings.regularisation_batch_size is not None
+        ), "Regularisation batch size must be specified."
+        x_sample = data.x[
+            jax.random.choice(
+                key,
+                data.x.shape[0],
+                shape=(
+                    min(trainer_settings.regularisation_batch_size, data.x.shape[0]),
+                ),
+                replace=False,
+            ),
+            ...,
+        ]
+        if (
+            trainer_settings.regularisation_batch_schema
+            == RegularisationBatchSchema.uniform
+        ):
+            return x_sample
+        if (
+            trainer_settings.regularisation_batch_schema
+            == RegularisationBatchSchema.inducing
+        ):
+            assert (
+                regularisation_anchor is not None
+            ), "Regularisation anchor must be provided for the inducing schema."
+            return jnp.concatenate([regularisation_anchor, x_sample], axis=0)
+        raise ValueError(
+            f"Unknown regularisation batch schema: {trainer_settings.regularisation_batch_schema}"
+        )
+
+    @staticmethod
+    def _calculate_accumulated_loss_and_gradients(
+        loss_function: Callable,
+        parameters: ModuleParameters,
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+        number_of_microbatches: int,
+        *args,
+    ) -> Tuple[jnp.ndarray, ModuleParameters]:
+        """
+        Calculates the loss and gradients of a batch by accumulating over microbatches with lax.scan,
+        such that peak memory is bounded by the microbatch size rather than the batch size.
+        The result is the average of the microbatch losses weighted by their sizes, which equals the
+        loss of the full batch for losses that average over the points of the batch.
+        Points which do not fill a whole microbatch are accumulated as a final smaller microbatch.
+        Args:
+            loss_function: the loss function of the parameters and a batch
+            parameters: the parameters
+            x: the inputs of the batch
+            y: the responses of the batch
+            number_of_microbatches: the number of microbatches to split the batch into
+            *args: additional arguments of the loss function shared by all microbatches
+
+        Returns: the loss and the gradients of the batch
+
+        """
+        value_and_grad_function = jax.value_and_grad(
+            lambda parameters_, x_, y_: loss_function(parameters_, x_, y_, *args)
+        )
+        if number_of_microbatches <= 1:
+            return value_and_grad_function(parameters, x, y)
+        batch_size = x.shape[0]
+        microbatch_size = max(batch_size // number_of_microbatches, 1)
+        number_of_full_microbatches = batch_size // microbatch_size
+        split_index = number_of_full_microbatches * microbatch_size
+
+        def accumulate(carry, microbatch):
+            loss, gradients = carry
+            microbatch_loss, microbatch_gradients = value_and_grad_function(
+                parameters, *microbatch
+            )
+            return (
+                loss + microbatch_loss,
+                jax.tree_util.tree_map(jnp.add, gradients, microbatch_gradients),
+            ), None
+
+        (loss, gradients), _ = jax.lax.scan(
+            accumulate,
+            (
+                jnp.zeros(()),
+                jax.tree_util.tree_map(jnp.zeros_like, parameters),
+            ),
+            (
+                x[:split_index].reshape(
+                    number_of_full_microbatches, microbatch_size, *x.shape[1:]
+                ),
+                y[:split_index].reshape(
+                    number_of_full_microbatches, microbatch_size, *y.shape[1:]
+                ),
+            ),
+        )
+        loss = loss * microbatch_size
+        gradients = jax.tree_util.tree_map(
+            lambda gradient: gradient * microbatch_size, gradients
+        )
+        if split_index < batch_size:
+            remainder_loss, remainder_gradients = value_and_grad_function(
+                parameters, x[split_index:], y[split_index:]
+            )
+            remainder_size = batch_size - split_index
+            loss = loss + remainder_loss * remainder_size
+            gradients = jax.tree_util.tree_map(
+                lambda gradient, remainder_gradient: gradient
+                + remainder_gradient * remainder_size,
+                gradients,
+                remainder_gradients,
+            )
+        return loss / batch_size, jax.tree_util.tree_map(
+            lambda gradient: gradient / batch_size, gradients
+        )
+
+    def _calculate_loss_and_gradients(
+        self,
+        trainer_settings: TrainerSettings,
+        parameters: ModuleParameters,
+        batch: Tuple[jnp.ndarray, ...],
+        loss_function: Callable,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ],
+    ) -> Tuple[jnp.ndarray, ModuleParameters]:
+        """
+        Calculates the loss and gradients of a training step.
+        The loss function is accumulated over microbatches, and the regularisation function, if given,
+        is calculated once on the regularisation inputs of the step, or the batch inputs if there are none.
+        Args:
+            trainer_settings: the trainer settings defining the number of microbatches
+            parameters: the parameters
+            batch: the inputs and responses of the batch, optionally followed by the regularisation inputs
+            loss_function: the loss function of the parameters and a batch
+            regularisation_function: the regularisation function of the parameters and inputs
+
+        Returns: the loss and the gradients of the training step
+
+        """
+        x, y, *regularisation_batch = batch
+        if regularisation_function is None:
+            return self._calculate_accumulated_loss_and_gradients(
+                loss_function,
+                parameters,
+                x,
+                y,
+                trainer_settings.number_of_microbatches,
+                *regularisation_batch,
+            )
+        loss, gradients = self._calculate_accumulated_loss_and_gradients(
+            loss_function,
+            parameters,
+            x,
+            y,
+            trainer_settings.number_of_microbatches,
+        )
+        regularisation, regularisation_gradients = jax.value_and_grad(
+            lambda parameters_: regularisation_function(
+                parameters_,
+                regularisation_batch[0] if regularisation_batch else x,
+            )
+        )(parameters)
+        return loss + regularisation, jax.tree_util.tree_map(
+            jnp.add, gradients, regularisation_gradients
+        )
+
+    def _calculate_data_parallel_loss_and_gradients(
+        self,
+        trainer_settings: TrainerSettings,
+        mesh: Mesh,
+        parameters: ModuleParameters,
+        batch: Tuple[jnp.ndarray, ...],
+        loss_function: Callable,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ],
+    ) -> Tuple[jnp.ndarray, ModuleParameters]:
+        """
+        Calculates the loss and gradients of a training step with the batch sharded across the
+        devices of the mesh. Every device calculates the loss and gradients of its shard,
+        which are averaged across devices with an all-reduce. Shards have equal sizes, so this is
+        the loss and gradients of the full batch up to the order of the reduction.
+        The loss function must average over the points of the batch, so any regularisation
+        must be given as the regularisation function, whose inputs are replicated or sharded
+        across the devices following the regularisation parallelism schema of the trainer settings.
+        Args:
+            trainer_settings: the trainer settings
+            mesh: the one dimensional mesh of devices with the axis "data"
+            parameters: the parameters
+            batch: the inputs and responses of the batch, optionally followed by the regularisation inputs
+            loss_function: the loss function of the parameters and a batch
+            regularisation_function: the regularisation function of the parameters and inputs
+
+        Returns: the loss and the gradients of the training step
+
+        """
+        x, y, *regularisation_batch = batch
+        if regularisation_function is None and regularisation_batch:
+            raise ValueError(
+                "Data parallel training requires the regularisation as the regularisation function, "
+                "a loss function of the regularisation inputs would be evaluated on every shard."
+            )
+        if regularisation_function is not None and not regularisation_batch:
+            # the shared schema regularises the batch inputs, which may be replicated
+            regularisation_batch = [x]
+        is_regularisation_sharded = (
+            trainer_settings.regularisation_parallelism_schema
+            == RegularisationParallelismSchema.sharded
+        )
+        number_of_devices = mesh.devices.size
+        for array in [x] + (regularisation_batch if is_regularisation_sharded else []):
+            if array.shape[0] % number_of_devices:
+                raise ValueError(
+                    f"Cannot shard a batch of size {array.shape[0]} across {number_of_devices} devices."
+                )
+        regularisation_batch_spec = P("data") if is_regularisation_sharded else P()
+
+        def calculate_shard_loss_and_gradients(
+            parameters_: ModuleParameters,
+            x_: jnp.ndarray,
+            y_: jnp.ndarray,
+            *regularisation_batch_,
+        ) -> Tuple[jnp.ndarray, ModuleParameters]:
+            loss, gradients = self._calculate_loss_and_gradients(
+                trainer_settings=trainer_settings,
+                parameters=parameters_,
+                batch=(x_, y_, *regularisation_batch_),
+                loss_function=loss_function,
+                regularisation_function=regularisation_function,
+            )
+            return jax.lax.pmean((loss, gradients), axis_name="data")
+
+        return shard_map(
+            calculate_shard_loss_and_gradients,
+            mesh=mesh,
+            in_specs=(P(), P("data"), P("data"))
+            + (regularisation_batch_spec,) * len(regularisation_batch),
+            out_specs=P(),
+            check_rep=False,
+        )(parameters, x, y, *regularisation_batch)
+
+    def _build_train_step(
+        self,
+        trainer_settings: TrainerSettings,
+        optimiser: optax.GradientTransformation,
+        loss_function: Callable,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ],
+        mesh: Optional[Mesh] = None,
+    ) -> Callable:
+        """
+        Builds a jit-compiled training step on raw parameter pytrees.
+        The step computes the loss and gradients in one forward and backward pass and applies the
+        optimiser update. If the loss is NaN, the update is skipped in-graph and the step is flagged.
+        If a mesh is given, the loss and gradients are calculated data parallel across its devices.
+        Args:
+            trainer_settings: the trainer settings
+            optimiser: the optimiser
+            loss_function: the loss function of the parameters and a batch
+            regularisation_function: the regularisation function of the parameters and inputs
+            mesh: the mesh of devices for data parallel training, a single device if None
+
+        Returns: a function of the parameters, optimiser state and batch returning the
+                 updated parameters, optimiser state, loss, gradient norm and whether the loss was NaN
+
+        """
+
+        def train_step(
+            parameters: ModuleParameters,
+            opt_state: optax.OptState,
+            *batch: jnp.ndarray,
+        ) -> Tuple[
+            ModuleParameters, optax.OptState, jnp.ndarray, jnp.ndarray, jnp.ndarray
+        ]:
+            if mesh is None:
+                loss, gradients = self._calculate_loss_and_gradients(
+                    trainer_settings=trainer_settings,
+                    parameters=parameters,
+                    batch=batch,
+                    loss_function=loss_function,
+                    regularisation_function=regularisation_function,
+                )
+            else:
+                loss, gradients = self._calculate_data_parallel_loss_and_gradients(
+                    trainer_settings=trainer_settings,
+                    mesh=mesh,
+                    parameters=parameters,
+                    batch=batch,
+                    loss_function=loss_function,
+                    regularisation_function=regularisation_function,
+                )
+            updates, updated_opt_state = optimiser.update(
+                gradients, opt_state, parameters
+            )
+            updated_parameters = optax.apply_updates(parameters, updates)
+            is_nan = jnp.isnan(loss)
+            parameters, opt_state = jax.tree_util.tree_map(
+                lambda updated, current: jnp.where(is_nan, current, updated),
+                (updated_parameters, updated_opt_state),
+                (parameters, opt_state),
+            )
+            return (
+                parameters,
+                opt_state,
+                loss,
+                optax.global_norm(gradients),
+                is_nan,
+            )
+
+        return jit_hoisting_constants(train_step)
+
+    @staticmethod
+    def _build_mesh(
+        trainer_settings: TrainerSettings,
+        dataset_size: int,
+    ) -> Optional[Mesh]:
+        """
+        Builds the mesh of devices for data parallel training, checking that every batch of an epoch
+        can be split evenly across the devices.
+        Args:
+            trainer_settings: the trainer settings defining the number of devices and the batching
+            dataset_size: the number of training points
+
+        Returns: a one dimensional mesh with the axis "data", or None for single device training
+
+        """
+        number_of_devices = trainer_settings.number_of_devices
+        if number_of_devices <= 1:
+            return None
+        if number_of_devices > jax.device_count():
+            raise ValueError(
+                f"{number_of_devices=} exceeds the {jax.device_count()} available devices."
+            )
+        batch_size = min(trainer_settings.batch_size, dataset_size)
+        batch_sizes = {batch_size}
+        if not trainer_settings.batch_drop_last and not trainer_settings.on_device:
+            batch_sizes.add(dataset_size % batch_size or batch_size)
+        for batch_size_ in batch_sizes:
+            if batch_size_ % number_of_devices:
+                raise ValueError(
+                    f"Cannot shard a batch of size {batch_size_} across {number_of_devices} devices."
+                )
+        return Mesh(jax.devices()[:number_of_devices], axis_names=("data",))
+
+    @staticmethod
+    def _calculate_checkpoint_metric(
+        trainer_settings: TrainerSettings,
+        training_state: TrainingState,
+    ) -> Optional[float]:
+        """
+        The validation metric of the parameters being checkpointed, used to rank checkpoints for retention.
+        This is the last entry of the post epoch history if it evaluated the parameters at the start
+        of the epoch of the checkpoint, parameters which were not evaluated are not ranked.
+        Args:
+            trainer_settings: the trainer settings defining the validation metric
+            training_state: the training state at the start of the epoch
+
+        Returns: the validation metric or None if it is not available
+
+        """
+        if (
+            trainer_settings.validation_metric is None
+            or training_state.last_evaluation_epoch != training_state.epoch
+        ):
+            return None
+        return float(
+            training_state.post_epoch_history[-1][trainer_settings.validation_metric]
+        )
+
+    def _save_checkpoint(
+        self,
+        trainer_settings: TrainerSettings,
+        parameters: ModuleParameters,
+        training_state: TrainingState,
+    ) -> None:
+        """
+        Saves the parameters with the training state at the start of an epoch.
+        The optimiser state is stored as its list of leaves and restored into the
+        structure of a freshly initialised optimiser state.
+        Args:
+            trainer_settings: the trainer settings
+            parameters: the parameters at the start of the epoch
+            training_state: the training state at the start of the epoch
+
+        """
+        self.checkpointer.save(
+            epoch=training_state.epoch,
+            parameters=parameters,
+            metric=self._calculate_checkpoint_metric(
+                trainer_settings=trainer_settings,
+                training_state=training_state,
+            ),
+            state=training_state._replace(
+                opt_state=jax.tree_util.tree_leaves(training_state.opt_state)
+            )._asdict(),
+        )
+
+    def _restore_checkpoint(
+        self,
+        parameters: ModuleParameters,
+        training_state: TrainingState,
+        maximum_epoch: Optional[int] = None,
+    ) -> Tuple[ModuleParameters, TrainingState]:
+        """
+        Restores the parameters and training state of the latest checkpoint if resuming
+        from checkpoints is enabled and one exists, otherwise returns the inputs unchanged.
+        Args:
+            parameters: the initial parameters
+            training_state: the initial training state
+            maximum_epoch: the latest epoch to restore, all epochs if None
+
+        Returns: the parameters and training state to start training from
+
+        """
+        if not self.resume_from_checkpoint:
+            return parameters, training_state
+        restored_checkpoint = self.checkpointer.restore_latest(
+            parameters=parameters,
+            maximum_epoch=maximum_epoch,
+        )
+        if restored_checkpoint is None:
+            return parameters, training_state
+        epoch, parameters, state = restored_checkpoint
+        return parameters, TrainingState(
+            epoch=epoch,
+            key=jnp.asarray(state["key"]),
+            opt_state=jax.tree_util.tree_unflatten(
+                jax.tree_util.tree_structure(training_state.opt_state),
+                state["opt_state"],
+            ),
+            loss_window=jnp.asarray(state["loss_window"]),
+            best_validation_metric=float(state["best_validation_metric"]),
+            epochs_without_improvement=int(state["epochs_without_improvement"]),
+            post_epoch_history=list(state["post_epoch_history"]),
+            last_evaluation_epoch=int(state["last_evaluation_epoch"]),
+        )
+
+    @staticmethod
+    def _is_evaluation_scheduled(
+        trainer_settings: TrainerSettings,
+        epoch: int,
+        number_of_epochs: int,
+        last_evaluation_time: float,
+    ) -> bool:
+        """
+        Whether the post epoch callback is evaluated after the epochs from epoch to
+        epoch + number_of_epochs - 1. This is the case if one of them is a multiple of
+        evaluation_frequency epochs, if evaluation_interval seconds have passed since the last
+        evaluation, or if the last of them is the final epoch of training.
+        Args:
+            trainer_settings: the trainer settings defining the evaluation schedule
+            epoch: the first epoch
+            number_of_epochs: the number of epochs run since the last check
+            last_evaluation_time: the time of the last evaluation from time.monotonic
+
+        Returns: whether to evaluate the post epoch callback
+
+        """
+        last_epoch = epoch + number_of_epochs - 1
+        if last_epoch >= trainer_settings.number_of_epochs - 1:
+            return True
+        if (
+            trainer_settings.evaluation_interval is not None
+            and time.monotonic() - last_evaluation_time
+            >= trainer_settings.evaluation_interval
+        ):
+            return True
+        return trainer_settings.evaluation_frequency > 0 and any(
+            (epoch_ + 1) % trainer_settings.evaluation_frequency == 0
+            for epoch_ in range(epoch, last_epoch + 1)
+        )
+
+    @staticmethod
+    def _initialise_convergence_window(
+        trainer_settings: TrainerSettings,
+    ) -> jnp.ndarray:
+        """
+        Initialises the rolling window of epoch losses used to detect convergence.
+        Args:
+            trainer_settings: the trainer settings defining the convergence window
+
+        Returns: a window of shape (convergence_window + 1,) filled with infinity
+
+        """
+        return jnp.full((max(trainer_settings.convergence_window, 0) + 1,), jnp.inf)
+
+    @staticmethod
+    def _update_convergence(
+        trainer_settings: TrainerSettings,
+        loss_window: jnp.ndarray,
+        epoch_loss: jnp.ndarray,
+        epoch_gradient_norm: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Updates the rolling window of epoch losses and checks the convergence criteria from the
+        statistics of the training steps, without any additional forward pass. Training has converged if
+            - the loss improved by less than convergence_relative_tolerance relative to the loss
+              convergence_window epochs ago, or
+            - the mean gradient norm of the epoch is below convergence_gradient_norm.
+        A criterion is disabled if its setting is not positive.
+        Args:
+            trainer_settings: the trainer settings defining the convergence criteria
+            loss_window: the rolling window of the most recent epoch losses
+            epoch_loss: the mean loss of the training steps in the epoch
+            epoch_gradient_norm: the mean gradient norm of the training steps in the epoch
+
+        Returns: the updated window and whether training has converged
+
+        """
+        loss_window = jnp.append(loss_window[1:], epoch_loss)
+        is_converged = jnp.array(False)
+        if trainer_settings.convergence_window > 0:
+            relative_improvement = (loss_window[0] - loss_window[-1]) / jnp.abs(
+                loss_window[0]
+            )
+            is_converged = is_converged | (
+                jnp.isfinite(loss_window[0])
+                & (
+                    relative_improvement
+                    < trainer_settings.convergence_relative_tolerance
+                )
+            )
+        if trainer_settings.convergence_gradient_norm > 0:
+            is_converged = is_converged | (
+                epoch_gradient_norm < trainer_settings.convergence_gradient_norm
+            )
+        return loss_window, is_converged
+
+    @staticmethod
+    def _update_validation_patience(
+        trainer_settings: TrainerSettings,
+        post_epoch_result: Dict[str, float],
+        best_validation_metric: float,
+        epochs_without_improvement: int,
+    ) -> Tuple[float, int, bool]:
+        """
+        Tracks the validation metric of the post epoch callback, where lower is better.
+        Args:
+            trainer_settings: the trainer settings defining the validation metric and patience
+            post_epoch_result: the result of the post epoch callback
+            best_validation_metric: the best validation metric so far
+            epochs_without_improvement: the number of evaluations since the best validation metric
+
+        Returns: the updated best validation metric, evaluations without improvement,
+                 and whether the patience is exhausted
+
+        """
+        if (
+            trainer_settings.validation_metric is None
+            or trainer_settings.validation_patience <= 0
+        ):
+            return best_validation_metric, epochs_without_improvement, False
+        validation_metric = float(post_epoch_result[trainer_settings.validation_metric])
+        if validation_metric < best_validation_metric:
+            return validation_metric, 0, False
+        epochs_without_improvement += 1
+        return (
+            best_validation_metric,
+            epochs_without_improvement,
+            epochs_without_improvement >= trainer_settings.validation_patience,
+        )
+
+    def _build_train_epochs(
+        self,
+        trainer_settings: TrainerSettings,
+        train_step: Callable,
+        regularisation_anchor: Optional[jnp.ndarray],
+    ) -> Callable:
+        """
+        Builds a jit-compiled function running several epochs on device in one lax.scan.
+        Each epoch permutes the data with a key inside the graph and scans over its full batches,
+        the last incomplete batch of an epoch is dropped so that all batches have the same shape.
+        Once a step has a NaN loss, or training has converged, all later updates are skipped
+        and their losses are NaN.
+        Args:
+            trainer_settings: the trainer settings
+            train_step: the jit-compiled training step
+            regularisation_anchor: points included in every regularisation batch for the inducing schema
+
+        Returns: a function of the parameters, optimiser state, convergence window, one key per epoch
+                 and the data returning the updated parameters, optimiser state, convergence window,
+                 whether training stopped on a NaN loss, whether training converged and
+                 the losses of each step of shape (number of epochs, number of batches)
+
+        """
+
+        def train_batch(carry, batch_indices_and_key):
+            parameters, opt_state, is_stopped, x, y = carry
+            batch_indices, key = batch_indices_and_key
+            batch = (x[batch_indices, ...], y[batch_indices, ...])
+            if (
+                trainer_settings.regularisation_batch_schema
+                != RegularisationBatchSchema.shared
+            ):
+                batch += (
+                    self._sample_regularisation_batch(
+                        key=key,
+                        trainer_settings=trainer_settings,
+                        data=Data(x=x, y=y),
+                        regularisation_anchor=regularisation_anchor,
+                    ),
+                )
+            (
+                updated_parameters,
+                updated_opt_state,
+                loss,
+                gradient_norm,
+                is_nan,
+            ) = train_step(parameters, opt_state, *batch)
+            loss = jnp.where(is_stopped, jnp.nan, loss)
+            is_stopped = is_stopped | is_nan
+            parameters, opt_state = jax.tree_util.tree_map(
+                lambda updated, current: jnp.where(is_stopped, current, updated),
+                (updated_parameters, updated_opt_state),
+                (parameters, opt_state),
+            )
+            return (parameters, opt_state, is_stopped, x, y), (
+                loss,
+                gradient_norm,
+            )
+
+        def train_epoch(carry, key):
+            (
+                parameters,
+                opt_state,
+                loss_window,
+                is_stopped,
+                is_converged,
+                x,
+                y,
+            ) = carry
+            dataset_size = x.shape[0]
+            batch_size = min(trainer_settings.batch_size, dataset_size)
+            number_of_batches = dataset_size // batch_size
+            permutation_key, regularisation_key = jax.random.split(key)
+            if trainer_settings.batch_shuffle:
+                indices = jax.random.permutation(permutation_key, dataset_size)
+            else:
+                indices = jnp.arange(dataset_size)
+            # a converged run is frozen in the same way as a run stopped by a NaN loss
+            (
+                (parameters, opt_state, is_frozen, _, _),
+                (losses, gradient_norms),
+            ) = jax.lax.scan(
+                train_batch,
+                (parameters, opt_state, is_stopped | is_converged, x, y),
+                (
+                    indices[: number_of_batches * batch_size].reshape(
+                        number_of_batches, batch_size
+                    ),
+                    jax.random.split(regularisation_key, number_of_batches),
+                ),
+            )
+            is_stopped = is_frozen & ~is_converged
+            loss_window, has_converged = self._update_convergence(
+                trainer_settings=trainer_settings,
+                loss_window=loss_window,
+                epoch_loss=jnp.mean(losses),
+                epoch_gradient_norm=jnp.mean(gradient_norms),
+            )
+            is_converged = is_converged | (has_converged & ~is_stopped)
+            return (
+                parameters,
+                opt_state,
+                loss_window,
+                is_stopped,
+                is_converged,
+                x,
+                y,
+            ), losses
+
+        def train_epochs(
+            parameters: ModuleParameters,
+            opt_state: optax.OptState,
+            loss_window: jnp.ndarray,
+            keys: jnp.ndarray,
+            x: jnp.ndarray,
+            y: jnp.ndarray,
+        ) -> Tuple[
+            ModuleParameters,
+            optax.OptState,
+            jnp.ndarray,
+            jnp.ndarray,
+            jnp.ndarray,
+            jnp.ndarray,
+        ]:
+            (
+                (
+                    parameters,
+                    opt_state,
+                    loss_window,
+                    is_stopped,
+                    is_converged,
+                    _,
+                    _,
+                ),
+                losses,
+            ) = jax.lax.scan(
+                train_epoch,
+                (
+                    parameters,
+                    opt_state,
+                    loss_window,
+                    jnp.array(False),
+                    jnp.array(False),
+                    x,
+                    y,
+                ),
+                keys,
+            )
+            return (
+                parameters,
+                opt_state,
+                loss_window,
+                is_stopped,
+                is_converged,
+                losses,
+            )
+
+        return jit_hoisting_constants(train_epochs)
+
+    def _train_on_device(
+        self,
+        trainer_settings: TrainerSettings,
+        parameters: ModuleParameters,
+        data: Data,
+        train_step: Callable,
+        training_state: TrainingState,
+        disable_tqdm: bool,
+        regularisation_anchor: Optional[jnp.ndarray],
+    ) -> Tuple[ModuleParameters, List[Dict[str, float]]]:
+        """
+        Trains with the epochs run on device, number_of_epochs_per_scan epochs per dispatch.
+        Convergence is detected in-graph, while checkpoints, the post epoch callback,
+        the validation patience and the break condition are evaluated between scans.
+        Args:
+            trainer_settings: the trainer settings
+            parameters: the initial parameters
+            data: the training data
+            train_step: the jit-compiled training step
+            training_state: the training state to start from
+            disable_tqdm: whether to disable the progress bar
+            regularisation_anchor: points included in every regularisation batch for the inducing schema
+
+        Returns: the trained parameters and the history of the post epoch callback
+
+        """
+        step_losses = []
+        train_epochs = self._build_train_epochs(
+            trainer_settings=trainer_settings,
+            train_step=train_step,
+            regularisation_anchor=regularisation_anchor,
+        )
+        (
+            start_epoch,
+            key,
+            opt_state,
+            loss_window,
+            best_validation_metric,
+            epochs_without_improvement,
+            post_epoch_history,
+            last_evaluation_epoch,
+        ) = training_state
+        last_evaluation_time = time.monotonic()
+        number_of_epochs_per_scan = max(trainer_settings.number_of_epochs_per_scan, 1)
+        for epoch in tqdm(
+            range(
+                start_epoch,
+                trainer_settings.number_of_epochs,
+                number_of_epochs_per_scan,
+            ),
+            disable=disable_tqdm,
+        ):
+            number_of_epochs = min(
+                number_of_epochs_per_scan, trainer_settings.number_of_epochs - epoch
+            )
+            if self.save_checkpoint_frequency and any(
+                epoch_ % self.save_checkpoint_frequency == 0
+                for epoch_ in range(epoch, epoch + number_of_epochs)
+            ):
+                self._save_checkpoint(
+                    trainer_settings=trainer_settings,
+                    parameters=parameters,
+                    training_state=TrainingState(
+                        epoch=epoch,
+                        key=key,
+                        opt_state=opt_state,
+                        loss_window=loss_window,
+                        best_validation_metric=best_validation_metric,
+                        epochs_without_improvement=epochs_without_improvement,
+                        post_epoch_history=post_epoch_history,
+                        last_evaluation_epoch=last_evaluation_epoch,
+                    ),
+                )
+            key, subkey = jax.random.split(key)
+            (
+                parameters,
+                opt_state,
+                loss_window,
+                is_stopped,
+                is_converged,
+                losses,
+            ) = train_epochs(
+                parameters,
+                opt_state,
+                loss_window,
+                jax.random.split(subkey, number_of_epochs),
+                data.x,
+                data.y,
+            )
+            step_losses.append(losses.reshape(-1))
+            if is_stopped:
+                break
+            is_break = bool(
+                self.break_condition_function
+                and self.break_condition_function(parameters)
+            )
+            is_evaluation = (
+                is_break
+                or bool(is_converged)
+                or self._is_evaluation_scheduled(
+                    trainer_settings=trainer_settings,
+                    epoch=epoch,
+                    number_of_epochs=number_of_epochs,
+                    last_evaluation_time=last_evaluation_time,
+                )
+            )
+            if is_evaluation:
+                post_epoch_history.append(self.post_epoch_callback(parameters))
+                last_evaluation_time = time.monotonic()
+                last_evaluation_epoch = epoch + number_of_epochs
+            if is_break or is_converged:
+                break
+            if is_evaluation:
+                (
+                    best_validation_metric,
+                    epochs_without_improvement,
+                    is_patience_exhausted,
+                ) = self._update_validation_patience(
+                    trainer_settings=trainer_settings,
+                    post_epoch_result=post_epoch_history[-1],
+                    best_validation_metric=best_validation_metric,
+                    epochs_without_improvement=epochs_without_improvement,
+                )
+                if is_patience_exhausted:
+                    break
+        if step_losses:
+            self.step_losses = jnp.concatenate(step_losses)
+        return parameters, post_epoch_history
+
+    def _train_lbfgs(
         self,
         trainer_settings: TrainerSettings,
         parameters: ModuleParameters,
         data: Data,
-        loss_function: Callable[[FrozenDict, jnp.ndarray, jnp.ndarray], float],
+        loss_function: Callable,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ],
+    ) -> Tuple[ModuleParameters, List[Dict[str, float]]]:
+        """
+        Trains with full-batch L-BFGS on the flattened parameter vector.
+        The number of epochs is the maximum number of iterations, and the whole minimisation
+        is run as one jit-compiled loop. The post epoch callback is evaluated once at the end.
+        Args:
+            trainer_settings: the trainer settings
+            parameters: the initial parameters
+            data: the training data
+            loss_function: the loss function of the parameters and a batch
+            regularisation_function: the regularisation function of the parameters and inputs
+
+        Returns: the trained parameters and the history of the post epoch callback
+
+        """
+        if self.save_checkpoint_frequency:
+            self.checkpointer.save(epoch=0, parameters=parameters)
+        parameters_vector, unravel = ravel_pytree(parameters)
+
+        def objective(vector: jnp.ndarray, x: jnp.ndarray, y: jnp.ndarray):
+            parameters_ = unravel(vector)
+            loss = loss_function(parameters_, x, y)
+            if regularisation_function is not None:
+                loss = loss + regularisation_function(parameters_, x)
+            return loss
+
+        result = jit_hoisting_constants(
+            lambda vector, x, y: minimise_lbfgs(
+                function=lambda vector_: objective(vector_, x, y),
+                x0=vector,
+                maximum_number_of_iterations=trainer_settings.number_of_epochs,
+                tolerance=trainer_settings.lbfgs_tolerance,
+                history_size=trainer_settings.lbfgs_history_size,
+            )
+        )(parameters_vector, data.x, data.y)
+        self.step_losses = result.value_history[: int(result.number_of_iterations)]
+        parameters = unravel(result.x)
+        return parameters, [self.post_epoch_callback(parameters)]
+
+    def _train(
+        self,
+        trainer_settings: TrainerSettings,
+        parameters: ModuleParameters,
+        data: Data,
+        loss_function: Callable[[ModuleParameters, jnp.ndarray, jnp.ndarray], float],
         disable_tqdm: bool = False,
+        regularisation_anchor: Optional[jnp.ndarray] = None,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ] = None,
     ) -> Tuple[ModuleParameters, List[Dict[str, float]]]:
-        post_epoch_history = []
+        """
+        Trains the parameters with the loss function, see train.
+        """
+        mesh = self._build_mesh(
+            trainer_settings=trainer_settings,
+            dataset_size=data.x.shape[0],
+        )
+        if trainer_settings.optimiser_schema == OptimiserSchema.lbfgs:
+            if mesh is not None:
+                raise ValueError("L-BFGS does not support data parallel training.")
+            return self._train_lbfgs(
+                trainer_settings=trainer_settings,
+                parameters=parameters,
+                data=data,
+                loss_function=loss_function,
+                regularisation_function=regularisation_function,
+            )
+        # imported here as the resolvers import the trainer settings of this module
+        from experiments.shared.resolvers import optimiser_resolver
+
         optimiser = optimiser_resolver(
-            trainer_settings.optimiser_schema, trainer_settings.learning_rate
+            optimiser_schema=trainer_settings.optimiser_schema,
+            learning_rate=trainer_settings.learning_rate,
+            natural_gradient_learning_rate=trainer_settings.natural_gradient_learning_rate,
         )
-        opt_state = optimiser.init(parameters.dict())
-        key = jax.random.PRNGKey(trainer_settings.seed)
+        train_step = self._build_train_step(
+            trainer_settings=trainer_settings,
+            optimiser=optimiser,
+            loss_function=loss_function,
+            regularisation_function=regularisation_function,
+            mesh=mesh,
+        )
+        parameters, training_state = self._restore_checkpoint(
+            parameters=parameters,
+            training_state=TrainingState(
+                epoch=0,
+                key=jax.random.PRNGKey(trainer_settings.seed),
+                opt_state=optimiser.init(parameters),
+                loss_window=self._initialise_convergence_window(trainer_settings),
+                best_validation_metric=float("inf"),
+                epochs_without_improvement=0,
+                post_epoch_history=[],
+            ),
+        )
+        self.step_losses = jnp.zeros((0,))
+        if trainer_settings.on_device:
+            return self._train_on_device(
+                trainer_settings=trainer_settings,
+                parameters=parameters,
+                data=data,
+                train_step=train_step,
+                training_state=training_state,
+                disable_tqdm=disable_tqdm,
+                regularisation_anchor=regularisation_anchor,
+            )
+        step_losses = []
+        (
+            start_epoch,
+            key,
+            opt_state,
+            loss_window,
+            best_validation_metric,
+            epochs_without_improvement,
+            post_epoch_history,
+            last_evaluation_epoch,
+        ) = training_state
+        # batches are shuffled and gathered on the host and staged on the device ahead of the step
+        host_data = (np.asarray(data.x), np.asarray(data.y))
+        last_evaluation_time = time.monotonic()
         for epoch in tqdm(
-            range(trainer_settings.number_of_epochs), disable=disable_tqdm
+            range(start_epoch, trainer_settings.number_of_epochs),
+            disable=disable_tqdm,
         ):
             if self.save_checkpoint_frequency:
                 if epoch % self.save_checkpoint_frequency == 0:
-                    parameters.save(
-                        path=os.path.join(self.checkpoint_path, f"epoch-{epoch}.ckpt"),
+                    self._save_checkpoint(
+                        trainer_settings=trainer_settings,
+                        parameters=parameters,
+                        training_state=TrainingState(
+                            epoch=epoch,
+                            key=key,
+                            opt_state=opt_state,
+                            loss_window=loss_window,
+                            best_validation_metric=best_validation_metric,
+                            epochs_without_improvement=epochs_without_improvement,
+                            post_epoch_history=post_epoch_history,
+                            last_evaluation_epoch=last_evaluation_epoch,
+                        ),
                     )
             key, subkey = jax.random.split(key)
-            batch_generator = generate_batch(
+            epoch_losses, epoch_gradient_norms = [], []
+            with PrefetchedBatchIterator(
                 key=subkey,
-                data=(data.x, data.y),
+                data=host_data,
                 batch_size=trainer_settings.batch_size,
                 shuffle=trainer_settings.batch_shuffle,
                 drop_last=trainer_settings.batch_drop_last,
+                prefetch_size=trainer_settings.prefetch_size,
+                device=None if mesh is None else NamedSharding(mesh, P("data")),
+            ) as batch_iterator:
+                for batch in batch_iterator:
+                    if (
+                        trainer_settings.regularisation_batch_schema
+                        != RegularisationBatchSchema.shared
+                    ):
+                        key, subkey = jax.random.split(key)
+                        batch += (
+                            self._sample_regularisation_batch(
+                                key=subkey,
+                                trainer_settings=trainer_settings,
+                                data=data,
+                                regularisation_anchor=regularisation_anchor,
+                            ),
+                        )
+                    (
+                        parameters,
+                        opt_state,
+                        loss,
+                        gradient_norm,
+                        is_nan,
+                    ) = train_step(parameters, opt_state, *batch)
+                    step_losses.append(loss)
+                    if is_nan:
+                        # the update was skipped, so these are the parameters before the NaN step
+                        self.step_losses = jnp.stack(step_losses)
+                        return parameters, post_epoch_history
+                    epoch_losses.append(loss)
+                    epoch_gradient_norms.append(gradient_norm)
+            loss_window, is_converged = self._update_convergence(
+                trainer_settings=trainer_settings,
+                loss_window=loss_window,
+                epoch_loss=jnp.mean(jnp.stack(epoch_losses)),
+                epoch_gradient_norm=jnp.mean(jnp.stack(epoch_gradient_norms)),
             )
-            data_batch = next(batch_generator, None)
-            while data_batch is not None:
-                x_batch, y_batch = data_batch
-                if jnp.isnan(
-                    loss_function(
-                        FrozenDict(parameters.dict()),
-                        x_batch,
-                        y_batch,
-                    )
+            is_break = bool(
+                self.break_condition_function
+                and self.break_condition_function(parameters)
+            )
+            is_evaluation = (
+                is_break
+                or bool(is_converged)
+                or self._is_evaluation_scheduled(
+                    trainer_settings=trainer_settings,
+                    epoch=epoch,
+                    number_of_epochs=1,
+                    last_evaluation_time=last_evaluation_time,
+                )
+            )
+            if is_evaluation:
+                post_epoch_history.append(self.post_epoch_callback(parameters))
+                last_evaluation_time = time.monotonic()
+                last_evaluation_epoch = epoch + 1
+            if is_break or is_converged:
+                break
+            if is_evaluation:
+                (
+                    best_validation_metric,
+                    epochs_without_improvement,
+                    is_patience_exhausted,
+                ) = self._update_validation_patience(
+                    trainer_settings=trainer_settings,
+                    post_epoch_result=post_epoch_history[-1],
+                    best_validation_metric=best_validation_metric,
+                    epochs_without_improvement=epochs_without_improvement,
+                )
+                if is_patience_exhausted:
+                    break
+        if step_losses:
+            self.step_losses = jnp.stack(step_losses)
+        return parameters, post_epoch_history
+
+    def train(
+        self,
+        trainer_settings: TrainerSettings,
+        parameters: ModuleParameters,
+        data: Data,
+        loss_function: Callable[[ModuleParameters, jnp.ndarray, jnp.ndarray], float],
+        disable_tqdm: bool = False,
+        regularisation_anchor: Optional[jnp.ndarray] = None,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ] = None,
+    ) -> Tuple[ModuleParameters, List[Dict[str, float]]]:
+        """
+        Trains the parameters with the loss function.
+        If the regularisation batch schema is not shared, the loss function is called with
+        a fourth argument, the inputs of the regularisation for the step.
+        If a regularisation function is given, the loss function is only the empirical risk
+        and the regularisation is added once per step rather than once per microbatch.
+        If on_device is set in the trainer settings, the epochs are run on device with lax.scan.
+        If the optimiser is L-BFGS, training is full-batch and the number of epochs is the
+        maximum number of iterations.
+        Training stops early when the convergence criteria of the trainer settings are met, or
+        the validation metric of the post epoch callback has not improved for validation_patience epochs.
+        The losses of every step are stored in step_losses.
+        If number_of_devices is greater than one, each batch is sharded across that many devices and
+        the gradients are averaged with an all-reduce, which matches single device training
+        up to the order of the reduction. Every batch must split evenly across the devices, and the
+        loss function must average over the points of the batch, with any regularisation
+        given as the regularisation function.
+        Checkpoints are written on a background thread if asynchronous checkpointing is enabled,
+        and this returns once all of them are written. Each checkpoint includes the optimiser state,
+        the PRNG key and the post epoch history, such that if resume_from_checkpoint is set,
+        training continues from the latest checkpoint exactly as if it had not been interrupted.
+        After resuming, step_losses only covers the epochs run since the checkpoint.
+        The post epoch callback is evaluated on the schedule of the trainer settings, every
+        evaluation_frequency epochs or evaluation_interval seconds, and always after the final epoch,
+        so the history has one entry per evaluation and the validation patience counts evaluations.
+        Args:
+            trainer_settings: the trainer settings
+            parameters: the initial parameters
+            data: the training data
+            loss_function: the loss function of the parameters and a batch
+            disable_tqdm: whether to disable the progress bar
+            regularisation_anchor: points included in every regularisation batch for the inducing schema
+            regularisation_function: the regularisation function of the parameters and inputs
+
+        Returns: the trained parameters and the history of the post epoch callback
+
+        """
+        try:
+            return self._train(
+                trainer_settings=trainer_settings,
+                parameters=parameters,
+                data=data,
+                loss_function=loss_function,
+                disable_tqdm=disable_tqdm,
+                regularisation_anchor=regularisation_anchor,
+                regularisation_function=regularisation_function,
+            )
+        finally:
+            self.checkpointer.wait_until_finished()
+
+    @staticmethod
+    def _check_sweep(
+        trainer_settings: List[TrainerSettings],
+        parameters: List[ModuleParameters],
+    ) -> None:
+        """
+        Checks that the configurations of a sweep can be trained together, such that they
+        differ only in their seeds, learning rates and parameter values.
+        Args:
+            trainer_settings: the trainer settings of each configuration
+            parameters: the initial parameters of each configuration
+
+        """
+        if not trainer_settings or len(trainer_settings) != len(parameters):
+            raise ValueError(
+                f"A sweep requires the same positive number of trainer settings and parameters, "
+                f"got {len(trainer_settings)} and {len(parameters)}."
+            )
+        shared_trainer_settings = [
+            replace(trainer_settings_, seed=0, learning_rate=0.0)
+            for trainer_settings_ in trainer_settings
+        ]
+        if any(
+            trainer_settings_ != shared_trainer_settings[0]
+            for trainer_settings_ in shared_trainer_settings
+        ):
+            raise ValueError(
+                "The trainer settings of a sweep may only differ in their seeds and learning rates."
+            )
+        if trainer_settings[0].optimiser_schema == OptimiserSchema.lbfgs:
+            raise ValueError("L-BFGS does not support sweeps.")
+        if trainer_settings[0].number_of_devices > 1:
+            raise ValueError("Sweeps do not support data parallel training.")
+        shapes = [
+            jax.tree_util.tree_map(jnp.shape, parameters_.dict())
+            for parameters_ in parameters
+        ]
+        if any(shapes_ != shapes[0] for shapes_ in shapes):
+            raise ValueError("The parameters of a sweep must have the same shapes.")
+
+    def _train_sweep(
+        self,
+        configuration_trainers: List["Trainer"],
+        trainer_settings: List[TrainerSettings],
+        parameters: List[ModuleParameters],
+        data: Data,
+        loss_function: Callable[[ModuleParameters, jnp.ndarray, jnp.ndarray], float],
+        disable_tqdm: bool = False,
+        regularisation_anchor: Optional[jnp.ndarray] = None,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ] = None,
+    ) -> List[Tuple[ModuleParameters, List[Dict[str, float]]]]:
+        """
+        Trains the configurations of a sweep together, see train_sweep.
+        """
+        self._check_sweep(trainer_settings=trainer_settings, parameters=parameters)
+        from experiments.shared.resolvers import optimiser_resolver
+
+        number_of_configurations = len(trainer_settings)
+        optimisers = [
+            optimiser_resolver(
+                optimiser_schema=trainer_settings_.optimiser_schema,
+                learning_rate=trainer_settings_.learning_rate,
+                natural_gradient_learning_rate=trainer_settings_.natural_gradient_learning_rate,
+            )
+            for trainer_settings_ in trainer_settings
+        ]
+        # the learning rates are held in the optimiser states, so one update serves all configurations
+        train_step = self._build_train_step(
+            trainer_settings=trainer_settings[0],
+            optimiser=optimisers[0],
+            loss_function=loss_function,
+            regularisation_function=regularisation_function,
+        )
+        train_epochs = jit_hoisting_constants(
+            jax.vmap(
+                self._build_train_epochs(
+                    trainer_settings=trainer_settings[0],
+                    train_step=train_step,
+                    regularisation_anchor=regularisation_anchor,
+                ),
+                in_axes=(0, 0, 0, 0, None, None),
+            )
+        )
+        # configurations checkpointed at different epochs resume from their latest common epoch
+        maximum_epoch = None
+        while True:
+            restored_checkpoints = [
+                configuration_trainer._restore_checkpoint(
+                    parameters=parameters_,
+                    training_state=TrainingState(
+                        epoch=0,
+                        key=jax.random.PRNGKey(trainer_settings_.seed),
+                        opt_state=optimiser.init(parameters_),
+                        loss_window=self._initialise_convergence_window(
+                            trainer_settings_
+                        ),
+                        best_validation_metric=float("inf"),
+                        epochs_without_improvement=0,
+                        post_epoch_history=[],
+                    ),
+                    maximum_epoch=maximum_epoch,
+                )
+                for configuration_trainer, trainer_settings_, parameters_, optimiser in zip(
+                    configuration_trainers, trainer_settings, parameters, optimisers
+                )
+            ]
+            epochs = {
+                training_state.epoch for _, training_state in restored_checkpoints
+            }
+            if len(epochs) == 1:
+                break
+            maximum_epoch = min(epochs)
+        parameters = [parameters_ for parameters_, _ in restored_checkpoints]
+        training_states = [training_state for _, training_state in restored_checkpoints]
+
+        def stack(trees: List) -> Dict:
+            return jax.tree_util.tree_map(lambda *leaves: jnp.stack(leaves), *trees)
+
+        def unstack(tree: Dict, index: int) -> Dict:
+            return jax.tree_util.tree_map(lambda leaf: leaf[index], tree)
+
+        stacked_parameters = stack(parameters)
+        opt_state = stack(
+            [training_state.opt_state for training_state in training_states]
+        )
+        loss_window = stack(
+            [training_state.loss_window for training_state in training_states]
+        )
+        keys = stack([training_state.key for training_state in training_states])
+        is_active = [True] * number_of_configurations
+        step_losses = []
+        last_evaluation_time = time.monotonic()
+        number_of_epochs_per_scan = max(
+            trainer_settings[0].number_of_epochs_per_scan, 1
+        )
+        for epoch in tqdm(
+            range(
+                training_states[0].epoch,
+                trainer_settings[0].number_of_epochs,
+                number_of_epochs_per_scan,
+            ),
+            disable=disable_tqdm,
+        ):
+            number_of_epochs = min(
+                number_of_epochs_per_scan, trainer_settings[0].number_of_epochs - epoch
+            )
+            if self.save_checkpoint_frequency and any(
+                epoch_ % self.save_checkpoint_frequency == 0
+                for epoch_ in range(epoch, epoch + number_of_epochs)
+            ):
+                for index in filter(
+                    is_active.__getitem__, range(number_of_configurations)
                 ):
-                    return parameters, post_epoch_history
-                gradients = jax.grad(
-                    lambda parameters_dict: loss_function(
-                        parameters_dict,
-                        x_batch,
-                        y_batch,
+                    configuration_trainers[index]._save_checkpoint(
+                        trainer_settings=trainer_settings[index],
+                        parameters=parameters[index],
+                        training_state=training_states[index]._replace(
+                            epoch=epoch,
+                            key=keys[index],
+                            opt_state=unstack(opt_state, index),
+                            loss_window=loss_window[index],
+                        ),
                     )
-                )(parameters.dict())
-                updates, opt_state = optimiser.update(gradients, opt_state)
-                parameters = parameters.construct(
-                    **optax.apply_updates(parameters.dict(), updates)
+            split_keys = jax.vmap(jax.random.split)(keys)
+            keys, subkeys = split_keys[:, 0], split_keys[:, 1]
+            (
+                stacked_parameters,
+                opt_state,
+                loss_window,
+                is_stopped,
+                is_converged,
+                losses,
+            ) = train_epochs(
+                stacked_parameters,
+                opt_state,
+                loss_window,
+                jax.vmap(lambda key: jax.random.split(key, number_of_epochs))(subkeys),
+                data.x,
+                data.y,
+            )
+            # configurations which have stopped keep running in the vmapped step, their losses are masked
+            step_losses.append(
+                jnp.where(
+                    jnp.array(is_active)[:, None],
+                    losses.reshape(number_of_configurations, -1),
+                    jnp.nan,
                 )
-                data_batch = next(batch_generator, None)
-            post_epoch_history.append(self.post_epoch_callback(parameters))
-            if self.break_condition_function and self.break_condition_function(
-                parameters
-            ):
+            )
+            is_evaluation_scheduled = self._is_evaluation_scheduled(
+                trainer_settings=trainer_settings[0],
+                epoch=epoch,
+                number_of_epochs=number_of_epochs,
+                last_evaluation_time=last_evaluation_time,
+            )
+            for index in filter(is_active.__getitem__, range(number_of_configurations)):
+                parameters[index] = unstack(stacked_parameters, index)
+                if is_stopped[index]:
+                    is_active[index] = False
+                    continue
+                is_break = bool(
+                    self.break_condition_function
+                    and self.break_condition_function(parameters[index])
+                )
+                if is_break or is_converged[index] or is_evaluation_scheduled:
+                    training_states[index].post_epoch_history.append(
+                        self.post_epoch_callback(parameters[index])
+                    )
+                    training_states[index] = training_states[index]._replace(
+                        last_evaluation_epoch=epoch + number_of_epochs
+                    )
+                    if is_break or is_converged[index]:
+                        is_active[index] = False
+                        continue
+                    (
+                        best_validation_metric,
+                        epochs_without_improvement,
+                        is_patience_exhausted,
+                    ) = self._update_validation_patience(
+                        trainer_settings=trainer_settings[index],
+                        post_epoch_result=training_states[index].post_epoch_history[-1],
+                        best_validation_metric=training_states[
+                            index
+                        ].best_validation_metric,
+                        epochs_without_improvement=training_states[
+                            index
+                        ].epochs_without_improvement,
+                    )
+                    training_states[index] = training_states[index]._replace(
+                        best_validation_metric=best_validation_metric,
+                        epochs_without_improvement=epochs_without_improvement,
+                    )
+                    if is_patience_exhausted:
+                        is_active[index] = False
+            if is_evaluation_scheduled:
+                last_evaluation_time = time.monotonic()
+            if not any(is_active):
                 break
-        return parameters, post_epoch_history
+        self.step_losses = (
+            jnp.concatenate(step_losses, axis=1)
+            if step_losses
+            else jnp.zeros((number_of_configurations, 0))
+        )
+        return [
+            (parameters_, training_state.post_epoch_history)
+            for parameters_, training_state in zip(parameters, training_states)
+        ]
+
+    def train_sweep(
+        self,
+        trainer_settings: List[TrainerSettings],
+        parameters: List[ModuleParameters],
+        data: Data,
+        loss_function: Callable[[ModuleParameters, jnp.ndarray, jnp.ndarray], float],
+        disable_tqdm: bool = False,
+        regularisation_anchor: Optional[jnp.ndarray] = None,
+        regularisation_function: Optional[
+            Callable[[ModuleParameters, jnp.ndarray], float]
+        ] = None,
+    ) -> List[Tuple[ModuleParameters, List[Dict[str, float]]]]:
+        """
+        Trains a sweep of configurations together in one vmapped jit-compiled program,
+        such that compilation is shared and small models make better use of the device.
+        The configurations may differ in their seeds, learning rates and parameter values,
+        but otherwise share their trainer settings and parameter shapes. Their parameters and
+        optimiser states are stacked and the epochs are run on device as with on_device,
+        each configuration with its own batch order and regularisation batches.
+        Every configuration has its own post epoch history, convergence, validation patience and
+        break condition, a configuration which stops keeps its parameters while the others continue.
+        Checkpoints of configuration i are written to the directory configuration-i of the checkpoint
+        path, and resuming restores every configuration from its latest checkpoint at a common epoch.
+        The losses of every step are stored in step_losses with one row per configuration.
+        Args:
+            trainer_settings: the trainer settings of each configuration
+            parameters: the initial parameters of each configuration
+            data: the training data
+            loss_function: the loss function of the parameters and a batch
+            disable_tqdm: whether to disable the progress bar
+            regularisation_anchor: points included in every regularisation batch for the inducing schema
+            regularisation_function: the regularisation function of the parameters and inputs
+
+        Returns: the trained parameters and the history of the post epoch callback of each configuration
+
+        """
+        configuration_trainers = [
+            Trainer(
+                save_checkpoint_frequency=self.save_checkpoint_frequency,
+                checkpoint_path=os.path.join(
+                    self.checkpoint_path, f"configuration-{index}"
+                ),
+                post_epoch_callback=self.post_epoch_callback,
+                break_condition_function=self.break_condition_function,
+                checkpoint_max_to_keep=self.checkpointer.max_to_keep,
+                checkpoint_best_to_keep=self.checkpointer.best_to_keep,
+                asynchronous_checkpointing=self.checkpointer.is_asynchronous,
+                resume_from_checkpoint=self.resume_from_checkpoint,
+            )
+            for index in range(len(trainer_settings))
+        ]
+        try:
+            return self._train_sweep(
+                configuration_trainers=configuration_trainers,
+                trainer_settings=trainer_settings,
+                parameters=parameters,
+                data=data,
+                loss_function=loss_function,
+                disable_tqdm=disable_tqdm,
+                regularisation_anchor=regularisation_anchor,
+                regularisation_function=regularisation_function,
+            )
+        finally:
+            for configuration_trainer in configuration_trainers:
+                configuration_trainer.checkpointer.wait_until_finished()
@@ -1,15 +1,22 @@
 from typing import Dict, List, Tuple
 
+from experiments.shared.checkpointer import Checkpointer
 from experiments.shared.data import Data
 from experiments.shared.resolvers import (
     empirical_risk_resolver,
     regularisation_resolver,
 )
 from experiments.shared.schemas import EmpiricalRiskSchema
+from experiments.shared.tempering import (
+    fit_tempering_factors,
+    is_tempering_factor_fit_supported,
+)
 from experiments.shared.trainer import Trainer, TrainerSettings
 from src import GeneralisedVariationalInference
 from src.gps.base.approximate_base import ApproximateGPBase
 from src.gps.base.base import GPBase, GPBaseParameters
+from src.kernels.approximate.base import ApproximateBaseKernel
+from src.regularisations.projected import CombinedProjectedRegularisation
 
 
 def train_approximate_gp(
@@ -38,26 +45,75 @@ def train_approximate_gp(
         empirical_risk=empirical_risk,
         regularisation=regularisation,
     )
+
+    def post_epoch_callback(parameters: GPBaseParameters) -> Dict[str, float]:
+        # one fused pass over the data for all the logged terms, the chunk size only applies to
+        # the shared prediction, so a regularisation without one is evaluated on all the data at once
+        empirical_risk_term, regularisation_term = gvi.calculate_loss_terms(
+            parameters=parameters,
+            x=data.x,
+            y=data.y,
+            chunk_size=trainer_settings.evaluation_chunk_size,
+        )
+        post_epoch_metrics = {
+            "empirical-risk": empirical_risk_term,
+            "regularisation": regularisation_term,
+            "gvi-objective": empirical_risk_term + regularisation_term,
+        }
+        if isinstance(regularisation, CombinedProjectedRegularisation):
+            # every divergence is monitored from one pass of the projected Gaussians
+            projected_regularisations = (
+                regularisation.calculate_projected_regularisations(
+                    parameters=parameters,
+                    x=data.x,
+                )
+            )
+            for name, projected_regularisation in projected_regularisations.items():
+                post_epoch_metrics[f"regularisation-{name}"] = projected_regularisation
+        return post_epoch_metrics
+
     trainer = Trainer(
         save_checkpoint_frequency=save_checkpoint_frequency,
         checkpoint_path=checkpoint_path,
-        post_epoch_callback=lambda parameters: {
-            "empirical-risk": empirical_risk.calculate_empirical_risk(
-                parameters, data.x, data.y
-            ),
-            "regularisation": regularisation.calculate_regularisation(
-                parameters, data.x
-            ),
-            "gvi-objective": gvi.calculate_loss(parameters, data.x, data.y),
-        },
+        post_epoch_callback=post_epoch_callback,
     )
+    if (
+        trainer_settings.number_of_microbatches > 1
+        or trainer_settings.number_of_devices > 1
+    ):
+        # accumulate the empirical risk over microbatches or shards and add the regularisation
+        # once per step, the regularisation is not separable over the batch
+        loss_function = (
+            lambda parameters_, x, y: empirical_risk.calculate_empirical_risk(
+                parameters=parameters_, x=x, y=y
+            )
+        )
+        regularisation_function = (
+            lambda parameters_, x: regularisation.calculate_regularisation(
+                parameters=parameters_, x=x
+            )
+        )
+    else:
+        loss_function = (
+            lambda parameters_, x, y, x_regularisation=None: gvi.calculate_loss(
+                parameters=parameters_,
+                x=x,
+                y=y,
+                x_regularisation=x_regularisation,
+            )
+        )
+        regularisation_function = None
     gp_parameters, post_epoch_history = trainer.train(
         trainer_settings=trainer_settings,
         parameters=approximate_gp_parameters,
         data=data,
-        loss_function=lambda parameters_dict, x, y: gvi.calculate_loss(
-            parameters=parameters_dict, x=x, y=y
+        loss_function=loss_function,
+        regularisation_anchor=(
+            approximate_gp.kernel.inducing_points
+            if isinstance(approximate_gp.kernel, ApproximateBaseKernel)
+            else None
         ),
+        regularisation_function=regularisation_function,
     )
     return approximate_gp.generate_parameters(gp_parameters.dict()), post_epoch_history
 
@@ -71,10 +127,50 @@ def train_tempered_gp(
     save_checkpoint_frequency: int,
     checkpoint_path: str,
 ) -> Tuple[GPBaseParameters, List[Dict[str, float]]]:
+    """
+    Fits the tempering factors of a tempered GP on the data.
+    For approximate GPs with tempered kernels, the factors are fitted from a single prediction
+    in closed form or with a bracketed one dimensional search, such that no epochs are run,
+    the history holds the empirical risk before and after the fit and only the fitted parameters
+    are checkpointed. Otherwise the factors are trained with the trainer settings.
+    """
     empirical_risk = empirical_risk_resolver(
         empirical_risk_schema=empirical_risk_schema,
         gp=tempered_gp,
     )
+    if is_tempering_factor_fit_supported(
+        empirical_risk=empirical_risk,
+        parameters=tempered_gp_parameters,
+    ):
+        tempered_kernel_parameters, fitted_empirical_risk = fit_tempering_factors(
+            empirical_risk=empirical_risk,
+            parameters=tempered_gp_parameters,
+            x=data.x,
+            y=data.y,
+        )
+        if save_checkpoint_frequency:
+            checkpointer = Checkpointer(
+                checkpoint_path=checkpoint_path,
+                is_asynchronous=False,
+            )
+            checkpointer.save(epoch=0, parameters=tempered_kernel_parameters)
+        return (
+            tempered_gp.Parameters(
+                log_observation_noise=tempered_gp_parameters.log_observation_noise,
+                mean=tempered_gp_parameters.mean,
+                kernel=tempered_kernel_parameters,
+            ),
+            [
+                {
+                    "empirical-risk": empirical_risk.calculate_empirical_risk(
+                        parameters=tempered_gp_parameters,
+                        x=data.x,
+                        y=data.y,
+                    ),
+                },
+                {"empirical-risk": fitted_empirical_risk},
+            ],
+        )
     trainer = Trainer(
         save_checkpoint_frequency=save_checkpoint_frequency,
         checkpoint_path=checkpoint_path,
@@ -83,7 +179,7 @@ def train_tempered_gp(
                 parameters=tempered_gp_parameters.construct(
                     log_observation_noise=tempered_gp_parameters.log_observation_noise,
                     mean=tempered_gp_parameters.mean,
-                    kernel=tempered_gp_parameters.kernel.construct(**parameters.dict()),
+                    kernel=parameters,
                 ),
                 x=data.x,
                 y=data.y,
@@ -94,11 +190,11 @@ def train_tempered_gp(
         trainer_settings=trainer_settings,
         parameters=tempered_gp_parameters.kernel,
         data=data,
-        loss_function=lambda parameters_dict, x, y: empirical_risk.calculate_empirical_risk(
+        loss_function=lambda parameters_, x, y: empirical_risk.calculate_empirical_risk(
             parameters=tempered_gp.Parameters(
                 log_observation_noise=tempered_gp_parameters.log_observation_noise,
                 mean=tempered_gp_parameters.mean,
-                kernel=tempered_gp_parameters.kernel.construct(**parameters_dict),
+                kernel=parameters_,
             ),
             x=x,
             y=y,
@@ -1,3 +1,18 @@
-from src.generalised_variational_inference import GeneralisedVariationalInference
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.generalised_variational_inference import GeneralisedVariationalInference
 
 __all__ = ["GeneralisedVariationalInference"]
+
+
+def __getattr__(name: str):
+    # attributes are imported on first access, so importing a submodule of src
+    # does not import every module of the package
+    if name == "GeneralisedVariationalInference":
+        from src.generalised_variational_inference import (
+            GeneralisedVariationalInference,
+        )
+
+        return GeneralisedVariationalInference
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
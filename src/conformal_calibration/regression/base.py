@@ -3,11 +3,12 @@ from typing import Dict, Tuple, Union
 
 import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core import FrozenDict
 
-from src.module import PYDANTIC_VALIDATION_CONFIG, Module, ModuleParameters
+from src.module import Module, ModuleParameters
 from src.utils.custom_types import JaxFloatType
+from src.utils.jit import jit_hoisting_constants
+from src.utils.validation import validate_arguments
 
 
 class ConformalRegressionBaseParameters(ModuleParameters, ABC):
@@ -37,7 +38,7 @@ class ConformalRegressionBase(Module, ABC):
         self.x_calibration = x_calibration
         self.y_calibration = y_calibration
         self.number_of_calibration_points = x_calibration.shape[0]
-        self._jit_compiled_predict_coverage = jax.jit(
+        self._jit_compiled_predict_coverage = jit_hoisting_constants(
             lambda x, coverage: self._predict_coverage(x=x, coverage=coverage)
         )
         super().__init__(preprocess_function=None)
@@ -133,7 +134,7 @@ class ConformalRegressionBase(Module, ABC):
             jnp.max(jnp.concatenate([calibrated_upper, median], axis=0), axis=0),
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def predict_coverage(
         self,
         x: jnp.ndarray,
@@ -154,7 +155,7 @@ class ConformalRegressionBase(Module, ABC):
             lambda coverage_: self._jit_compiled_predict_coverage(x, coverage_)
         )(coverage)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_average_interval_width(
         self,
         x: jnp.ndarray,
@@ -172,7 +173,7 @@ class ConformalRegressionBase(Module, ABC):
         lower, upper = self.predict_coverage(x=x, coverage=coverage)
         return jnp.mean(upper - lower, axis=1)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[Dict, FrozenDict] = None
     ) -> ModuleParameters:
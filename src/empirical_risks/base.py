@@ -1,13 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Union
 
-import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
-from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.gps.base.base import GPBase, GPBaseParameters, GPPrediction
+from src.utils.jit import jit_hoisting_constants
+from src.utils.validation import validate_arguments
 
 
 class EmpiricalRiskBase(ABC):
@@ -15,9 +14,12 @@ class EmpiricalRiskBase(ABC):
     A base class for all empirical risks.
     """
 
+    # whether the empirical risk can be calculated from a GPPrediction shared with the regularisation
+    supports_shared_prediction = False
+
     def __init__(self, gp: GPBase):
         self._gp = gp
-        self._jit_compiled_calculate_empirical_risk = jax.jit(
+        self._jit_compiled_calculate_empirical_risk = jit_hoisting_constants(
             lambda parameters, x, y: self._calculate_empirical_risk(
                 parameters=parameters,
                 x=x,
@@ -41,7 +43,7 @@ class EmpiricalRiskBase(ABC):
 
         """
         self._gp = gp
-        self._jit_compiled_calculate_empirical_risk = jax.jit(
+        self._jit_compiled_calculate_empirical_risk = jit_hoisting_constants(
             lambda parameters, x, y: self._calculate_empirical_risk(
                 parameters=parameters,
                 x=x,
@@ -58,7 +60,24 @@ class EmpiricalRiskBase(ABC):
     ) -> float:
         raise NotImplementedError
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    def _calculate_empirical_risk_from_prediction(
+        self,
+        prediction: GPPrediction,
+        y: jnp.ndarray,
+    ) -> float:
+        """
+        Calculates the empirical risk from the predictive quantities of the GP on the batch.
+        Only implemented by empirical risks with supports_shared_prediction set.
+        Args:
+            prediction: the predictive quantities of the GP on the input data
+            y: the response data
+
+        Returns: the empirical risk
+
+        """
+        raise NotImplementedError
+
+    @validate_arguments
     def calculate_empirical_risk(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -68,6 +87,6 @@ class EmpiricalRiskBase(ABC):
         if not isinstance(parameters, self.gp.Parameters):
             parameters = self.gp.generate_parameters(parameters)
         return self._jit_compiled_calculate_empirical_risk(
-            parameters.dict(),
+            parameters,
             *(x, y),
         )
@@ -1,30 +1,41 @@
 import jax.numpy as jnp
-import jax_metrics as jm
 
-from src.distributions import Multinomial
 from src.empirical_risks.base import EmpiricalRiskBase
-from src.gps.base.base import GPBaseParameters
+from src.gps.base.base import GPBaseParameters, GPPrediction
 from src.gps.base.classification_base import GPClassificationBase
 from src.utils.custom_types import JaxFloatType
 
 
 class CrossEntropy(EmpiricalRiskBase):
+    supports_shared_prediction = True
+
     def __init__(self, gp: GPClassificationBase):
+        # jax_metrics imports optax and its contributed modules, so it is only imported when used
+        import jax_metrics as jm
+
         self.cross_entropy = jm.losses.Crossentropy()
         super().__init__(gp)
 
-    def _calculate_empirical_risk(
+    def _calculate_empirical_risk_from_prediction(
         self,
-        parameters: GPBaseParameters,
-        x: jnp.ndarray,
+        prediction: GPPrediction,
         y: jnp.ndarray,
     ) -> JaxFloatType:
-        multinomial = Multinomial(
-            **self.gp.predict_probability(parameters=parameters, x=x).dict()
-        )
+        multinomial = self.gp._construct_distribution(prediction.probabilities)
         return jnp.float64(
             self.cross_entropy(
                 target=y,
                 preds=multinomial.probabilities,
             )
         )
+
+    def _calculate_empirical_risk(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+    ) -> JaxFloatType:
+        return self._calculate_empirical_risk_from_prediction(
+            prediction=self.gp.calculate_prediction(parameters=parameters, x=x),
+            y=y,
+        )
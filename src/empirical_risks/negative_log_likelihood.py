@@ -2,25 +2,25 @@ import jax
 import jax.numpy as jnp
 import jax.scipy as jsp
 
-from src.distributions import Gaussian, Multinomial
 from src.empirical_risks.base import EmpiricalRiskBase
-from src.gps.base.base import GPBase, GPBaseParameters
+from src.gps.base.base import GPBase, GPBaseParameters, GPPrediction
 from src.gps.base.classification_base import GPClassificationBase
 from src.gps.base.regression_base import GPRegressionBase
 from src.utils.custom_types import JaxFloatType
 
 
 class NegativeLogLikelihood(EmpiricalRiskBase):
+    supports_shared_prediction = True
+
     def __init__(self, gp: GPBase):
         super().__init__(gp)
 
     def _calculate_gaussian_negative_log_likelihood(
         self,
-        parameters: GPBaseParameters,
-        x: jnp.ndarray,
+        prediction: GPPrediction,
         y: jnp.ndarray,
     ) -> JaxFloatType:
-        gaussian = Gaussian(**self.gp.predict_probability(parameters, x=x).dict())
+        gaussian = self.gp._construct_distribution(prediction.probabilities)
         if self.gp.kernel.number_output_dimensions > 1:
             return jnp.float64(
                 jnp.mean(
@@ -56,13 +56,10 @@ class NegativeLogLikelihood(EmpiricalRiskBase):
 
     def _calculate_multinomial_negative_log_likelihood(
         self,
-        parameters: GPBaseParameters,
-        x: jnp.ndarray,
+        prediction: GPPrediction,
         y: jnp.ndarray,
     ) -> JaxFloatType:
-        multinomial = Multinomial(
-            **self.gp.predict_probability(parameters=parameters, x=x).dict()
-        )
+        multinomial = self.gp._construct_distribution(prediction.probabilities)
         return jnp.float64(
             -jnp.sum(
                 jnp.log(
@@ -77,22 +74,30 @@ class NegativeLogLikelihood(EmpiricalRiskBase):
             )
         )
 
-    def _calculate_empirical_risk(
+    def _calculate_empirical_risk_from_prediction(
         self,
-        parameters: GPBaseParameters,
-        x: jnp.ndarray,
+        prediction: GPPrediction,
         y: jnp.ndarray,
     ) -> JaxFloatType:
         if isinstance(self.gp, GPRegressionBase):
             return self._calculate_gaussian_negative_log_likelihood(
-                parameters=parameters,
-                x=x,
+                prediction=prediction,
                 y=y,
             )
         if isinstance(self.gp, GPClassificationBase):
             return self._calculate_multinomial_negative_log_likelihood(
-                parameters=parameters,
-                x=x,
+                prediction=prediction,
                 y=y,
             )
         raise NotImplementedError(f"GP type {type(self.gp)} not implemented")
+
+    def _calculate_empirical_risk(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+    ) -> JaxFloatType:
+        return self._calculate_empirical_risk_from_prediction(
+            prediction=self.gp.calculate_prediction(parameters=parameters, x=x),
+            y=y,
+        )
@@ -1,14 +1,13 @@
-from typing import Dict, Union
+from typing import Dict, Optional, Tuple, Union
 
-import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.empirical_risks.base import EmpiricalRiskBase
 from src.gps.base.base import GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.regularisations.base import RegularisationBase
+from src.utils.jit import jit_hoisting_constants
+from src.utils.validation import validate_arguments
 
 
 class GeneralisedVariationalInference:
@@ -26,11 +25,17 @@ class GeneralisedVariationalInference:
     ):
         self._regularisation = regularisation
         self._empirical_risk = empirical_risk
-        self._jit_compiled_calculate_loss = jax.jit(
-            lambda parameters, x, y: self._calculate_loss(
-                parameters=parameters, x=x, y=y
+        self._jit_compiled_calculate_loss = jit_hoisting_constants(
+            lambda parameters, x, y, x_regularisation: self._calculate_loss(
+                parameters=parameters, x=x, y=y, x_regularisation=x_regularisation
             )
         )
+        self._jit_compiled_calculate_loss_terms = jit_hoisting_constants(
+            lambda parameters, x, y, chunk_size: self._calculate_loss_terms(
+                parameters=parameters, x=x, y=y, chunk_size=chunk_size
+            ),
+            static_argnums=(3,),
+        )
 
     @property
     def regularisation(self) -> RegularisationBase:
@@ -45,11 +50,17 @@ class GeneralisedVariationalInference:
 
         """
         self._regularisation = regularisation
-        self._jit_compiled_calculate_loss = jax.jit(
-            lambda parameters, x, y: self._calculate_loss(
-                parameters=parameters, x=x, y=y
+        self._jit_compiled_calculate_loss = jit_hoisting_constants(
+            lambda parameters, x, y, x_regularisation: self._calculate_loss(
+                parameters=parameters, x=x, y=y, x_regularisation=x_regularisation
             )
         )
+        self._jit_compiled_calculate_loss_terms = jit_hoisting_constants(
+            lambda parameters, x, y, chunk_size: self._calculate_loss_terms(
+                parameters=parameters, x=x, y=y, chunk_size=chunk_size
+            ),
+            static_argnums=(3,),
+        )
 
     @property
     def empirical_risk(self) -> EmpiricalRiskBase:
@@ -64,28 +75,69 @@ class GeneralisedVariationalInference:
 
         """
         self._empirical_risk = empirical_risk
-        self._jit_compiled_calculate_loss = jax.jit(
-            lambda parameters, x, y: self._calculate_loss(
-                parameters=parameters, x=x, y=y
+        self._jit_compiled_calculate_loss = jit_hoisting_constants(
+            lambda parameters, x, y, x_regularisation: self._calculate_loss(
+                parameters=parameters, x=x, y=y, x_regularisation=x_regularisation
             )
         )
+        self._jit_compiled_calculate_loss_terms = jit_hoisting_constants(
+            lambda parameters, x, y, chunk_size: self._calculate_loss_terms(
+                parameters=parameters, x=x, y=y, chunk_size=chunk_size
+            ),
+            static_argnums=(3,),
+        )
+
+    @property
+    def shares_prediction(self) -> bool:
+        """
+        Whether the empirical risk and the regularisation can share a single forward pass of the GP.
+        This requires both terms to support calculation from a GPPrediction of the same GP.
+        """
+        return (
+            self.empirical_risk.supports_shared_prediction
+            and self.regularisation.supports_shared_prediction
+            and self.empirical_risk.gp is self.regularisation.gp
+        )
 
     def _calculate_loss(
         self,
         parameters: GPBaseParameters,
         x: jnp.ndarray,
         y: jnp.ndarray,
+        x_regularisation: Optional[jnp.ndarray] = None,
     ) -> jnp.float64:
         """
         Calculate the GVI objective. This is the empirical risk and the regularisation.
+        If both terms support it, the predictive quantities of the GP on the batch are
+        computed once and shared between the empirical risk and the regularisation.
         Args:
             parameters: The parameters of the GP.
             x: The input data.
             y: The response data.
+            x_regularisation: The input data for the regularisation, if None the input data x is used.
 
         Returns: The GVI objective.
 
         """
+        if x_regularisation is not None:
+            return self.empirical_risk.calculate_empirical_risk(
+                parameters=parameters, x=x, y=y
+            ) + self.regularisation.calculate_regularisation(
+                parameters=parameters,
+                x=x_regularisation,
+            )
+        if self.shares_prediction:
+            prediction = self.regularisation.gp.calculate_prediction(
+                parameters=parameters,
+                x=x,
+            )
+            return self.empirical_risk._calculate_empirical_risk_from_prediction(
+                prediction=prediction,
+                y=y,
+            ) + self.regularisation._calculate_regularisation_from_prediction(
+                prediction=prediction,
+                x=x,
+            )
         return self.empirical_risk.calculate_empirical_risk(
             parameters=parameters, x=x, y=y
         ) + self.regularisation.calculate_regularisation(
@@ -93,20 +145,113 @@ class GeneralisedVariationalInference:
             x=x,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    def _calculate_loss_terms(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[jnp.float64, jnp.float64]:
+        """
+        Calculate the empirical risk and the regularisation of the GVI objective in one pass.
+        The predictive quantities of the GP are computed once, in chunks if a chunk size is given,
+        and shared by the terms that support it. Only the shared prediction is chunked, terms that do not
+        support sharing it, such as the Gaussian Wasserstein regularisation whose eigendecomposition couples
+        all the points, are calculated on all of x at once.
+        Args:
+            parameters: The parameters of the GP.
+            x: The input data.
+            y: The response data.
+            chunk_size: The number of points per chunk of the shared prediction, if None a single pass is used.
+
+        Returns: The empirical risk and the regularisation.
+
+        """
+        is_empirical_risk_shared = (
+            self.empirical_risk.supports_shared_prediction
+            and self.empirical_risk.gp is self.regularisation.gp
+        )
+        if is_empirical_risk_shared or self.regularisation.supports_shared_prediction:
+            prediction = self.regularisation.gp.calculate_prediction(
+                parameters=parameters,
+                x=x,
+                chunk_size=chunk_size,
+            )
+        if is_empirical_risk_shared:
+            empirical_risk = (
+                self.empirical_risk._calculate_empirical_risk_from_prediction(
+                    prediction=prediction,
+                    y=y,
+                )
+            )
+        else:
+            empirical_risk = self.empirical_risk.calculate_empirical_risk(
+                parameters=parameters, x=x, y=y
+            )
+        if self.regularisation.supports_shared_prediction:
+            regularisation = (
+                self.regularisation._calculate_regularisation_from_prediction(
+                    prediction=prediction,
+                    x=x,
+                )
+            )
+        else:
+            regularisation = self.regularisation.calculate_regularisation(
+                parameters=parameters,
+                x=x,
+            )
+        return empirical_risk, regularisation
+
+    @validate_arguments
+    def calculate_loss_terms(
+        self,
+        parameters: Union[Dict, FrozenDict, GPBaseParameters],
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+        chunk_size: Optional[int] = None,
+    ) -> Tuple[jnp.float64, jnp.float64]:
+        """
+        Calculate the empirical risk and the regularisation of the GVI objective in a single
+        jitted pass, such that logging all terms does not repeat the forward pass of the GP.
+        The GVI objective is their sum. Calls the jitted function.
+        The chunk size bounds the memory of the shared prediction only, terms that do not share it
+        are calculated on all of x at once (see _calculate_loss_terms).
+        Args:
+            parameters: The parameters of the GP.
+            x: The input data.
+            y: The response data.
+            chunk_size: The number of points per chunk of the shared prediction, if None a single pass is used.
+
+        Returns: The empirical risk and the regularisation.
+
+        """
+        if not isinstance(parameters, self.regularisation.gp.Parameters):
+            parameters = self.regularisation.gp.generate_parameters(parameters)
+        return self._jit_compiled_calculate_loss_terms(
+            parameters,
+            x,
+            y,
+            chunk_size,
+        )
+
+    @validate_arguments
     def calculate_loss(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
         x: jnp.ndarray,
         y: jnp.ndarray,
+        x_regularisation: Optional[jnp.ndarray] = None,
     ) -> jnp.float64:
         """
         Calculate the GVI objective. This is the empirical risk and the regularisation.
+        The regularisation can be evaluated on a separate, typically smaller, sample x_regularisation
+        so that the batch size of the empirical risk can grow without the cost of the regularisation.
         Calls the jitted function.
         Args:
             parameters: The parameters of the GP.
             x: The input data.
             y: The response data.
+            x_regularisation: The input data for the regularisation, if None the input data x is used.
 
         Returns: The GVI objective.
 
@@ -114,6 +259,6 @@ class GeneralisedVariationalInference:
         if not isinstance(parameters, self.regularisation.gp.Parameters):
             parameters = self.regularisation.gp.generate_parameters(parameters)
         return self._jit_compiled_calculate_loss(
-            parameters.dict(),
-            *(x, y),
+            parameters,
+            *(x, y, x_regularisation),
         )
@@ -1,14 +1,14 @@
 from typing import Dict, Union
 
-import pydantic
 from flax.core import FrozenDict
 
 from src.gps.base.approximate_base import ApproximateGPBase, ApproximateGPBaseParameters
 from src.gps.base.classification_base import GPClassificationBase
-from src.kernels import TemperedKernel
+from src.kernels import CoregionalisationKernel, TemperedKernel
 from src.kernels.multi_output_kernel import MultiOutputKernel
 from src.means.base import MeanBase
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.precision import DOUBLE_PRECISION_POLICY, PrecisionPolicy
+from src.utils.validation import validate_arguments
 
 
 class ApproximateGPClassificationParameters(ApproximateGPBaseParameters):
@@ -30,10 +30,11 @@ class ApproximateGPClassification(ApproximateGPBase, GPClassificationBase):
     def __init__(
         self,
         mean: MeanBase,
-        kernel: Union[MultiOutputKernel, TemperedKernel],
+        kernel: Union[MultiOutputKernel, CoregionalisationKernel, TemperedKernel],
         epsilon: float = 0.01,
         hermite_polynomial_order: int = 50,
         cdf_lower_bound: float = 1e-10,
+        precision_policy: PrecisionPolicy = DOUBLE_PRECISION_POLICY,
     ):
         """
         Defining the mean function, and the kernel for the Gaussian process.
@@ -41,6 +42,7 @@ class ApproximateGPClassification(ApproximateGPBase, GPClassificationBase):
         Args:
             mean: the mean function of the Gaussian process
             kernel: the kernel of the Gaussian process
+            precision_policy: the precision the Gaussian process is evaluated in
         """
         ApproximateGPBase.__init__(
             self,
@@ -55,8 +57,9 @@ class ApproximateGPClassification(ApproximateGPBase, GPClassificationBase):
             hermite_polynomial_order=hermite_polynomial_order,
             cdf_lower_bound=cdf_lower_bound,
         )
+        self.precision_policy = precision_policy
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> ApproximateGPClassificationParameters:
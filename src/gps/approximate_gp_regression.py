@@ -1,13 +1,13 @@
 from typing import Dict, Union
 
-import pydantic
 from flax.core import FrozenDict
 
 from src.gps.base.approximate_base import ApproximateGPBase, ApproximateGPBaseParameters
 from src.gps.base.regression_base import GPRegressionBase
 from src.kernels.base import KernelBase
 from src.means.base import MeanBase
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.precision import DOUBLE_PRECISION_POLICY, PrecisionPolicy
+from src.utils.validation import validate_arguments
 
 
 class ApproximateGPRegressionParameters(ApproximateGPBaseParameters):
@@ -30,6 +30,7 @@ class ApproximateGPRegression(ApproximateGPBase, GPRegressionBase):
         self,
         mean: MeanBase,
         kernel: KernelBase,
+        precision_policy: PrecisionPolicy = DOUBLE_PRECISION_POLICY,
     ):
         """
         Defining the mean function, and the kernel for the Gaussian process.
@@ -37,6 +38,7 @@ class ApproximateGPRegression(ApproximateGPBase, GPRegressionBase):
         Args:
             mean: the mean function of the Gaussian process
             kernel: the kernel of the Gaussian process
+            precision_policy: the precision the Gaussian process is evaluated in
         """
         ApproximateGPBase.__init__(
             self,
@@ -48,8 +50,9 @@ class ApproximateGPRegression(ApproximateGPBase, GPRegressionBase):
             mean=mean,
             kernel=kernel,
         )
+        self.precision_policy = precision_policy
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> ApproximateGPRegressionParameters:
@@ -2,14 +2,13 @@ from abc import ABC
 from typing import Dict, Tuple, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core import FrozenDict
 
 from src.gps.base.base import GPBase, GPBaseParameters
 from src.kernels.base import KernelBase
 from src.means.base import MeanBase
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class ApproximateGPBaseParameters(GPBaseParameters):
@@ -48,7 +47,28 @@ class ApproximateGPBase(GPBase, ABC):
             parameters=parameters, x=x, full_covariance=full_covariance
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    def _calculate_prior_covariance(
+        self,
+        parameters: ApproximateGPBaseParameters,
+        x: jnp.ndarray,
+        full_covariance: bool,
+    ) -> jnp.ndarray:
+        # approximate Gaussian processes have no observation noise, generate_parameters drops a given noise
+        # and parameters passed as models, which are not regenerated, are evaluated without it as well
+        return GPBase._calculate_prior_covariance(
+            self,
+            parameters=parameters.copy(
+                update={
+                    "log_observation_noise": ApproximateGPBaseParameters.__fields__[
+                        "log_observation_noise"
+                    ].default
+                }
+            ),
+            x=x,
+            full_covariance=full_covariance,
+        )
+
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> ApproximateGPBaseParameters:
@@ -1,17 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple, Union
+from typing import Dict, NamedTuple, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 import jax.scipy as jsp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.distributions import Distribution, Gaussian
 from src.kernels.base import KernelBase, KernelBaseParameters
 from src.means.base import MeanBase, MeanBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG, Module, ModuleParameters
+from src.module import Module, ModuleParameters
 from src.utils.custom_types import JaxFloatType
+from src.utils.jit import jit_hoisting_constants
+from src.utils.linear_operators import (
+    BlockDiagonalLinearOperator,
+    DenseLinearOperator,
+    LinearOperator,
+)
+from src.utils.matrix_operations import cho_factor_with_adaptive_jitter
+from src.utils.precision import (
+    DOUBLE_PRECISION_POLICY,
+    PrecisionPolicy,
+    cast_floating_point,
+)
+from src.utils.validation import validate_arguments
 
 
 class GPBaseParameters(ModuleParameters, ABC):
@@ -24,6 +36,25 @@ class GPBaseParameters(ModuleParameters, ABC):
     kernel: KernelBaseParameters
 
 
+class GPPrediction(NamedTuple):
+    """
+    The predictive quantities of a Gaussian process on a batch of points.
+    These are computed once and shared between the terms of a loss that evaluate the same batch.
+        - k is the number of output dimensions
+        - n is the number of points
+
+    Args:
+        mean: the mean of the Gaussian distribution of the prediction
+        covariance: the diagonal covariance of the Gaussian distribution of the prediction
+        probabilities: the output of _predict_probability, the probabilities of the labels of shape (n, k)
+                       for classification or the mean and covariance for regression
+    """
+
+    mean: jnp.ndarray
+    covariance: jnp.ndarray
+    probabilities: Union[Tuple[jnp.ndarray, jnp.ndarray], jnp.ndarray]
+
+
 class GPBase(Module, ABC):
     """
     A Gaussian process defined with respect to a mean function and a kernel.
@@ -34,6 +65,9 @@ class GPBase(Module, ABC):
     # indicates the type of distribution that is returned by the predict method
     PredictDistribution = Distribution
 
+    # the precision the Gaussian process is evaluated in, set by the constructors of the Gaussian processes
+    precision_policy: PrecisionPolicy = DOUBLE_PRECISION_POLICY
+
     def __init__(
         self,
         mean: MeanBase,
@@ -48,7 +82,7 @@ class GPBase(Module, ABC):
         """
         self.mean = mean
         self.kernel = kernel
-        self._jit_compiled_predict_probability = jax.jit(
+        self._jit_compiled_predict_probability = jit_hoisting_constants(
             lambda parameters, x: self._predict_probability(parameters=parameters, x=x)
         )
         super().__init__(preprocess_function=None)
@@ -109,6 +143,116 @@ class GPBase(Module, ABC):
         """
         raise NotImplementedError
 
+    def _calculate_probabilities_from_prediction_gaussian(
+        self,
+        mean: jnp.ndarray,
+        covariance_diagonals: jnp.ndarray,
+    ) -> Union[Tuple[jnp.ndarray, jnp.ndarray], jnp.ndarray]:
+        """
+        Computes the output of _predict_probability from an already computed diagonal prediction Gaussian.
+        Args:
+            mean: the mean of the Gaussian distribution of the prediction
+            covariance_diagonals: the diagonal covariance of the Gaussian distribution of the prediction
+
+        Returns: the probabilities of the labels or the mean and covariance of the Gaussian distribution of the
+                 prediction
+
+        """
+        raise NotImplementedError
+
+    def _calculate_prediction(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> GPPrediction:
+        """
+        Calculates the diagonal prediction Gaussian and the probabilities in a single forward pass.
+        Args:
+            parameters: the parameters of the Gaussian process
+            x: the input points for which the prediction is made
+
+        Returns: the predictive quantities of the Gaussian process
+
+        """
+        mean, covariance = self._calculate_prediction_gaussian(
+            parameters=parameters,
+            x=x,
+            full_covariance=False,
+        )
+        return GPPrediction(
+            mean=mean,
+            covariance=covariance,
+            probabilities=self._calculate_probabilities_from_prediction_gaussian(
+                mean=mean,
+                covariance_diagonals=covariance,
+            ),
+        )
+
+    def _calculate_prediction_in_chunks(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+        chunk_size: int,
+    ) -> GPPrediction:
+        """
+        Calculates the predictive quantities in chunks of chunk_size points with lax.map,
+        bounding the memory of the forward pass by the chunk size rather than the number of points.
+        The points are padded to a multiple of the chunk size and the padding is removed afterwards.
+        The prediction is diagonal, so the result is the same as for a single pass.
+            - n is the number of points
+            - d is the number of dimensions
+
+        Args:
+            parameters: the parameters of the Gaussian process
+            x: the input points of shape (n, d)
+            chunk_size: the number of points per chunk
+
+        Returns: the predictive quantities of the Gaussian process
+
+        """
+        number_of_points = x.shape[0]
+        number_of_chunks = -(-number_of_points // chunk_size)
+        number_of_padded_points = number_of_chunks * chunk_size - number_of_points
+        x_padded = jnp.concatenate(
+            [x, jnp.repeat(x[-1:], number_of_padded_points, axis=0)], axis=0
+        )
+
+        # the axis over points differs between outputs, so it is found from the output shapes
+        def prediction_shapes(number_of_points_: int):
+            return jax.eval_shape(
+                lambda x_: self._calculate_prediction(parameters=parameters, x=x_),
+                jax.ShapeDtypeStruct((number_of_points_,) + x.shape[1:], x.dtype),
+            )
+
+        point_axes = jax.tree_util.tree_map(
+            lambda shape_1, shape_2: [
+                axis
+                for axis, (size_1, size_2) in enumerate(
+                    zip(shape_1.shape, shape_2.shape)
+                )
+                if size_1 != size_2
+            ][0],
+            prediction_shapes(1),
+            prediction_shapes(2),
+        )
+        chunked_predictions = jax.lax.map(
+            lambda x_chunk: self._calculate_prediction(
+                parameters=parameters,
+                x=x_chunk,
+            ),
+            x_padded.reshape((number_of_chunks, chunk_size) + x.shape[1:]),
+        )
+        return jax.tree_util.tree_map(
+            lambda chunked_prediction, point_axis: jax.lax.slice_in_dim(
+                jnp.concatenate(chunked_prediction, axis=point_axis),
+                0,
+                number_of_points,
+                axis=point_axis,
+            ),
+            chunked_predictions,
+            point_axes,
+        )
+
     @abstractmethod
     def _construct_distribution(
         self,
@@ -125,7 +269,7 @@ class GPBase(Module, ABC):
         """
         raise NotImplementedError
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def predict_probability(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -147,27 +291,98 @@ class GPBase(Module, ABC):
         if not isinstance(parameters, self.Parameters):
             parameters = self.generate_parameters(parameters)
         Module.check_parameters(parameters, self.Parameters)
-        probabilities = self._jit_compiled_predict_probability(parameters.dict(), x)
+        probabilities = self._jit_compiled_predict_probability(parameters, x)
         return self._construct_distribution(probabilities)
 
-    def construct_observation_noise_matrix(
+    def _calculate_kernel_gram(
+        self,
+        parameters: GPBaseParameters,
+        x1: jnp.ndarray,
+        x2: jnp.ndarray,
+        full_covariance: bool,
+    ) -> jnp.ndarray:
+        """
+        Calculates the gram matrix of the kernel in the compute dtype of the precision policy.
+        Args:
+            parameters: the parameters of the Gaussian process
+            x1: design matrix of shape (m1, d)
+            x2: design matrix of shape (m2, d)
+            full_covariance: whether the full covariance matrix is returned or just the diagonal
+
+        Returns: the gram matrix in the linear algebra dtype of the precision policy
+
+        """
+        gram = self.kernel.calculate_gram(
+            parameters=cast_floating_point(
+                parameters.kernel, self.precision_policy.compute_dtype
+            ),
+            x1=cast_floating_point(x1, self.precision_policy.compute_dtype),
+            x2=cast_floating_point(x2, self.precision_policy.compute_dtype),
+            full_covariance=full_covariance,
+        )
+        return cast_floating_point(gram, self.precision_policy.linear_algebra_dtype)
+
+    def _calculate_kernel_gram_operator(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Calculates the gram operator of the kernel in the compute dtype of the precision policy.
+        Args:
+            parameters: the parameters of the Gaussian process
+            x: design matrix of shape (n, d)
+
+        Returns: the gram operator in the linear algebra dtype of the precision policy
+
+        """
+        gram_operator = self.kernel.calculate_gram_operator(
+            parameters=cast_floating_point(
+                parameters.kernel, self.precision_policy.compute_dtype
+            ),
+            x=cast_floating_point(x, self.precision_policy.compute_dtype),
+        )
+        return cast_floating_point(
+            gram_operator, self.precision_policy.linear_algebra_dtype
+        )
+
+    def _predict_mean(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Predicts the mean function in the compute dtype of the precision policy.
+        Args:
+            parameters: the parameters of the Gaussian process
+            x: design matrix of shape (m, d)
+
+        Returns: the mean function in the linear algebra dtype of the precision policy
+
+        """
+        mean = self.mean.predict(
+            cast_floating_point(parameters.mean, self.precision_policy.compute_dtype),
+            cast_floating_point(x, self.precision_policy.compute_dtype),
+        )
+        return cast_floating_point(mean, self.precision_policy.linear_algebra_dtype)
+
+    def construct_observation_noise_operator(
         self, log_observation_noise: Union[jnp.ndarray, float], number_of_points: int
-    ):
+    ) -> LinearOperator:
         """
-        Constructs the observation noise matrix.
+        Constructs the observation noise matrix as a linear operator without allocating it.
         Args:
             log_observation_noise: the log of the observation noise
             number_of_points: the number of points for which the observation noise matrix is constructed
 
-        Returns: the observation noise matrix of shape (k, n, n) where k is the number of output dimensions and n is
-                    the number of points
+        Returns: a scaled identity operator of shape (n, n) if there is one output dimension, otherwise
+                 a block diagonal operator of k scaled identities of shape (n, n), where k is the number of
+                 output dimensions and n is the number of points
 
         """
-        return jnp.multiply(
-            jnp.atleast_1d(jnp.exp(log_observation_noise))[:, None, None],
-            jnp.array(
-                [jnp.eye(number_of_points)] * self.kernel.number_output_dimensions
-            ),
+        return self.kernel.construct_observation_noise_operator(
+            log_observation_noise=log_observation_noise,
+            number_of_points=number_of_points,
         )
 
     def _calculate_prior_covariance(
@@ -188,19 +403,23 @@ class GPBase(Module, ABC):
                     (k, n) where k is the number of output dimensions and n is the number of points
 
         """
-        covariance = self.kernel.calculate_gram(
-            parameters=parameters.kernel,
+        covariance = self._calculate_kernel_gram(
+            parameters=parameters,
             x1=x,
             x2=x,
             full_covariance=full_covariance,
         )
         if full_covariance:
             # (k, n, n)
-            observation_noise_matrix = self.construct_observation_noise_matrix(
-                log_observation_noise=parameters.log_observation_noise,
-                number_of_points=x.shape[0],
-            ).reshape(covariance.shape)
-            covariance = covariance + observation_noise_matrix
+            diagonal_indices = jnp.diag_indices(x.shape[0])
+            covariance = (
+                covariance.reshape(
+                    self.kernel.number_output_dimensions, x.shape[0], x.shape[0]
+                )
+                .at[:, diagonal_indices[0], diagonal_indices[1]]
+                .add(jnp.atleast_1d(jnp.exp(parameters.log_observation_noise))[:, None])
+                .reshape(covariance.shape)
+            )
         else:
             # (k, n)
             covariance = (
@@ -211,7 +430,7 @@ class GPBase(Module, ABC):
                 covariance = covariance.squeeze(axis=0)
         return covariance
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_prior_covariance(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -243,7 +462,39 @@ class GPBase(Module, ABC):
         )
         return covariance
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
+    def calculate_prior_covariance_operator(
+        self,
+        parameters: Union[Dict, FrozenDict, GPBaseParameters],
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Calculates the prior covariance matrix as a linear operator, the sum of the gram operator of the kernel
+        and the observation noise operator. The structure of the gram operator is kept, for example the prior
+        covariance of an SVGP kernel is a low-rank update that is solved without densifying it.
+            - k is the number of output dimensions
+            - n is the number of points
+        Args:
+            parameters: the parameters of the Gaussian process
+            x: the input points for which the prediction is made
+
+        Returns: the prior covariance operator of shape (n, n), or block diagonal with k blocks of shape (n, n)
+                 if there are multiple output dimensions
+
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        Module.check_parameters(parameters, self.Parameters)
+        return self._calculate_kernel_gram_operator(
+            parameters=parameters,
+            x=x,
+        ) + self.construct_observation_noise_operator(
+            log_observation_noise=parameters.log_observation_noise,
+            number_of_points=x.shape[0],
+        )
+
+    @validate_arguments
     def calculate_prior(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -267,7 +518,7 @@ class GPBase(Module, ABC):
         if not isinstance(parameters, self.Parameters):
             parameters = self.generate_parameters(parameters)
         Module.check_parameters(parameters, self.Parameters)
-        mean = self.mean.predict(parameters.mean, x)
+        mean = self._predict_mean(parameters=parameters, x=x)
         covariance = self._calculate_prior_covariance(
             parameters=parameters,
             x=x,
@@ -294,6 +545,15 @@ class GPBase(Module, ABC):
         Returns: the posterior covariance matrix
 
         """
+        if self.kernel.has_structured_posterior:
+            _, covariance = self._calculate_structured_posterior(
+                parameters=parameters,
+                x_train=x_train,
+                y_train=y_train,
+                x=x,
+                full_covariance=False,
+            )
+            return covariance
         covariance = jax.vmap(
             lambda x_: self._calculate_full_posterior_covariance(
                 parameters=parameters,
@@ -328,57 +588,21 @@ class GPBase(Module, ABC):
         Returns: the mean (k, n) and covariance (k, n, n) of the posterior distribution
 
         """
-        number_of_train_points = x_train.shape[0]
-        number_of_test_points = x.shape[0]
-
-        # (k, n, n)
-        gram_train = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
-                x1=x_train,
-                x2=x_train,
-                full_covariance=True,
-            )
-        ).reshape(-1, number_of_train_points, number_of_train_points)
-
-        # (k, n, m)
-        gram_train_x = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
-                x1=x_train,
-                x2=x,
-                full_covariance=True,
-            )
-        ).reshape(-1, number_of_train_points, number_of_test_points)
-
-        # (k, m, m)
-        gram_x = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
-                x1=x,
-                x2=x,
+        if self.kernel.has_structured_posterior:
+            _, covariance = self._calculate_structured_posterior(
+                parameters=parameters,
+                x_train=x_train,
+                y_train=y_train,
+                x=x,
                 full_covariance=True,
             )
-        ).reshape(-1, number_of_test_points, number_of_test_points)
-
-        # (k, n, n)
-        observation_noise_matrix = self.construct_observation_noise_matrix(
-            log_observation_noise=parameters.log_observation_noise,
-            number_of_points=number_of_train_points,
+            return covariance
+        _, covariance = self._calculate_posterior_of_kernel(
+            parameters=parameters,
+            x_train=x_train,
+            y_train=y_train,
+            x=x,
         )
-        # (k, n)
-        y_train = jnp.atleast_2d(y_train.T)
-
-        # (k, n), (k, n, n)
-        kernel_mean, covariance = jax.vmap(
-            lambda g_tr, g_tr_x, g_x, obs_noise, y_tr: self.calculate_posterior_matrices_of_kernel(
-                gram_train=g_tr,
-                gram_train_x=g_tr_x,
-                gram_x=g_x,
-                observation_noise_matrix=obs_noise,
-                y_train=y_tr,
-            )
-        )(gram_train, gram_train_x, gram_x, observation_noise_matrix, y_train)
         return covariance
 
     def _calculate_partial_posterior(
@@ -399,6 +623,14 @@ class GPBase(Module, ABC):
         Returns: the mean (k, m) and covariance (k, m) of the posterior distribution
 
         """
+        if self.kernel.has_structured_posterior:
+            return self._calculate_structured_posterior(
+                parameters=parameters,
+                x_train=x_train,
+                y_train=y_train,
+                x=x,
+                full_covariance=False,
+            )
         mean, covariance = jax.vmap(
             lambda x_: self._calculate_full_posterior(
                 parameters=parameters,
@@ -433,24 +665,78 @@ class GPBase(Module, ABC):
 
         Returns: the mean (k, n) and covariance (k, n, n) of the posterior distribution
 
+        """
+        if self.kernel.has_structured_posterior:
+            return self._calculate_structured_posterior(
+                parameters=parameters,
+                x_train=x_train,
+                y_train=y_train,
+                x=x,
+                full_covariance=True,
+            )
+        # (k, m), (k, m, m)
+        kernel_mean, covariance = self._calculate_posterior_of_kernel(
+            parameters=parameters,
+            x_train=x_train,
+            y_train=y_train,
+            x=x,
+        )
+
+        # (k, m)
+        prior_mean = self._predict_mean(parameters=parameters, x=x)
+        mean = kernel_mean + prior_mean
+        return mean, covariance
+
+    def _calculate_posterior_of_kernel(
+        self,
+        parameters: GPBaseParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Calculate the posterior mean of the kernel and the posterior covariance for each output dimension,
+        solving the gram operator of the training points and the observation noise operator.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+
+        Returns: the kernel mean (k, m) and covariance (k, m, m) of the posterior distribution
+
         """
         number_of_train_points = x_train.shape[0]
         number_of_test_points = x.shape[0]
 
-        # (k, n, n)
-        gram_train = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
-                x1=x_train,
-                x2=x_train,
-                full_covariance=True,
-            )
-        ).reshape(-1, number_of_train_points, number_of_train_points)
+        # (n, n) or k blocks of shape (n, n)
+        gram_train_operator = self._calculate_kernel_gram_operator(
+            parameters=parameters,
+            x=x_train,
+        )
+        observation_noise_operator = self.construct_observation_noise_operator(
+            log_observation_noise=parameters.log_observation_noise,
+            number_of_points=number_of_train_points,
+        )
+        if self.kernel.number_output_dimensions == 1:
+            gram_train_operators = [gram_train_operator]
+            observation_noise_operators = [observation_noise_operator]
+        else:
+            assert isinstance(
+                gram_train_operator, BlockDiagonalLinearOperator
+            ), f"{type(gram_train_operator)=} must be block diagonal over the output dimensions"
+            gram_train_operators = gram_train_operator.blocks
+            observation_noise_operators = observation_noise_operator.blocks
 
         # (k, n, m)
         gram_train_x = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
+            self._calculate_kernel_gram(
+                parameters=parameters,
                 x1=x_train,
                 x2=x,
                 full_covariance=True,
@@ -459,73 +745,128 @@ class GPBase(Module, ABC):
 
         # (k, m, m)
         gram_x = jnp.atleast_3d(
-            self.kernel.calculate_gram(
-                parameters=parameters.kernel,
+            self._calculate_kernel_gram(
+                parameters=parameters,
                 x1=x,
                 x2=x,
                 full_covariance=True,
             )
         ).reshape(-1, number_of_test_points, number_of_test_points)
 
-        # (k, n, n)
-        observation_noise_matrix = self.construct_observation_noise_matrix(
-            log_observation_noise=parameters.log_observation_noise,
-            number_of_points=number_of_train_points,
+        # (k, n)
+        y_train = jnp.atleast_2d(y_train.T)
+
+        # (k, m), (k, m, m)
+        kernel_mean, covariance = zip(
+            *[
+                self.calculate_posterior_matrices_of_kernel(
+                    gram_train_operator=gram_train_operator_,
+                    observation_noise_operator=observation_noise_operator_,
+                    gram_train_x=gram_train_x_,
+                    gram_x=gram_x_,
+                    y_train=y_train_,
+                )
+                for gram_train_operator_, observation_noise_operator_, gram_train_x_, gram_x_, y_train_ in zip(
+                    gram_train_operators,
+                    observation_noise_operators,
+                    gram_train_x,
+                    gram_x,
+                    y_train,
+                )
+            ]
         )
+        return jnp.stack(kernel_mean), jnp.stack(covariance)
 
-        # (k, n)
-        prior_mean = self.mean.predict(parameters.mean, x)
+    def _calculate_structured_posterior(
+        self,
+        parameters: GPBaseParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        full_covariance: bool,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Calculate the posterior distribution of the Gaussian Processes with the structured solve of the kernel,
+        such as the joint solve of the outputs of a coregionalisation kernel. The kernel is evaluated in the
+        compute dtype of the precision policy and solved in the linear algebra dtype.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
 
-        # (k, n)
-        y_train = jnp.atleast_2d(y_train.T)
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
 
-        # (k, n), (k, n, n)
-        kernel_mean, covariance = jax.vmap(
-            lambda g_tr, g_tr_x, g_x, obs_noise, y_tr: self.calculate_posterior_matrices_of_kernel(
-                gram_train=g_tr,
-                gram_train_x=g_tr_x,
-                gram_x=g_x,
-                observation_noise_matrix=obs_noise,
-                y_train=y_tr,
-            )
-        )(gram_train, gram_train_x, gram_x, observation_noise_matrix, y_train)
+        Returns: the mean (k, m) and covariance (k, m, m) of the posterior distribution if full_covariance is True,
+                 otherwise the mean (k, m) and covariance diagonal (k, m)
+
+        """
+        kernel_mean, covariance = self.kernel.calculate_structured_posterior(
+            parameters=cast_floating_point(
+                parameters.kernel, self.precision_policy.compute_dtype
+            ),
+            x_train=cast_floating_point(x_train, self.precision_policy.compute_dtype),
+            y_train=y_train,
+            x=cast_floating_point(x, self.precision_policy.compute_dtype),
+            log_observation_noise=parameters.log_observation_noise,
+            full_covariance=full_covariance,
+            linear_algebra_dtype=self.precision_policy.linear_algebra_dtype,
+        )
+
+        # (k, m)
+        prior_mean = self._predict_mean(parameters=parameters, x=x)
         mean = kernel_mean + prior_mean
         return mean, covariance
 
-    @staticmethod
     def calculate_posterior_matrices_of_kernel(
-        gram_train: jnp.ndarray,
+        self,
+        gram_train_operator: LinearOperator,
+        observation_noise_operator: LinearOperator,
         gram_train_x: jnp.ndarray,
         gram_x: jnp.ndarray,
-        observation_noise_matrix: jnp.ndarray,
         y_train: jnp.ndarray,
     ):
         """
         Calculate the posterior mean and covariance of the Gaussian Processes.
+        Structured gram operators are solved with the observation noise without densifying them,
+        dense gram matrices are factorised with the Cholesky decomposition with adaptive jitter.
 
         Args:
-            gram_train: the gram matrix of the training points
+            gram_train_operator: the gram operator of the training points
+            observation_noise_operator: the observation noise operator of the training points
             gram_train_x: the gram matrix between the training points and the test points
             gram_x: the gram matrix of the test points
-            observation_noise_matrix: the observation noise matrix
             y_train: the training response matrix
 
         Returns: the mean and covariance of the posterior distribution
 
         """
-        cholesky_decomposition_and_lower = jsp.linalg.cho_factor(
-            gram_train + observation_noise_matrix
-        )
-        kernel_mean = gram_train_x.T @ jsp.linalg.cho_solve(
-            c_and_lower=cholesky_decomposition_and_lower, b=y_train
-        )
-
-        covariance = gram_x - gram_train_x.T @ jsp.linalg.cho_solve(
-            c_and_lower=cholesky_decomposition_and_lower, b=gram_train_x
-        )
+        # solve the training response and the gram matrix to the test points together
+        matrix = jnp.concatenate((y_train[:, None], gram_train_x), axis=1)
+        if isinstance(gram_train_operator, DenseLinearOperator):
+            diagonal_indices = jnp.diag_indices(gram_train_operator.shape[0])
+            cholesky_decomposition_and_lower = cho_factor_with_adaptive_jitter(
+                matrix=gram_train_operator.to_dense()
+                .at[diagonal_indices]
+                .add(observation_noise_operator.diag()),
+                jitter=self.precision_policy.jitter,
+                maximum_number_of_jitter_increases=self.precision_policy.maximum_number_of_jitter_increases,
+                jitter_growth_factor=self.precision_policy.jitter_growth_factor,
+            )
+            solution = jsp.linalg.cho_solve(
+                c_and_lower=cholesky_decomposition_and_lower, b=matrix
+            )
+        else:
+            solution = (gram_train_operator + observation_noise_operator).solve(matrix)
+        kernel_mean = gram_train_x.T @ solution[:, 0]
+        covariance = gram_x - gram_train_x.T @ solution[:, 1:]
         return kernel_mean, covariance
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_prediction_gaussian(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -557,7 +898,39 @@ class GPBase(Module, ABC):
             full_covariance=full_covariance,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
+    def calculate_prediction(
+        self,
+        parameters: Union[Dict, FrozenDict, GPBaseParameters],
+        x: jnp.ndarray,
+        chunk_size: Optional[int] = None,
+    ) -> GPPrediction:
+        """
+        Calculate the predictive quantities of the Gaussian Processes used by empirical risks and regularisations.
+        Args:
+            parameters: parameters of the Gaussian Processes
+            x: the input design matrix of shape (m, d)
+            chunk_size: if given, the prediction is calculated in chunks of this many points
+
+        Returns: the diagonal prediction Gaussian and the probabilities of the prediction
+
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        Module.check_parameters(parameters, self.Parameters)
+        if chunk_size is not None and chunk_size < x.shape[0]:
+            return self._calculate_prediction_in_chunks(
+                parameters=parameters,
+                x=x,
+                chunk_size=chunk_size,
+            )
+        return self._calculate_prediction(
+            parameters=parameters,
+            x=x,
+        )
+
+    @validate_arguments
     def calculate_prediction_gaussian_covariance(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -585,7 +958,7 @@ class GPBase(Module, ABC):
         )
         return covariance
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_posterior(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -633,7 +1006,7 @@ class GPBase(Module, ABC):
             posterior_covariance = posterior_covariance.squeeze(axis=0)
         return posterior_mean, posterior_covariance
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_posterior_covariance(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
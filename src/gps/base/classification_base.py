@@ -8,7 +8,12 @@ from scipy.special import roots_hermite
 
 from src.distributions import Multinomial
 from src.gps.base.base import GPBase, GPBaseParameters
-from src.kernels import TemperedKernel, TemperedKernelParameters
+from src.kernels import (
+    CoregionalisationKernel,
+    CoregionalisationKernelParameters,
+    TemperedKernel,
+    TemperedKernelParameters,
+)
 from src.kernels.multi_output_kernel import (
     MultiOutputKernel,
     MultiOutputKernelParameters,
@@ -17,7 +22,11 @@ from src.means.base import MeanBase
 
 
 class GPClassificationBaseParameters(GPBaseParameters):
-    kernel: Union[MultiOutputKernelParameters, TemperedKernelParameters]
+    kernel: Union[
+        MultiOutputKernelParameters,
+        CoregionalisationKernelParameters,
+        TemperedKernelParameters,
+    ]
 
 
 class GPClassificationBase(GPBase, ABC):
@@ -30,7 +39,7 @@ class GPClassificationBase(GPBase, ABC):
     def __init__(
         self,
         mean: MeanBase,
-        kernel: Union[MultiOutputKernel, TemperedKernel],
+        kernel: Union[MultiOutputKernel, CoregionalisationKernel, TemperedKernel],
         epsilon: float,
         hermite_polynomial_order: int,
         cdf_lower_bound: float,
@@ -60,6 +69,16 @@ class GPClassificationBase(GPBase, ABC):
             x=x,
             full_covariance=False,
         )
+        return self._calculate_probabilities_from_prediction_gaussian(
+            mean=mean,
+            covariance_diagonals=covariance_diagonals,
+        )
+
+    def _calculate_probabilities_from_prediction_gaussian(
+        self,
+        mean: jnp.ndarray,
+        covariance_diagonals: jnp.ndarray,
+    ) -> jnp.ndarray:
         s_matrix = self._calculate_s_matrix(
             means=mean,
             covariance_diagonals=covariance_diagonals,
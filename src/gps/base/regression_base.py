@@ -41,3 +41,10 @@ class GPRegressionBase(GPBase, ABC):
             x=x,
             full_covariance=False,
         )
+
+    def _calculate_probabilities_from_prediction_gaussian(
+        self,
+        mean: jnp.ndarray,
+        covariance_diagonals: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        return mean, covariance_diagonals
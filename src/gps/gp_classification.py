@@ -1,29 +1,39 @@
 from typing import Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core import FrozenDict
 
 from src.gps.base.base import GPBaseParameters
 from src.gps.base.classification_base import GPClassificationBase
 from src.gps.base.exact_base import ExactGPBase
-from src.kernels import TemperedKernel, TemperedKernelParameters
+from src.kernels import (
+    CoregionalisationKernel,
+    CoregionalisationKernelParameters,
+    TemperedKernel,
+    TemperedKernelParameters,
+)
 from src.kernels.multi_output_kernel import (
     MultiOutputKernel,
     MultiOutputKernelParameters,
 )
 from src.means.base import MeanBase
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.precision import DOUBLE_PRECISION_POLICY, PrecisionPolicy
+from src.utils.validation import validate_arguments
 
 
 class GPClassificationParameters(GPBaseParameters):
     """
     The parameters of an exact Gaussian process classification model.
     The parameters are the mean function, the kernel, and the observation noise.
-    The kernel is either a multi-output kernel or a tempered kernel (for multi-class classification).
+    The kernel is either a multi-output kernel, a coregionalisation kernel or a tempered kernel
+    (for multi-class classification).
     """
 
-    kernel: Union[MultiOutputKernelParameters, TemperedKernelParameters]
+    kernel: Union[
+        MultiOutputKernelParameters,
+        CoregionalisationKernelParameters,
+        TemperedKernelParameters,
+    ]
 
 
 class GPClassification(ExactGPBase, GPClassificationBase):
@@ -36,12 +46,13 @@ class GPClassification(ExactGPBase, GPClassificationBase):
     def __init__(
         self,
         mean: MeanBase,
-        kernel: Union[MultiOutputKernel, TemperedKernel],
+        kernel: Union[MultiOutputKernel, CoregionalisationKernel, TemperedKernel],
         x: jnp.ndarray,
         y: jnp.ndarray,
         epsilon: float = 0.01,
         hermite_polynomial_order: int = 50,
         cdf_lower_bound: float = 1e-10,
+        precision_policy: PrecisionPolicy = DOUBLE_PRECISION_POLICY,
     ):
         """
         Defining the mean function, and the kernel for the Gaussian process.
@@ -49,6 +60,7 @@ class GPClassification(ExactGPBase, GPClassificationBase):
         Args:
             mean: the mean function of the Gaussian process
             kernel: the kernel of the Gaussian process
+            precision_policy: the precision the Gaussian process is evaluated in
         """
         ExactGPBase.__init__(
             self,
@@ -67,8 +79,9 @@ class GPClassification(ExactGPBase, GPClassificationBase):
         )
         self.mean = mean
         self.kernel = kernel
+        self.precision_policy = precision_policy
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> GPClassificationParameters:
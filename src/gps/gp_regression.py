@@ -1,7 +1,6 @@
 from typing import Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core import FrozenDict
 
 from src.gps.base.base import GPBaseParameters
@@ -9,7 +8,8 @@ from src.gps.base.exact_base import ExactGPBase
 from src.gps.base.regression_base import GPRegressionBase
 from src.kernels.base import KernelBase
 from src.means.base import MeanBase
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.precision import DOUBLE_PRECISION_POLICY, PrecisionPolicy
+from src.utils.validation import validate_arguments
 
 
 class GPRegressionParameters(GPBaseParameters):
@@ -34,6 +34,7 @@ class GPRegression(ExactGPBase, GPRegressionBase):
         kernel: KernelBase,
         x: jnp.ndarray,
         y: jnp.ndarray,
+        precision_policy: PrecisionPolicy = DOUBLE_PRECISION_POLICY,
     ):
         """
         Defining the mean function, and the kernel for the Gaussian process.
@@ -41,6 +42,7 @@ class GPRegression(ExactGPBase, GPRegressionBase):
         Args:
             mean: the mean function of the Gaussian process
             kernel: the kernel of the Gaussian process
+            precision_policy: the precision the Gaussian process is evaluated in
         """
         GPRegressionBase.__init__(
             self,
@@ -54,8 +56,9 @@ class GPRegression(ExactGPBase, GPRegressionBase):
             x=x,
             y=y,
         )
+        self.precision_policy = precision_policy
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> GPRegressionParameters:
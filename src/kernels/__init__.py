@@ -1,8 +1,16 @@
+from src.kernels.coregionalisation_kernel import (
+    CoregionalisationKernel,
+    CoregionalisationKernelParameters,
+)
 from src.kernels.custom_kernel import CustomKernel, CustomKernelParameters
 from src.kernels.custom_mapping_kernel import (
     CustomMappingKernel,
     CustomMappingKernelParameters,
 )
+from src.kernels.grid_interpolation_kernel import (
+    GridInterpolationKernel,
+    GridInterpolationKernelParameters,
+)
 from src.kernels.multi_output_kernel import (
     MultiOutputKernel,
     MultiOutputKernelParameters,
@@ -10,8 +18,12 @@ from src.kernels.multi_output_kernel import (
 from src.kernels.tempered_kernel import TemperedKernel, TemperedKernelParameters
 
 __all__ = [
+    "CoregionalisationKernel",
+    "CoregionalisationKernelParameters",
     "CustomKernel",
     "CustomKernelParameters",
+    "GridInterpolationKernel",
+    "GridInterpolationKernelParameters",
     "MultiOutputKernel",
     "MultiOutputKernelParameters",
     "TemperedKernel",
@@ -1,14 +1,13 @@
 from typing import Callable, Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax.scipy.linalg import cho_factor, cho_solve
 
 from src.kernels.approximate.base import ApproximateBaseKernel
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.matrix_operations import add_diagonal_regulariser
+from src.utils.validation import validate_arguments
 
 
 class SparsePosteriorKernelParameters(KernelBaseParameters):
@@ -43,7 +42,7 @@ class SparsePosteriorKernel(ApproximateBaseKernel):
             preprocess_function=preprocess_function,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> SparsePosteriorKernelParameters:
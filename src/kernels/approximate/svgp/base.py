@@ -1,14 +1,16 @@
 from abc import ABC
-from typing import Callable
+from typing import Callable, Dict, Union
 
 import jax.numpy as jnp
-from jax.scipy.linalg import cho_factor
+from flax.core.frozen_dict import FrozenDict
+from jax.scipy.linalg import cho_factor, cho_solve
 
 from src.kernels.approximate.base import (
     ApproximateBaseKernel,
     ApproximateBaseKernelParameters,
 )
 from src.kernels.base import KernelBase, KernelBaseParameters
+from src.utils.linear_operators import LinearOperator, LowRankUpdateLinearOperator
 from src.utils.matrix_operations import add_diagonal_regulariser
 
 
@@ -78,3 +80,89 @@ class SVGPBaseKernel(ApproximateBaseKernel, ABC):
             is_diagonal_regularisation_absolute_scale=is_diagonal_regularisation_absolute_scale,
             preprocess_function=preprocess_function,
         )
+
+    def _calculate_sigma_matrix(
+        self,
+        parameters: SVGPBaseKernelParameters,
+    ) -> jnp.ndarray:
+        """
+        Computes the inducing point covariance matrix sigma_matrix of the SVGP kernel, such that
+        the gram matrix is:
+            r(x1, x2) - r(x1, Z) @ r(Z, Z)^{-1} @ r(Z, x2) + r(x1, Z) @ sigma_matrix @ r(Z, x2)
+        where r is the regulariser kernel and Z are the inducing points.
+            - m is the number of inducing points
+
+        Args:
+            parameters: parameters of the kernel
+
+        Returns: the sigma matrix of shape (m, m)
+
+        """
+        raise NotImplementedError(
+            f"Sigma matrix not defined for kernel type {type(self)}"
+        )
+
+    def calculate_sigma_matrix(
+        self,
+        parameters: Union[Dict, FrozenDict, SVGPBaseKernelParameters],
+    ) -> jnp.ndarray:
+        """
+        Computes the inducing point covariance matrix sigma_matrix of the SVGP kernel.
+            - m is the number of inducing points
+
+        Args:
+            parameters: parameters of the kernel
+
+        Returns: the sigma matrix of shape (m, m)
+
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        return self._calculate_sigma_matrix(parameters=parameters)
+
+    def _calculate_gram_operator(
+        self,
+        parameters: SVGPBaseKernelParameters,
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the gram matrix of the SVGP kernel as a low-rank update of the regulariser gram matrix:
+            r(x, x) + r(x, Z) @ (sigma_matrix - r(Z, Z)^{-1}) @ r(Z, x)
+        such that it can be solved at the cost of solving r(x, x) and a system of the inducing points.
+        Kernels without a sigma matrix are densified.
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: the kernel gram operator
+
+        """
+        if (
+            type(self)._calculate_sigma_matrix is SVGPBaseKernel._calculate_sigma_matrix
+            or self.number_output_dimensions != 1
+        ):
+            return super()._calculate_gram_operator(parameters=parameters, x=x)
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        regulariser_gram_x_inducing = self.regulariser_kernel.calculate_gram(
+            parameters=self.regulariser_kernel_parameters,
+            x1=x,
+            x2=self.inducing_points,
+        )
+        return LowRankUpdateLinearOperator(
+            base=self.regulariser_kernel.calculate_gram_operator(
+                parameters=self.regulariser_kernel_parameters,
+                x=x,
+            ),
+            factor=regulariser_gram_x_inducing,
+            core=self._calculate_sigma_matrix(parameters=parameters)
+            - cho_solve(
+                c_and_lower=self.regulariser_gram_inducing_cholesky_decomposition_and_lower,
+                b=jnp.eye(self.inducing_points.shape[0]),
+            ),
+        )
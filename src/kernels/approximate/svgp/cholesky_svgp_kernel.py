@@ -1,14 +1,13 @@
 from typing import Callable, Dict, Literal, Tuple, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax.scipy.linalg import cho_solve
 
 from src.kernels.approximate.svgp.base import SVGPBaseKernel, SVGPBaseKernelParameters
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType
+from src.utils.validation import validate_arguments
 
 
 class CholeskySVGPKernelParameters(SVGPBaseKernelParameters):
@@ -54,7 +53,7 @@ class CholeskySVGPKernel(SVGPBaseKernel):
             is_diagonal_regularisation_absolute_scale=is_diagonal_regularisation_absolute_scale,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict] = None
     ) -> CholeskySVGPKernelParameters:
@@ -104,6 +103,45 @@ class CholeskySVGPKernel(SVGPBaseKernel):
         )
         return el_matrix_lower_triangle, el_matrix_log_diagonal
 
+    def _calculate_sigma_matrix(
+        self,
+        parameters: CholeskySVGPKernelParameters,
+    ) -> jnp.ndarray:
+        return self._calculate_sigma_matrix_from_el_matrix_parameters(
+            el_matrix_lower_triangle=parameters.el_matrix_lower_triangle,
+            el_matrix_log_diagonal=parameters.el_matrix_log_diagonal,
+        )
+
+    @staticmethod
+    def _calculate_sigma_matrix_from_el_matrix_parameters(
+        el_matrix_lower_triangle: jnp.ndarray,
+        el_matrix_log_diagonal: jnp.ndarray,
+    ) -> jnp.ndarray:
+        el_matrix_lower_triangle = jnp.tril(el_matrix_lower_triangle, k=-1)
+        el_matrix = el_matrix_lower_triangle + jnp.diag(
+            jnp.exp(el_matrix_log_diagonal),
+        )
+        return el_matrix.T @ el_matrix
+
+    @staticmethod
+    def _calculate_el_matrix_parameters(
+        sigma_matrix: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Inverts _calculate_sigma_matrix by finding the lower triangular L such that:
+            sigma_matrix = L.T @ L
+        This is the Cholesky decomposition of sigma_matrix with its rows and columns reversed.
+        Args:
+            sigma_matrix: a positive definite matrix of shape (m, m)
+
+        Returns:
+            el_matrix_lower_triangle
+            el_matrix_log_diagonal
+
+        """
+        el_matrix = jnp.linalg.cholesky(sigma_matrix[::-1, ::-1])[::-1, ::-1].T
+        return jnp.tril(el_matrix, k=-1), jnp.log(jnp.diag(el_matrix))
+
     def _calculate_gram(
         self,
         parameters: Union[Dict, FrozenDict, CholeskySVGPKernelParameters],
@@ -130,11 +168,7 @@ class CholeskySVGPKernel(SVGPBaseKernel):
             x1=x1,
             x2=x2,
         )
-        el_matrix_lower_triangle = jnp.tril(parameters.el_matrix_lower_triangle, k=-1)
-        el_matrix = el_matrix_lower_triangle + jnp.diag(
-            jnp.exp(parameters.el_matrix_log_diagonal),
-        )
-        sigma_matrix = el_matrix.T @ el_matrix
+        sigma_matrix = self._calculate_sigma_matrix(parameters=parameters)
         return (
             regulariser_gram_x1_x2
             - (
@@ -1,14 +1,13 @@
 from typing import Callable, Dict, Literal, Tuple, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax.scipy.linalg import cho_solve
 
 from src.kernels.approximate.svgp.base import SVGPBaseKernel, SVGPBaseKernelParameters
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType
+from src.utils.validation import validate_arguments
 
 
 class DiagonalSVGPKernelParameters(SVGPBaseKernelParameters):
@@ -48,7 +47,7 @@ class DiagonalSVGPKernel(SVGPBaseKernel):
             is_diagonal_regularisation_absolute_scale=is_diagonal_regularisation_absolute_scale,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict] = None
     ) -> DiagonalSVGPKernelParameters:
@@ -87,6 +86,12 @@ class DiagonalSVGPKernel(SVGPBaseKernel):
             )
         )
 
+    def _calculate_sigma_matrix(
+        self,
+        parameters: DiagonalSVGPKernelParameters,
+    ) -> jnp.ndarray:
+        return jnp.diag(jnp.exp(parameters.log_el_matrix_diagonal))
+
     def _calculate_gram(
         self,
         parameters: Union[Dict, FrozenDict, DiagonalSVGPKernelParameters],
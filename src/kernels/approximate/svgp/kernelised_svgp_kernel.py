@@ -1,13 +1,12 @@
 from typing import Callable, Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax.scipy.linalg import cho_solve
 
 from src.kernels.approximate.svgp.base import SVGPBaseKernel, SVGPBaseKernelParameters
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.validation import validate_arguments
 
 
 class KernelisedSVGPKernelParameters(SVGPBaseKernelParameters):
@@ -49,7 +48,7 @@ class KernelisedSVGPKernel(SVGPBaseKernel):
             is_diagonal_regularisation_absolute_scale=is_diagonal_regularisation_absolute_scale,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> KernelisedSVGPKernelParameters:
@@ -1,14 +1,13 @@
 from typing import Callable, Dict, Literal, Tuple, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax.scipy.linalg import cho_solve
 
 from src.kernels.approximate.svgp.base import SVGPBaseKernel, SVGPBaseKernelParameters
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType
+from src.utils.validation import validate_arguments
 
 
 class LogSVGPKernelParameters(SVGPBaseKernelParameters):
@@ -44,7 +43,7 @@ class LogSVGPKernel(SVGPBaseKernel):
             is_diagonal_regularisation_absolute_scale=is_diagonal_regularisation_absolute_scale,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict] = None
     ) -> LogSVGPKernelParameters:
@@ -79,6 +78,15 @@ class LogSVGPKernel(SVGPBaseKernel):
             )
         )
 
+    def _calculate_sigma_matrix(
+        self,
+        parameters: LogSVGPKernelParameters,
+    ) -> jnp.ndarray:
+        el_matrix = (
+            jnp.exp(parameters.log_el_matrix) @ jnp.exp(parameters.log_el_matrix).T
+        )
+        return el_matrix.T @ el_matrix
+
     def _calculate_gram(
         self,
         parameters: Union[Dict, FrozenDict, LogSVGPKernelParameters],
@@ -105,10 +113,7 @@ class LogSVGPKernel(SVGPBaseKernel):
             x1=x1,
             x2=x2,
         )
-        el_matrix = (
-            jnp.exp(parameters.log_el_matrix) @ jnp.exp(parameters.log_el_matrix).T
-        )
-        sigma_matrix = el_matrix.T @ el_matrix
+        sigma_matrix = self._calculate_sigma_matrix(parameters=parameters)
         return (
             regulariser_gram_x1_x2
             - (
@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Tuple
+from typing import Callable, Tuple, Union
 
 import jax
 import jax.numpy as jnp
-import pydantic
 
-from src.module import PYDANTIC_VALIDATION_CONFIG, Module, ModuleParameters
+from src.module import Module, ModuleParameters
 from src.utils.checks import check_matching_dimensions, check_maximum_dimension
+from src.utils.jit import jit_hoisting_constants
+from src.utils.linear_operators import (
+    BlockDiagonalLinearOperator,
+    DenseLinearOperator,
+    LinearOperator,
+    ScaledIdentityLinearOperator,
+)
+from src.utils.validation import validate_arguments
 
 
 class KernelBaseParameters(ModuleParameters, ABC):
@@ -35,14 +42,14 @@ class KernelBase(Module, ABC):
             preprocess_function: a function to preprocess the inputs of the kernel function
         """
         self.number_output_dimensions = number_output_dimensions
-        self._jit_compiled_calculate_gram = jax.jit(
+        self._jit_compiled_calculate_gram = jit_hoisting_constants(
             lambda parameters, x1, x2: self._calculate_gram(
                 parameters=parameters, x1=x1, x2=x2
             )
         )
         super().__init__(preprocess_function=preprocess_function)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def preprocess_inputs(
         self, x: jnp.ndarray, y: jnp.ndarray = None
     ) -> Tuple[jnp.ndarray, jnp.ndarray]:
@@ -63,7 +70,7 @@ class KernelBase(Module, ABC):
         )
 
     @staticmethod
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def check_inputs(x: jnp.ndarray, y: jnp.ndarray) -> None:
         """
         Checks the inputs of a kernel function.
@@ -101,7 +108,7 @@ class KernelBase(Module, ABC):
         """
         raise NotImplementedError
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_gram(
         self,
         parameters: KernelBaseParameters,
@@ -128,7 +135,7 @@ class KernelBase(Module, ABC):
         self.check_inputs(x1, x2)
         Module.check_parameters(parameters, self.Parameters)
         if full_covariance:
-            return self._jit_compiled_calculate_gram(parameters.dict(), x1, x2)
+            return self._jit_compiled_calculate_gram(parameters, x1, x2)
         else:
             assert (
                 x1.shape[0] == x2.shape[0]
@@ -136,7 +143,7 @@ class KernelBase(Module, ABC):
             return (
                 jax.vmap(
                     lambda x1_, x2_: self._jit_compiled_calculate_gram(
-                        parameters.dict(),
+                        parameters,
                         x1_,
                         x2_,
                     )
@@ -145,3 +152,172 @@ class KernelBase(Module, ABC):
                 .squeeze(axis=-1)
                 .T
             )
+
+    def _calculate_gram_operator(
+        self,
+        parameters: KernelBaseParameters,
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the prior gram matrix of the kernel on a set of points as a linear operator.
+        Kernels with structured gram matrices override this to avoid densifying them.
+            - k is the number of output dimensions
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: a dense operator of shape (m, m), or a block diagonal operator of k dense blocks
+                 of shape (m, m) if the kernel has multiple output dimensions
+
+        """
+        number_of_points = x.shape[0]
+        gram = self._jit_compiled_calculate_gram(parameters, x, x).reshape(
+            self.number_output_dimensions, number_of_points, number_of_points
+        )
+        if self.number_output_dimensions == 1:
+            return DenseLinearOperator(gram[0])
+        return BlockDiagonalLinearOperator(
+            [DenseLinearOperator(gram_) for gram_ in gram]
+        )
+
+    @validate_arguments
+    def calculate_gram_operator(
+        self,
+        parameters: KernelBaseParameters,
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the prior gram matrix of the kernel on a set of points as a linear operator,
+        keeping the structure of the gram matrix such that it can be solved without densifying it.
+        For multiple independent output dimensions, the operator is block diagonal with a block for each output.
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: the kernel gram operator
+        """
+        x, _ = self.preprocess_inputs(x)
+        self.check_inputs(x, x)
+        Module.check_parameters(parameters, self.Parameters)
+        return self._calculate_gram_operator(parameters=parameters, x=x)
+
+    def construct_observation_noise_operator(
+        self, log_observation_noise: Union[jnp.ndarray, float], number_of_points: int
+    ) -> LinearOperator:
+        """
+        Constructs the observation noise matrix of the outputs of the kernel as a linear operator without allocating it.
+        Args:
+            log_observation_noise: the log of the observation noise
+            number_of_points: the number of points for which the observation noise matrix is constructed
+
+        Returns: a scaled identity operator of shape (n, n) if there is one output dimension, otherwise
+                 a block diagonal operator of k scaled identities of shape (n, n), where k is the number of
+                 output dimensions and n is the number of points
+
+        """
+        observation_noise = jnp.broadcast_to(
+            jnp.atleast_1d(jnp.exp(log_observation_noise)),
+            (self.number_output_dimensions,),
+        )
+        if self.number_output_dimensions == 1:
+            return ScaledIdentityLinearOperator(observation_noise[0], number_of_points)
+        return BlockDiagonalLinearOperator(
+            [
+                ScaledIdentityLinearOperator(observation_noise_, number_of_points)
+                for observation_noise_ in observation_noise
+            ]
+        )
+
+    @property
+    def has_structured_posterior(self) -> bool:
+        """
+        Whether exact GPs with the kernel are conditioned with the structured solve of the kernel,
+        rather than Cholesky factorisations of the dense gram matrix of each output.
+        Kernels with structured gram operators override this and _calculate_structured_posterior.
+        """
+        return False
+
+    def _calculate_structured_posterior(
+        self,
+        parameters: KernelBaseParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        log_observation_noise: Union[jnp.ndarray, float],
+        full_covariance: bool,
+        linear_algebra_dtype: str,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the posterior of a zero mean Gaussian process with the kernel using the structure of the kernel.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+            log_observation_noise: the log of the observation noise
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
+            linear_algebra_dtype: the dtype the gram matrices are solved in
+
+        Returns: the mean (k, m) and covariance (k, m, m) of the posterior distribution if full_covariance is True,
+                 otherwise the mean (k, m) and covariance diagonal (k, m)
+
+        """
+        raise NotImplementedError
+
+    @validate_arguments
+    def calculate_structured_posterior(
+        self,
+        parameters: KernelBaseParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        log_observation_noise: Union[jnp.ndarray, float],
+        full_covariance: bool,
+        linear_algebra_dtype: str,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the posterior of a zero mean Gaussian process with the kernel using the structure of the kernel,
+        which is only available if has_structured_posterior is True. The gram matrices are computed in the dtype
+        of the parameters and inputs, and solved in the linear algebra dtype.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+            log_observation_noise: the log of the observation noise
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
+            linear_algebra_dtype: the dtype the gram matrices are solved in
+
+        Returns: the mean (k, m) and covariance (k, m, m) of the posterior distribution if full_covariance is True,
+                 otherwise the mean (k, m) and covariance diagonal (k, m)
+
+        """
+        assert (
+            self.has_structured_posterior
+        ), f"{type(self).__name__} has no structured posterior"
+        Module.check_parameters(parameters, self.Parameters)
+        return self._calculate_structured_posterior(
+            parameters=parameters,
+            x_train=x_train,
+            y_train=y_train,
+            x=x,
+            log_observation_noise=log_observation_noise,
+            full_covariance=full_covariance,
+            linear_algebra_dtype=linear_algebra_dtype,
+        )
@@ -0,0 +1,291 @@
+from typing import Dict, Literal, Tuple, Union
+
+import jax.numpy as jnp
+from flax.core.frozen_dict import FrozenDict
+
+from src.kernels.base import KernelBase, KernelBaseParameters
+from src.utils.custom_types import JaxArrayType
+from src.utils.linear_operators import KroneckerLinearOperator, LinearOperator
+from src.utils.precision import cast_floating_point
+from src.utils.validation import validate_arguments
+
+
+class CoregionalisationKernelParameters(KernelBaseParameters):
+    """
+    The parameters of a coregionalisation kernel, the parameters of the shared kernel and
+    the coregionalisation matrix B = W @ W.T + diag(exp(log_coregionalisation_diagonal)) where
+    W is the coregionalisation factor of shape (k, r).
+    """
+
+    kernel: KernelBaseParameters
+    coregionalisation_factor: JaxArrayType[Literal["float64"]]
+    log_coregionalisation_diagonal: JaxArrayType[Literal["float64"]]
+
+
+class CoregionalisationKernel(KernelBase):
+    """
+    A multi-output kernel from the linear model of coregionalisation with a single shared kernel,
+    also known as the intrinsic coregionalisation model:
+        cov(f_i(x1), f_j(x2)) = B_ij * r(x1, x2)
+    such that the gram matrix of the stacked outputs is the Kronecker product B ⊗ r(x1, x2).
+    The gram matrix of each output is B_ii * r(x1, x2), which is returned by calculate_gram for consistency
+    with other multi-output kernels. The gram operator is the Kronecker product, which the structured
+    posterior solves to condition the outputs jointly with eigendecompositions of B and r(x, x).
+    """
+
+    Parameters = CoregionalisationKernelParameters
+
+    def __init__(
+        self,
+        kernel: KernelBase,
+        number_output_dimensions: int,
+    ):
+        """
+        Construct a coregionalisation kernel.
+
+        Args:
+            kernel: the kernel r shared by the outputs
+            number_output_dimensions: the number of output dimensions k
+        """
+        assert kernel.number_output_dimensions == 1
+        self.kernel = kernel
+        super().__init__(
+            number_output_dimensions=number_output_dimensions,
+            preprocess_function=None,
+        )
+
+    @validate_arguments
+    def generate_parameters(
+        self, parameters: Union[FrozenDict, Dict]
+    ) -> CoregionalisationKernelParameters:
+        return CoregionalisationKernel.Parameters(
+            kernel=self.kernel.generate_parameters(parameters["kernel"]),
+            coregionalisation_factor=parameters["coregionalisation_factor"],
+            log_coregionalisation_diagonal=parameters["log_coregionalisation_diagonal"],
+        )
+
+    def _calculate_coregionalisation_matrix(
+        self,
+        parameters: CoregionalisationKernelParameters,
+    ) -> jnp.ndarray:
+        coregionalisation_factor = jnp.atleast_2d(
+            parameters.coregionalisation_factor
+        ).reshape(self.number_output_dimensions, -1)
+        return coregionalisation_factor @ coregionalisation_factor.T + jnp.diag(
+            jnp.exp(
+                jnp.broadcast_to(
+                    parameters.log_coregionalisation_diagonal,
+                    (self.number_output_dimensions,),
+                )
+            )
+        )
+
+    @validate_arguments
+    def calculate_coregionalisation_matrix(
+        self,
+        parameters: Union[Dict, FrozenDict, CoregionalisationKernelParameters],
+    ) -> jnp.ndarray:
+        """
+        Computes the coregionalisation matrix, the covariance between the outputs.
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+
+        Returns: the coregionalisation matrix of shape (k, k)
+
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        return self._calculate_coregionalisation_matrix(parameters=parameters)
+
+    def _calculate_gram(
+        self,
+        parameters: Union[Dict, FrozenDict, CoregionalisationKernelParameters],
+        x1: jnp.ndarray,
+        x2: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Computes the prior gram matrix of each output.
+            - k is the number of output dimensions
+            - m1 is the number of points in x1
+            - m2 is the number of points in x2
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x1: design matrix of shape (m1, d)
+            x2: design matrix of shape (m2, d)
+
+        Returns: the stacked gram matrices of the outputs of shape (k, m_1, m_2)
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        gram = self.kernel.calculate_gram(
+            parameters=parameters.kernel,
+            x1=x1,
+            x2=x2,
+        )
+        return jnp.multiply(
+            jnp.diag(self._calculate_coregionalisation_matrix(parameters))[
+                :, None, None
+            ],
+            gram[None, ...],
+        )
+
+    def _calculate_gram_operator(
+        self,
+        parameters: Union[Dict, FrozenDict, CoregionalisationKernelParameters],
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the prior gram matrix of the stacked outputs as the Kronecker product of the
+        coregionalisation matrix and the gram matrix of the shared kernel.
+            - k is the number of output dimensions
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: a Kronecker operator of shape (km, km)
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        return KroneckerLinearOperator(
+            left=self._calculate_coregionalisation_matrix(parameters),
+            right=self.kernel.calculate_gram(
+                parameters=parameters.kernel,
+                x1=x,
+                x2=x,
+            ),
+        )
+
+    @property
+    def has_structured_posterior(self) -> bool:
+        return True
+
+    def _calculate_structured_posterior(
+        self,
+        parameters: CoregionalisationKernelParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        log_observation_noise: Union[jnp.ndarray, float],
+        full_covariance: bool,
+        linear_algebra_dtype: str,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the posterior of a zero mean Gaussian process, conditioning the outputs jointly on the training data.
+        The prior covariance of the stacked training outputs is B ⊗ r(x_train, x_train) + diag(s) ⊗ I, which is
+        solved with the eigendecompositions of the coregionalisation matrix B and r(x_train, x_train).
+        The cross covariance B ⊗ r(x_train, x) is never formed, r(x_train, x) is rotated by the eigenvectors
+        of r(x_train, x_train) once and the outputs are mixed with the whitened eigenvectors of B,
+        such that the posterior costs O(n^3 + k^3 + n^2 m + knm), and O(knm^2) more for the full covariance,
+        instead of O(k^3 n^3).
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+            log_observation_noise: the log of the observation noise
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
+            linear_algebra_dtype: the dtype the gram matrices are solved in
+
+        Returns: the mean (k, m) and covariance (k, m, m) of the posterior distribution of each output
+                 if full_covariance is True, otherwise the mean (k, m) and covariance diagonal (k, m)
+
+        """
+        number_of_train_points = x_train.shape[0]
+
+        # (k, k), (n, n), (n, m), (m, m) or (m,)
+        (
+            coregionalisation_matrix,
+            gram_train,
+            gram_train_x,
+            gram_x,
+        ) = cast_floating_point(
+            (
+                self._calculate_coregionalisation_matrix(parameters),
+                self.kernel.calculate_gram(
+                    parameters=parameters.kernel, x1=x_train, x2=x_train
+                ),
+                self.kernel.calculate_gram(
+                    parameters=parameters.kernel, x1=x_train, x2=x
+                ),
+                self.kernel.calculate_gram(
+                    parameters=parameters.kernel,
+                    x1=x,
+                    x2=x,
+                    full_covariance=full_covariance,
+                ),
+            ),
+            linear_algebra_dtype,
+        )
+
+        # (kn, kn)
+        prior_covariance = KroneckerLinearOperator(
+            left=coregionalisation_matrix,
+            right=gram_train,
+        ) + self.construct_observation_noise_operator(
+            log_observation_noise=log_observation_noise,
+            number_of_points=number_of_train_points,
+        )
+
+        # (k,), (k, k), (n, n), (k, n) such that the prior covariance is
+        # S (Q_l ⊗ Q_r) diag(eigenvalues) (Q_l ⊗ Q_r)^T S with S = diag(noise_scale) ⊗ I
+        (
+            noise_scale,
+            left_eigenvectors,
+            right_eigenvectors,
+            eigenvalues,
+        ) = prior_covariance._calculate_eigendecomposition()
+
+        # (k, k), the coregionalisation matrix whitened by the noise and rotated by Q_l
+        coregionalisation_factor = left_eigenvectors.T @ (
+            coregionalisation_matrix / noise_scale[:, None]
+        )
+
+        # (n, m), the cross covariance of the shared kernel rotated by Q_r
+        gram_train_x = right_eigenvectors.T @ gram_train_x
+
+        # (k, n), the whitened training responses rotated by Q_l ⊗ Q_r and solved
+        rotated_y_train = (
+            jnp.einsum(
+                "ja,pb,jp->ab",
+                left_eigenvectors,
+                right_eigenvectors,
+                jnp.atleast_2d(y_train.T) / noise_scale[:, None],
+            )
+            / eigenvalues
+        )
+
+        # (k, m)
+        mean = jnp.einsum(
+            "ai,bm,ab->im", coregionalisation_factor, gram_train_x, rotated_y_train
+        )
+
+        # (k, n), the weight of each rotated training point in the variance reduction of each output
+        weights = jnp.einsum(
+            "ai,ab->ib", jnp.square(coregionalisation_factor), 1 / eigenvalues
+        )
+        if full_covariance:
+            # (k, m, m)
+            covariance = jnp.multiply(
+                jnp.diag(coregionalisation_matrix)[:, None, None], gram_x[None, ...]
+            ) - jnp.einsum("ib,bm,bq->imq", weights, gram_train_x, gram_train_x)
+        else:
+            # (k, m)
+            covariance = jnp.multiply(
+                jnp.diag(coregionalisation_matrix)[:, None], gram_x[None, ...]
+            ) - jnp.einsum("ib,bm,bm->im", weights, gram_train_x, gram_train_x)
+        return mean, covariance
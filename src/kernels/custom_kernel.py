@@ -2,11 +2,10 @@ from typing import Any, Callable, Dict, Union
 
 import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.validation import validate_arguments
 
 
 class CustomKernelParameters(KernelBaseParameters):
@@ -39,7 +38,7 @@ class CustomKernel(KernelBase):
         self.kernel_function = kernel_function
         KernelBase.__init__(self, preprocess_function=preprocess_function)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> CustomKernelParameters:
@@ -2,7 +2,6 @@ from typing import Any, Callable, Dict, Union
 
 import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.base import KernelBase, KernelBaseParameters
@@ -10,7 +9,7 @@ from src.kernels.non_stationary.base import (
     NonStationaryKernelBase,
     NonStationaryKernelBaseParameters,
 )
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.validation import validate_arguments
 
 
 class CustomMappingKernelParameters(KernelBaseParameters):
@@ -40,7 +39,7 @@ class CustomMappingKernel(KernelBase):
         self.feature_mapping = feature_mapping
         KernelBase.__init__(self, preprocess_function=preprocess_function)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> CustomMappingKernelParameters:
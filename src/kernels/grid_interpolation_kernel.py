@@ -0,0 +1,426 @@
+from typing import Dict, List, Tuple, Union
+
+import jax.numpy as jnp
+import numpy as np
+from flax.core.frozen_dict import FrozenDict
+
+from src.kernels.base import KernelBase, KernelBaseParameters
+from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.utils.linear_operators import GridInterpolationLinearOperator, LinearOperator
+from src.utils.precision import cast_floating_point
+from src.utils.validation import validate_arguments
+
+
+class GridInterpolationKernelParameters(KernelBaseParameters):
+    """
+    The parameters of a grid interpolation kernel, the parameters of the ARD kernel it interpolates.
+    """
+
+    kernel: ARDKernelParameters
+
+
+class GridInterpolationKernel(KernelBase):
+    """
+    An ARD kernel interpolated from a regular grid, as in structured kernel interpolation (KISS-GP):
+        r(x1, x2) ≈ w(x1) @ r(U, U) @ w(x2).T
+    where U is the grid and w are cubic convolution interpolation weights of the 4^d grid points around a point.
+    The ARD kernel is a product over the dimensions of stationary kernels, so its gram matrix on the grid is a
+    Kronecker product of Toeplitz matrices, which are multiplied with the FFT. The gram operator of n points then
+    has products in O(n4^d + g log g), and is solved with conjugate gradients by exact GPs.
+    This is intended for low dimensional inputs, such as one or two dimensions.
+        - g is the number of grid points
+        - d is the number of dimensions
+    """
+
+    Parameters = GridInterpolationKernelParameters
+
+    def __init__(
+        self,
+        kernel: ARDKernel,
+        grid_bounds: Union[List[Tuple[float, float]], jnp.ndarray],
+        grid_size: Union[int, List[int]],
+        tolerance: float = 1e-8,
+        maximum_number_of_iterations: int = 1000,
+    ):
+        """
+        Construct a grid interpolation kernel.
+
+        Args:
+            kernel: the ARD kernel to interpolate
+            grid_bounds: the lower and upper bound of the grid in each dimension, of shape (d, 2).
+                         Points outside the bounds are interpolated from the closest point within the bounds.
+            grid_size: the number of grid points within the bounds in each dimension, the grid is extended by
+                       one point below and two points above the bounds for the cubic interpolation
+            tolerance: the relative tolerance of the conjugate gradient solves
+            maximum_number_of_iterations: the maximum number of conjugate gradient iterations
+        """
+        assert isinstance(kernel, ARDKernel)
+        self.kernel = kernel
+        self.grid_bounds = np.asarray(grid_bounds, dtype=float).reshape(
+            kernel.number_of_dimensions, 2
+        )
+        self.grid_size = np.broadcast_to(
+            np.asarray(grid_size, dtype=int), (kernel.number_of_dimensions,)
+        )
+        assert np.all(self.grid_size >= 2)
+        self.grid_spacing = (self.grid_bounds[:, 1] - self.grid_bounds[:, 0]) / (
+            self.grid_size - 1
+        )
+        self.tolerance = tolerance
+        self.maximum_number_of_iterations = maximum_number_of_iterations
+        super().__init__(
+            number_output_dimensions=1,
+            preprocess_function=None,
+        )
+
+    @validate_arguments
+    def generate_parameters(
+        self, parameters: Union[FrozenDict, Dict]
+    ) -> GridInterpolationKernelParameters:
+        return GridInterpolationKernel.Parameters(
+            kernel=self.kernel.generate_parameters(parameters["kernel"]),
+        )
+
+    @staticmethod
+    def _calculate_cubic_interpolation_weights(
+        distance: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Computes the cubic convolution interpolation weights (Keys, 1981) of the 4 grid points around a point.
+        Args:
+            distance: the distance from the second of the 4 grid points in units of the grid spacing, in [0, 1]
+
+        Returns: the weights of the 4 grid points, of shape (..., 4)
+
+        """
+        return jnp.stack(
+            [
+                ((-0.5 * distance + 1) * distance - 0.5) * distance,
+                (1.5 * distance - 2.5) * distance**2 + 1,
+                ((-1.5 * distance + 2) * distance + 0.5) * distance,
+                (0.5 * distance - 0.5) * distance**2,
+            ],
+            axis=-1,
+        )
+
+    def _calculate_interpolation(
+        self,
+        x: jnp.ndarray,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the interpolation of points from the grid.
+            - n is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            x: design matrix of shape (n, d)
+
+        Returns: the grid index of the first of the 4 interpolating grid points in each dimension of shape (n, d)
+                 and the interpolation weights of shape (n, d, 4)
+
+        """
+        # the position of each point on the grid within the bounds, in units of the grid spacing
+        position = jnp.clip(
+            (x - self.grid_bounds[:, 0]) / self.grid_spacing,
+            0,
+            self.grid_size - 1,
+        )
+        # with the grid extended by one point below the bounds, the first interpolating grid point
+        # of a point between the grid points i and i + 1 within the bounds has the index i
+        interpolation_indices = jnp.clip(
+            jnp.floor(position).astype(int), 0, self.grid_size - 2
+        )
+        return interpolation_indices, self._calculate_cubic_interpolation_weights(
+            position - interpolation_indices
+        )
+
+    def _calculate_toeplitz_columns(
+        self,
+        parameters: GridInterpolationKernelParameters,
+    ) -> List[jnp.ndarray]:
+        """
+        Computes the first column of the Toeplitz gram matrix of the grid in each dimension.
+        The ARD kernel factorises over the dimensions, so the gram matrix of the grid is their Kronecker product.
+        The scaling of the kernel is kept in the first dimension.
+
+        Args:
+            parameters: parameters of the kernel
+
+        Returns: the first columns, of shapes (g_i + 3,)
+
+        """
+        number_of_dimensions = self.kernel.number_of_dimensions
+        toeplitz_columns = []
+        for dimension in range(number_of_dimensions):
+            # the offsets of the extended grid from its first point along the dimension
+            offsets = (
+                jnp.zeros((self.grid_size[dimension] + 3, number_of_dimensions))
+                .at[:, dimension]
+                .set(
+                    self.grid_spacing[dimension]
+                    * jnp.arange(self.grid_size[dimension] + 3)
+                )
+            )
+            column = self.kernel.calculate_gram(
+                parameters=parameters.kernel,
+                x1=jnp.zeros((1, number_of_dimensions)),
+                x2=offsets,
+            ).reshape(-1)
+            toeplitz_columns.append(column if dimension == 0 else column / column[0])
+        return toeplitz_columns
+
+    @staticmethod
+    def _calculate_interpolated_gram_of_dimension(
+        column: jnp.ndarray,
+        interpolation_indices_1: jnp.ndarray,
+        interpolation_weights_1: jnp.ndarray,
+        interpolation_indices_2: jnp.ndarray,
+        interpolation_weights_2: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Computes the interpolated gram matrix of a single dimension.
+            - m1 is the number of points in x1
+            - m2 is the number of points in x2
+            - g is the number of grid points of the dimension
+
+        Args:
+            column: the first column of the Toeplitz gram matrix of the grid of shape (g,)
+            interpolation_indices_1: the first interpolating grid point of x1 of shape (m1,)
+            interpolation_weights_1: the interpolation weights of x1 of shape (m1, 4)
+            interpolation_indices_2: the first interpolating grid point of x2 of shape (m2,)
+            interpolation_weights_2: the interpolation weights of x2 of shape (m2, 4)
+
+        Returns: the interpolated gram matrix of shape (m1, m2)
+
+        """
+        grid_indices_1 = interpolation_indices_1[:, None] + jnp.arange(4)
+        grid_indices_2 = interpolation_indices_2[:, None] + jnp.arange(4)
+        number_of_grid_points = column.shape[0]
+        if 3 * grid_indices_1.shape[0] <= number_of_grid_points:
+            # (m1, 4, m2, 4), the grid gram between all pairs of interpolating grid points,
+            # which is cheaper for few points, such as the single points of a diagonal
+            return jnp.einsum(
+                "ia,iajb,jb->ij",
+                interpolation_weights_1,
+                column[
+                    jnp.abs(
+                        grid_indices_1[:, :, None, None]
+                        - grid_indices_2[None, None, :, :]
+                    )
+                ],
+                interpolation_weights_2,
+            )
+        # (g, m2), the grid gram times the interpolation of x2, which is then interpolated at x1
+        grid_gram_2 = jnp.einsum(
+            "ujb,jb->uj",
+            column[
+                jnp.abs(
+                    jnp.arange(number_of_grid_points)[:, None, None]
+                    - grid_indices_2[None, :, :]
+                )
+            ],
+            interpolation_weights_2,
+        )
+        return jnp.einsum(
+            "ia,iaj->ij", interpolation_weights_1, grid_gram_2[grid_indices_1]
+        )
+
+    def _calculate_gram(
+        self,
+        parameters: Union[Dict, FrozenDict, GridInterpolationKernelParameters],
+        x1: jnp.ndarray,
+        x2: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Computes the interpolated gram matrix. The interpolation and the gram matrix of the grid factorise
+        over the dimensions, so the gram matrix is the product of the interpolated gram matrices of each dimension.
+            - m1 is the number of points in x1
+            - m2 is the number of points in x2
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x1: design matrix of shape (m1, d)
+            x2: design matrix of shape (m2, d)
+
+        Returns: the kernel gram matrix of shape (m_1, m_2)
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        (
+            interpolation_indices_1,
+            interpolation_weights_1,
+        ) = self._calculate_interpolation(x1)
+        (
+            interpolation_indices_2,
+            interpolation_weights_2,
+        ) = self._calculate_interpolation(x2)
+        gram = jnp.ones((x1.shape[0], x2.shape[0]))
+        for dimension, column in enumerate(
+            self._calculate_toeplitz_columns(parameters)
+        ):
+            gram = gram * self._calculate_interpolated_gram_of_dimension(
+                column=column,
+                interpolation_indices_1=interpolation_indices_1[:, dimension],
+                interpolation_weights_1=interpolation_weights_1[:, dimension, :],
+                interpolation_indices_2=interpolation_indices_2[:, dimension],
+                interpolation_weights_2=interpolation_weights_2[:, dimension, :],
+            )
+        return gram
+
+    def _calculate_gram_operator(
+        self,
+        parameters: Union[Dict, FrozenDict, GridInterpolationKernelParameters],
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the interpolated gram matrix as an operator that is multiplied through the grid with the FFT.
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: a grid interpolation operator of shape (m, m)
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        interpolation_indices, interpolation_weights = self._calculate_interpolation(x)
+        return GridInterpolationLinearOperator(
+            interpolation_indices=interpolation_indices,
+            interpolation_weights=interpolation_weights,
+            toeplitz_columns=self._calculate_toeplitz_columns(parameters),
+            tolerance=self.tolerance,
+            maximum_number_of_iterations=self.maximum_number_of_iterations,
+        )
+
+    @property
+    def has_structured_posterior(self) -> bool:
+        return True
+
+    def _calculate_structured_posterior(
+        self,
+        parameters: GridInterpolationKernelParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        log_observation_noise: Union[jnp.ndarray, float],
+        full_covariance: bool,
+        linear_algebra_dtype: str,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the posterior of a zero mean Gaussian process without constructing the gram matrix of the
+        training points. The prior covariance operator is solved with conjugate gradients, which only multiply
+        by it through the grid. The cross covariance is interpolated through the grid, W_train @ K_grid @ W_x.T,
+        and the mean only needs the solve of the training responses. The covariance needs the solve of the
+        cross covariance at the fewer of the m points and the g grid points. If there are more points than grid
+        points, the posterior covariance is computed on the grid and interpolated, the diagonal from the blocks
+        of the interpolating grid points of each point, such that the number of solves does not grow with m.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - g is the number of grid points
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, 1)
+            x: design matrix of shape (m, d)
+            log_observation_noise: the log of the observation noise
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
+            linear_algebra_dtype: the dtype the gram matrices are solved in
+
+        Returns: the mean (1, m) and covariance (1, m, m) of the posterior distribution if full_covariance is True,
+                 otherwise the mean (1, m) and covariance diagonal (1, m)
+
+        """
+        number_of_train_points = x_train.shape[0]
+        number_of_test_points = x.shape[0]
+
+        # (n, n), (m, m), sharing the gram matrix of the grid
+        gram_train_operator, gram_x_operator = cast_floating_point(
+            (
+                self._calculate_gram_operator(parameters=parameters, x=x_train),
+                self._calculate_gram_operator(parameters=parameters, x=x),
+            ),
+            linear_algebra_dtype,
+        )
+        prior_covariance = (
+            gram_train_operator
+            + self.construct_observation_noise_operator(
+                log_observation_noise=log_observation_noise,
+                number_of_points=number_of_train_points,
+            )
+        )
+        number_of_grid_points = int(np.prod(gram_train_operator.grid_shape))
+
+        # (m, m) or (m,)
+        gram_x = cast_floating_point(
+            self.calculate_gram(
+                parameters=parameters,
+                x1=x,
+                x2=x,
+                full_covariance=full_covariance,
+            ),
+            linear_algebra_dtype,
+        )
+        if number_of_test_points <= number_of_grid_points:
+            # (n, m), the cross covariance W_train @ K_grid @ W_x.T
+            cross_covariance = gram_train_operator.interpolate(
+                gram_train_operator.grid_matmul(
+                    gram_x_operator.interpolate_transpose(
+                        jnp.eye(number_of_test_points, dtype=linear_algebra_dtype)
+                    )
+                )
+            )
+        else:
+            # (n, g), the cross covariance of the grid W_train @ K_grid
+            cross_covariance = gram_train_operator.interpolate(
+                gram_train_operator.grid_matmul(
+                    jnp.eye(number_of_grid_points, dtype=linear_algebra_dtype)
+                )
+            )
+
+        # (n, 1 + m) or (n, 1 + g)
+        solution = prior_covariance.solve(
+            jnp.concatenate(
+                (jnp.atleast_2d(y_train.T).reshape(-1, 1), cross_covariance), axis=1
+            )
+        )
+
+        # (1, m), W_x @ K_grid @ W_train.T @ solution
+        mean = gram_x_operator.interpolate(
+            gram_train_operator.grid_matmul(
+                gram_train_operator.interpolate_transpose(solution[:, :1])
+            )
+        ).T
+        if number_of_test_points <= number_of_grid_points:
+            if full_covariance:
+                # (m, m)
+                covariance_reduction = cross_covariance.T @ solution[:, 1:]
+            else:
+                # (m,)
+                covariance_reduction = jnp.sum(
+                    jnp.multiply(cross_covariance, solution[:, 1:]), axis=0
+                )
+        else:
+            # (g, g), the covariance reduction on the grid
+            grid_covariance_reduction = cross_covariance.T @ solution[:, 1:]
+            if full_covariance:
+                # (m, m)
+                covariance_reduction = gram_x_operator.interpolate(
+                    gram_x_operator.interpolate(grid_covariance_reduction).T
+                )
+            else:
+                # (m,)
+                covariance_reduction = gram_x_operator.interpolate_diag(
+                    grid_covariance_reduction
+                )
+        # (1, m, m) or (1, m)
+        covariance = (
+            gram_x.reshape(covariance_reduction.shape) - covariance_reduction
+        )[None, ...]
+        return mean, covariance
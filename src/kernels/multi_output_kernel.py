@@ -1,11 +1,11 @@
 from typing import Dict, List, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.linear_operators import BlockDiagonalLinearOperator, LinearOperator
+from src.utils.validation import validate_arguments
 
 
 class MultiOutputKernelParameters(KernelBaseParameters):
@@ -23,7 +23,7 @@ class MultiOutputKernel(KernelBase):
             preprocess_function=None,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> MultiOutputKernelParameters:
@@ -68,3 +68,34 @@ class MultiOutputKernel(KernelBase):
                 for kernel_, parameters_ in zip(self.kernels, parameters.kernels)
             ]
         )
+
+    def _calculate_gram_operator(
+        self,
+        parameters: Union[Dict, FrozenDict, MultiOutputKernelParameters],
+        x: jnp.ndarray,
+    ) -> LinearOperator:
+        """
+        Computes the prior gram matrix of multiple kernels as a block diagonal operator
+        of the gram operators of the kernels, keeping the structure of each block.
+            - k is the number of kernels
+            - m is the number of points in x
+            - d is the number of dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x: design matrix of shape (m, d)
+
+        Returns: a block diagonal operator of k blocks of shape (m, m)
+        """
+        # convert to Pydantic model if necessary
+        if not isinstance(parameters, self.Parameters):
+            parameters = self.generate_parameters(parameters)
+        return BlockDiagonalLinearOperator(
+            [
+                kernel_.calculate_gram_operator(
+                    parameters=parameters_,
+                    x=x,
+                )
+                for kernel_, parameters_ in zip(self.kernels, parameters.kernels)
+            ]
+        )
@@ -1,15 +1,14 @@
 from typing import Callable, Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.non_stationary.base import (
     NonStationaryKernelBase,
     NonStationaryKernelBaseParameters,
 )
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class PolynomialKernelParameters(NonStationaryKernelBaseParameters):
@@ -50,7 +49,7 @@ class PolynomialKernel(NonStationaryKernelBase):
             self.polynomial_degree,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> PolynomialKernelParameters:
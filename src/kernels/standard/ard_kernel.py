@@ -1,12 +1,11 @@
 from typing import Callable, Dict, Literal, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.standard.base import StandardKernelBase, StandardKernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType, JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class ARDKernelParameters(StandardKernelBaseParameters):
@@ -25,7 +24,7 @@ class ARDKernel(StandardKernelBase):
         self.number_of_dimensions = number_of_dimensions
         super().__init__(preprocess_function=preprocess_function)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> ARDKernelParameters:
@@ -63,4 +62,4 @@ class ARDKernel(StandardKernelBase):
                 * jnp.atleast_1d(jnp.exp(parameters.log_lengthscales))
                 @ jnp.square(x1 - x2).T
             )
-        ).astype(jnp.float64)
+        ).astype(jnp.result_type(float, x1, x2))
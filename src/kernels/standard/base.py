@@ -2,12 +2,12 @@ from abc import ABC, abstractmethod
 from typing import Callable, Dict, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax import vmap
 
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG, Module
+from src.module import Module
+from src.utils.validation import validate_arguments
 
 
 class StandardKernelBaseParameters(KernelBaseParameters, ABC):
@@ -44,7 +44,7 @@ class StandardKernelBase(KernelBase, ABC):
         """
         raise NotImplementedError
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_kernel(
         self,
         parameters: StandardKernelBaseParameters,
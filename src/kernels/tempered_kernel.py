@@ -1,12 +1,11 @@
-from typing import Callable, Dict, Literal, Union
+from typing import Callable, Dict, Literal, Tuple, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.kernels.base import KernelBase, KernelBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType, JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class TemperedKernelParameters(KernelBaseParameters):
@@ -38,7 +37,7 @@ class TemperedKernel(KernelBase):
             number_output_dimensions=number_output_dimensions,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> TemperedKernelParameters:
@@ -79,3 +78,67 @@ class TemperedKernel(KernelBase):
             jnp.atleast_3d(gram),
         )
         return tempered_gram.reshape(gram.shape)
+
+    @property
+    def has_structured_posterior(self) -> bool:
+        return self.base_kernel.has_structured_posterior
+
+    def _calculate_structured_posterior(
+        self,
+        parameters: TemperedKernelParameters,
+        x_train: jnp.ndarray,
+        y_train: jnp.ndarray,
+        x: jnp.ndarray,
+        log_observation_noise: Union[jnp.ndarray, float],
+        full_covariance: bool,
+        linear_algebra_dtype: str,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """
+        Computes the posterior with the structured solve of the base kernel. Tempering scales the outputs
+        of the base kernel by the square roots of the tempering factors, so the posterior is that of the base
+        kernel with the responses scaled by their inverse and the observation noise divided by the factors,
+        with the mean and covariance scaled back.
+            - n is the number of training pairs in x_train and y_train
+            - m is the number of points in x
+            - d is the number of input dimensions
+            - k is the number of output dimensions
+
+        Args:
+            parameters: parameters of the kernel
+            x_train: training design matrix of shape (n, d)
+            y_train: training response matrix of shape (n, k)
+            x: design matrix of shape (m, d)
+            log_observation_noise: the log of the observation noise
+            full_covariance: whether to compute the full covariance matrix or just the diagonal
+            linear_algebra_dtype: the dtype the gram matrices are solved in
+
+        Returns: the mean (k, m) and covariance (k, m, m) of the posterior distribution if full_covariance is True,
+                 otherwise the mean (k, m) and covariance diagonal (k, m)
+
+        """
+        # (k,)
+        log_tempering_factor = jnp.broadcast_to(
+            jnp.atleast_1d(parameters.log_tempering_factor),
+            (self.number_output_dimensions,),
+        )
+        mean, covariance = self.base_kernel.calculate_structured_posterior(
+            parameters=self.base_kernel_parameters,
+            x_train=x_train,
+            y_train=(
+                jnp.atleast_2d(y_train.T)
+                * jnp.exp(-0.5 * log_tempering_factor)[:, None]
+            ).T,
+            x=x,
+            log_observation_noise=log_observation_noise - log_tempering_factor,
+            full_covariance=full_covariance,
+            linear_algebra_dtype=linear_algebra_dtype,
+        )
+        return (
+            jnp.multiply(jnp.exp(0.5 * log_tempering_factor)[:, None], mean),
+            jnp.multiply(
+                jnp.exp(log_tempering_factor).reshape(
+                    (-1,) + (1,) * (covariance.ndim - 1)
+                ),
+                covariance,
+            ),
+        )
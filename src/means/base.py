@@ -1,11 +1,11 @@
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Dict, Union
 
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax import numpy as jnp
 
-from src.module import PYDANTIC_VALIDATION_CONFIG, Module, ModuleParameters
+from src.module import Module, ModuleParameters
+from src.utils.validation import validate_arguments
 
 
 class MeanBaseParameters(ModuleParameters, ABC):
@@ -31,7 +31,7 @@ class MeanBase(Module, ABC):
         self.number_output_dimensions = number_output_dimensions
         super().__init__(preprocess_function=preprocess_function)
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     @abstractmethod
     def generate_parameters(
         self, parameters: Union[Dict, FrozenDict]
@@ -75,7 +75,7 @@ class MeanBase(Module, ABC):
         """
         return jnp.atleast_2d(self.preprocess_function(x))
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def predict(self, parameters: MeanBaseParameters, x: jnp.ndarray) -> jnp.ndarray:
         """
         Computes the mean function at the given points.
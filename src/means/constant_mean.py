@@ -1,12 +1,11 @@
 from typing import Any, Callable, Dict, Literal, Union
 
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax import numpy as jnp
 
 from src.means.base import MeanBase, MeanBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType, JaxFloatType, PRNGKey
+from src.utils.validation import validate_arguments
 
 
 class ConstantMeanParameters(MeanBaseParameters):
@@ -30,7 +29,7 @@ class ConstantMean(MeanBase):
             preprocess_function=preprocess_function,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> ConstantMeanParameters:
@@ -1,11 +1,10 @@
 from typing import Any, Callable, Dict, Union
 
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax import numpy as jnp
 
 from src.means.base import MeanBase, MeanBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.validation import validate_arguments
 
 
 class CustomMeanParameters(MeanBaseParameters):
@@ -31,7 +30,7 @@ class CustomMean(MeanBase):
             preprocess_function=preprocess_function,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> CustomMeanParameters:
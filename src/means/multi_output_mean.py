@@ -1,11 +1,10 @@
 from typing import Dict, List, Union
 
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.means.base import MeanBase, MeanBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.utils.validation import validate_arguments
 
 
 class MultiOutputMeanParameters(MeanBaseParameters):
@@ -27,7 +26,7 @@ class MultiOutputMean(MeanBase):
             preprocess_function=None,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> MultiOutputMeanParameters:
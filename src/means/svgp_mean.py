@@ -1,13 +1,12 @@
 from typing import Callable, Dict, Literal, Union
 
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 from jax import numpy as jnp
 
 from src.kernels.base import KernelBase, KernelBaseParameters
 from src.means.base import MeanBase, MeanBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.utils.custom_types import JaxArrayType
+from src.utils.validation import validate_arguments
 
 
 class SVGPMeanParameters(MeanBaseParameters):
@@ -48,7 +47,7 @@ class SVGPMean(MeanBase):
             preprocess_function=preprocess_function,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def generate_parameters(
         self, parameters: Union[FrozenDict, Dict]
     ) -> SVGPMeanParameters:
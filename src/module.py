@@ -1,29 +1,74 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Type, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple, Type, Union
 
+import jax
 import jax.numpy as jnp
-import orbax
-import pydantic
 from flax.core.frozen_dict import FrozenDict
-from flax.training import orbax_utils
 from pydantic import BaseModel
 
 from src.utils.custom_types import JSON_ENCODERS
+from src.utils.validation import PYDANTIC_VALIDATION_CONFIG, validate_arguments
 
-orbax_checkpointer = orbax.checkpoint.PyTreeCheckpointer()
-PYDANTIC_VALIDATION_CONFIG = dict(arbitrary_types_allowed=True)
+if TYPE_CHECKING:
+    import orbax
+
+
+@lru_cache(maxsize=None)
+def get_orbax_checkpointer() -> orbax.checkpoint.PyTreeCheckpointer:
+    """
+    Constructs the checkpointer used to save and load parameters on first use,
+    such that orbax is only imported when checkpoints are written or read.
+
+    Returns: the orbax checkpointer
+
+    """
+    import orbax.checkpoint
+
+    return orbax.checkpoint.PyTreeCheckpointer()
 
 
 class ModuleParameters(BaseModel, ABC):
     """
     A base class for parameters. All model parameter classes will inherit this ABC.
+    Parameter classes are registered as JAX pytrees, so parameters pass directly through
+    jit, grad and optax without conversion to dictionaries. Fields are flattened in the sorted
+    order of their names and keyed by them, such that the leaves and key paths of parameters
+    match those of their dictionary. Unflattening does not validate the leaves, which may be tracers.
     """
 
     class Config:
         json_encoders = JSON_ENCODERS
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        jax.tree_util.register_pytree_with_keys(
+            cls,
+            cls._flatten_with_keys,
+            cls._unflatten,
+            flatten_func=cls._flatten,
+        )
+
+    def _flatten(self) -> Tuple[List[Any], Tuple[str, ...]]:
+        field_names = tuple(sorted(self.__fields__))
+        return [getattr(self, name) for name in field_names], field_names
+
+    def _flatten_with_keys(
+        self,
+    ) -> Tuple[List[Tuple[jax.tree_util.DictKey, Any]], Tuple[str, ...]]:
+        field_names = tuple(sorted(self.__fields__))
+        return [
+            (jax.tree_util.DictKey(name), getattr(self, name)) for name in field_names
+        ], field_names
+
+    @classmethod
+    def _unflatten(
+        cls, field_names: Tuple[str, ...], children: List[Any]
+    ) -> ModuleParameters:
+        return cls.construct(**dict(zip(field_names, children)))
+
     def save(self, path: str) -> None:
         """
         Save the parameters as a checkpoint.
@@ -32,9 +77,11 @@ class ModuleParameters(BaseModel, ABC):
             path: save path
 
         """
+        from flax.training import orbax_utils
+
         ckpt = self.dict()
         save_args = orbax_utils.save_args_from_target(ckpt)
-        orbax_checkpointer.save(
+        get_orbax_checkpointer().save(
             path,
             ckpt,
             save_args=save_args,
@@ -51,7 +98,7 @@ class ModuleParameters(BaseModel, ABC):
         Returns: Module parameters with loaded parameters
 
         """
-        ckpt = orbax_checkpointer.restore(path)
+        ckpt = get_orbax_checkpointer().restore(path)
         return self.construct(**ckpt)
 
 
@@ -93,7 +140,7 @@ class Module(ABC):
             parameters, parameter_type
         ), f"Parameters is type: {type(parameters)=}, needs to be {parameter_type=}"
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     @abstractmethod
     def generate_parameters(
         self, parameters: Union[Dict, FrozenDict]
@@ -1,15 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Union
 
-import jax
 import jax.numpy as jnp
-import pydantic
 from flax.core.frozen_dict import FrozenDict
 
 from src.distributions import Gaussian
-from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.gps.base.base import GPBase, GPBaseParameters, GPPrediction
 from src.regularisations.schemas import RegularisationMode
+from src.utils.jit import jit_hoisting_constants
+from src.utils.validation import validate_arguments
 
 
 class RegularisationBase(ABC):
@@ -17,6 +16,9 @@ class RegularisationBase(ABC):
     A base class for all regularisers.
     """
 
+    # whether the regularisation can be calculated from a GPPrediction shared with the empirical risk
+    supports_shared_prediction = False
+
     def __init__(
         self,
         gp: GPBase,
@@ -26,15 +28,39 @@ class RegularisationBase(ABC):
     ):
         self._gp = gp
         self._regulariser = regulariser
-        self._regulariser_parameters = regulariser_parameters
+        self._regulariser_parameters = self._generate_regulariser_parameters(
+            regulariser=regulariser,
+            regulariser_parameters=regulariser_parameters,
+        )
         self._mode = mode
-        self._jit_compiled_calculate_regularisation = jax.jit(
+        self._jit_compiled_calculate_regularisation = jit_hoisting_constants(
             lambda parameters, x: self._calculate_regularisation(
                 parameters=parameters,
                 x=x,
             )
         )
 
+    @staticmethod
+    def _generate_regulariser_parameters(
+        regulariser: GPBase,
+        regulariser_parameters: GPBaseParameters,
+    ) -> GPBaseParameters:
+        """
+        Generates the parameters of the regulariser GP from parameters of another GP with the same fields,
+        such as those of the GP to regularise.
+        Args:
+            regulariser: the regulariser GP
+            regulariser_parameters: the parameters of the regulariser GP or of another GP
+
+        Returns: the parameters of the regulariser GP
+
+        """
+        if not isinstance(regulariser_parameters, regulariser.Parameters):
+            regulariser_parameters = regulariser.generate_parameters(
+                regulariser_parameters.dict()
+            )
+        return regulariser_parameters
+
     @property
     def gp(self) -> GPBase:
         return self._gp
@@ -49,7 +75,7 @@ class RegularisationBase(ABC):
 
         """
         self._gp = gp
-        self._jit_compiled_calculate_regularisation = jax.jit(
+        self._jit_compiled_calculate_regularisation = jit_hoisting_constants(
             lambda parameters, x: self._calculate_regularisation(
                 parameters=parameters,
                 x=x,
@@ -70,7 +96,7 @@ class RegularisationBase(ABC):
 
         """
         self._regulariser = regulariser
-        self._jit_compiled_calculate_regularisation = jax.jit(
+        self._jit_compiled_calculate_regularisation = jit_hoisting_constants(
             lambda parameters, x: self._calculate_regularisation(
                 parameters=parameters,
                 x=x,
@@ -90,8 +116,11 @@ class RegularisationBase(ABC):
             regulariser_parameters: the parameters of the regulariser GP
 
         """
-        self._regulariser_parameters = regulariser_parameters
-        self._jit_compiled_calculate_regularisation = jax.jit(
+        self._regulariser_parameters = self._generate_regulariser_parameters(
+            regulariser=self.regulariser,
+            regulariser_parameters=regulariser_parameters,
+        )
+        self._jit_compiled_calculate_regularisation = jit_hoisting_constants(
             lambda parameters, x: self._calculate_regularisation(
                 parameters=parameters,
                 x=x,
@@ -106,6 +135,23 @@ class RegularisationBase(ABC):
     ) -> jnp.float64:
         raise NotImplementedError
 
+    def _calculate_regularisation_from_prediction(
+        self,
+        prediction: GPPrediction,
+        x: jnp.ndarray,
+    ) -> jnp.float64:
+        """
+        Calculates the regularisation term from the predictive quantities of the GP on the batch.
+        Only implemented by regularisations with supports_shared_prediction set.
+        Args:
+            prediction: the predictive quantities of the GP to regularise on the input data
+            x: the input data to calculate the regularisation term at
+
+        Returns: the regularisation term
+
+        """
+        raise NotImplementedError
+
     def _calculate_regulariser_gaussian(
         self,
         x: jnp.ndarray,
@@ -166,7 +212,7 @@ class RegularisationBase(ABC):
                 full_covariance=full_covariance,
             )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_regularisation(
         self,
         parameters: Union[Dict, FrozenDict, GPBaseParameters],
@@ -185,6 +231,6 @@ class RegularisationBase(ABC):
         if not isinstance(parameters, self.gp.Parameters):
             parameters = self.gp.generate_parameters(parameters)
         return self._jit_compiled_calculate_regularisation(
-            parameters.dict(),
+            parameters,
             x,
         )
@@ -1,11 +1,10 @@
 import jax
 import jax.numpy as jnp
-import pydantic
 
 from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.regularisations.base import RegularisationBase
 from src.regularisations.schemas import RegularisationMode
+from src.utils.validation import validate_arguments
 
 
 class GaussianSquaredDifferenceRegularisation(RegularisationBase):
@@ -31,7 +30,7 @@ class GaussianSquaredDifferenceRegularisation(RegularisationBase):
         )
 
     @staticmethod
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_squared_distance(
         m_p: jnp.ndarray,
         c_p: jnp.ndarray,
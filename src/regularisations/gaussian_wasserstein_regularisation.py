@@ -1,20 +1,29 @@
 import warnings
-from typing import Optional
+from typing import Dict, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
-import pydantic
+from flax.core.frozen_dict import FrozenDict
+from jax.scipy.linalg import cho_factor, cho_solve
 
 from src.distributions import Gaussian
 from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.gps.base.exact_base import ExactGPBase
+from src.kernels.approximate.svgp.base import SVGPBaseKernel
+from src.kernels.base import KernelBase, KernelBaseParameters
 from src.regularisations.base import RegularisationBase
 from src.regularisations.schemas import RegularisationMode
+from src.utils.linear_operators import (
+    LowRankUpdateLinearOperator,
+    ScaledIdentityLinearOperator,
+)
 from src.utils.matrix_operations import (
     add_diagonal_regulariser,
     compute_covariance_eigenvalues,
+    compute_low_rank_product_eigenvalues,
     compute_product_eigenvalues,
 )
+from src.utils.validation import validate_arguments
 
 
 class GaussianWassersteinRegularisation(RegularisationBase):
@@ -36,7 +45,30 @@ class GaussianWassersteinRegularisation(RegularisationBase):
         is_eigenvalue_regularisation_absolute_scale: bool = False,
         use_symmetric_matrix_eigendecomposition: bool = True,
         include_eigendecomposition: bool = False,
+        use_low_rank_structure: bool = False,
+        low_rank_diagonal_regularisation: float = 1e-5,
     ):
+        """
+        Args:
+            gp: the approximate GP to regularise
+            regulariser: the regulariser GP
+            regulariser_parameters: the parameters of the regulariser GP
+            mode: whether to regularise with the prior or the posterior of the regulariser GP
+            eigenvalue_regularisation: the regularisation to add to the covariance matrix during eigenvalue computation
+            is_eigenvalue_regularisation_absolute_scale: whether the regularisation is an absolute or relative scale
+            use_symmetric_matrix_eigendecomposition: ensure symmetric matrices for eignedecomposition
+            include_eigendecomposition: whether to include the eigendecomposition term of the Gaussian wasserstein
+                                        metric
+            use_low_rank_structure: approximate the eigendecomposition term from the inducing point structure of the
+                                    covariances in O(b*m^2 + m^3) instead of O(b^3), requires an exact regulariser GP
+                                    and a single output SVGP kernel (see has_low_rank_structure). The Nyström residual
+                                    of each covariance is replaced by its average diagonal times the identity, the
+                                    resulting error is bounded by calculate_low_rank_approximation_error_bound.
+                                    Batches with fewer points than the total number of inducing points of the GP and
+                                    the regulariser fall back to the dense eigendecomposition
+            low_rank_diagonal_regularisation: the relative diagonal regularisation of the regulariser gram matrix of
+                                              the inducing points during the Cholesky decomposition
+        """
         self.eigenvalue_regularisation = eigenvalue_regularisation
         self.is_eigenvalue_regularisation_absolute_scale = (
             is_eigenvalue_regularisation_absolute_scale
@@ -45,12 +77,36 @@ class GaussianWassersteinRegularisation(RegularisationBase):
             use_symmetric_matrix_eigendecomposition
         )
         self.include_eigendecomposition = include_eigendecomposition
+        self.use_low_rank_structure = use_low_rank_structure
+        self.low_rank_diagonal_regularisation = low_rank_diagonal_regularisation
         super().__init__(
             gp=gp,
             regulariser=regulariser,
             regulariser_parameters=regulariser_parameters,
             mode=mode,
         )
+        if self.use_low_rank_structure and not self.has_low_rank_structure:
+            raise ValueError(
+                f"Low rank structure not available for {type(self.gp.kernel)=} and {type(self.regulariser)=}"
+            )
+
+    @property
+    def has_low_rank_structure(self) -> bool:
+        """
+        Whether both covariances can be approximated by a scaled identity plus a low-rank inducing point component:
+            - the regulariser is an exact GP conditioned on its inducing points
+            - the GP has a single output SVGP kernel with a defined sigma matrix
+        Returns: True if the low rank structure is available, False otherwise
+
+        """
+        return (
+            isinstance(self.regulariser, ExactGPBase)
+            and self.regulariser.kernel.number_output_dimensions == 1
+            and isinstance(self.gp.kernel, SVGPBaseKernel)
+            and self.gp.kernel.number_output_dimensions == 1
+            and type(self.gp.kernel)._calculate_sigma_matrix
+            is not SVGPBaseKernel._calculate_sigma_matrix
+        )
 
     @staticmethod
     def _compute_cross_covariance_eigenvalues(
@@ -104,7 +160,7 @@ class GaussianWassersteinRegularisation(RegularisationBase):
             return compute_covariance_eigenvalues(covariance_p_q_regularised)
 
     @staticmethod
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_gaussian_wasserstein_metric(
         mean_train_p: jnp.ndarray,
         covariance_train_p_diagonal: jnp.ndarray,
@@ -159,6 +215,313 @@ class GaussianWassersteinRegularisation(RegularisationBase):
             ) * jnp.sum(jnp.sqrt(cross_covariance_eigenvalues))
         return jnp.float64(gaussian_wasserstein_metric)
 
+    @staticmethod
+    def _add_low_rank_diagonal_regulariser(
+        low_rank_covariance: LowRankUpdateLinearOperator,
+        diagonal_regularisation: float,
+        is_diagonal_regularisation_absolute_scale: bool,
+    ) -> LowRankUpdateLinearOperator:
+        """
+        Add a regularisation to the diagonal of a low-rank covariance operator:
+            diagonal * I + factor @ core @ factor.T
+        following add_diagonal_regulariser without constructing the matrix.
+
+        Args:
+            low_rank_covariance: the low-rank covariance operator with a scaled identity base of shape (n, n)
+            diagonal_regularisation: the regularisation to add to the diagonal
+            is_diagonal_regularisation_absolute_scale: whether the regularisation is an absolute or relative scale
+
+        Returns: the regularised low-rank covariance operator
+
+        """
+        if not is_diagonal_regularisation_absolute_scale:
+            diagonal_regularisation *= jnp.mean(low_rank_covariance.diag())
+        return low_rank_covariance + ScaledIdentityLinearOperator(
+            scale=diagonal_regularisation,
+            dimension=low_rank_covariance.shape[0],
+        )
+
+    @staticmethod
+    def calculate_low_rank_gaussian_wasserstein_metric(
+        mean_train_p: jnp.ndarray,
+        covariance_train_p_diagonal: jnp.ndarray,
+        mean_train_q: jnp.ndarray,
+        covariance_train_q_diagonal: jnp.ndarray,
+        low_rank_covariance_p: LowRankUpdateLinearOperator,
+        low_rank_covariance_q: LowRankUpdateLinearOperator,
+        eigenvalue_regularisation: float = 1e-8,
+        is_eigenvalue_regularisation_absolute_scale: bool = False,
+    ) -> float:
+        """
+        Compute the empirical Gaussian Wasserstein metric between two Gaussian measures where the
+        covariances of the batch points have the low-rank form:
+            diagonal * I + factor @ core @ factor.T
+        The eigenvalues of the cross covariance of these covariances are computed from (m_p + m_q) x (m_p + m_q)
+        matrices without constructing the (n, n) covariances.
+                - n is the number of batch points
+                - m_p is the rank of the first Gaussian measure covariance
+                - m_q is the rank of the second Gaussian measure covariance
+        Args:
+            mean_train_p: the mean of the first Gaussian measure of shape (n, 1)
+            covariance_train_p_diagonal: the covariance diagonal of the first Gaussian measure of shape (n, 1)
+            mean_train_q: the mean of the second Gaussian measure of shape (n, 1)
+            covariance_train_q_diagonal: the covariance diagonal of the second Gaussian measure of shape (n, 1)
+            low_rank_covariance_p: the low-rank covariance operator of the first Gaussian measure,
+                                   with a scaled identity base, factor (n, m_p) and core (m_p, m_p)
+            low_rank_covariance_q: the low-rank covariance operator of the second Gaussian measure,
+                                   with a scaled identity base, factor (n, m_q) and core (m_q, m_q)
+            eigenvalue_regularisation: the regularisation to add to the covariance matrix during eigenvalue computation
+            is_eigenvalue_regularisation_absolute_scale: whether the regularisation is an absolute or relative scale
+
+        Returns: the empirical Gaussian Wasserstein metric
+
+        """
+        batch_size = low_rank_covariance_p.shape[0]
+        regularised_covariance_q = GaussianWassersteinRegularisation._add_low_rank_diagonal_regulariser(
+            low_rank_covariance=low_rank_covariance_q,
+            diagonal_regularisation=eigenvalue_regularisation,
+            is_diagonal_regularisation_absolute_scale=is_eigenvalue_regularisation_absolute_scale,
+        )
+        regularised_covariance_p = GaussianWassersteinRegularisation._add_low_rank_diagonal_regulariser(
+            low_rank_covariance=low_rank_covariance_p,
+            diagonal_regularisation=eigenvalue_regularisation,
+            is_diagonal_regularisation_absolute_scale=is_eigenvalue_regularisation_absolute_scale,
+        )
+        cross_covariance_eigenvalues = compute_low_rank_product_eigenvalues(
+            diagonal_a=regularised_covariance_q.base.scale,
+            factor_a=regularised_covariance_q.factor,
+            core_a=regularised_covariance_q.core,
+            diagonal_b=regularised_covariance_p.base.scale,
+            factor_b=regularised_covariance_p.factor,
+            core_b=regularised_covariance_p.core,
+        )
+        return jnp.float64(
+            jnp.mean(jnp.square(mean_train_p - mean_train_q))
+            + jnp.mean(covariance_train_p_diagonal)
+            + jnp.mean(covariance_train_q_diagonal)
+            - (2 / batch_size) * jnp.sum(jnp.sqrt(cross_covariance_eigenvalues))
+        )
+
+    @staticmethod
+    def _calculate_nystrom_components(
+        kernel: KernelBase,
+        kernel_parameters: KernelBaseParameters,
+        x: jnp.ndarray,
+        inducing_points: jnp.ndarray,
+        gram_inducing_cholesky_decomposition_and_lower: Tuple[jnp.ndarray, bool],
+    ) -> Tuple[jnp.ndarray, float]:
+        """
+        Calculates the gram matrix between the batch points and the inducing points and the average
+        diagonal of the Nyström residual r(x, x) - r(x, Z) @ r(Z, Z)^{-1} @ r(Z, x), which is used as the scaled
+        identity component of the low-rank covariance.
+            - n is the number of batch points
+            - m is the number of inducing points
+
+        Args:
+            kernel: the kernel r
+            kernel_parameters: the parameters of the kernel
+            x: the batch points of shape (n, d)
+            inducing_points: the inducing points Z of shape (m, d)
+            gram_inducing_cholesky_decomposition_and_lower: the Cholesky decomposition of r(Z, Z)
+
+        Returns: the gram matrix of shape (n, m) and the average Nyström residual
+
+        """
+        gram_x_inducing = kernel.calculate_gram(
+            parameters=kernel_parameters,
+            x1=x,
+            x2=inducing_points,
+        )
+        gram_x_diagonal = kernel.calculate_gram(
+            parameters=kernel_parameters,
+            x1=x,
+            x2=x,
+            full_covariance=False,
+        ).reshape(-1)
+        nystrom_diagonal = jnp.sum(
+            jnp.multiply(
+                gram_x_inducing,
+                cho_solve(
+                    c_and_lower=gram_inducing_cholesky_decomposition_and_lower,
+                    b=gram_x_inducing.T,
+                ).T,
+            ),
+            axis=1,
+        )
+        return gram_x_inducing, jnp.mean(gram_x_diagonal - nystrom_diagonal)
+
+    def _calculate_regulariser_low_rank_covariance(
+        self,
+        x: jnp.ndarray,
+    ) -> Tuple[LowRankUpdateLinearOperator, jnp.ndarray]:
+        """
+        Calculates the low-rank approximation of the regulariser covariance for an exact GP conditioned on the
+        inducing points Z with observation noise s:
+            - prior: (residual + s) * I + r(x, Z) @ r(Z, Z)^{-1} @ r(Z, x)
+            - posterior: residual * I + r(x, Z) @ (r(Z, Z)^{-1} - (r(Z, Z) + s * I)^{-1}) @ r(Z, x)
+        where residual is the average diagonal of the Nyström residual, which replaces the Nyström residual
+        r(x, x) - r(x, Z) @ r(Z, Z)^{-1} @ r(Z, x) of the exact covariance.
+        Args:
+            x: the batch points of shape (n, d)
+
+        Returns: the regulariser covariance operator with a scaled identity base, factor (n, m) and core (m, m)
+                 and the average Nyström residual
+
+        """
+        inducing_points = self.regulariser.x
+        number_of_inducing_points = inducing_points.shape[0]
+        kernel_parameters = self.regulariser_parameters.kernel
+        gram_inducing = self.regulariser.kernel.calculate_gram(
+            parameters=kernel_parameters,
+            x1=inducing_points,
+            x2=inducing_points,
+        )
+        gram_inducing_cholesky_decomposition_and_lower = cho_factor(
+            add_diagonal_regulariser(
+                matrix=gram_inducing,
+                diagonal_regularisation=self.low_rank_diagonal_regularisation,
+                is_diagonal_regularisation_absolute_scale=False,
+            )
+        )
+        gram_x_inducing, nystrom_residual = self._calculate_nystrom_components(
+            kernel=self.regulariser.kernel,
+            kernel_parameters=kernel_parameters,
+            x=x,
+            inducing_points=inducing_points,
+            gram_inducing_cholesky_decomposition_and_lower=gram_inducing_cholesky_decomposition_and_lower,
+        )
+        observation_noise = jnp.exp(
+            jnp.reshape(self.regulariser_parameters.log_observation_noise, ())
+        )
+        gram_inducing_inverse = cho_solve(
+            c_and_lower=gram_inducing_cholesky_decomposition_and_lower,
+            b=jnp.eye(number_of_inducing_points),
+        )
+        if self._mode == RegularisationMode.prior:
+            return (
+                LowRankUpdateLinearOperator(
+                    base=ScaledIdentityLinearOperator(
+                        scale=nystrom_residual + observation_noise,
+                        dimension=x.shape[0],
+                    ),
+                    factor=gram_x_inducing,
+                    core=gram_inducing_inverse,
+                ),
+                nystrom_residual,
+            )
+        elif self._mode == RegularisationMode.posterior:
+            return (
+                LowRankUpdateLinearOperator(
+                    base=ScaledIdentityLinearOperator(
+                        scale=nystrom_residual,
+                        dimension=x.shape[0],
+                    ),
+                    factor=gram_x_inducing,
+                    core=gram_inducing_inverse
+                    - cho_solve(
+                        c_and_lower=cho_factor(
+                            gram_inducing
+                            + observation_noise * jnp.eye(number_of_inducing_points)
+                        ),
+                        b=jnp.eye(number_of_inducing_points),
+                    ),
+                ),
+                nystrom_residual,
+            )
+
+    def _calculate_gp_low_rank_covariance(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> Tuple[LowRankUpdateLinearOperator, jnp.ndarray]:
+        """
+        Calculates the low-rank approximation of the covariance of a GP with an SVGP kernel:
+            residual * I + r(x, Z) @ sigma_matrix @ r(Z, x)
+        where residual is the average diagonal of the Nyström residual, which replaces the Nyström residual
+        of the exact covariance. Approximate GPs have no observation noise.
+        Args:
+            parameters: the parameters of the GP
+            x: the batch points of shape (n, d)
+
+        Returns: the GP covariance operator with a scaled identity base, factor (n, m) and core (m, m)
+                 and the average Nyström residual
+
+        """
+        if not isinstance(parameters, self.gp.Parameters):
+            parameters = self.gp.generate_parameters(parameters)
+        kernel = self.gp.kernel
+        gram_x_inducing, nystrom_residual = self._calculate_nystrom_components(
+            kernel=kernel.regulariser_kernel,
+            kernel_parameters=kernel.regulariser_kernel_parameters,
+            x=x,
+            inducing_points=kernel.inducing_points,
+            gram_inducing_cholesky_decomposition_and_lower=kernel.regulariser_gram_inducing_cholesky_decomposition_and_lower,
+        )
+        return (
+            LowRankUpdateLinearOperator(
+                base=ScaledIdentityLinearOperator(
+                    scale=nystrom_residual,
+                    dimension=x.shape[0],
+                ),
+                factor=gram_x_inducing,
+                core=kernel.calculate_sigma_matrix(parameters=parameters.kernel),
+            ),
+            nystrom_residual,
+        )
+
+    @validate_arguments
+    def calculate_low_rank_approximation_error_bound(
+        self,
+        parameters: Union[Dict, FrozenDict, GPBaseParameters],
+        x: jnp.ndarray,
+    ) -> jnp.float64:
+        """
+        Calculates a bound on the absolute error of the low rank Gaussian Wasserstein metric with respect to the
+        dense Gaussian Wasserstein metric on a batch. The eigenvalue term is (2/n) ||C_q^{1/2} C_p^{1/2}||_1,
+        which is approximated by replacing the Nyström residual R of each covariance with c * I, where c is
+        the average diagonal of R, such that the traces are unchanged. With the triangle and Hölder inequalities
+        and the Powers-Størmer inequality ||A^{1/2} - B^{1/2}||_2^2 <= ||A - B||_1 <= 2 * n * c, the error is at most
+            2 * sqrt(2) * (sqrt(c_q * d_p) + sqrt(d_q * c_p))
+        where d is the average diagonal of a regularised covariance. The bound vanishes with the Nyström residuals,
+        for example at the inducing points.
+            - n is the number of batch points
+
+        Args:
+            parameters: the parameters of the GP to regularise
+            x: the batch points of shape (n, d)
+
+        Returns: the bound on the absolute error of the low rank Gaussian Wasserstein metric
+
+        """
+        if not isinstance(parameters, self.gp.Parameters):
+            parameters = self.gp.generate_parameters(parameters)
+        (
+            covariance_p,
+            nystrom_residual_p,
+        ) = self._calculate_regulariser_low_rank_covariance(x=x)
+        covariance_q, nystrom_residual_q = self._calculate_gp_low_rank_covariance(
+            parameters=parameters,
+            x=x,
+        )
+        covariance_p_diagonal, covariance_q_diagonal = [
+            jnp.mean(
+                GaussianWassersteinRegularisation._add_low_rank_diagonal_regulariser(
+                    low_rank_covariance=covariance,
+                    diagonal_regularisation=self.eigenvalue_regularisation,
+                    is_diagonal_regularisation_absolute_scale=self.is_eigenvalue_regularisation_absolute_scale,
+                ).diag()
+            )
+            for covariance in [covariance_p, covariance_q]
+        ]
+        return jnp.float64(
+            2
+            * jnp.sqrt(2)
+            * (
+                jnp.sqrt(jnp.clip(nystrom_residual_q * covariance_p_diagonal, 0))
+                + jnp.sqrt(jnp.clip(covariance_q_diagonal * nystrom_residual_p, 0))
+            )
+        )
+
     def _calculate_regularisation(
         self,
         parameters: GPBaseParameters,
@@ -187,6 +550,29 @@ class GaussianWassersteinRegularisation(RegularisationBase):
         covariance_train_q_diagonal = jnp.atleast_2d(gaussian_q.covariance).reshape(
             self.gp.mean.number_output_dimensions, -1
         )
+        # the low rank eigenvalues require at least as many batch points as the total rank of the covariances,
+        # smaller batches use the dense eigendecomposition
+        if (
+            self.include_eigendecomposition
+            and self.use_low_rank_structure
+            and x.shape[0]
+            >= self.regulariser.x.shape[0] + self.gp.kernel.inducing_points.shape[0]
+        ):
+            return GaussianWassersteinRegularisation.calculate_low_rank_gaussian_wasserstein_metric(
+                mean_train_p=mean_train_p,
+                covariance_train_p_diagonal=covariance_train_p_diagonal,
+                mean_train_q=mean_train_q,
+                covariance_train_q_diagonal=covariance_train_q_diagonal,
+                low_rank_covariance_p=self._calculate_regulariser_low_rank_covariance(
+                    x=x
+                )[0],
+                low_rank_covariance_q=self._calculate_gp_low_rank_covariance(
+                    parameters=parameters,
+                    x=x,
+                )[0],
+                eigenvalue_regularisation=self.eigenvalue_regularisation,
+                is_eigenvalue_regularisation_absolute_scale=self.is_eigenvalue_regularisation_absolute_scale,
+            )
         if self.include_eigendecomposition:
             gram_batch_train_p = self._calculate_regulariser_covariance(
                 x=x,
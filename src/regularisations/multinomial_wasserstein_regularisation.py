@@ -1,7 +1,7 @@
 import jax.numpy as jnp
 
 from src.distributions import Multinomial
-from src.gps.base.base import GPBaseParameters
+from src.gps.base.base import GPBaseParameters, GPPrediction
 from src.gps.gp_classification import GPClassificationBase
 from src.regularisations.base import RegularisationBase
 from src.regularisations.schemas import RegularisationMode
@@ -13,6 +13,8 @@ class MultinomialWassersteinRegularisation(RegularisationBase):
     of two Multinomial distributions.
     """
 
+    supports_shared_prediction = True
+
     def __init__(
         self,
         gp: GPClassificationBase,
@@ -43,20 +45,15 @@ class MultinomialWassersteinRegularisation(RegularisationBase):
                 ).dict()
             )
 
-    def _calculate_regularisation(
+    def _calculate_regularisation_from_prediction(
         self,
-        parameters: GPBaseParameters,
+        prediction: GPPrediction,
         x: jnp.ndarray,
     ) -> jnp.float64:
         multinomial_p = self._calculate_regulariser_multinomial(
             x=x,
         )
-        multinomial_q = Multinomial(
-            **self.gp.predict_probability(
-                parameters=parameters,
-                x=x,
-            ).dict()
-        )
+        multinomial_q = self.gp._construct_distribution(prediction.probabilities)
         return jnp.float64(
             jnp.mean(
                 jnp.power(
@@ -74,3 +71,13 @@ class MultinomialWassersteinRegularisation(RegularisationBase):
                 )
             )
         )
+
+    def _calculate_regularisation(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> jnp.float64:
+        return self._calculate_regularisation_from_prediction(
+            prediction=self.gp.calculate_prediction(parameters=parameters, x=x),
+            x=x,
+        )
@@ -1,3 +1,6 @@
+from src.regularisations.projected.combined_projected_regularisation import (
+    CombinedProjectedRegularisation,
+)
 from src.regularisations.projected.projected_bhattacharyya_regularisation import (
     ProjectedBhattacharyyaRegularisation,
 )
@@ -20,4 +23,5 @@ __all__ = [
     "ProjectedKLRegularisation",
     "ProjectedRenyiRegularisation",
     "ProjectedHellingerRegularisation",
+    "CombinedProjectedRegularisation",
 ]
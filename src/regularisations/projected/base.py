@@ -1,14 +1,13 @@
 from abc import abstractmethod
+from typing import Tuple
 
-import jax
 import jax.numpy as jnp
-import pydantic
 
-from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
+from src.gps.base.base import GPBase, GPBaseParameters, GPPrediction
 from src.regularisations.base import RegularisationBase
 from src.regularisations.schemas import RegularisationMode
 from src.utils.custom_types import JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class ProjectedRegularisationBase(RegularisationBase):
@@ -16,6 +15,8 @@ class ProjectedRegularisationBase(RegularisationBase):
     A base class for all projected regularisations.
     """
 
+    supports_shared_prediction = True
+
     def __init__(
         self,
         gp: GPBase,
@@ -30,7 +31,7 @@ class ProjectedRegularisationBase(RegularisationBase):
             mode=mode,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     @abstractmethod
     def calculate_projected_distance(
         self,
@@ -41,52 +42,93 @@ class ProjectedRegularisationBase(RegularisationBase):
     ) -> JaxFloatType:
         raise NotImplementedError
 
-    def _calculate_regularisation(
+    @abstractmethod
+    def _calculate_projected_distances(
         self,
-        parameters: GPBaseParameters,
+        m_p: jnp.ndarray,
+        c_p: jnp.ndarray,
+        m_q: jnp.ndarray,
+        c_q: jnp.ndarray,
+    ) -> jnp.ndarray:
+        """
+        Computes the projected distance elementwise for arrays of means and variances of the same shape.
+        This is the vectorised implementation used to calculate the regularisation and is not validated.
+
+        Args:
+            m_p: the means of the first Gaussian measure
+            c_p: the variances of the first Gaussian measure
+            m_q: the means of the second Gaussian measure
+            c_q: the variances of the second Gaussian measure
+
+        Returns: the projected distances, an array of the same shape as the inputs
+
+        """
+        raise NotImplementedError
+
+    def _calculate_projected_gaussians(
+        self,
+        prediction: GPPrediction,
         x: jnp.ndarray,
-    ) -> jnp.float64:
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+        """
+        Calculates the means and variances of the regulariser and the GP at each input point.
+            - k is the number of output dimensions
+            - n is the number of points in x
+
+        Args:
+            prediction: the predictive quantities of the GP to regularise on x
+            x: the input data of shape (n, d)
+
+        Returns: the means and variances of the regulariser (m_p, c_p) and the GP (m_q, c_q), each of shape (k, n)
+
+        """
         gaussian_p = self._calculate_regulariser_gaussian(
             x=x,
             full_covariance=False,
         )
-        mean_p, covariance_p = (
-            gaussian_p.mean,
-            gaussian_p.covariance,
+        number_output_dimensions = self.gp.mean.number_output_dimensions
+        return (
+            jnp.atleast_2d(gaussian_p.mean).reshape(number_output_dimensions, -1),
+            jnp.atleast_2d(gaussian_p.covariance).reshape(
+                number_output_dimensions, x.shape[0]
+            ),
+            jnp.atleast_2d(prediction.mean).reshape(number_output_dimensions, -1),
+            jnp.atleast_2d(prediction.covariance).reshape(
+                number_output_dimensions, x.shape[0]
+            ),
         )
-        gaussian_q = self.gp.calculate_prediction_gaussian(
-            parameters=parameters,
+
+    def _calculate_regularisation_from_prediction(
+        self,
+        prediction: GPPrediction,
+        x: jnp.ndarray,
+    ) -> jnp.float64:
+        (
+            mean_p,
+            covariance_p,
+            mean_q,
+            covariance_q,
+        ) = self._calculate_projected_gaussians(
+            prediction=prediction,
             x=x,
-            full_covariance=False,
-        )
-        mean_q, covariance_q = (
-            gaussian_q.mean,
-            gaussian_q.covariance,
         )
+        # every output dimension has the same number of points,
+        # so the mean over all points is the mean over the output dimensions of the mean over points
         return jnp.mean(
-            jax.vmap(
-                lambda m_p, c_p, m_q, c_q: jnp.mean(
-                    jax.vmap(
-                        lambda m_p_, c_p_, m_q_, c_q_: self.calculate_projected_distance(
-                            m_p=m_p_,
-                            c_p=c_p_,
-                            m_q=m_q_,
-                            c_q=c_q_,
-                        )
-                    )(m_p, c_p, m_q, c_q)
-                )
-            )(
-                jnp.atleast_2d(mean_p).reshape(
-                    self.gp.mean.number_output_dimensions, -1
-                ),
-                jnp.atleast_2d(covariance_p).reshape(
-                    self.gp.mean.number_output_dimensions, x.shape[0]
-                ),
-                jnp.atleast_2d(mean_q).reshape(
-                    self.gp.mean.number_output_dimensions, -1
-                ),
-                jnp.atleast_2d(covariance_q).reshape(
-                    self.gp.mean.number_output_dimensions, x.shape[0]
-                ),
+            self._calculate_projected_distances(
+                m_p=mean_p,
+                c_p=covariance_p,
+                m_q=mean_q,
+                c_q=covariance_q,
             )
         )
+
+    def _calculate_regularisation(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> jnp.float64:
+        return self._calculate_regularisation_from_prediction(
+            prediction=self.gp.calculate_prediction(parameters=parameters, x=x),
+            x=x,
+        )
@@ -0,0 +1,147 @@
+from typing import Dict, Union
+
+import jax.numpy as jnp
+from flax.core.frozen_dict import FrozenDict
+
+from src.gps.base.base import GPBaseParameters
+from src.regularisations.projected.base import ProjectedRegularisationBase
+from src.utils.custom_types import JaxFloatType
+from src.utils.jit import jit_hoisting_constants
+from src.utils.validation import validate_arguments
+
+
+class CombinedProjectedRegularisation(ProjectedRegularisationBase):
+    """
+    Evaluates several projected regularisations from a single set of projected Gaussians.
+    The means and variances of the regulariser and the GP are computed once and every
+    divergence is evaluated on the same arrays in one jitted pass.
+    One of the divergences is chosen as the objective, which is the value returned by
+    calculate_regularisation, the others are available through calculate_projected_regularisations.
+    """
+
+    def __init__(
+        self,
+        projected_regularisations: Dict[str, ProjectedRegularisationBase],
+        objective: str,
+    ):
+        """
+        Args:
+            projected_regularisations: a dictionary of named projected regularisations,
+                                       all sharing the same gp, regulariser and mode
+            objective: the name of the projected regularisation used as the regularisation term
+        """
+        assert (
+            objective in projected_regularisations
+        ), f"{objective=} not in {list(projected_regularisations.keys())}"
+        objective_regularisation = projected_regularisations[objective]
+        for name, projected_regularisation in projected_regularisations.items():
+            assert isinstance(
+                projected_regularisation, ProjectedRegularisationBase
+            ), f"{name} is not a projected regularisation"
+            assert (
+                projected_regularisation.gp is objective_regularisation.gp
+            ), f"{name} regularises a different gp"
+            assert (
+                projected_regularisation.regulariser
+                is objective_regularisation.regulariser
+            ), f"{name} has a different regulariser"
+            assert (
+                projected_regularisation.regulariser_parameters
+                is objective_regularisation.regulariser_parameters
+            ), f"{name} has different regulariser parameters"
+            assert (
+                projected_regularisation._mode == objective_regularisation._mode
+            ), f"{name} has a different mode"
+        self.projected_regularisations = projected_regularisations
+        self.objective = objective
+        self._jit_compiled_calculate_projected_regularisations = jit_hoisting_constants(
+            lambda parameters, x: self._calculate_projected_regularisations(
+                parameters=parameters,
+                x=x,
+            )
+        )
+        super().__init__(
+            gp=objective_regularisation.gp,
+            regulariser=objective_regularisation.regulariser,
+            regulariser_parameters=objective_regularisation.regulariser_parameters,
+            mode=objective_regularisation._mode,
+        )
+
+    @validate_arguments
+    def calculate_projected_distance(
+        self,
+        m_p: JaxFloatType,
+        c_p: JaxFloatType,
+        m_q: JaxFloatType,
+        c_q: JaxFloatType,
+    ) -> JaxFloatType:
+        return self._calculate_projected_distances(
+            m_p=m_p,
+            c_p=c_p,
+            m_q=m_q,
+            c_q=c_q,
+        )
+
+    def _calculate_projected_distances(
+        self,
+        m_p: jnp.ndarray,
+        c_p: jnp.ndarray,
+        m_q: jnp.ndarray,
+        c_q: jnp.ndarray,
+    ) -> jnp.ndarray:
+        return self.projected_regularisations[
+            self.objective
+        ]._calculate_projected_distances(
+            m_p=m_p,
+            c_p=c_p,
+            m_q=m_q,
+            c_q=c_q,
+        )
+
+    def _calculate_projected_regularisations(
+        self,
+        parameters: GPBaseParameters,
+        x: jnp.ndarray,
+    ) -> Dict[str, jnp.float64]:
+        (
+            mean_p,
+            covariance_p,
+            mean_q,
+            covariance_q,
+        ) = self._calculate_projected_gaussians(
+            prediction=self.gp.calculate_prediction(parameters=parameters, x=x),
+            x=x,
+        )
+        return {
+            name: jnp.mean(
+                projected_regularisation._calculate_projected_distances(
+                    m_p=mean_p,
+                    c_p=covariance_p,
+                    m_q=mean_q,
+                    c_q=covariance_q,
+                )
+            )
+            for name, projected_regularisation in self.projected_regularisations.items()
+        }
+
+    @validate_arguments
+    def calculate_projected_regularisations(
+        self,
+        parameters: Union[Dict, FrozenDict, GPBaseParameters],
+        x: jnp.ndarray,
+    ) -> Dict[str, jnp.float64]:
+        """
+        Calculates all the projected regularisations in a single jitted pass.
+        Args:
+            parameters: the parameters of the GP to regularise
+            x: the input data to calculate the regularisation terms at
+
+        Returns: a dictionary of the regularisation terms keyed by name
+
+        """
+        if not isinstance(parameters, self.gp.Parameters):
+            parameters = self.gp.generate_parameters(parameters)
+        return self._jit_compiled_calculate_projected_regularisations(
+            parameters,
+            x,
+        )
@@ -1,11 +1,10 @@
 import jax.numpy as jnp
-import pydantic
 
 from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.regularisations.projected.base import ProjectedRegularisationBase
 from src.regularisations.schemas import RegularisationMode
 from src.utils.custom_types import JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class ProjectedHellingerRegularisation(ProjectedRegularisationBase):
@@ -23,7 +22,7 @@ class ProjectedHellingerRegularisation(ProjectedRegularisationBase):
             mode=mode,
         )
 
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_projected_distance(
         self,
         m_p: JaxFloatType,
@@ -31,6 +30,20 @@ class ProjectedHellingerRegularisation(ProjectedRegularisationBase):
         m_q: JaxFloatType,
         c_q: JaxFloatType,
     ) -> JaxFloatType:
+        return self._calculate_projected_distances(
+            m_p=m_p,
+            c_p=c_p,
+            m_q=m_q,
+            c_q=c_q,
+        )
+
+    def _calculate_projected_distances(
+        self,
+        m_p: jnp.ndarray,
+        c_p: jnp.ndarray,
+        m_q: jnp.ndarray,
+        c_q: jnp.ndarray,
+    ) -> jnp.ndarray:
         return 1 - jnp.sqrt(
             jnp.divide(
                 2 * jnp.multiply(jnp.sqrt(c_p), jnp.sqrt(c_q)),
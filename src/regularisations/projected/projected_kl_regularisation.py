@@ -1,11 +1,10 @@
 import jax.numpy as jnp
-import pydantic
 
 from src.gps.base.base import GPBase, GPBaseParameters
-from src.module import PYDANTIC_VALIDATION_CONFIG
 from src.regularisations.projected.base import ProjectedRegularisationBase
 from src.regularisations.schemas import RegularisationMode
 from src.utils.custom_types import JaxFloatType
+from src.utils.validation import validate_arguments
 
 
 class ProjectedKLRegularisation(ProjectedRegularisationBase):
@@ -24,13 +23,27 @@ class ProjectedKLRegularisation(ProjectedRegularisationBase):
         )
 
     @staticmethod
-    @pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)
+    @validate_arguments
     def calculate_projected_distance(
         m_p: JaxFloatType,
         c_p: JaxFloatType,
         m_q: JaxFloatType,
         c_q: JaxFloatType,
     ) -> JaxFloatType:
+        return ProjectedKLRegularisation._calculate_projected_distances(
+            m_p=m_p,
+            c_p=c_p,
+            m_q=m_q,
+            c_q=c_q,
+        )
+
+    @staticmethod
+    def _calculate_projected_distances(
+        m_p: jnp.ndarray,
+        c_p: jnp.ndarray,
+        m_q: jnp.ndarray,
+        c_q: jnp.ndarray,
+    ) -> jnp.ndarray:
         return (
             jnp.log(jnp.sqrt(c_q) / jnp.sqrt(c_p))
             + (c_p + jnp.square(m_p - m_q)) / (2 * c_q)
@@ -31,7 +31,7 @@ class JaxArrayType(jnp.ndarray, Generic[ArrayDType]):
         actual_dtype = dtype_field.type_.__args__[0]
         # If jax.numpy cannot create an array with the request dtype, an error will be raised
         # and correctly bubbled up.
-        return jnp.array(val, dtype=actual_dtype)
+        return jnp.asarray(val, dtype=actual_dtype)
 
 
 class JaxFloatType(jnp.float64, Generic[FloatDType]):
@@ -1,5 +1,7 @@
 import math
-from typing import Tuple, Union
+import queue
+import threading
+from typing import Iterator, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
@@ -58,3 +60,142 @@ def generate_batch(
             yield (x[curr_idx, ...] for x in data)
         else:
             yield data[curr_idx, ...]
+
+
+def _calculate_batch_indices(
+    key: PRNGKey,
+    dataset_size: int,
+    batch_size: int,
+    shuffle: bool,
+    drop_last: bool,
+) -> Iterator[np.ndarray]:
+    """
+    Generates the indices of the batches of an epoch on the host.
+    The permutation is drawn with a NumPy generator seeded by the key, so the order is
+    reproducible from the key without a device round trip.
+    Args:
+        key: PRNGKey
+        dataset_size: the number of points in the dataset
+        batch_size: int, size of batch
+        shuffle: bool, if True, shuffle data before batching
+        drop_last: bool, if True, drop last incomplete batch
+
+    Returns: an iterator of the indices of each batch
+
+    """
+    if shuffle:
+        batch_idx = np.random.default_rng(np.asarray(key)).permutation(dataset_size)
+    else:
+        batch_idx = np.arange(dataset_size)
+    if drop_last:
+        steps_per_epoch = math.floor(dataset_size / batch_size)
+    else:
+        steps_per_epoch = math.ceil(dataset_size / batch_size)
+    # Ensure at least one step
+    steps_per_epoch = max(steps_per_epoch, 1)
+    for idx in range(steps_per_epoch):
+        yield batch_idx[idx * batch_size : (idx + 1) * batch_size]
+
+
+class PrefetchedBatchIterator:
+    """
+    Iterates over the batches of an epoch, gathering them on a background thread.
+    The data is held on the host as NumPy (or memory-mapped) arrays and shuffled there,
+    each batch is gathered with host indexing and transferred with jax.device_put
+    up to prefetch_size steps ahead of the consumer, such that the gather and the transfer
+    overlap with the training step rather than being on its critical path.
+    The iterator must be closed if it is not exhausted, which is done on exiting its context.
+    """
+
+    def __init__(
+        self,
+        key: PRNGKey,
+        data: Tuple[np.ndarray, ...],
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = True,
+        prefetch_size: int = 2,
+        device: Optional[Union[jax.Device, jax.sharding.Sharding]] = None,
+    ):
+        """
+        Args:
+            key: PRNGKey
+            data: tuple of host arrays each of shape (dataset_size, ...)
+            batch_size: int, size of batch
+            shuffle: bool, if True, shuffle data before batching
+            drop_last: bool, if True, drop last incomplete batch
+            prefetch_size: the number of batches staged on the device ahead of the consumer
+            device: the device or sharding to transfer the batches to, the default device if None
+        """
+        assert prefetch_size > 0, f"{prefetch_size=} must be positive"
+        self.data = data
+        self.device = device
+        self._batch_indices = _calculate_batch_indices(
+            key=key,
+            dataset_size=data[0].shape[0],
+            batch_size=batch_size,
+            shuffle=shuffle,
+            drop_last=drop_last,
+        )
+        self._queue = queue.Queue(maxsize=prefetch_size)
+        self._is_closed = threading.Event()
+        self._is_exhausted = False
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        # wait for space in the queue without blocking a close
+        while not self._is_closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for batch_indices in self._batch_indices:
+                batch = tuple(
+                    jax.device_put(array[batch_indices, ...], self.device)
+                    for array in self.data
+                )
+                if not self._put(batch):
+                    return
+        except Exception as exception:  # pylint: disable=broad-except
+            # raised in the consumer thread on the next call to __next__
+            self._put(exception)
+            return
+        self._put(None)
+
+    def __iter__(self) -> "PrefetchedBatchIterator":
+        return self
+
+    def __next__(self) -> Tuple[jnp.ndarray, ...]:
+        if self._is_exhausted:
+            raise StopIteration
+        item = self._queue.get()
+        if item is None:
+            self._is_exhausted = True
+            raise StopIteration
+        if isinstance(item, Exception):
+            self._is_exhausted = True
+            self.close()
+            raise item
+        return item
+
+    def close(self) -> None:
+        """
+        Stops the background thread and releases the staged batches.
+        """
+        self._is_closed.set()
+        self._is_exhausted = True
+        self._thread.join()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def __enter__(self) -> "PrefetchedBatchIterator":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,83 @@
+from typing import Callable, Dict, Sequence
+
+import jax
+from jax.api_util import shaped_abstractify
+from jax.experimental.compilation_cache import compilation_cache
+
+
+def jit_hoisting_constants(
+    function: Callable,
+    static_argnums: Sequence[int] = (),
+) -> Callable:
+    """
+    jit-compiles a function with the arrays it closes over passed to the compiled program as
+    arguments rather than embedded in it as constants. Functions of modules close over arrays
+    held by the module, such as the training data of an exact GP, so with jax.jit every instance
+    compiles a program specific to its arrays. With the arrays hoisted, the compiled program only
+    depends on the computation and the shapes of its inputs, such that instances of a module
+    with different arrays of the same shapes share it through the persistent compilation cache.
+    The function is traced once for every combination of input shapes and static arguments.
+    If the function closes over tracers of an enclosing transformation, it is called directly.
+    Hoisting only pays off through the persistent compilation cache, so until the cache is initialised
+    the function is compiled with jax.jit, which dispatches faster.
+
+    Args:
+        function: the function to jit-compile
+        static_argnums: the positions of the arguments treated as static, which must be hashable
+
+    Returns: the jit-compiled function
+
+    """
+    compiled_functions: Dict = {}
+    jitted_function = jax.jit(function, static_argnums=static_argnums)
+
+    def compiled_function(*args):
+        if not compilation_cache.is_initialized():
+            return jitted_function(*args)
+        static_args = tuple(args[index] for index in static_argnums)
+        dynamic_args = tuple(
+            arg for index, arg in enumerate(args) if index not in static_argnums
+        )
+        leaves, tree_definition = jax.tree_util.tree_flatten(dynamic_args)
+        key = (
+            tree_definition,
+            tuple(map(shaped_abstractify, leaves)),
+            static_args,
+        )
+        if key not in compiled_functions:
+
+            def function_of_dynamic_args(*dynamic_args_):
+                dynamic_args_iterator = iter(dynamic_args_)
+                static_args_iterator = iter(static_args)
+                return function(
+                    *(
+                        next(static_args_iterator)
+                        if index in static_argnums
+                        else next(dynamic_args_iterator)
+                        for index in range(len(args))
+                    )
+                )
+
+            closed_jaxpr, output_shape = jax.make_jaxpr(
+                function_of_dynamic_args, return_shape=True
+            )(*dynamic_args)
+            if any(
+                isinstance(constant, jax.core.Tracer)
+                for constant in closed_jaxpr.consts
+            ):
+                return function(*args)
+            compiled_functions[key] = (
+                jax.jit(
+                    lambda constants, *leaves_: jax.core.eval_jaxpr(
+                        closed_jaxpr.jaxpr, constants, *leaves_
+                    )
+                ),
+                closed_jaxpr.consts,
+                jax.tree_util.tree_structure(output_shape),
+            )
+        hoisted_function, constants, output_tree_definition = compiled_functions[key]
+        return jax.tree_util.tree_unflatten(
+            output_tree_definition, hoisted_function(constants, *leaves)
+        )
+
+    return compiled_function
@@ -0,0 +1,850 @@
+import functools
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+import jax
+import jax.numpy as jnp
+import jax.scipy as jsp
+import jax.scipy.sparse.linalg
+import numpy as np
+
+
+class LinearOperator(ABC):
+    """
+    A square matrix represented by its structure, such that products, solves, log determinants,
+    diagonals and Cholesky decompositions can be computed without constructing the dense matrix.
+    Operators are pytrees, so they can be passed through and returned from jit-compiled and vmapped functions.
+    Adding operators keeps the structure where it is closed under addition, for example the sum of a
+    low-rank update and a diagonal is a low-rank update of the sum of its base and the diagonal.
+        - n is the number of rows and columns of the operator
+        - p is the number of columns of the matrix the operator is applied to
+    """
+
+    @property
+    @abstractmethod
+    def shape(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    @property
+    def dtype(self) -> jnp.dtype:
+        return jnp.result_type(*jax.tree_util.tree_leaves(self))
+
+    @abstractmethod
+    def to_dense(self) -> jnp.ndarray:
+        """
+        Constructs the dense matrix of the operator.
+
+        Returns: the matrix of shape (n, n)
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Multiplies a matrix by the operator from the left.
+        Args:
+            matrix: a vector of shape (n,) or a matrix of shape (n, p)
+
+        Returns: the product of the operator and the matrix, of the same shape as the matrix
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def diag(self) -> jnp.ndarray:
+        """
+        Computes the diagonal of the operator.
+
+        Returns: the diagonal of shape (n,)
+
+        """
+        raise NotImplementedError
+
+    def cholesky(self) -> "LinearOperator":
+        """
+        Computes the lower triangular Cholesky decomposition of a positive definite operator.
+        Operators without a structured decomposition are densified.
+
+        Returns: the lower triangular Cholesky decomposition as an operator
+
+        """
+        return DenseLinearOperator(jnp.linalg.cholesky(self.to_dense()))
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Solves the linear system of a positive definite operator.
+        Operators without a structured solve are solved with the Cholesky decomposition.
+        Args:
+            matrix: a vector of shape (n,) or a matrix of shape (n, p)
+
+        Returns: the solution of the operator times the solution equal to the matrix
+
+        """
+        return jsp.linalg.cho_solve((self.cholesky().to_dense(), True), matrix)
+
+    def logdet(self) -> jnp.ndarray:
+        """
+        Computes the log determinant of a positive definite operator.
+        Operators without a structured log determinant use the Cholesky decomposition.
+
+        Returns: the log determinant
+
+        """
+        return 2 * jnp.sum(jnp.log(self.cholesky().diag()))
+
+    def __matmul__(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return self.matmul(matrix)
+
+    def __add__(self, other: "LinearOperator") -> "LinearOperator":
+        # operators with a structured sum override __add__ for structured right operands
+        # and __radd__ for structured left operands, all other sums are left unstructured
+        assert self.shape == other.shape, f"{self.shape=} must match {other.shape=}"
+        return other.__radd__(self)
+
+    def __radd__(self, other: "LinearOperator") -> "LinearOperator":
+        return SumLinearOperator(operators=[other, self])
+
+
+@jax.tree_util.register_pytree_node_class
+class DenseLinearOperator(LinearOperator):
+    """
+    A dense matrix.
+    """
+
+    def __init__(self, matrix: jnp.ndarray):
+        self.matrix = matrix
+
+    def tree_flatten(self):
+        return (self.matrix,), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    def to_dense(self) -> jnp.ndarray:
+        return self.matrix
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return self.matrix @ matrix
+
+    def diag(self) -> jnp.ndarray:
+        return jnp.diag(self.matrix)
+
+
+@jax.tree_util.register_pytree_node_class
+class DiagonalLinearOperator(LinearOperator):
+    """
+    A diagonal matrix.
+    """
+
+    def __init__(self, diagonal: jnp.ndarray):
+        self.diagonal = diagonal
+
+    def tree_flatten(self):
+        return (self.diagonal,), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.diagonal.shape[0], self.diagonal.shape[0]
+
+    def to_dense(self) -> jnp.ndarray:
+        return jnp.diag(self.diagonal)
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return jnp.multiply(
+            self.diagonal.reshape((-1,) + (1,) * (matrix.ndim - 1)), matrix
+        )
+
+    def diag(self) -> jnp.ndarray:
+        return self.diagonal
+
+    def cholesky(self) -> LinearOperator:
+        return DiagonalLinearOperator(jnp.sqrt(self.diagonal))
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return jnp.divide(
+            matrix, self.diagonal.reshape((-1,) + (1,) * (matrix.ndim - 1))
+        )
+
+    def logdet(self) -> jnp.ndarray:
+        return jnp.sum(jnp.log(self.diagonal))
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, (DiagonalLinearOperator, ScaledIdentityLinearOperator)):
+            return DiagonalLinearOperator(self.diagonal + other.diag())
+        return super().__add__(other)
+
+    def __radd__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, ScaledIdentityLinearOperator):
+            return self + other
+        return super().__radd__(other)
+
+
+@jax.tree_util.register_pytree_node_class
+class ScaledIdentityLinearOperator(LinearOperator):
+    """
+    A scalar multiple of the identity matrix.
+    """
+
+    def __init__(self, scale: jnp.ndarray, dimension: int):
+        self.scale = scale
+        self.dimension = dimension
+
+    def tree_flatten(self):
+        return (self.scale,), self.dimension
+
+    @classmethod
+    def tree_unflatten(cls, dimension, children):
+        return cls(*children, dimension=dimension)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.dimension, self.dimension
+
+    def to_dense(self) -> jnp.ndarray:
+        return self.scale * jnp.eye(self.dimension)
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return self.scale * matrix
+
+    def diag(self) -> jnp.ndarray:
+        return jnp.full((self.dimension,), self.scale)
+
+    def cholesky(self) -> LinearOperator:
+        return ScaledIdentityLinearOperator(jnp.sqrt(self.scale), self.dimension)
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return matrix / self.scale
+
+    def logdet(self) -> jnp.ndarray:
+        return self.dimension * jnp.log(self.scale)
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, ScaledIdentityLinearOperator):
+            return ScaledIdentityLinearOperator(
+                self.scale + other.scale, self.dimension
+            )
+        return super().__add__(other)
+
+
+@jax.tree_util.register_pytree_node_class
+class LowRankUpdateLinearOperator(LinearOperator):
+    """
+    A low-rank update of an operator:
+        base + factor @ core @ factor.T
+    Solves and log determinants use the Woodbury identity and the matrix determinant lemma, which only
+    require solves with the base and an r x r system, such that they cost O(nr^2 + r^3) for a diagonal base.
+    The core does not need to be invertible.
+        - r is the rank of the update
+    """
+
+    def __init__(self, base: LinearOperator, factor: jnp.ndarray, core: jnp.ndarray):
+        self.base = base
+        self.factor = factor
+        self.core = core
+
+    def tree_flatten(self):
+        return (self.base, self.factor, self.core), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.base.shape
+
+    def to_dense(self) -> jnp.ndarray:
+        return self.base.to_dense() + self.factor @ self.core @ self.factor.T
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return self.base.matmul(matrix) + self.factor @ (
+            self.core @ (self.factor.T @ matrix)
+        )
+
+    def diag(self) -> jnp.ndarray:
+        return self.base.diag() + jnp.sum(
+            jnp.multiply(self.factor @ self.core, self.factor), axis=1
+        )
+
+    def _calculate_capacitance(self) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        # (n, r), (r, r) with capacitance I + C @ U.T @ B^{-1} @ U
+        base_solved_factor = self.base.solve(self.factor)
+        return base_solved_factor, jnp.eye(self.core.shape[0]) + self.core @ (
+            self.factor.T @ base_solved_factor
+        )
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        # (B + U C U^T)^{-1} = B^{-1} - B^{-1} U (I + C U^T B^{-1} U)^{-1} C U^T B^{-1}
+        base_solved_factor, capacitance = self._calculate_capacitance()
+        base_solved_matrix = self.base.solve(matrix)
+        return base_solved_matrix - base_solved_factor @ jnp.linalg.solve(
+            capacitance, self.core @ (self.factor.T @ base_solved_matrix)
+        )
+
+    def logdet(self) -> jnp.ndarray:
+        # log det(B + U C U^T) = log det(B) + log det(I + C U^T B^{-1} U)
+        _, capacitance = self._calculate_capacitance()
+        return self.base.logdet() + jnp.linalg.slogdet(capacitance)[1]
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, (DiagonalLinearOperator, ScaledIdentityLinearOperator)):
+            return LowRankUpdateLinearOperator(
+                base=self.base + other,
+                factor=self.factor,
+                core=self.core,
+            )
+        return super().__add__(other)
+
+    def __radd__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, (DiagonalLinearOperator, ScaledIdentityLinearOperator)):
+            return self + other
+        return super().__radd__(other)
+
+
+@jax.tree_util.register_pytree_node_class
+class BlockDiagonalLinearOperator(LinearOperator):
+    """
+    A block diagonal matrix of square blocks, each of which is an operator.
+    """
+
+    def __init__(self, blocks: List[LinearOperator]):
+        self.blocks = blocks
+
+    def tree_flatten(self):
+        return (self.blocks,), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        dimension = sum(block.shape[0] for block in self.blocks)
+        return dimension, dimension
+
+    def _split(self, matrix: jnp.ndarray) -> List[jnp.ndarray]:
+        split_indices, index = [], 0
+        for block in self.blocks[:-1]:
+            index += block.shape[0]
+            split_indices.append(index)
+        return jnp.split(matrix, split_indices, axis=0)
+
+    def to_dense(self) -> jnp.ndarray:
+        return jsp.linalg.block_diag(*[block.to_dense() for block in self.blocks])
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return jnp.concatenate(
+            [
+                block.matmul(matrix_)
+                for block, matrix_ in zip(self.blocks, self._split(matrix))
+            ],
+            axis=0,
+        )
+
+    def diag(self) -> jnp.ndarray:
+        return jnp.concatenate([block.diag() for block in self.blocks])
+
+    def cholesky(self) -> LinearOperator:
+        return BlockDiagonalLinearOperator([block.cholesky() for block in self.blocks])
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return jnp.concatenate(
+            [
+                block.solve(matrix_)
+                for block, matrix_ in zip(self.blocks, self._split(matrix))
+            ],
+            axis=0,
+        )
+
+    def logdet(self) -> jnp.ndarray:
+        return sum(block.logdet() for block in self.blocks)
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, BlockDiagonalLinearOperator) and [
+            block.shape for block in self.blocks
+        ] == [block.shape for block in other.blocks]:
+            return BlockDiagonalLinearOperator(
+                [
+                    block + other_block
+                    for block, other_block in zip(self.blocks, other.blocks)
+                ]
+            )
+        return super().__add__(other)
+
+
+@jax.tree_util.register_pytree_node_class
+class KroneckerLinearOperator(LinearOperator):
+    """
+    A Kronecker product with a Kronecker structured diagonal:
+        left ⊗ right + diag(noise) ⊗ I
+    where left is a symmetric (k, k) matrix, right is a symmetric (m, m) matrix and noise is a positive (k,)
+    vector or None, such that n = km. The rows are ordered by the index of left first, as in jnp.kron.
+    Solves and log determinants use the eigendecompositions of left, after whitening it by the noise, and right:
+        left ⊗ right + diag(noise) ⊗ I = S (Q_l ⊗ Q_r) (Λ_l ⊗ Λ_r + I) (Q_l ⊗ Q_r)^T S
+    with S = diag(noise)^{1/2} ⊗ I, such that they cost O(k^3 + m^3 + kmp(k + m)) instead of O(k^3 m^3).
+        - k is the number of rows and columns of left
+        - m is the number of rows and columns of right
+    """
+
+    def __init__(
+        self, left: jnp.ndarray, right: jnp.ndarray, noise: jnp.ndarray = None
+    ):
+        self.left = left
+        self.right = right
+        self.noise = noise
+
+    def tree_flatten(self):
+        return (self.left, self.right, self.noise), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        dimension = self.left.shape[0] * self.right.shape[0]
+        return dimension, dimension
+
+    def _noise_diagonal(self) -> jnp.ndarray:
+        # (k,)
+        if self.noise is None:
+            return jnp.zeros(self.left.shape[0], dtype=self.left.dtype)
+        return self.noise
+
+    def _reshape(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        # (k, m, p)
+        return matrix.reshape(self.left.shape[0], self.right.shape[0], -1)
+
+    def to_dense(self) -> jnp.ndarray:
+        return jnp.kron(self.left, self.right) + jnp.kron(
+            jnp.diag(self._noise_diagonal()), jnp.eye(self.right.shape[0])
+        )
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        reshaped_matrix = self._reshape(matrix)
+        return (
+            jnp.einsum("ij,pq,jqc->ipc", self.left, self.right, reshaped_matrix)
+            + self._noise_diagonal()[:, None, None] * reshaped_matrix
+        ).reshape(matrix.shape)
+
+    def diag(self) -> jnp.ndarray:
+        return (
+            jnp.diag(self.left)[:, None] * jnp.diag(self.right)[None, :]
+            + self._noise_diagonal()[:, None]
+        ).reshape(-1)
+
+    def _calculate_eigendecomposition(
+        self,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+        # (k,), (k, k), (m, k), (k, m) such that the operator is S (Q_l ⊗ Q_r) diag(eigenvalues) (Q_l ⊗ Q_r)^T S
+        if self.noise is None:
+            noise_scale = jnp.ones(self.left.shape[0], dtype=self.left.dtype)
+            left = self.left
+        else:
+            noise_scale = jnp.sqrt(self.noise)
+            left = self.left / jnp.outer(noise_scale, noise_scale)
+        left_eigenvalues, left_eigenvectors = jnp.linalg.eigh(left)
+        right_eigenvalues, right_eigenvectors = jnp.linalg.eigh(self.right)
+        eigenvalues = left_eigenvalues[:, None] * right_eigenvalues[None, :]
+        if self.noise is not None:
+            eigenvalues = eigenvalues + 1
+        return noise_scale, left_eigenvectors, right_eigenvectors, eigenvalues
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        (
+            noise_scale,
+            left_eigenvectors,
+            right_eigenvectors,
+            eigenvalues,
+        ) = self._calculate_eigendecomposition()
+        rotated_matrix = jnp.einsum(
+            "ia,pb,ipc->abc",
+            left_eigenvectors,
+            right_eigenvectors,
+            self._reshape(matrix) / noise_scale[:, None, None],
+        )
+        return (
+            jnp.einsum(
+                "ia,pb,abc->ipc",
+                left_eigenvectors,
+                right_eigenvectors,
+                rotated_matrix / eigenvalues[:, :, None],
+            )
+            / noise_scale[:, None, None]
+        ).reshape(matrix.shape)
+
+    def logdet(self) -> jnp.ndarray:
+        noise_scale, _, _, eigenvalues = self._calculate_eigendecomposition()
+        return jnp.sum(jnp.log(eigenvalues)) + 2 * self.right.shape[0] * jnp.sum(
+            jnp.log(noise_scale)
+        )
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, ScaledIdentityLinearOperator):
+            return KroneckerLinearOperator(
+                left=self.left,
+                right=self.right,
+                noise=self._noise_diagonal() + other.scale,
+            )
+        if (
+            isinstance(other, BlockDiagonalLinearOperator)
+            and len(other.blocks) == self.left.shape[0]
+            and all(
+                isinstance(block, ScaledIdentityLinearOperator)
+                and block.shape == self.right.shape
+                for block in other.blocks
+            )
+        ):
+            return KroneckerLinearOperator(
+                left=self.left,
+                right=self.right,
+                noise=self._noise_diagonal()
+                + jnp.stack([block.scale for block in other.blocks]),
+            )
+        return super().__add__(other)
+
+    def __radd__(self, other: LinearOperator) -> LinearOperator:
+        # the noise of the Kronecker product commutes, so the structured sums are shared with __add__
+        if isinstance(
+            other, (ScaledIdentityLinearOperator, BlockDiagonalLinearOperator)
+        ):
+            return self + other
+        return super().__radd__(other)
+
+
+def _toeplitz_matmul(
+    column: jnp.ndarray, matrix: jnp.ndarray, axis: int
+) -> jnp.ndarray:
+    # multiplies the symmetric Toeplitz matrix with first column of shape (g,) along an axis of size g
+    # by embedding it in a circulant matrix of size 2g, which is diagonalised by the FFT
+    number_of_rows = column.shape[0]
+    circulant_column = jnp.concatenate(
+        (column, jnp.zeros((1,), dtype=column.dtype), column[:0:-1])
+    )
+    matrix = jnp.moveaxis(matrix, axis, -1)
+    product = jnp.fft.irfft(
+        jnp.fft.rfft(circulant_column) * jnp.fft.rfft(matrix, n=2 * number_of_rows),
+        n=2 * number_of_rows,
+    )[..., :number_of_rows]
+    return jnp.moveaxis(product, -1, axis)
+
+
+@jax.tree_util.register_pytree_node_class
+class GridInterpolationLinearOperator(LinearOperator):
+    """
+    A gram matrix of a product kernel interpolated from a regular grid, as in structured kernel interpolation:
+        W @ K_grid @ W.T + noise * I
+    where K_grid is the Kronecker product of the symmetric Toeplitz matrices of each dimension on the grid
+    and W interpolates each point from the 4^d surrounding grid points with cubic convolution weights.
+    Products cost O(n4^d + g log g) with the FFT, so solves use preconditioned conjugate gradients
+    and only need products. Log determinants and Cholesky decompositions densify the operator.
+        - g is the number of grid points
+        - d is the number of dimensions of the grid
+    """
+
+    def __init__(
+        self,
+        interpolation_indices: jnp.ndarray,
+        interpolation_weights: jnp.ndarray,
+        toeplitz_columns: List[jnp.ndarray],
+        noise: jnp.ndarray = None,
+        tolerance: float = 1e-8,
+        maximum_number_of_iterations: int = 1000,
+    ):
+        """
+        Args:
+            interpolation_indices: the grid index of the first of the 4 grid points interpolating
+                                   each point in each dimension, of shape (n, d)
+            interpolation_weights: the cubic interpolation weights of the 4 grid points
+                                   in each dimension, of shape (n, d, 4)
+            toeplitz_columns: the first column of the Toeplitz matrix of each dimension, of shapes (g_i,)
+            noise: the scale of the identity added to the interpolated gram matrix or None
+            tolerance: the relative tolerance of the conjugate gradient solves
+            maximum_number_of_iterations: the maximum number of conjugate gradient iterations
+        """
+        self.interpolation_indices = interpolation_indices
+        self.interpolation_weights = interpolation_weights
+        self.toeplitz_columns = toeplitz_columns
+        self.noise = noise
+        self.tolerance = tolerance
+        self.maximum_number_of_iterations = maximum_number_of_iterations
+
+    def tree_flatten(self):
+        return (
+            self.interpolation_indices,
+            self.interpolation_weights,
+            self.toeplitz_columns,
+            self.noise,
+        ), (self.tolerance, self.maximum_number_of_iterations)
+
+    @classmethod
+    def tree_unflatten(cls, auxiliary_data, children):
+        return cls(*children, *auxiliary_data)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.interpolation_indices.shape[0], self.interpolation_indices.shape[0]
+
+    @property
+    def dtype(self) -> jnp.dtype:
+        return jnp.result_type(self.interpolation_weights, *self.toeplitz_columns)
+
+    @property
+    def grid_shape(self) -> Tuple[int, ...]:
+        return tuple(column.shape[0] for column in self.toeplitz_columns)
+
+    def _calculate_flat_interpolation(self) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        # (n, 4^d), (n, 4^d), the flat grid indices and weights of the tensor product interpolation
+        number_of_points, number_of_dimensions = self.interpolation_indices.shape
+        offsets = jnp.stack(
+            jnp.meshgrid(*[jnp.arange(4)] * number_of_dimensions, indexing="ij"),
+            axis=-1,
+        ).reshape(-1, number_of_dimensions)
+        flat_indices = jnp.ravel_multi_index(
+            tuple(
+                (self.interpolation_indices[:, None, :] + offsets[None, :, :])[..., i]
+                for i in range(number_of_dimensions)
+            ),
+            self.grid_shape,
+            mode="clip",
+        )
+        flat_weights = jnp.prod(
+            jnp.take_along_axis(
+                self.interpolation_weights,
+                jnp.broadcast_to(
+                    offsets.T[None, ...],
+                    (number_of_points, number_of_dimensions, offsets.shape[0]),
+                ),
+                axis=2,
+            ),
+            axis=1,
+        )
+        return flat_indices, flat_weights
+
+    def _scatter(
+        self,
+        matrix: jnp.ndarray,
+        flat_indices: jnp.ndarray,
+        flat_weights: jnp.ndarray,
+    ) -> jnp.ndarray:
+        # (n, p) -> (g, p), the transposed interpolation scatters the points onto the grid
+        # one interpolating grid point at a time, which avoids materialising an array of shape (n, 4^d, p)
+        grid_matrix = jnp.zeros(
+            (int(np.prod(self.grid_shape)), matrix.shape[1]),
+            dtype=jnp.result_type(self.dtype, matrix),
+        )
+        for i in range(flat_indices.shape[1]):
+            grid_matrix = grid_matrix.at[flat_indices[:, i]].add(
+                flat_weights[:, i, None] * matrix
+            )
+        return grid_matrix
+
+    @staticmethod
+    def _gather(
+        grid_matrix: jnp.ndarray,
+        flat_indices: jnp.ndarray,
+        flat_weights: jnp.ndarray,
+    ) -> jnp.ndarray:
+        # (g, p) -> (n, p), the interpolation gathers the points from the grid
+        return sum(
+            flat_weights[:, i, None] * grid_matrix[flat_indices[:, i]]
+            for i in range(flat_indices.shape[1])
+        )
+
+    def interpolate(self, grid_matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Interpolates a matrix on the grid at the points, W @ grid_matrix.
+        Args:
+            grid_matrix: a matrix of shape (g, p)
+
+        Returns: the interpolated matrix of shape (n, p)
+
+        """
+        return self._gather(grid_matrix, *self._calculate_flat_interpolation())
+
+    def interpolate_transpose(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Multiplies a matrix of the points by the transposed interpolation, W.T @ matrix.
+        Args:
+            matrix: a matrix of shape (n, p)
+
+        Returns: the matrix on the grid of shape (g, p)
+
+        """
+        return self._scatter(matrix, *self._calculate_flat_interpolation())
+
+    def grid_matmul(self, grid_matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Multiplies a matrix on the grid by the gram matrix of the grid, K_grid @ grid_matrix.
+        Args:
+            grid_matrix: a matrix of shape (g, p)
+
+        Returns: the product of shape (g, p)
+
+        """
+        grid_matrix = grid_matrix.reshape(*self.grid_shape, -1)
+        for axis, column in enumerate(self.toeplitz_columns):
+            grid_matrix = _toeplitz_matmul(column, grid_matrix, axis=axis)
+        return grid_matrix.reshape(-1, grid_matrix.shape[-1])
+
+    def interpolate_diag(self, grid_matrix: jnp.ndarray) -> jnp.ndarray:
+        """
+        Computes the diagonal of a matrix on the grid interpolated at the points, diag(W @ grid_matrix @ W.T),
+        from the blocks of the 4^d interpolating grid points of each point.
+        Args:
+            grid_matrix: a matrix of shape (g, g)
+
+        Returns: the diagonal of shape (n,)
+
+        """
+        flat_indices, flat_weights = self._calculate_flat_interpolation()
+        return jnp.einsum(
+            "na,nb,nab->n",
+            flat_weights,
+            flat_weights,
+            grid_matrix[flat_indices[:, :, None], flat_indices[:, None, :]],
+        )
+
+    def _noise_scale(self) -> jnp.ndarray:
+        if self.noise is None:
+            return jnp.zeros((), dtype=self.dtype)
+        return self.noise
+
+    def to_dense(self) -> jnp.ndarray:
+        flat_indices, flat_weights = self._calculate_flat_interpolation()
+        number_of_points = flat_indices.shape[0]
+        interpolation_matrix = (
+            jnp.zeros(
+                (number_of_points, int(np.prod(self.grid_shape))), dtype=self.dtype
+            )
+            .at[jnp.arange(number_of_points)[:, None], flat_indices]
+            .add(flat_weights)
+        )
+        grid_gram = functools.reduce(
+            jnp.kron, [jsp.linalg.toeplitz(column) for column in self.toeplitz_columns]
+        )
+        return interpolation_matrix @ grid_gram @ interpolation_matrix.T + (
+            self._noise_scale() * jnp.eye(number_of_points)
+        )
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return self._interpolated_matmul(matrix, *self._calculate_flat_interpolation())
+
+    def _interpolated_matmul(
+        self,
+        matrix: jnp.ndarray,
+        flat_indices: jnp.ndarray,
+        flat_weights: jnp.ndarray,
+    ) -> jnp.ndarray:
+        reshaped_matrix = matrix.reshape(matrix.shape[0], -1)
+        product = self._gather(
+            self.grid_matmul(
+                self._scatter(reshaped_matrix, flat_indices, flat_weights)
+            ),
+            flat_indices,
+            flat_weights,
+        )
+        return (product + self._noise_scale() * reshaped_matrix).reshape(matrix.shape)
+
+    def diag(self) -> jnp.ndarray:
+        # the interpolation and the grid gram factorise over the dimensions, so the diagonal is the product
+        # of w_a * w_b * t[|a - b|] summed over the 4 x 4 pairs of interpolating grid points of each dimension
+        offsets = jnp.abs(jnp.arange(4)[:, None] - jnp.arange(4)[None, :])
+        return (
+            jnp.prod(
+                jnp.stack(
+                    [
+                        jnp.einsum(
+                            "na,nb,ab->n",
+                            self.interpolation_weights[:, i, :],
+                            self.interpolation_weights[:, i, :],
+                            column[offsets],
+                        )
+                        for i, column in enumerate(self.toeplitz_columns)
+                    ]
+                ),
+                axis=0,
+            )
+            + self._noise_scale()
+        )
+
+    def solve(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        # conjugate gradients preconditioned by the inverse diagonal
+        diagonal = self.diag().reshape((-1,) + (1,) * (matrix.ndim - 1))
+        # the interpolation is computed once rather than in every iteration
+        flat_indices, flat_weights = self._calculate_flat_interpolation()
+        solution, _ = jsp.sparse.linalg.cg(
+            lambda matrix_: self._interpolated_matmul(
+                matrix_, flat_indices, flat_weights
+            ),
+            matrix,
+            tol=self.tolerance,
+            maxiter=self.maximum_number_of_iterations,
+            M=lambda residual: residual / diagonal,
+        )
+        return solution
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, ScaledIdentityLinearOperator):
+            return GridInterpolationLinearOperator(
+                interpolation_indices=self.interpolation_indices,
+                interpolation_weights=self.interpolation_weights,
+                toeplitz_columns=self.toeplitz_columns,
+                noise=self._noise_scale() + other.scale,
+                tolerance=self.tolerance,
+                maximum_number_of_iterations=self.maximum_number_of_iterations,
+            )
+        return super().__add__(other)
+
+    def __radd__(self, other: LinearOperator) -> LinearOperator:
+        if isinstance(other, ScaledIdentityLinearOperator):
+            return self + other
+        return super().__radd__(other)
+
+
+@jax.tree_util.register_pytree_node_class
+class SumLinearOperator(LinearOperator):
+    """
+    A sum of operators without a structured sum, such as a dense matrix plus a diagonal.
+    Products and diagonals are computed term by term, solves, log determinants and
+    Cholesky decompositions densify the sum.
+    """
+
+    def __init__(self, operators: List[LinearOperator]):
+        self.operators = operators
+
+    def tree_flatten(self):
+        return (self.operators,), None
+
+    @classmethod
+    def tree_unflatten(cls, _, children):
+        return cls(*children)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.operators[0].shape
+
+    def to_dense(self) -> jnp.ndarray:
+        return sum(operator.to_dense() for operator in self.operators)
+
+    def matmul(self, matrix: jnp.ndarray) -> jnp.ndarray:
+        return sum(operator.matmul(matrix) for operator in self.operators)
+
+    def diag(self) -> jnp.ndarray:
+        return sum(operator.diag() for operator in self.operators)
+
+    def __add__(self, other: LinearOperator) -> LinearOperator:
+        return SumLinearOperator(operators=self.operators + [other])
+
+    def __radd__(self, other: LinearOperator) -> LinearOperator:
+        return SumLinearOperator(operators=[other] + self.operators)
@@ -1,5 +1,8 @@
 import logging
+from functools import partial
+from typing import Tuple
 
+import jax
 import jax.numpy as jnp
 import jax.scipy as jsp
 
@@ -28,6 +31,119 @@ def add_diagonal_regulariser(
     return matrix + diagonal_regularisation * jnp.eye(dimension)
 
 
+@partial(jax.custom_jvp, nondiff_argnums=(1, 2, 3))
+def _cholesky_with_adaptive_jitter(
+    matrix: jnp.ndarray,
+    jitter: float,
+    maximum_number_of_jitter_increases: int,
+    jitter_growth_factor: float,
+) -> jnp.ndarray:
+    identity = jnp.eye(matrix.shape[0], dtype=matrix.dtype)
+    diagonal_scale = jnp.mean(jnp.diag(matrix))
+
+    def is_failed(
+        number_and_cholesky_decomposition: Tuple[jnp.ndarray, jnp.ndarray]
+    ) -> jnp.ndarray:
+        (
+            number_of_jitter_increases,
+            cholesky_decomposition,
+        ) = number_and_cholesky_decomposition
+        return jnp.logical_and(
+            number_of_jitter_increases < maximum_number_of_jitter_increases,
+            jnp.logical_not(jnp.all(jnp.isfinite(cholesky_decomposition))),
+        )
+
+    def retry(
+        number_and_cholesky_decomposition: Tuple[jnp.ndarray, jnp.ndarray]
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        number_of_jitter_increases = number_and_cholesky_decomposition[0] + 1
+        diagonal_jitter = (
+            jitter
+            * diagonal_scale
+            * jitter_growth_factor ** (number_of_jitter_increases - 1)
+        )
+        return number_of_jitter_increases, jnp.linalg.cholesky(
+            matrix + diagonal_jitter.astype(matrix.dtype) * identity
+        )
+
+    _, cholesky_decomposition = jax.lax.while_loop(
+        is_failed,
+        retry,
+        (jnp.array(0), jnp.linalg.cholesky(matrix)),
+    )
+    return cholesky_decomposition
+
+
+@_cholesky_with_adaptive_jitter.defjvp
+def _cholesky_with_adaptive_jitter_jvp(
+    jitter: float,
+    maximum_number_of_jitter_increases: int,
+    jitter_growth_factor: float,
+    primals: Tuple[jnp.ndarray],
+    tangents: Tuple[jnp.ndarray],
+) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    # the jitter is treated as a constant, such that the tangent is that of the Cholesky decomposition
+    # of the jittered matrix: L @ Phi(L^{-1} @ tangent @ L^{-T}), where Phi takes the lower triangle
+    # and halves the diagonal
+    (matrix,), (matrix_tangent,) = primals, tangents
+    # the tangent is symmetrised as only the lower triangle of the matrix is read
+    matrix_tangent = (matrix_tangent + matrix_tangent.T) / 2
+    cholesky_decomposition = _cholesky_with_adaptive_jitter(
+        matrix,
+        jitter,
+        maximum_number_of_jitter_increases,
+        jitter_growth_factor,
+    )
+    inverse_cholesky_tangent = jsp.linalg.solve_triangular(
+        cholesky_decomposition,
+        jsp.linalg.solve_triangular(
+            cholesky_decomposition, matrix_tangent, lower=True
+        ).T,
+        lower=True,
+    ).T
+    phi = jnp.tril(inverse_cholesky_tangent) - 0.5 * jnp.diag(
+        jnp.diag(inverse_cholesky_tangent)
+    )
+    return cholesky_decomposition, cholesky_decomposition @ phi
+
+
+def cho_factor_with_adaptive_jitter(
+    matrix: jnp.ndarray,
+    jitter: float,
+    maximum_number_of_jitter_increases: int,
+    jitter_growth_factor: float,
+) -> Tuple[jnp.ndarray, bool]:
+    """
+    Computes the Cholesky decomposition of a matrix, adding jitter to its diagonal only if the
+    decomposition fails. The first retry adds jitter times the mean of the diagonal, every further
+    retry multiplies the jitter by jitter_growth_factor. The jitter is treated as a constant when
+    differentiating, so a decomposition that succeeds on the first attempt costs a single factorisation
+    and has the same gradients as jax.scipy.linalg.cho_factor.
+        - n is the number of rows and columns of the matrix
+
+    Args:
+        matrix: a symmetric positive semi-definite matrix of shape (n, n)
+        jitter: the first jitter added to the diagonal, relative to the mean of the diagonal
+        maximum_number_of_jitter_increases: the maximum number of retried decompositions,
+                                            the matrix is decomposed as is if zero
+        jitter_growth_factor: the factor the jitter is multiplied by for every retry
+
+    Returns: the Cholesky decomposition and whether it is lower triangular, as used by cho_solve
+
+    """
+    if maximum_number_of_jitter_increases == 0:
+        return jsp.linalg.cho_factor(matrix)
+    return (
+        _cholesky_with_adaptive_jitter(
+            matrix,
+            jitter,
+            maximum_number_of_jitter_increases,
+            jitter_growth_factor,
+        ),
+        True,
+    )
+
+
 def _eigenvalue_warning(values_to_check, _) -> None:
     (
         minimum_covariance_eigenvalue,
@@ -100,3 +216,80 @@ def compute_product_eigenvalues(
         a_min=0,
         a_max=None,
     ).real
+
+
+def compute_low_rank_product_eigenvalues(
+    diagonal_a: float,
+    factor_a: jnp.ndarray,
+    core_a: jnp.ndarray,
+    diagonal_b: float,
+    factor_b: jnp.ndarray,
+    core_b: jnp.ndarray,
+) -> jnp.ndarray:
+    """
+    Computes the eigenvalues of a product of two covariance matrices with low-rank structure:
+        A = diagonal_a * I + factor_a @ core_a @ factor_a.T
+        B = diagonal_b * I + factor_b @ core_b @ factor_b.T
+    without constructing A or B.
+        - n is the number of points
+        - m_a is the rank of the factor of A
+        - m_b is the rank of the factor of B
+
+    Both matrices act as a scaled identity on the orthogonal complement of W = [factor_a, factor_b],
+    so the eigenvalues of A*B are diagonal_a * diagonal_b with multiplicity n - (m_a + m_b) and the
+    eigenvalues of the (m_a + m_b) x (m_a + m_b) projection of A*B onto the span of W.
+    The projection basis is taken from the eigendecomposition of W.T @ W, which also handles rank-deficient W
+    (for example when factor_a and factor_b are the same).
+    The eigenvalues of the projected product are computed with jnp.linalg.eigh
+    using eig(A*B) = eig(sqrt(A)*B*sqrt(A)).
+    The cost is O(n(m_a + m_b)^2 + (m_a + m_b)^3) instead of O(n^3).
+
+    Args:
+        diagonal_a: the scaled identity component of A
+        factor_a: the low-rank factor of A of shape (n, m_a)
+        core_a: the symmetric core matrix of A of shape (m_a, m_a)
+        diagonal_b: the scaled identity component of B
+        factor_b: the low-rank factor of B of shape (n, m_b)
+        core_b: the symmetric core matrix of B of shape (m_b, m_b)
+
+    Returns: the eigenvalues of the product A*B, a vector of shape (n, )
+
+    """
+    number_of_points, rank_a = factor_a.shape
+    rank = rank_a + factor_b.shape[1]
+    assert (
+        number_of_points >= rank
+    ), f"Low rank eigenvalues require {number_of_points=} >= {rank=}"
+
+    # (n, m_a + m_b)
+    factor = jnp.concatenate((factor_a, factor_b), axis=1)
+
+    # factor = Q @ R for some Q with orthonormal columns, R of shape (m_a + m_b, m_a + m_b)
+    gram_eigenvalues, gram_eigenvectors = jnp.linalg.eigh(factor.T @ factor)
+    r_matrix = jnp.multiply(
+        jnp.sqrt(jnp.clip(gram_eigenvalues, a_min=0, a_max=None))[:, None],
+        gram_eigenvectors.T,
+    )
+    r_matrix_a, r_matrix_b = r_matrix[:, :rank_a], r_matrix[:, rank_a:]
+    projected_a = diagonal_a * jnp.eye(rank) + r_matrix_a @ core_a @ r_matrix_a.T
+    projected_b = diagonal_b * jnp.eye(rank) + r_matrix_b @ core_b @ r_matrix_b.T
+
+    projected_a_eigenvalues, projected_a_eigenvectors = jnp.linalg.eigh(projected_a)
+    projected_a_sqrt = (
+        projected_a_eigenvectors
+        * jnp.sqrt(jnp.clip(projected_a_eigenvalues, a_min=0, a_max=None))[None, :]
+    ) @ projected_a_eigenvectors.T
+    projected_eigenvalues = jnp.linalg.eigvalsh(
+        projected_a_sqrt @ projected_b @ projected_a_sqrt
+    )
+    covariance_eigenvalues = jnp.concatenate(
+        (
+            projected_eigenvalues,
+            jnp.full((number_of_points - rank,), diagonal_a * diagonal_b),
+        )
+    )
+    return jnp.clip(
+        covariance_eigenvalues,
+        a_min=0,
+        a_max=None,
+    )
@@ -0,0 +1,381 @@
+from typing import Callable, NamedTuple, Tuple
+
+import jax
+import jax.numpy as jnp
+from jax.scipy.linalg import cho_factor, cho_solve
+
+
+class LBFGSResult(NamedTuple):
+    """
+    The result of an L-BFGS minimisation.
+
+    Args:
+        x: the minimiser of shape (n,)
+        value: the function value at the minimiser
+        gradient_norm: the infinity norm of the gradient at the minimiser
+        number_of_iterations: the number of iterations run
+        converged: whether the gradient norm or the relative change of the function value reached the tolerance
+        value_history: the function value after each iteration, NaN for iterations not run
+    """
+
+    x: jnp.ndarray
+    value: jnp.ndarray
+    gradient_norm: jnp.ndarray
+    number_of_iterations: jnp.ndarray
+    converged: jnp.ndarray
+    value_history: jnp.ndarray
+
+
+def _calculate_lbfgs_direction(
+    gradient: jnp.ndarray,
+    s_history: jnp.ndarray,
+    y_history: jnp.ndarray,
+    rho_history: jnp.ndarray,
+) -> jnp.ndarray:
+    """
+    Computes the L-BFGS search direction with the two-loop recursion.
+    The histories are ordered from oldest to newest, unused entries are zero and have rho zero,
+    such that they do not contribute to the direction.
+        - m is the history size
+        - n is the number of parameters
+
+    Args:
+        gradient: the gradient at the current point of shape (n,)
+        s_history: the differences of consecutive points of shape (m, n)
+        y_history: the differences of consecutive gradients of shape (m, n)
+        rho_history: the inverse curvatures 1 / (s^T y) of shape (m,)
+
+    Returns: the search direction of shape (n,)
+
+    """
+    history_size = s_history.shape[0]
+
+    def backward(i, carry):
+        q, alphas = carry
+        index = history_size - 1 - i
+        alpha = rho_history[index] * jnp.dot(s_history[index], q)
+        return q - alpha * y_history[index], alphas.at[index].set(alpha)
+
+    q, alphas = jax.lax.fori_loop(
+        0, history_size, backward, (gradient, jnp.zeros((history_size,)))
+    )
+    y_newest, s_newest = y_history[-1], s_history[-1]
+    y_squared_norm = jnp.dot(y_newest, y_newest)
+    gamma = jnp.where(
+        y_squared_norm > 0,
+        jnp.dot(s_newest, y_newest) / jnp.where(y_squared_norm > 0, y_squared_norm, 1),
+        1.0,
+    )
+
+    def forward(index, r):
+        beta = rho_history[index] * jnp.dot(y_history[index], r)
+        return r + s_history[index] * (alphas[index] - beta)
+
+    return -jax.lax.fori_loop(0, history_size, forward, gamma * q)
+
+
+def minimise_lbfgs(
+    function: Callable[[jnp.ndarray], jnp.ndarray],
+    x0: jnp.ndarray,
+    maximum_number_of_iterations: int,
+    tolerance: float = 1e-6,
+    history_size: int = 10,
+    maximum_number_of_line_search_iterations: int = 30,
+    armijo_constant: float = 1e-4,
+    curvature_constant: float = 0.9,
+) -> LBFGSResult:
+    """
+    Minimises a scalar function of a vector with L-BFGS and a weak Wolfe bisection line search.
+    The loop runs inside a single lax.while_loop so it can be jit-compiled as a whole.
+    Iteration stops when the infinity norm of the gradient or the relative change of the
+    function value falls below the tolerance, when the line search cannot find a finite decrease,
+    or after the maximum number of iterations.
+        - n is the number of parameters
+
+    Args:
+        function: the function to minimise, mapping a vector of shape (n,) to a scalar
+        x0: the initial point of shape (n,)
+        maximum_number_of_iterations: the maximum number of iterations
+        tolerance: the convergence tolerance
+        history_size: the number of curvature pairs stored
+        maximum_number_of_line_search_iterations: the maximum number of step updates per iteration
+        armijo_constant: the sufficient decrease constant of the line search
+        curvature_constant: the curvature constant of the line search
+
+    Returns: the result of the minimisation
+
+    """
+    value_and_grad_function = jax.value_and_grad(function)
+    value, gradient = value_and_grad_function(x0)
+    number_of_parameters = x0.shape[0]
+
+    def line_search(x, value, gradient, direction):
+        slope = jnp.dot(gradient, direction)
+
+        def is_sufficient_decrease(step_size, new_value):
+            # written as a comparison that is False for NaN values so that they are rejected
+            return new_value <= value + armijo_constant * step_size * slope
+
+        def is_curvature_satisfied(new_gradient):
+            return jnp.dot(new_gradient, direction) >= curvature_constant * slope
+
+        def condition(carry):
+            step_size, _, new_value, new_gradient, iteration = carry[:5]
+            return ~(
+                is_sufficient_decrease(step_size, new_value)
+                & is_curvature_satisfied(new_gradient)
+            ) & (iteration < maximum_number_of_line_search_iterations)
+
+        def body(carry):
+            step_size, lower, new_value, new_gradient, iteration, upper = carry
+            # bisect the bracket if the decrease is insufficient, otherwise expand or bisect
+            # towards larger steps because the curvature condition failed
+            upper = jnp.where(
+                is_sufficient_decrease(step_size, new_value), upper, step_size
+            )
+            lower = jnp.where(
+                is_sufficient_decrease(step_size, new_value), step_size, lower
+            )
+            step_size = jnp.where(
+                jnp.isfinite(upper), 0.5 * (lower + upper), 2.0 * lower
+            )
+            new_value, new_gradient = value_and_grad_function(x + step_size * direction)
+            return step_size, lower, new_value, new_gradient, iteration + 1, upper
+
+        new_value, new_gradient = value_and_grad_function(x + direction)
+        step_size, _, new_value, new_gradient, _, _ = jax.lax.while_loop(
+            condition,
+            body,
+            (jnp.array(1.0), jnp.array(0.0), new_value, new_gradient, 0, jnp.inf),
+        )
+        return (
+            step_size,
+            new_value,
+            new_gradient,
+            is_sufficient_decrease(step_size, new_value),
+        )
+
+    def condition(state):
+        iteration, _, _, _, _, _, _, is_finished, _, _ = state
+        return (iteration < maximum_number_of_iterations) & ~is_finished
+
+    def body(state):
+        (
+            iteration,
+            x,
+            value,
+            gradient,
+            s_history,
+            y_history,
+            rho_history,
+            _,
+            _,
+            value_history,
+        ) = state
+        direction = _calculate_lbfgs_direction(
+            gradient=gradient,
+            s_history=s_history,
+            y_history=y_history,
+            rho_history=rho_history,
+        )
+        # fall back to steepest descent if the direction is not a descent direction
+        direction = jnp.where(jnp.dot(gradient, direction) < 0, direction, -gradient)
+        step_size, new_value, new_gradient, is_accepted = line_search(
+            x, value, gradient, direction
+        )
+        s = step_size * direction
+        y = new_gradient - gradient
+        curvature = jnp.dot(s, y)
+        is_curvature_positive = is_accepted & (curvature > 1e-10)
+        s_history, y_history, rho_history = jax.tree_util.tree_map(
+            lambda history, update: jnp.where(
+                is_curvature_positive,
+                jnp.concatenate([history[1:], update[None]], axis=0),
+                history,
+            ),
+            (s_history, y_history, rho_history),
+            (s, y, 1 / jnp.where(is_curvature_positive, curvature, 1.0)),
+        )
+        relative_change = jnp.abs(value - new_value) / jnp.maximum(
+            jnp.maximum(jnp.abs(value), jnp.abs(new_value)), 1.0
+        )
+        x, value, gradient = jax.tree_util.tree_map(
+            lambda new, current: jnp.where(is_accepted, new, current),
+            (x + s, new_value, new_gradient),
+            (x, value, gradient),
+        )
+        is_converged = is_accepted & (
+            (jnp.max(jnp.abs(gradient)) <= tolerance) | (relative_change <= tolerance)
+        )
+        return (
+            iteration + 1,
+            x,
+            value,
+            gradient,
+            s_history,
+            y_history,
+            rho_history,
+            ~is_accepted | is_converged,
+            is_converged,
+            value_history.at[iteration].set(value),
+        )
+
+    (
+        iteration,
+        x,
+        value,
+        gradient,
+        _,
+        _,
+        _,
+        _,
+        is_converged,
+        value_history,
+    ) = jax.lax.while_loop(
+        condition,
+        body,
+        (
+            0,
+            x0,
+            value,
+            gradient,
+            jnp.zeros((history_size, number_of_parameters)),
+            jnp.zeros((history_size, number_of_parameters)),
+            jnp.zeros((history_size,)),
+            jnp.max(jnp.abs(gradient)) <= tolerance,
+            jnp.max(jnp.abs(gradient)) <= tolerance,
+            jnp.full((maximum_number_of_iterations,), jnp.nan),
+        ),
+    )
+    gradient_norm = jnp.max(jnp.abs(gradient))
+    return LBFGSResult(
+        x=x,
+        value=value,
+        gradient_norm=gradient_norm,
+        number_of_iterations=iteration,
+        converged=is_converged,
+        value_history=value_history,
+    )
+
+
+def calculate_natural_gradient_gaussian_update(
+    mean: jnp.ndarray,
+    covariance: jnp.ndarray,
+    mean_gradient: jnp.ndarray,
+    covariance_gradient: jnp.ndarray,
+    learning_rate: float,
+) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    """
+    Takes a natural gradient step for a loss of a Gaussian N(mean, covariance).
+    The precision is updated with the positive definite retraction of Lin et al. (2020):
+        precision = precision + 2 lr G + 2 lr^2 G @ covariance @ G
+    where G is the symmetrised gradient with respect to the covariance, followed by:
+        mean = mean - lr updated_covariance @ mean_gradient
+    To first order in the learning rate this is a natural gradient step, but the updated
+    precision stays positive definite for any learning rate, which is needed for losses that
+    are not conjugate to the Gaussian.
+        - m is the dimension of the Gaussian
+
+    Args:
+        mean: the mean of shape (m,)
+        covariance: the covariance of shape (m, m)
+        mean_gradient: the gradient of the loss with respect to the mean of shape (m,)
+        covariance_gradient: the gradient of the loss with respect to the covariance of shape (m, m)
+        learning_rate: the learning rate
+
+    Returns: the updated mean of shape (m,) and the updated covariance of shape (m, m)
+
+    """
+    covariance_gradient = 0.5 * (covariance_gradient + covariance_gradient.T)
+    identity = jnp.eye(covariance.shape[0])
+    precision = cho_solve(cho_factor(covariance), identity)
+    updated_precision = (
+        precision
+        + 2 * learning_rate * covariance_gradient
+        + 2
+        * learning_rate**2
+        * covariance_gradient
+        @ covariance
+        @ covariance_gradient
+    )
+    updated_covariance = cho_solve(
+        cho_factor(0.5 * (updated_precision + updated_precision.T)),
+        identity,
+    )
+    updated_covariance = 0.5 * (updated_covariance + updated_covariance.T)
+    return (
+        mean - learning_rate * updated_covariance @ mean_gradient,
+        updated_covariance,
+    )
+
+
+def minimise_bracketed_scalar(
+    function: Callable[[jnp.ndarray], jnp.ndarray],
+    lower: float,
+    upper: float,
+    number_of_grid_points: int = 64,
+    tolerance: float = 1e-8,
+    maximum_number_of_iterations: int = 100,
+) -> jnp.ndarray:
+    """
+    Minimises a scalar function of a scalar on an interval.
+    The function is evaluated on a grid to bracket the lowest grid point between its neighbours,
+    and the bracket is refined with a golden-section search. The result is never worse than the
+    best grid point and is the minimiser if the function is unimodal on the bracket.
+    NaN values are treated as infinite. The search can be jit-compiled as a whole.
+
+    Args:
+        function: the function to minimise, mapping a scalar to a scalar
+        lower: the lower end of the interval
+        upper: the upper end of the interval
+        number_of_grid_points: the number of grid points used to find the bracket
+        tolerance: the width of the bracket at which the search stops
+        maximum_number_of_iterations: the maximum number of golden-section iterations
+
+    Returns: the minimiser
+
+    """
+
+    def evaluate(value: jnp.ndarray) -> jnp.ndarray:
+        function_value = function(value)
+        return jnp.where(jnp.isnan(function_value), jnp.inf, function_value)
+
+    grid = jnp.linspace(lower, upper, number_of_grid_points)
+    grid_values = jax.vmap(evaluate)(grid)
+    index = jnp.argmin(grid_values)
+    inverse_golden_ratio = (jnp.sqrt(5.0) - 1) / 2
+    a = grid[jnp.maximum(index - 1, 0)]
+    b = grid[jnp.minimum(index + 1, number_of_grid_points - 1)]
+    c = b - inverse_golden_ratio * (b - a)
+    d = a + inverse_golden_ratio * (b - a)
+
+    def condition(state):
+        iteration, a, b, _, _, _, _ = state
+        return (b - a > tolerance) & (iteration < maximum_number_of_iterations)
+
+    def body(state):
+        iteration, a, b, c, d, c_value, d_value = state
+        is_left = c_value < d_value
+        # keep [a, d] if the minimum is left of d, otherwise keep [c, b]
+        a, b = jnp.where(is_left, a, c), jnp.where(is_left, d, b)
+        new_point = jnp.where(
+            is_left,
+            b - inverse_golden_ratio * (b - a),
+            a + inverse_golden_ratio * (b - a),
+        )
+        new_value = evaluate(new_point)
+        c, d, c_value, d_value = (
+            jnp.where(is_left, new_point, d),
+            jnp.where(is_left, c, new_point),
+            jnp.where(is_left, new_value, d_value),
+            jnp.where(is_left, c_value, new_value),
+        )
+        return iteration + 1, a, b, c, d, c_value, d_value
+
+    _, _, _, c, d, c_value, d_value = jax.lax.while_loop(
+        condition,
+        body,
+        (0, a, b, c, d, evaluate(c), evaluate(d)),
+    )
+    candidates = jnp.stack([grid[index], c, d])
+    return candidates[jnp.argmin(jnp.stack([grid_values[index], c_value, d_value]))]
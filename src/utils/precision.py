@@ -0,0 +1,57 @@
+from typing import Any, NamedTuple
+
+import jax
+import jax.numpy as jnp
+
+
+class PrecisionPolicy(NamedTuple):
+    """
+    The floating point precision a Gaussian process is evaluated in.
+    Kernels and means are evaluated in the compute dtype, which halves the memory traffic of the
+    gram matrices in float32. Cholesky factorisations and the solves with them are computed in the
+    linear algebra dtype, which is also the dtype of the predictions.
+    If the Cholesky factorisation of a matrix fails, which happens for nearly singular gram matrices
+    rounded to float32, the jitter added to its diagonal is increased until the factorisation succeeds.
+
+    Args:
+        compute_dtype: the dtype of the kernel and mean evaluations
+        linear_algebra_dtype: the dtype of Cholesky factorisations, solves and predictions
+        jitter: the first jitter added to the diagonal after a failed factorisation,
+                relative to the mean of the diagonal
+        maximum_number_of_jitter_increases: the maximum number of factorisations retried with jitter,
+                                            no jitter is added if zero
+        jitter_growth_factor: the factor the jitter is multiplied by for every retried factorisation
+    """
+
+    compute_dtype: str = "float64"
+    linear_algebra_dtype: str = "float64"
+    jitter: float = 1e-6
+    maximum_number_of_jitter_increases: int = 0
+    jitter_growth_factor: float = 10.0
+
+
+DOUBLE_PRECISION_POLICY = PrecisionPolicy()
+MIXED_PRECISION_POLICY = PrecisionPolicy(
+    compute_dtype="float32",
+    linear_algebra_dtype="float64",
+    maximum_number_of_jitter_increases=5,
+)
+
+
+def cast_floating_point(tree: Any, dtype: str) -> Any:
+    """
+    Casts the floating point leaves of a pytree, such as parameters or arrays, to a dtype.
+    Leaves of other dtypes, such as integer labels, are left unchanged.
+    Args:
+        tree: the pytree to cast
+        dtype: the floating point dtype to cast to
+
+    Returns: the pytree with its floating point leaves cast to the dtype
+
+    """
+    return jax.tree_util.tree_map(
+        lambda leaf: jnp.asarray(leaf).astype(dtype)
+        if jnp.issubdtype(jnp.result_type(leaf), jnp.floating)
+        else leaf,
+        tree,
+    )
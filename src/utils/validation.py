@@ -0,0 +1,132 @@
+from contextlib import contextmanager
+from enum import Enum
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pydantic
+
+# a union accepts an instance of one of its types as is, such that parameters passed as models are
+# not coerced to dictionaries and validation does not change the arguments a function sees
+PYDANTIC_VALIDATION_CONFIG = dict(arbitrary_types_allowed=True, smart_union=True)
+
+
+class ArgumentValidationMode(str, Enum):
+    # every call is validated
+    always = "always"
+    # the first call of each method is validated, later calls pass the arguments through
+    once = "once"
+    # no call is validated
+    never = "never"
+
+
+_validated_functions: List[Callable] = []
+_default_validation_mode = ArgumentValidationMode.always
+_module_validation_modes: Dict[str, ArgumentValidationMode] = {}
+
+
+def _resolve_validation_mode(module_name: str) -> ArgumentValidationMode:
+    """
+    Resolves the validation mode of a module from the mode set for the module or its closest
+    enclosing package, falling back to the global mode.
+    Args:
+        module_name: the name of the module defining the function
+
+    Returns: the validation mode of the module
+
+    """
+    matching_module_names = [
+        name
+        for name in _module_validation_modes
+        if module_name == name or module_name.startswith(f"{name}.")
+    ]
+    if not matching_module_names:
+        return _default_validation_mode
+    return _module_validation_modes[max(matching_module_names, key=len)]
+
+
+def _apply_validation_mode(function: Callable) -> None:
+    function.validation_mode = _resolve_validation_mode(function.__module__)
+    function.is_validating = function.validation_mode != ArgumentValidationMode.never
+
+
+def validate_arguments(function: Callable) -> Callable:
+    """
+    Validates the arguments of a function with pydantic, coercing them to their annotated types.
+    Validation follows the mode set with set_argument_validation_mode for the module of the
+    function, and is skipped without overhead beyond one attribute lookup once it is turned off.
+    Args:
+        function: the function to validate the arguments of
+
+    Returns: the function with validated arguments
+
+    """
+    validated_function = pydantic.validate_arguments(config=PYDANTIC_VALIDATION_CONFIG)(
+        function
+    )
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not wrapper.is_validating:
+            return function(*args, **kwargs)
+        result = validated_function(*args, **kwargs)
+        if wrapper.validation_mode == ArgumentValidationMode.once:
+            wrapper.is_validating = False
+        return result
+
+    wrapper.raw_function = function
+    _apply_validation_mode(wrapper)
+    _validated_functions.append(wrapper)
+    return wrapper
+
+
+def set_argument_validation_mode(
+    validation_mode: ArgumentValidationMode,
+    module_name: Optional[str] = None,
+) -> None:
+    """
+    Sets the argument validation mode of the functions decorated with validate_arguments.
+    Validation is always on by default. Turning it off removes the overhead of pydantic from every
+    call, which is meant for production use once the inputs of a pipeline are known to be valid.
+    Args:
+        validation_mode: the validation mode
+        module_name: a module or package, such as "src.kernels", to set the mode of,
+                     sets the global mode and clears the modes of all modules if None
+
+    """
+    global _default_validation_mode
+    validation_mode = ArgumentValidationMode(validation_mode)
+    if module_name is None:
+        _default_validation_mode = validation_mode
+        _module_validation_modes.clear()
+    else:
+        _module_validation_modes[module_name] = validation_mode
+    for function in _validated_functions:
+        _apply_validation_mode(function)
+
+
+@contextmanager
+def argument_validation_mode(
+    validation_mode: ArgumentValidationMode,
+    module_name: Optional[str] = None,
+) -> Iterator[None]:
+    """
+    Sets the argument validation mode within a context, restoring the previous modes on exit.
+    Args:
+        validation_mode: the validation mode
+        module_name: a module or package to set the mode of, sets the global mode if None
+
+    """
+    global _default_validation_mode
+    default_validation_mode = _default_validation_mode
+    module_validation_modes = dict(_module_validation_modes)
+    set_argument_validation_mode(
+        validation_mode=validation_mode, module_name=module_name
+    )
+    try:
+        yield
+    finally:
+        _default_validation_mode = default_validation_mode
+        _module_validation_modes.clear()
+        _module_validation_modes.update(module_validation_modes)
+        for function in _validated_functions:
+            _apply_validation_mode(function)
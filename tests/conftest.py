@@ -0,0 +1,15 @@
+from typing import Iterator
+
+import pytest
+
+from src.utils.validation import ArgumentValidationMode, argument_validation_mode
+
+
+@pytest.fixture(params=[ArgumentValidationMode.always, ArgumentValidationMode.never])
+def validation_mode(request) -> Iterator[ArgumentValidationMode]:
+    """
+    Runs a test with the arguments of every call validated and with validation skipped,
+    which must not change the results of the test.
+    """
+    with argument_validation_mode(request.param):
+        yield request.param
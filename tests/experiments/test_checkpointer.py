@@ -0,0 +1,159 @@
+import os
+import shutil
+from typing import List, Optional
+
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+
+from experiments.shared.checkpointer import Checkpointer
+from experiments.shared.data import Data
+from experiments.shared.schemas import OptimiserSchema
+from experiments.shared.trainer import Trainer, TrainerSettings
+from src.means import ConstantMean
+
+config.update("jax_enable_x64", True)
+
+PARAMETERS = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+
+
+def _list_checkpoint_epochs(checkpoint_path: str) -> List[int]:
+    return sorted(
+        int(name[len("epoch-") : -len(".ckpt")])
+        for name in os.listdir(checkpoint_path)
+        if name.endswith(".ckpt")
+    )
+
+
+@pytest.mark.parametrize("is_asynchronous", [False, True])
+@pytest.mark.parametrize(
+    "max_to_keep,best_to_keep,metrics,epochs_to_keep",
+    [
+        [None, 0, [5.0, 1.0, 4.0, None, 3.0, 2.0], [0, 1, 2, 3, 4, 5]],
+        [2, 0, [5.0, 1.0, 4.0, None, 3.0, 2.0], [4, 5]],
+        [2, 1, [5.0, 1.0, 4.0, None, 3.0, 2.0], [1, 4, 5]],
+        [1, 2, [5.0, 1.0, 4.0, None, 3.0, 2.0], [1, 5]],
+        [2, 2, [None, None, None, None, None, None], [4, 5]],
+    ],
+)
+def test_checkpointer_retention_policy(
+    tmp_path,
+    is_asynchronous: bool,
+    max_to_keep: Optional[int],
+    best_to_keep: int,
+    metrics: List[Optional[float]],
+    epochs_to_keep: List[int],
+):
+    checkpointer = Checkpointer(
+        checkpoint_path=str(tmp_path),
+        max_to_keep=max_to_keep,
+        best_to_keep=best_to_keep,
+        is_asynchronous=is_asynchronous,
+    )
+    for epoch, metric in enumerate(metrics):
+        checkpointer.save(
+            epoch=epoch,
+            parameters=PARAMETERS,
+            metric=metric,
+            state={"epoch": epoch},
+        )
+    checkpointer.wait_until_finished()
+    assert _list_checkpoint_epochs(str(tmp_path)) == epochs_to_keep
+    assert all(
+        os.path.isdir(checkpointer.epoch_state_path(epoch)) for epoch in epochs_to_keep
+    )
+
+
+def test_checkpointer_restore_keeps_retention_ranking(tmp_path):
+    checkpointer = Checkpointer(
+        checkpoint_path=str(tmp_path),
+        max_to_keep=2,
+        best_to_keep=1,
+        is_asynchronous=False,
+    )
+    for epoch, metric in enumerate([2.0, 1.0, 3.0, 4.0]):
+        checkpointer.save(
+            epoch=epoch,
+            parameters=PARAMETERS.construct(constant=jnp.array(float(epoch))),
+            metric=metric,
+            state={"epoch": epoch},
+        )
+    restored_checkpointer = Checkpointer(
+        checkpoint_path=str(tmp_path),
+        max_to_keep=2,
+        best_to_keep=1,
+        is_asynchronous=False,
+    )
+    epoch, parameters, state = restored_checkpointer.restore_latest(PARAMETERS)
+    assert epoch == 3
+    assert parameters.constant == 3.0
+    assert int(state["epoch"]) == 3
+    # the checkpoint with the lowest metric is kept while later ones are not evaluated
+    for epoch in [3, 4, 5]:
+        restored_checkpointer.save(
+            epoch=epoch,
+            parameters=PARAMETERS,
+            state={"epoch": epoch},
+        )
+    assert _list_checkpoint_epochs(str(tmp_path)) == [1, 4, 5]
+
+
+def test_checkpointer_restore_skips_incomplete_checkpoints(tmp_path):
+    checkpointer = Checkpointer(checkpoint_path=str(tmp_path), is_asynchronous=False)
+    for epoch in range(4):
+        checkpointer.save(
+            epoch=epoch,
+            parameters=PARAMETERS.construct(constant=jnp.array(float(epoch))),
+            state={"epoch": epoch},
+        )
+    shutil.rmtree(checkpointer.epoch_state_path(3))
+    epoch, parameters, _ = checkpointer.restore_latest(PARAMETERS)
+    assert epoch == 2
+    assert parameters.constant == 2.0
+    epoch, _, _ = checkpointer.restore_latest(PARAMETERS, maximum_epoch=1)
+    assert epoch == 1
+    assert (
+        Checkpointer(checkpoint_path=str(tmp_path / "missing")).restore_latest(
+            PARAMETERS
+        )
+        is None
+    )
+
+
+def test_trainer_ranks_only_evaluated_checkpoints(tmp_path):
+    x = jnp.arange(16.0).reshape(-1, 1)
+    y = jnp.sin(x[:, 0]) + 2
+    validation_metrics = iter([4.0, 3.0, 2.0])
+    trainer = Trainer(
+        save_checkpoint_frequency=1,
+        checkpoint_path=str(tmp_path),
+        post_epoch_callback=lambda parameters: {"metric": next(validation_metrics)},
+        asynchronous_checkpointing=False,
+    )
+    trainer.train(
+        trainer_settings=TrainerSettings(
+            seed=0,
+            optimiser_schema=OptimiserSchema.adam,
+            learning_rate=0.1,
+            number_of_epochs=5,
+            batch_size=4,
+            batch_shuffle=False,
+            batch_drop_last=False,
+            validation_metric="metric",
+            evaluation_frequency=2,
+        ),
+        parameters=PARAMETERS,
+        data=Data(x=x, y=y),
+        loss_function=lambda parameters, x_, y_: jnp.mean(
+            jnp.square(y_ - parameters.constant)
+        ),
+        disable_tqdm=True,
+    )
+    # the parameters at the start of epochs 2 and 4 were evaluated after epochs 1 and 3
+    assert trainer.checkpointer._saved_checkpoints == [
+        (0, None),
+        (1, None),
+        (2, 4.0),
+        (3, None),
+        (4, 3.0),
+    ]
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+
+import jax
+import pytest
+
+from experiments.shared.compilation_cache import (
+    CPU_XLA_RUNTIME_FLAG,
+    initialise_compilation_cache,
+)
+
+REPOSITORY_PATH = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# predicts with two freshly built GPs on different data of the same shapes,
+# the second should compile its programs from the cache written by the first
+COMPILATION_CACHE_SCRIPT = """
+import json
+import tempfile
+
+import jax
+import jax.numpy as jnp
+from jax.config import config
+
+from experiments.shared.compilation_cache import initialise_compilation_cache
+from src.gps import GPRegression
+from src.kernels.standard import ARDKernel
+from src.means import ConstantMean
+
+config.update("jax_enable_x64", True)
+
+metrics = []
+with tempfile.TemporaryDirectory() as cache_path:
+    compilation_cache_metrics = initialise_compilation_cache(cache_path=cache_path)
+    for seed in range(2):
+        x = jax.random.normal(jax.random.PRNGKey(seed), shape=(10, 2))
+        gp = GPRegression(
+            mean=ConstantMean(),
+            kernel=ARDKernel(number_of_dimensions=2),
+            x=x,
+            y=jnp.sin(x[:, 0]),
+        )
+        parameters = gp.generate_parameters(
+            {
+                "log_observation_noise": 0.0,
+                "mean": {"constant": 0.0},
+                "kernel": {"log_scaling": 0.0, "log_lengthscales": jnp.zeros(2)},
+            }
+        )
+        gp.predict_probability(parameters=parameters, x=x)
+        metrics.append(
+            [
+                compilation_cache_metrics.number_of_compile_requests,
+                compilation_cache_metrics.number_of_cache_hits,
+            ]
+        )
+print(json.dumps(metrics))
+"""
+
+
+def test_compilation_cache_hits_across_fresh_gps():
+    completed_process = subprocess.run(
+        [sys.executable, "-c", COMPILATION_CACHE_SCRIPT],
+        cwd=REPOSITORY_PATH,
+        env=dict(
+            os.environ,
+            PYTHONPATH=REPOSITORY_PATH,
+            XLA_FLAGS=CPU_XLA_RUNTIME_FLAG,
+        ),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    (first_requests, first_hits), (second_requests, second_hits) = json.loads(
+        completed_process.stdout.splitlines()[-1]
+    )
+    assert first_requests > 0
+    assert first_hits == 0
+    assert second_hits > 0
+    assert second_hits == second_requests - first_requests
+
+
+@pytest.mark.skipif(jax.default_backend() != "cpu", reason="requires the CPU backend")
+def test_initialise_compilation_cache_without_cpu_xla_runtime(tmp_path, monkeypatch):
+    monkeypatch.setenv("XLA_FLAGS", "")
+    with pytest.warns(UserWarning):
+        assert initialise_compilation_cache(cache_path=str(tmp_path)) is None
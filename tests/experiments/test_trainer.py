@@ -0,0 +1,393 @@
+import jax
+import jax.numpy as jnp
+import optax
+import pytest
+from jax.config import config
+
+from experiments.shared.data import Data
+from experiments.shared.schemas import OptimiserSchema, RegularisationBatchSchema
+from experiments.shared.trainer import Trainer, TrainerSettings
+from src.means import ConstantMean
+
+config.update("jax_enable_x64", True)
+
+X = jnp.arange(16.0).reshape(-1, 1)
+Y = jnp.sin(X[:, 0]) + 2
+
+
+def _calculate_loss(parameters, x: jnp.ndarray, y: jnp.ndarray) -> jnp.ndarray:
+    return jnp.mean(jnp.square(y - parameters.constant))
+
+
+def _calculate_regularisation(parameters, x: jnp.ndarray) -> jnp.ndarray:
+    return 0.1 * jnp.square(parameters.constant) * x.shape[0]
+
+
+def _generate_trainer_settings(**kwargs) -> TrainerSettings:
+    return TrainerSettings(
+        **{
+            "seed": 0,
+            "optimiser_schema": OptimiserSchema.adam,
+            "learning_rate": 0.1,
+            "number_of_epochs": 5,
+            "batch_size": 4,
+            "batch_shuffle": False,
+            "batch_drop_last": False,
+            **kwargs,
+        }
+    )
+
+
+def _generate_trainer(checkpoint_path: str, **kwargs) -> Trainer:
+    return Trainer(
+        **{
+            "save_checkpoint_frequency": 0,
+            "checkpoint_path": checkpoint_path,
+            "post_epoch_callback": lambda parameters: {
+                "loss": float(_calculate_loss(parameters, X, Y))
+            },
+            **kwargs,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "regularisation_function",
+    [None, _calculate_regularisation],
+)
+def test_train_step_matches_optimiser_update(tmp_path, regularisation_function):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.5)})
+    optimiser = optax.adam(0.1)
+    opt_state = optimiser.init(parameters)
+    train_step = _generate_trainer(str(tmp_path))._build_train_step(
+        trainer_settings=_generate_trainer_settings(),
+        optimiser=optimiser,
+        loss_function=_calculate_loss,
+        regularisation_function=regularisation_function,
+    )
+    (
+        updated_parameters,
+        updated_opt_state,
+        loss,
+        gradient_norm,
+        is_nan,
+    ) = train_step(parameters, opt_state, X, Y)
+
+    def calculate_objective(parameters_):
+        objective = _calculate_loss(parameters_, X, Y)
+        if regularisation_function is not None:
+            objective += regularisation_function(parameters_, X)
+        return objective
+
+    expected_loss, expected_gradients = jax.value_and_grad(calculate_objective)(
+        parameters
+    )
+    updates, expected_opt_state = optimiser.update(
+        expected_gradients, opt_state, parameters
+    )
+    assert jnp.isclose(loss, expected_loss)
+    assert jnp.isclose(gradient_norm, optax.global_norm(expected_gradients))
+    assert not is_nan
+    assert jnp.isclose(
+        updated_parameters.constant,
+        optax.apply_updates(parameters, updates).constant,
+    )
+    assert all(
+        jnp.allclose(leaf, expected_leaf)
+        for leaf, expected_leaf in zip(
+            jax.tree_util.tree_leaves(updated_opt_state),
+            jax.tree_util.tree_leaves(expected_opt_state),
+        )
+    )
+
+
+def test_train_step_skips_nan_update(tmp_path):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.5)})
+    optimiser = optax.adam(0.1)
+    opt_state = optimiser.update(
+        jax.tree_util.tree_map(jnp.ones_like, parameters), optimiser.init(parameters)
+    )[1]
+    train_step = _generate_trainer(str(tmp_path))._build_train_step(
+        trainer_settings=_generate_trainer_settings(),
+        optimiser=optimiser,
+        loss_function=_calculate_loss,
+        regularisation_function=None,
+    )
+    updated_parameters, updated_opt_state, loss, _, is_nan = train_step(
+        parameters, opt_state, X, Y.at[3].set(jnp.nan)
+    )
+    assert is_nan
+    assert jnp.isnan(loss)
+    assert updated_parameters.constant == parameters.constant
+    assert all(
+        jnp.array_equal(leaf, expected_leaf)
+        for leaf, expected_leaf in zip(
+            jax.tree_util.tree_leaves(updated_opt_state),
+            jax.tree_util.tree_leaves(opt_state),
+        )
+    )
+
+
+def test_train_returns_parameters_before_nan_step(tmp_path):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+    # the third batch has a NaN response
+    trainer = _generate_trainer(str(tmp_path))
+    trained_parameters, post_epoch_history = trainer.train(
+        trainer_settings=_generate_trainer_settings(),
+        parameters=parameters,
+        data=Data(x=X, y=Y.at[9].set(jnp.nan)),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    expected_parameters, _ = _generate_trainer(str(tmp_path)).train(
+        trainer_settings=_generate_trainer_settings(number_of_epochs=1),
+        parameters=parameters,
+        data=Data(x=X[:8], y=Y[:8]),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    assert post_epoch_history == []
+    assert trainer.step_losses.shape == (3,)
+    assert jnp.isnan(trainer.step_losses[-1])
+    assert trained_parameters.constant == expected_parameters.constant
+
+
+@pytest.mark.parametrize(
+    "number_of_epochs_per_scan,y",
+    [
+        [1, Y],
+        [2, Y],
+        [3, Y],
+        [2, Y.at[9].set(jnp.nan)],
+    ],
+)
+def test_on_device_training_matches_host_training(
+    tmp_path, number_of_epochs_per_scan: int, y: jnp.ndarray
+):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+    host_trainer = _generate_trainer(str(tmp_path))
+    host_parameters, _ = host_trainer.train(
+        trainer_settings=_generate_trainer_settings(),
+        parameters=parameters,
+        data=Data(x=X, y=y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    on_device_trainer = _generate_trainer(str(tmp_path))
+    on_device_parameters, post_epoch_history = on_device_trainer.train(
+        trainer_settings=_generate_trainer_settings(
+            on_device=True,
+            number_of_epochs_per_scan=number_of_epochs_per_scan,
+        ),
+        parameters=parameters,
+        data=Data(x=X, y=y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    # the host loop stops at the NaN step, the later steps of its scan are NaN on device
+    number_of_steps = host_trainer.step_losses.shape[0]
+    assert jnp.isclose(on_device_parameters.constant, host_parameters.constant)
+    assert jnp.allclose(
+        on_device_trainer.step_losses[:number_of_steps],
+        host_trainer.step_losses,
+        equal_nan=True,
+    )
+    assert jnp.all(jnp.isnan(on_device_trainer.step_losses[number_of_steps:]))
+    if jnp.all(jnp.isfinite(y)):
+        assert number_of_steps == on_device_trainer.step_losses.shape[0] == 20
+        assert post_epoch_history[-1]["loss"] == pytest.approx(
+            float(_calculate_loss(on_device_parameters, X, Y))
+        )
+
+
+@pytest.mark.parametrize(
+    "on_device,convergence_settings,number_of_epochs_run",
+    [
+        [False, {"convergence_gradient_norm": 1e6}, 1],
+        [True, {"convergence_gradient_norm": 1e6}, 1],
+        [False, {"convergence_window": 1, "convergence_relative_tolerance": 1.0}, 2],
+        [True, {"convergence_window": 1, "convergence_relative_tolerance": 1.0}, 2],
+        [False, {"convergence_window": 1, "convergence_relative_tolerance": -1.0}, 5],
+    ],
+)
+def test_training_stops_on_convergence(
+    tmp_path,
+    on_device: bool,
+    convergence_settings: dict,
+    number_of_epochs_run: int,
+):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+    trainer = _generate_trainer(str(tmp_path))
+    trained_parameters, post_epoch_history = trainer.train(
+        trainer_settings=_generate_trainer_settings(
+            on_device=on_device,
+            number_of_epochs_per_scan=5,
+            **convergence_settings,
+        ),
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    expected_parameters, _ = _generate_trainer(str(tmp_path)).train(
+        trainer_settings=_generate_trainer_settings(
+            number_of_epochs=number_of_epochs_run
+        ),
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    number_of_steps = 4 * number_of_epochs_run
+    assert jnp.isclose(trained_parameters.constant, expected_parameters.constant)
+    assert jnp.all(jnp.isfinite(trainer.step_losses[:number_of_steps]))
+    # frozen epochs of the scan on device have NaN losses
+    assert jnp.all(jnp.isnan(trainer.step_losses[number_of_steps:]))
+    assert len(post_epoch_history) == (1 if on_device else number_of_epochs_run)
+
+
+@pytest.mark.parametrize("on_device", [False, True])
+def test_training_stops_on_validation_patience(tmp_path, on_device: bool):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+    validation_metrics = iter([3.0, 1.0, 2.0, 1.0, 0.5])
+    trainer = _generate_trainer(
+        str(tmp_path),
+        post_epoch_callback=lambda parameters_: {"metric": next(validation_metrics)},
+    )
+    _, post_epoch_history = trainer.train(
+        trainer_settings=_generate_trainer_settings(
+            on_device=on_device,
+            validation_metric="metric",
+            validation_patience=2,
+        ),
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+    )
+    # the metric does not improve on 1.0 for two evaluations
+    assert [result["metric"] for result in post_epoch_history] == [3.0, 1.0, 2.0, 1.0]
+    assert trainer.step_losses.shape == (16,)
+
+
+@pytest.mark.parametrize(
+    "on_device,number_of_epochs_per_scan,number_of_evaluations",
+    [[False, 1, 3], [True, 1, 3], [True, 2, 2]],
+)
+def test_resumed_training_is_identical(
+    tmp_path,
+    on_device: bool,
+    number_of_epochs_per_scan: int,
+    number_of_evaluations: int,
+):
+    parameters = ConstantMean().generate_parameters({"constant": jnp.array(0.0)})
+    trainer_settings = _generate_trainer_settings(
+        number_of_epochs=6,
+        batch_shuffle=True,
+        regularisation_batch_schema=RegularisationBatchSchema.uniform,
+        regularisation_batch_size=4,
+        on_device=on_device,
+        number_of_epochs_per_scan=number_of_epochs_per_scan,
+        convergence_window=2,
+        validation_metric="loss",
+        validation_patience=10,
+    )
+    expected_parameters, expected_post_epoch_history = _generate_trainer(
+        str(tmp_path / "uninterrupted")
+    ).train(
+        trainer_settings=trainer_settings,
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+        regularisation_function=_calculate_regularisation,
+    )
+    # training is interrupted after the evaluation following the checkpoint of epoch 2
+    evaluation_counter = iter(range(1, 10))
+    _generate_trainer(
+        str(tmp_path / "interrupted"),
+        save_checkpoint_frequency=2,
+        break_condition_function=lambda parameters_: next(evaluation_counter)
+        == number_of_evaluations,
+    ).train(
+        trainer_settings=trainer_settings,
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+        regularisation_function=_calculate_regularisation,
+    )
+    resumed_trainer = _generate_trainer(
+        str(tmp_path / "interrupted"),
+        save_checkpoint_frequency=2,
+        resume_from_checkpoint=True,
+    )
+    resumed_parameters, resumed_post_epoch_history = resumed_trainer.train(
+        trainer_settings=trainer_settings,
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+        regularisation_function=_calculate_regularisation,
+    )
+    assert resumed_parameters.constant == expected_parameters.constant
+    assert resumed_post_epoch_history == expected_post_epoch_history
+    assert resumed_trainer.step_losses.shape == (16,)
+
+
+@pytest.mark.parametrize(
+    "trainer_settings_kwargs",
+    [
+        {},
+        {
+            "regularisation_batch_schema": RegularisationBatchSchema.uniform,
+            "regularisation_batch_size": 4,
+        },
+        {"convergence_window": 1, "convergence_relative_tolerance": 0.1},
+    ],
+)
+def test_train_sweep_matches_separate_training(tmp_path, trainer_settings_kwargs):
+    trainer_settings = [
+        _generate_trainer_settings(
+            seed=seed,
+            learning_rate=learning_rate,
+            batch_shuffle=True,
+            on_device=True,
+            **trainer_settings_kwargs,
+        )
+        for seed, learning_rate in [(0, 0.1), (1, 0.05), (2, 0.5)]
+    ]
+    parameters = [
+        ConstantMean().generate_parameters({"constant": jnp.array(constant)})
+        for constant in [0.0, 1.0, -1.0]
+    ]
+    sweep_trainer = _generate_trainer(str(tmp_path / "sweep"))
+    sweep_results = sweep_trainer.train_sweep(
+        trainer_settings=trainer_settings,
+        parameters=parameters,
+        data=Data(x=X, y=Y),
+        loss_function=_calculate_loss,
+        disable_tqdm=True,
+        regularisation_function=_calculate_regularisation,
+    )
+    assert len(sweep_results) == len(trainer_settings)
+    for index, (sweep_parameters, sweep_post_epoch_history) in enumerate(sweep_results):
+        trainer = _generate_trainer(str(tmp_path / f"separate-{index}"))
+        separate_parameters, separate_post_epoch_history = trainer.train(
+            trainer_settings=trainer_settings[index],
+            parameters=parameters[index],
+            data=Data(x=X, y=Y),
+            loss_function=_calculate_loss,
+            disable_tqdm=True,
+            regularisation_function=_calculate_regularisation,
+        )
+        number_of_steps = trainer.step_losses.shape[0]
+        assert jnp.isclose(sweep_parameters.constant, separate_parameters.constant)
+        assert jnp.allclose(
+            sweep_trainer.step_losses[index, :number_of_steps], trainer.step_losses
+        )
+        assert len(sweep_post_epoch_history) == len(separate_post_epoch_history)
+        for sweep_entry, separate_entry in zip(
+            sweep_post_epoch_history, separate_post_epoch_history
+        ):
+            assert sweep_entry["loss"] == pytest.approx(separate_entry["loss"])
@@ -0,0 +1,253 @@
+import json
+import os
+import subprocess
+import sys
+
+import jax
+import jax.numpy as jnp
+from jax.config import config
+
+from experiments.shared.data import Data
+from experiments.shared.resolvers import regularisation_resolver
+from experiments.shared.schemas import (
+    EmpiricalRiskSchema,
+    OptimiserSchema,
+    RegularisationSchema,
+)
+from experiments.shared.trainer import TrainerSettings
+from experiments.shared.trainers import train_approximate_gp
+from src.gps import ApproximateGPRegression, GPRegression
+from src.kernels.approximate import CholeskySVGPKernel
+from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.means import ConstantMean
+from src.regularisations.projected import CombinedProjectedRegularisation
+
+config.update("jax_enable_x64", True)
+
+REPOSITORY_PATH = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# trains an approximate GP with a regularisation which is not separable over the batch,
+# the Gaussian Wasserstein regularisation with the eigendecomposition term, on one and two devices
+DATA_PARALLEL_TRAINING_SCRIPT = """
+import json
+import tempfile
+
+import jax
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+
+from experiments.shared.data import Data
+from experiments.shared.schemas import (
+    EmpiricalRiskSchema,
+    OptimiserSchema,
+    RegularisationBatchSchema,
+    RegularisationSchema,
+)
+from experiments.shared.trainer import Trainer, TrainerSettings
+from experiments.shared.trainers import train_approximate_gp
+from src.gps import ApproximateGPRegression, GPRegression
+from src.kernels.approximate import CholeskySVGPKernel
+from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.means import ConstantMean
+
+config.update("jax_enable_x64", True)
+
+x = jax.random.normal(jax.random.PRNGKey(0), shape=(16, 2))
+y = jnp.sin(x[:, 0])
+kernel = ARDKernel(number_of_dimensions=2)
+kernel_parameters = ARDKernelParameters(
+    log_scaling=jnp.log(1.0),
+    log_lengthscales=jnp.log(jnp.array([0.5, 0.8])),
+)
+regulariser = GPRegression(mean=ConstantMean(), kernel=kernel, x=x, y=y)
+regulariser_parameters = regulariser.Parameters(
+    log_observation_noise=jnp.log(0.5),
+    mean=ConstantMean().generate_parameters({"constant": 0.0}),
+    kernel=kernel_parameters,
+)
+svgp_kernel = CholeskySVGPKernel(
+    regulariser_kernel=kernel,
+    regulariser_kernel_parameters=kernel_parameters,
+    log_observation_noise=jnp.log(0.5),
+    inducing_points=x[:4],
+    training_points=x,
+    diagonal_regularisation=1e-10,
+)
+gp = ApproximateGPRegression(mean=ConstantMean(), kernel=svgp_kernel)
+gp_parameters = gp.Parameters(
+    log_observation_noise=jnp.log(0.5),
+    mean=ConstantMean().generate_parameters({"constant": 0.0}),
+    kernel=svgp_kernel.generate_parameters(),
+)
+histories = []
+for number_of_devices in [1, 2]:
+    with tempfile.TemporaryDirectory() as checkpoint_path:
+        _, history = train_approximate_gp(
+            data=Data(x=x, y=y),
+            empirical_risk_schema=EmpiricalRiskSchema.negative_log_likelihood,
+            regularisation_config={
+                "regularisation_schema": RegularisationSchema.gaussian_wasserstein,
+                "regularisation_kwargs": {
+                    "mode": "prior",
+                    "include_eigendecomposition": True,
+                },
+            },
+            trainer_settings=TrainerSettings(
+                seed=0,
+                optimiser_schema=OptimiserSchema.adam,
+                learning_rate=0.01,
+                number_of_epochs=2,
+                batch_size=8,
+                batch_shuffle=False,
+                batch_drop_last=False,
+                number_of_devices=number_of_devices,
+            ),
+            approximate_gp=gp,
+            approximate_gp_parameters=gp_parameters,
+            regulariser=regulariser,
+            regulariser_parameters=regulariser_parameters,
+            save_checkpoint_frequency=0,
+            checkpoint_path=checkpoint_path,
+        )
+    histories.append([float(history_["gvi-objective"]) for history_ in history])
+
+# a loss function of the regularisation inputs cannot be sharded
+with tempfile.TemporaryDirectory() as checkpoint_path:
+    with pytest.raises(ValueError, match="regularisation function"):
+        Trainer(
+            save_checkpoint_frequency=0,
+            checkpoint_path=checkpoint_path,
+            post_epoch_callback=lambda parameters: {},
+        ).train(
+            trainer_settings=TrainerSettings(
+                seed=0,
+                optimiser_schema=OptimiserSchema.adam,
+                learning_rate=0.01,
+                number_of_epochs=1,
+                batch_size=8,
+                batch_shuffle=False,
+                batch_drop_last=False,
+                regularisation_batch_schema=RegularisationBatchSchema.uniform,
+                regularisation_batch_size=8,
+                number_of_devices=2,
+            ),
+            parameters=ConstantMean().generate_parameters({"constant": 0.0}),
+            data=Data(x=x, y=y),
+            loss_function=lambda parameters_, x_, y_, x_regularisation: jnp.mean(
+                jnp.square(y_ - parameters_.constant)
+            )
+            + jnp.var(x_regularisation) * jnp.square(parameters_.constant),
+            disable_tqdm=True,
+        )
+print(json.dumps(histories))
+"""
+
+
+def test_data_parallel_approximate_gp_training_matches_single_device():
+    completed_process = subprocess.run(
+        [sys.executable, "-c", DATA_PARALLEL_TRAINING_SCRIPT],
+        cwd=REPOSITORY_PATH,
+        env=dict(
+            os.environ,
+            PYTHONPATH=REPOSITORY_PATH,
+            XLA_FLAGS="--xla_force_host_platform_device_count=2",
+        ),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    single_device_history, data_parallel_history = json.loads(
+        completed_process.stdout.splitlines()[-1]
+    )
+    assert len(single_device_history) == len(data_parallel_history) == 2
+    for single_device_objective, data_parallel_objective in zip(
+        single_device_history, data_parallel_history
+    ):
+        assert abs(single_device_objective - data_parallel_objective) < 1e-10
+
+
+def test_combined_projected_regularisation_logs_every_divergence(tmp_path):
+    x = jax.random.normal(jax.random.PRNGKey(0), shape=(16, 2))
+    y = jnp.sin(x[:, 0])
+    kernel = ARDKernel(number_of_dimensions=2)
+    kernel_parameters = ARDKernelParameters(
+        log_scaling=jnp.log(1.0),
+        log_lengthscales=jnp.log(jnp.array([0.5, 0.8])),
+    )
+    regulariser = GPRegression(mean=ConstantMean(), kernel=kernel, x=x, y=y)
+    regulariser_parameters = regulariser.Parameters(
+        log_observation_noise=jnp.log(0.5),
+        mean=ConstantMean().generate_parameters({"constant": 0.0}),
+        kernel=kernel_parameters,
+    )
+    svgp_kernel = CholeskySVGPKernel(
+        regulariser_kernel=kernel,
+        regulariser_kernel_parameters=kernel_parameters,
+        log_observation_noise=jnp.log(0.5),
+        inducing_points=x[:4],
+        training_points=x,
+        diagonal_regularisation=1e-10,
+    )
+    gp = ApproximateGPRegression(mean=ConstantMean(), kernel=svgp_kernel)
+    gp_parameters = gp.Parameters(
+        mean=ConstantMean().generate_parameters({"constant": 0.0}),
+        kernel=svgp_kernel.generate_parameters(),
+    )
+    regularisation_config = {
+        "regularisation_schema": RegularisationSchema.combined_projected,
+        "regularisation_kwargs": {
+            "mode": "prior",
+            "objective": "projected_renyi",
+            "projected_regularisation_kwargs": {
+                "projected_kl": None,
+                "projected_renyi": {"alpha": 0.3},
+                "projected_hellinger": None,
+            },
+        },
+    }
+    regularisation = regularisation_resolver(
+        regularisation_config=regularisation_config,
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+    )
+    assert isinstance(regularisation, CombinedProjectedRegularisation)
+    assert regularisation.projected_regularisations["projected_renyi"].alpha == 0.3
+    trained_parameters, history = train_approximate_gp(
+        data=Data(x=x, y=y),
+        empirical_risk_schema=EmpiricalRiskSchema.negative_log_likelihood,
+        regularisation_config=regularisation_config,
+        trainer_settings=TrainerSettings(
+            seed=0,
+            optimiser_schema=OptimiserSchema.adam,
+            learning_rate=0.01,
+            number_of_epochs=2,
+            batch_size=8,
+            batch_shuffle=False,
+            batch_drop_last=False,
+        ),
+        approximate_gp=gp,
+        approximate_gp_parameters=gp_parameters,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+        save_checkpoint_frequency=0,
+        checkpoint_path=str(tmp_path),
+    )
+    projected_regularisations = regularisation.calculate_projected_regularisations(
+        parameters=trained_parameters, x=x
+    )
+    for name in ["projected_kl", "projected_renyi", "projected_hellinger"]:
+        assert all(f"regularisation-{name}" in history_ for history_ in history)
+        assert jnp.isclose(
+            history[-1][f"regularisation-{name}"], projected_regularisations[name]
+        )
+    # the objective is the logged regularisation
+    assert all(
+        jnp.isclose(
+            history_["regularisation"], history_["regularisation-projected_renyi"]
+        )
+        for history_ in history
+    )
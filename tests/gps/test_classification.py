@@ -1,3 +1,4 @@
+import jax
 import jax.numpy as jnp
 import pytest
 from jax.config import config
@@ -11,11 +12,16 @@ from mockers.mean import MockMean, MockMeanParameters
 from src.distributions import Multinomial
 from src.gps import ApproximateGPClassification, GPClassification
 from src.kernels import (
+    CoregionalisationKernel,
     MultiOutputKernel,
     MultiOutputKernelParameters,
     TemperedKernel,
     TemperedKernelParameters,
 )
+from src.kernels.approximate import CholeskySVGPKernel
+from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.means import ConstantMean
+from src.utils.precision import DOUBLE_PRECISION_POLICY, MIXED_PRECISION_POLICY
 
 config.update("jax_enable_x64", True)
 
@@ -265,3 +271,291 @@ def test_tempered_approximate_gp_classification_prediction(
         **tempered_gp.predict_probability(tempered_gp_parameters, x=x_test).dict()
     )
     assert jnp.allclose(multinomial.probabilities, probabilities)
+
+
+@pytest.mark.parametrize(
+    "number_of_classes,number_of_points,number_of_inducing_points,number_of_dimensions,log_observation_noise",
+    [
+        [3, 50, 10, 3, jnp.log(1e-2)],
+        [3, 50, 10, 3, jnp.log(1e-8)],
+    ],
+)
+def test_mixed_precision_approximate_gp_classification_prediction(
+    number_of_classes: int,
+    number_of_points: int,
+    number_of_inducing_points: int,
+    number_of_dimensions: int,
+    log_observation_noise: float,
+):
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    x_test = jax.random.normal(
+        jax.random.PRNGKey(1), shape=(number_of_points, number_of_dimensions)
+    )
+    svgp_kernels = [
+        CholeskySVGPKernel(
+            regulariser_kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+            regulariser_kernel_parameters=ARDKernelParameters(
+                log_scaling=0.0,
+                log_lengthscales=jnp.zeros(number_of_dimensions),
+            ),
+            log_observation_noise=log_observation_noise,
+            inducing_points=x[:number_of_inducing_points],
+            training_points=x,
+        )
+        for _ in range(number_of_classes)
+    ]
+    # perturb the initial variational parameters, such that the sigma matrices are not the prior's
+    svgp_kernel_parameters = [
+        jax.tree_util.tree_map(
+            lambda parameter: parameter
+            + 0.1
+            * jax.random.normal(jax.random.PRNGKey(i), shape=jnp.shape(parameter)),
+            svgp_kernel.generate_parameters().dict(),
+        )
+        for i, svgp_kernel in enumerate(svgp_kernels)
+    ]
+    multinomials = []
+    for precision_policy in [DOUBLE_PRECISION_POLICY, MIXED_PRECISION_POLICY]:
+        gp = ApproximateGPClassification(
+            mean=ConstantMean(number_output_dimensions=number_of_classes),
+            kernel=MultiOutputKernel(kernels=svgp_kernels),
+            precision_policy=precision_policy,
+        )
+        parameters = gp.generate_parameters(
+            {
+                "mean": {"constant": jnp.linspace(-0.5, 0.5, number_of_classes)},
+                "kernel": {"kernels": svgp_kernel_parameters},
+            }
+        )
+        multinomials.append(
+            Multinomial(**gp.predict_probability(parameters, x=x_test).dict())
+        )
+    double_precision_multinomial, mixed_precision_multinomial = multinomials
+    assert mixed_precision_multinomial.probabilities.dtype == jnp.float64
+    assert jnp.all(jnp.isfinite(mixed_precision_multinomial.probabilities))
+    assert jnp.allclose(
+        mixed_precision_multinomial.probabilities,
+        double_precision_multinomial.probabilities,
+        atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize(
+    "number_of_classes,number_of_points,number_of_dimensions,log_observation_noise",
+    [
+        [3, 8, 2, jnp.log(jnp.array([0.1, 0.5, 0.2]))],
+        [4, 6, 3, jnp.log(0.3)],
+    ],
+)
+def test_coregionalised_exact_gp_classification_posterior(
+    number_of_classes: int,
+    number_of_points: int,
+    number_of_dimensions: int,
+    log_observation_noise: jnp.ndarray,
+):
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    y = jax.nn.one_hot(
+        jax.random.randint(
+            jax.random.PRNGKey(1), (number_of_points,), 0, number_of_classes
+        ),
+        number_of_classes,
+    )
+    x_test = jax.random.normal(
+        jax.random.PRNGKey(2), shape=(number_of_points - 1, number_of_dimensions)
+    )
+    kernel = CoregionalisationKernel(
+        kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+        number_output_dimensions=number_of_classes,
+    )
+    gp = GPClassification(
+        mean=ConstantMean(number_output_dimensions=number_of_classes),
+        kernel=kernel,
+        x=x,
+        y=y,
+    )
+    parameters = gp.generate_parameters(
+        {
+            "log_observation_noise": log_observation_noise,
+            "mean": {"constant": jnp.zeros(number_of_classes)},
+            "kernel": {
+                "kernel": {
+                    "log_scaling": 0.0,
+                    "log_lengthscales": jnp.zeros(number_of_dimensions),
+                },
+                "coregionalisation_factor": jax.random.normal(
+                    jax.random.PRNGKey(3), shape=(number_of_classes, 2)
+                ),
+                "log_coregionalisation_diagonal": jnp.zeros(number_of_classes),
+            },
+        }
+    )
+
+    # the posterior of the stacked outputs with a dense joint prior covariance
+    coregionalisation_matrix = kernel.calculate_coregionalisation_matrix(
+        parameters.kernel
+    )
+    gram = kernel.kernel.calculate_gram(
+        parameters.kernel.kernel, x1=jnp.concatenate((x, x_test))
+    )
+    joint_gram = jnp.kron(coregionalisation_matrix, gram).reshape(
+        number_of_classes,
+        2 * number_of_points - 1,
+        number_of_classes,
+        2 * number_of_points - 1,
+    )
+    joint_gram_train = joint_gram[:, :number_of_points, :, :number_of_points].reshape(
+        number_of_classes * number_of_points, -1
+    ) + jnp.kron(
+        jnp.diag(
+            jnp.broadcast_to(jnp.exp(log_observation_noise), (number_of_classes,))
+        ),
+        jnp.eye(number_of_points),
+    )
+    joint_gram_train_x = joint_gram[:, :number_of_points, :, number_of_points:].reshape(
+        number_of_classes * number_of_points, -1
+    )
+    joint_gram_x = joint_gram[:, number_of_points:, :, number_of_points:].reshape(
+        number_of_classes * (number_of_points - 1), -1
+    )
+    mean = joint_gram_train_x.T @ jnp.linalg.solve(joint_gram_train, y.T.reshape(-1))
+    covariance = joint_gram_x - joint_gram_train_x.T @ jnp.linalg.solve(
+        joint_gram_train, joint_gram_train_x
+    )
+    # (k, m, m), the covariance of each output
+    covariance = jnp.einsum(
+        "iaib->iab",
+        covariance.reshape(
+            number_of_classes,
+            number_of_points - 1,
+            number_of_classes,
+            number_of_points - 1,
+        ),
+    )
+
+    posterior_mean, posterior_covariance = gp.calculate_posterior(
+        parameters, x_train=x, y_train=y, x=x_test
+    )
+    assert jnp.allclose(posterior_mean, mean.reshape(number_of_classes, -1))
+    assert jnp.allclose(posterior_covariance, covariance)
+    posterior_mean, posterior_covariance = gp.calculate_posterior(
+        parameters, x_train=x, y_train=y, x=x_test, full_covariance=False
+    )
+    assert jnp.allclose(posterior_mean, mean.reshape(number_of_classes, -1))
+    assert jnp.allclose(
+        posterior_covariance, jnp.diagonal(covariance, axis1=1, axis2=2)
+    )
+    probabilities = gp.predict_probability(parameters, x=x_test).probabilities
+    assert probabilities.shape == (number_of_points - 1, number_of_classes)
+    assert jnp.allclose(jnp.sum(probabilities, axis=1), 1)
+    assert jnp.isclose(
+        gp.calculate_prior_covariance_operator(parameters, x=x).logdet(),
+        jnp.linalg.slogdet(joint_gram_train)[1],
+    )
+
+
+@pytest.mark.parametrize(
+    "number_of_classes,log_tempering_factor",
+    [
+        [3, jnp.log(jnp.array([0.5, 2.0, 1.5]))],
+        [4, jnp.log(3.0)],
+    ],
+)
+def test_tempered_coregionalised_exact_gp_classification_posterior(
+    number_of_classes: int,
+    log_tempering_factor: jnp.ndarray,
+):
+    number_of_points, number_of_dimensions = 7, 2
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    y = jax.nn.one_hot(
+        jax.random.randint(
+            jax.random.PRNGKey(1), (number_of_points,), 0, number_of_classes
+        ),
+        number_of_classes,
+    )
+    x_test = jax.random.normal(
+        jax.random.PRNGKey(2), shape=(number_of_points - 1, number_of_dimensions)
+    )
+    log_observation_noise = jnp.log(0.2)
+    coregionalisation_factor = jax.random.normal(
+        jax.random.PRNGKey(3), shape=(number_of_classes, 2)
+    )
+    base_kernel = CoregionalisationKernel(
+        kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+        number_output_dimensions=number_of_classes,
+    )
+    base_kernel_parameters = base_kernel.generate_parameters(
+        {
+            "kernel": {
+                "log_scaling": 0.0,
+                "log_lengthscales": jnp.zeros(number_of_dimensions),
+            },
+            "coregionalisation_factor": coregionalisation_factor,
+            "log_coregionalisation_diagonal": jnp.zeros(number_of_classes),
+        }
+    )
+    tempered_gp = GPClassification(
+        mean=ConstantMean(number_output_dimensions=number_of_classes),
+        kernel=TemperedKernel(
+            base_kernel=base_kernel,
+            base_kernel_parameters=base_kernel_parameters,
+            number_output_dimensions=number_of_classes,
+        ),
+        x=x,
+        y=y,
+    )
+    tempered_gp_parameters = tempered_gp.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=tempered_gp.mean.generate_parameters(
+            {"constant": jnp.zeros(number_of_classes)}
+        ),
+        kernel=TemperedKernelParameters(log_tempering_factor=log_tempering_factor),
+    )
+
+    # tempering the outputs with D scales the coregionalisation matrix to D^1/2 B D^1/2
+    tempering_factor = jnp.broadcast_to(
+        jnp.exp(log_tempering_factor), (number_of_classes,)
+    )
+    gp = GPClassification(
+        mean=ConstantMean(number_output_dimensions=number_of_classes),
+        kernel=base_kernel,
+        x=x,
+        y=y,
+    )
+    gp_parameters = gp.generate_parameters(
+        {
+            "log_observation_noise": log_observation_noise,
+            "mean": {"constant": jnp.zeros(number_of_classes)},
+            "kernel": {
+                "kernel": {
+                    "log_scaling": 0.0,
+                    "log_lengthscales": jnp.zeros(number_of_dimensions),
+                },
+                "coregionalisation_factor": jnp.sqrt(tempering_factor)[:, None]
+                * coregionalisation_factor,
+                "log_coregionalisation_diagonal": jnp.log(tempering_factor),
+            },
+        }
+    )
+    for full_covariance in [True, False]:
+        tempered_mean, tempered_covariance = tempered_gp.calculate_posterior(
+            tempered_gp_parameters,
+            x_train=x,
+            y_train=y,
+            x=x_test,
+            full_covariance=full_covariance,
+        )
+        mean, covariance = gp.calculate_posterior(
+            gp_parameters,
+            x_train=x,
+            y_train=y,
+            x=x_test,
+            full_covariance=full_covariance,
+        )
+        assert jnp.allclose(tempered_mean, mean)
+        assert jnp.allclose(tempered_covariance, covariance)
@@ -1,3 +1,4 @@
+import jax
 import jax.numpy as jnp
 import pytest
 from jax.config import config
@@ -6,7 +7,25 @@ from mockers.kernel import MockKernel, MockKernelParameters
 from mockers.mean import MockMean, MockMeanParameters
 from src.distributions import Gaussian
 from src.gps import ApproximateGPRegression, GPRegression
-from src.kernels import TemperedKernel, TemperedKernelParameters
+from src.kernels import (
+    GridInterpolationKernel,
+    TemperedKernel,
+    TemperedKernelParameters,
+)
+from src.kernels.approximate import (
+    CholeskySVGPKernel,
+    DiagonalSVGPKernel,
+    LogSVGPKernel,
+)
+from src.kernels.standard import ARDKernel, ARDKernelParameters
+from src.means import ConstantMean
+from src.utils.linear_operators import (
+    DenseLinearOperator,
+    DiagonalLinearOperator,
+    LowRankUpdateLinearOperator,
+    ScaledIdentityLinearOperator,
+)
+from src.utils.precision import DOUBLE_PRECISION_POLICY, MIXED_PRECISION_POLICY
 
 config.update("jax_enable_x64", True)
 
@@ -370,3 +389,362 @@ def test_tempered_approximate_gp_regression_prediction_covariance(
         ).dict()
     )
     assert jnp.array_equal(gaussian.covariance, covariance)
+
+
+@pytest.mark.parametrize(
+    "number_of_points,number_of_dimensions,log_observation_noise",
+    [
+        [50, 3, jnp.log(1e-2)],
+        [50, 3, jnp.log(1e-8)],
+    ],
+)
+def test_mixed_precision_exact_gp_regression_prediction(
+    number_of_points: int,
+    number_of_dimensions: int,
+    log_observation_noise: float,
+):
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    y = jnp.sin(jnp.sum(x, axis=1))
+    x_test = jax.random.normal(
+        jax.random.PRNGKey(1), shape=(number_of_points, number_of_dimensions)
+    )
+    gaussians = []
+    for precision_policy in [DOUBLE_PRECISION_POLICY, MIXED_PRECISION_POLICY]:
+        gp = GPRegression(
+            mean=ConstantMean(),
+            kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+            x=x,
+            y=y,
+            precision_policy=precision_policy,
+        )
+        parameters = gp.generate_parameters(
+            {
+                "log_observation_noise": log_observation_noise,
+                "mean": {"constant": 0.0},
+                "kernel": {
+                    "log_scaling": 0.0,
+                    "log_lengthscales": jnp.zeros(number_of_dimensions),
+                },
+            }
+        )
+        gaussians.append(
+            Gaussian(**gp.predict_probability(parameters, x=x_test).dict())
+        )
+    double_precision_gaussian, mixed_precision_gaussian = gaussians
+    assert mixed_precision_gaussian.mean.dtype == jnp.float64
+    assert jnp.all(jnp.isfinite(mixed_precision_gaussian.mean))
+    assert jnp.all(jnp.isfinite(mixed_precision_gaussian.covariance))
+    assert jnp.allclose(
+        mixed_precision_gaussian.mean, double_precision_gaussian.mean, atol=1e-4
+    )
+    assert jnp.allclose(
+        mixed_precision_gaussian.covariance,
+        double_precision_gaussian.covariance,
+        atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize(
+    "svgp_kernel_type", [CholeskySVGPKernel, DiagonalSVGPKernel, LogSVGPKernel]
+)
+@pytest.mark.parametrize(
+    "number_of_points,number_of_inducing_points,number_of_dimensions,log_observation_noise",
+    [
+        [50, 10, 3, jnp.log(1e-2)],
+        [50, 10, 3, jnp.log(1e-8)],
+    ],
+)
+def test_mixed_precision_approximate_gp_regression_prediction(
+    svgp_kernel_type: type,
+    number_of_points: int,
+    number_of_inducing_points: int,
+    number_of_dimensions: int,
+    log_observation_noise: float,
+):
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    x_test = jax.random.normal(
+        jax.random.PRNGKey(1), shape=(number_of_points, number_of_dimensions)
+    )
+    svgp_kernel = svgp_kernel_type(
+        regulariser_kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+        regulariser_kernel_parameters=ARDKernelParameters(
+            log_scaling=0.0,
+            log_lengthscales=jnp.zeros(number_of_dimensions),
+        ),
+        log_observation_noise=log_observation_noise,
+        inducing_points=x[:number_of_inducing_points],
+        training_points=x,
+    )
+    # perturb the initial variational parameters, such that the sigma matrix is not the prior's
+    svgp_kernel_parameters = jax.tree_util.tree_map(
+        lambda parameter: parameter
+        + 0.1 * jax.random.normal(jax.random.PRNGKey(2), shape=jnp.shape(parameter)),
+        svgp_kernel.generate_parameters().dict(),
+    )
+    gaussians = []
+    for precision_policy in [DOUBLE_PRECISION_POLICY, MIXED_PRECISION_POLICY]:
+        gp = ApproximateGPRegression(
+            mean=ConstantMean(),
+            kernel=svgp_kernel,
+            precision_policy=precision_policy,
+        )
+        parameters = gp.generate_parameters(
+            {
+                "mean": {"constant": 0.5},
+                "kernel": svgp_kernel_parameters,
+            }
+        )
+        gaussians.append(
+            Gaussian(**gp.predict_probability(parameters, x=x_test).dict())
+        )
+    double_precision_gaussian, mixed_precision_gaussian = gaussians
+    assert mixed_precision_gaussian.mean.dtype == jnp.float64
+    assert mixed_precision_gaussian.covariance.dtype == jnp.float64
+    assert jnp.all(jnp.isfinite(mixed_precision_gaussian.covariance))
+    assert jnp.allclose(
+        mixed_precision_gaussian.mean, double_precision_gaussian.mean, atol=1e-4
+    )
+    assert jnp.allclose(
+        mixed_precision_gaussian.covariance,
+        double_precision_gaussian.covariance,
+        atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize(
+    "number_of_points,number_of_dimensions,log_observation_noise",
+    [
+        [10, 3, jnp.log(1e-2)],
+    ],
+)
+def test_exact_gp_regression_prior_covariance_operator(
+    number_of_points: int,
+    number_of_dimensions: int,
+    log_observation_noise: float,
+):
+    x = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_points, number_of_dimensions)
+    )
+    y = jnp.sin(jnp.sum(x, axis=1))
+    gp = GPRegression(
+        mean=ConstantMean(),
+        kernel=ARDKernel(number_of_dimensions=number_of_dimensions),
+        x=x,
+        y=y,
+    )
+    parameters = gp.generate_parameters(
+        {
+            "log_observation_noise": log_observation_noise,
+            "mean": {"constant": 0.0},
+            "kernel": {
+                "log_scaling": 0.0,
+                "log_lengthscales": jnp.zeros(number_of_dimensions),
+            },
+        }
+    )
+    prior_covariance = gp.kernel.calculate_gram(
+        parameters.kernel, x1=x, x2=x
+    ) + jnp.exp(log_observation_noise) * jnp.eye(number_of_points)
+    prior_covariance_operator = gp.calculate_prior_covariance_operator(parameters, x=x)
+    assert jnp.allclose(prior_covariance_operator.to_dense(), prior_covariance)
+    assert jnp.allclose(
+        prior_covariance_operator.solve(y[:, None]),
+        jnp.linalg.solve(prior_covariance, y[:, None]),
+    )
+    assert jnp.isclose(
+        prior_covariance_operator.logdet(),
+        jnp.linalg.slogdet(prior_covariance)[1],
+    )
+
+
+@pytest.mark.parametrize(
+    "number_of_points,number_of_test_points,rank,observation_noise",
+    [
+        [8, 3, 2, 1e-2],
+    ],
+)
+def test_exact_gp_posterior_matrices_of_structured_gram_operator(
+    number_of_points: int,
+    number_of_test_points: int,
+    rank: int,
+    observation_noise: float,
+):
+    x = jax.random.normal(jax.random.PRNGKey(0), shape=(number_of_points, 1))
+    gp = GPRegression(
+        mean=ConstantMean(),
+        kernel=ARDKernel(number_of_dimensions=1),
+        x=x,
+        y=jnp.sin(x[:, 0]),
+    )
+    gram_train_operator = LowRankUpdateLinearOperator(
+        base=DiagonalLinearOperator(jnp.linspace(0.5, 1.5, number_of_points)),
+        factor=jax.random.normal(jax.random.PRNGKey(1), shape=(number_of_points, rank)),
+        core=jnp.eye(rank),
+    )
+    observation_noise_operator = ScaledIdentityLinearOperator(
+        jnp.array(observation_noise), dimension=number_of_points
+    )
+    gram_train_x = jax.random.normal(
+        jax.random.PRNGKey(2), shape=(number_of_points, number_of_test_points)
+    )
+    gram_x = jnp.eye(number_of_test_points)
+    y_train = jnp.sin(x[:, 0])
+    structured_mean, structured_covariance = gp.calculate_posterior_matrices_of_kernel(
+        gram_train_operator=gram_train_operator,
+        observation_noise_operator=observation_noise_operator,
+        gram_train_x=gram_train_x,
+        gram_x=gram_x,
+        y_train=y_train,
+    )
+    dense_mean, dense_covariance = gp.calculate_posterior_matrices_of_kernel(
+        gram_train_operator=DenseLinearOperator(gram_train_operator.to_dense()),
+        observation_noise_operator=observation_noise_operator,
+        gram_train_x=gram_train_x,
+        gram_x=gram_x,
+        y_train=y_train,
+    )
+    prior_covariance = gram_train_operator.to_dense() + observation_noise * jnp.eye(
+        number_of_points
+    )
+    assert jnp.allclose(
+        structured_mean, gram_train_x.T @ jnp.linalg.solve(prior_covariance, y_train)
+    )
+    assert jnp.allclose(
+        structured_covariance,
+        gram_x - gram_train_x.T @ jnp.linalg.solve(prior_covariance, gram_train_x),
+    )
+    assert jnp.allclose(structured_mean, dense_mean)
+    assert jnp.allclose(structured_covariance, dense_covariance)
+
+
+@pytest.mark.parametrize(
+    "number_of_points,grid_size,number_of_test_points,log_observation_noise",
+    [
+        [200, 100, 7, jnp.log(1e-2)],
+        [200, 100, 120, jnp.log(1e-2)],
+    ],
+)
+def test_grid_interpolation_exact_gp_regression(
+    number_of_points: int,
+    grid_size: int,
+    number_of_test_points: int,
+    log_observation_noise: float,
+):
+    x = jax.random.uniform(
+        jax.random.PRNGKey(0), shape=(number_of_points, 1), minval=-3, maxval=3
+    )
+    y = jnp.sin(2 * x[:, 0])
+    x_test = jnp.linspace(-3, 3, number_of_test_points).reshape(-1, 1)
+    gaussians = []
+    posteriors = []
+    for kernel in [
+        ARDKernel(number_of_dimensions=1),
+        GridInterpolationKernel(
+            kernel=ARDKernel(number_of_dimensions=1),
+            grid_bounds=[(-3.0, 3.0)],
+            grid_size=grid_size,
+        ),
+    ]:
+        gp = GPRegression(mean=ConstantMean(), kernel=kernel, x=x, y=y)
+        kernel_parameters = {"log_scaling": 0.0, "log_lengthscales": jnp.zeros(1)}
+        parameters = gp.generate_parameters(
+            {
+                "log_observation_noise": log_observation_noise,
+                "mean": {"constant": 0.0},
+                "kernel": kernel_parameters
+                if isinstance(kernel, ARDKernel)
+                else {"kernel": kernel_parameters},
+            }
+        )
+        gaussians.append(
+            Gaussian(**gp.predict_probability(parameters, x=x_test).dict())
+        )
+        posteriors.append(
+            gp.calculate_posterior(parameters, x_train=x, y_train=y, x=x_test)
+        )
+    dense_gaussian, grid_interpolation_gaussian = gaussians
+    assert jnp.allclose(
+        grid_interpolation_gaussian.mean, dense_gaussian.mean, atol=1e-4
+    )
+    assert jnp.allclose(
+        grid_interpolation_gaussian.covariance, dense_gaussian.covariance, atol=1e-4
+    )
+    (dense_mean, dense_covariance), (
+        grid_interpolation_mean,
+        grid_interpolation_covariance,
+    ) = posteriors
+    assert jnp.allclose(grid_interpolation_mean, dense_mean, atol=1e-4)
+    assert jnp.allclose(grid_interpolation_covariance, dense_covariance, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "number_of_points,grid_size,log_observation_noise,log_tempering_factor",
+    [
+        [200, 100, jnp.log(1e-2), jnp.log(2.0)],
+        [150, 80, jnp.log(5e-2), jnp.log(0.5)],
+    ],
+)
+def test_tempered_grid_interpolation_exact_gp_regression(
+    number_of_points: int,
+    grid_size: int,
+    log_observation_noise: float,
+    log_tempering_factor: float,
+):
+    x = jax.random.uniform(
+        jax.random.PRNGKey(0), shape=(number_of_points, 1), minval=-3, maxval=3
+    )
+    y = jnp.sin(2 * x[:, 0])
+    x_test = jnp.linspace(-3, 3, 7).reshape(-1, 1)
+    kernel_parameters = ARDKernelParameters(
+        log_scaling=0.0, log_lengthscales=jnp.zeros(1)
+    )
+    posteriors = []
+    for base_kernel, base_kernel_parameters in [
+        (ARDKernel(number_of_dimensions=1), kernel_parameters),
+        (
+            GridInterpolationKernel(
+                kernel=ARDKernel(number_of_dimensions=1),
+                grid_bounds=[(-3.0, 3.0)],
+                grid_size=grid_size,
+            ),
+            GridInterpolationKernel.Parameters(kernel=kernel_parameters),
+        ),
+    ]:
+        gp = GPRegression(
+            mean=ConstantMean(),
+            kernel=TemperedKernel(
+                base_kernel=base_kernel,
+                base_kernel_parameters=base_kernel_parameters,
+                number_output_dimensions=1,
+            ),
+            x=x,
+            y=y,
+        )
+        parameters = gp.Parameters(
+            log_observation_noise=log_observation_noise,
+            mean=gp.mean.generate_parameters({"constant": 0.0}),
+            kernel=TemperedKernelParameters(log_tempering_factor=log_tempering_factor),
+        )
+        posteriors.append(
+            [
+                gp.calculate_posterior(
+                    parameters,
+                    x_train=x,
+                    y_train=y,
+                    x=x_test,
+                    full_covariance=full_covariance,
+                )
+                for full_covariance in [True, False]
+            ]
+        )
+    assert gp.kernel.has_structured_posterior
+    for (dense_mean, dense_covariance), (
+        grid_interpolation_mean,
+        grid_interpolation_covariance,
+    ) in zip(*posteriors):
+        assert jnp.allclose(grid_interpolation_mean, dense_mean, atol=1e-4)
+        assert jnp.allclose(grid_interpolation_covariance, dense_covariance, atol=1e-4)
@@ -1,14 +1,25 @@
 from typing import Dict
 
 import jax.numpy as jnp
+import jax.scipy as jsp
 import pytest
 from jax.config import config
 from mock import Mock
 
 from mockers.kernel import MockKernel, MockKernelParameters
-from src.kernels import CustomKernel, MultiOutputKernel
+from src.kernels import (
+    CoregionalisationKernel,
+    CustomKernel,
+    GridInterpolationKernel,
+    MultiOutputKernel,
+)
 from src.kernels.non_stationary import InnerProductKernel, PolynomialKernel
 from src.kernels.standard import ARDKernel
+from src.utils.linear_operators import (
+    BlockDiagonalLinearOperator,
+    GridInterpolationLinearOperator,
+    KroneckerLinearOperator,
+)
 
 config.update("jax_enable_x64", True)
 
@@ -378,3 +389,238 @@ def test_multi_output_kernel_diagonal_grams(
         ),
         k,
     )
+
+
+@pytest.mark.parametrize(
+    "kernel,parameters,x",
+    [
+        [
+            MultiOutputKernel(
+                kernels=[
+                    ARDKernel(number_of_dimensions=3),
+                    ARDKernel(number_of_dimensions=3),
+                ]
+            ),
+            {
+                "kernels": [
+                    {"log_scaling": 0.0, "log_lengthscales": jnp.zeros(3)},
+                    {"log_scaling": 0.5, "log_lengthscales": jnp.ones(3)},
+                ]
+            },
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                    [0.5, 1.5, 2.0],
+                ]
+            ),
+        ],
+    ],
+)
+def test_multi_output_kernel_gram_operator(
+    kernel: MultiOutputKernel,
+    parameters: Dict,
+    x: jnp.ndarray,
+):
+    parameters = kernel.generate_parameters(parameters)
+    gram_operator = kernel.calculate_gram_operator(parameters, x=x)
+    assert isinstance(gram_operator, BlockDiagonalLinearOperator)
+    assert jnp.allclose(
+        gram_operator.to_dense(),
+        jsp.linalg.block_diag(*kernel.calculate_gram(parameters, x1=x, x2=x)),
+    )
+
+
+@pytest.mark.parametrize(
+    "parameters,x",
+    [
+        [
+            {
+                "kernel": {"log_scaling": 0.0, "log_lengthscales": jnp.zeros(3)},
+                "coregionalisation_factor": jnp.array([[1.0], [0.5]]),
+                "log_coregionalisation_diagonal": jnp.log(jnp.array([0.1, 0.2])),
+            },
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                    [0.5, 1.5, 2.0],
+                ]
+            ),
+        ],
+    ],
+)
+def test_coregionalisation_kernel_grams(
+    parameters: Dict,
+    x: jnp.ndarray,
+):
+    kernel = CoregionalisationKernel(
+        kernel=ARDKernel(number_of_dimensions=3),
+        number_output_dimensions=2,
+    )
+    parameters = kernel.generate_parameters(parameters)
+    coregionalisation_matrix = jnp.array([[1.1, 0.5], [0.5, 0.45]])
+    gram = kernel.kernel.calculate_gram(parameters.kernel, x1=x, x2=x)
+    assert jnp.allclose(
+        kernel.calculate_coregionalisation_matrix(parameters),
+        coregionalisation_matrix,
+    )
+    assert jnp.allclose(
+        kernel.calculate_gram(parameters, x1=x, x2=x),
+        jnp.diag(coregionalisation_matrix)[:, None, None] * gram,
+    )
+    assert jnp.allclose(
+        kernel.calculate_gram(parameters, x1=x, x2=x, full_covariance=False),
+        jnp.diag(coregionalisation_matrix)[:, None] * jnp.diag(gram),
+    )
+    gram_operator = kernel.calculate_gram_operator(parameters, x=x)
+    assert isinstance(gram_operator, KroneckerLinearOperator)
+    assert jnp.allclose(
+        gram_operator.to_dense(), jnp.kron(coregionalisation_matrix, gram)
+    )
+
+
+@pytest.mark.parametrize(
+    "parameters,log_observation_noise,x_train,y_train,x",
+    [
+        [
+            {
+                "kernel": {"log_scaling": 0.0, "log_lengthscales": jnp.zeros(3)},
+                "coregionalisation_factor": jnp.array([[1.0], [0.5], [-0.3]]),
+                "log_coregionalisation_diagonal": jnp.log(jnp.array([0.1, 0.2, 0.3])),
+            },
+            jnp.log(jnp.array([0.1, 0.2, 0.05])),
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                    [0.5, 1.5, 2.0],
+                    [0.0, 1.0, 2.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 0.5, -0.2],
+                    [1.5, 0.7, 0.1],
+                    [0.2, -0.3, 0.4],
+                    [-0.5, 0.1, 0.9],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.2, 2.1, 3.0],
+                    [0.1, 1.2, 2.3],
+                ]
+            ),
+        ],
+    ],
+)
+def test_coregionalisation_kernel_structured_posterior(
+    parameters: Dict,
+    log_observation_noise: jnp.ndarray,
+    x_train: jnp.ndarray,
+    y_train: jnp.ndarray,
+    x: jnp.ndarray,
+):
+    kernel = CoregionalisationKernel(
+        kernel=ARDKernel(number_of_dimensions=3),
+        number_output_dimensions=3,
+    )
+    parameters = kernel.generate_parameters(parameters)
+    coregionalisation_matrix = kernel.calculate_coregionalisation_matrix(parameters)
+    gram_train = kernel.kernel.calculate_gram(parameters.kernel, x1=x_train, x2=x_train)
+    gram_train_x = kernel.kernel.calculate_gram(parameters.kernel, x1=x_train, x2=x)
+    gram_x = kernel.kernel.calculate_gram(parameters.kernel, x1=x, x2=x)
+
+    # dense reference of the stacked outputs
+    prior_covariance = jnp.kron(coregionalisation_matrix, gram_train) + jnp.kron(
+        jnp.diag(jnp.exp(log_observation_noise)), jnp.eye(x_train.shape[0])
+    )
+    cross_covariance = jnp.kron(coregionalisation_matrix, gram_train_x)
+    mean = (
+        cross_covariance.T @ jnp.linalg.solve(prior_covariance, y_train.T.reshape(-1))
+    ).reshape(3, x.shape[0])
+    covariance = jnp.kron(
+        coregionalisation_matrix, gram_x
+    ) - cross_covariance.T @ jnp.linalg.solve(prior_covariance, cross_covariance)
+    covariance = jnp.stack(
+        [
+            covariance[
+                i * x.shape[0] : (i + 1) * x.shape[0],
+                i * x.shape[0] : (i + 1) * x.shape[0],
+            ]
+            for i in range(3)
+        ]
+    )
+    for full_covariance in [True, False]:
+        structured_mean, structured_covariance = kernel.calculate_structured_posterior(
+            parameters=parameters,
+            x_train=x_train,
+            y_train=y_train,
+            x=x,
+            log_observation_noise=log_observation_noise,
+            full_covariance=full_covariance,
+            linear_algebra_dtype="float64",
+        )
+        assert jnp.allclose(structured_mean, mean)
+        assert jnp.allclose(
+            structured_covariance,
+            covariance
+            if full_covariance
+            else jnp.diagonal(covariance, axis1=1, axis2=2),
+        )
+
+
+@pytest.mark.parametrize(
+    "parameters,grid_bounds,grid_size,x1,x2",
+    [
+        [
+            {"kernel": {"log_scaling": jnp.log(2.0), "log_lengthscales": jnp.zeros(1)}},
+            [(-2.0, 2.0)],
+            100,
+            jnp.array([[-1.5], [0.0], [0.37], [1.9]]),
+            jnp.array([[-0.2], [1.1]]),
+        ],
+        [
+            {
+                "kernel": {
+                    "log_scaling": 0.0,
+                    "log_lengthscales": jnp.log(jnp.array([1.0, 2.0])),
+                }
+            },
+            [(-2.0, 2.0), (0.0, 5.0)],
+            [60, 40],
+            jnp.array([[-1.5, 0.3], [0.0, 4.9], [0.37, 2.2]]),
+            jnp.array([[-0.2, 1.0], [1.1, 3.3], [1.8, 0.1], [0.5, 2.5]]),
+        ],
+    ],
+)
+def test_grid_interpolation_kernel_grams(
+    parameters: Dict,
+    grid_bounds,
+    grid_size,
+    x1: jnp.ndarray,
+    x2: jnp.ndarray,
+):
+    kernel = GridInterpolationKernel(
+        kernel=ARDKernel(number_of_dimensions=x1.shape[1]),
+        grid_bounds=grid_bounds,
+        grid_size=grid_size,
+    )
+    parameters = kernel.generate_parameters(parameters)
+    gram = kernel.calculate_gram(parameters, x1=x1, x2=x2)
+    assert jnp.allclose(
+        gram,
+        kernel.kernel.calculate_gram(parameters.kernel, x1=x1, x2=x2),
+        atol=1e-3,
+    )
+    assert jnp.allclose(
+        kernel.calculate_gram(parameters, x1=x1, x2=x1, full_covariance=False),
+        jnp.diag(kernel.calculate_gram(parameters, x1=x1, x2=x1)),
+    )
+    gram_operator = kernel.calculate_gram_operator(parameters, x=x2)
+    assert isinstance(gram_operator, GridInterpolationLinearOperator)
+    assert jnp.allclose(
+        gram_operator.to_dense(),
+        kernel.calculate_gram(parameters, x1=x2, x2=x2),
+    )
@@ -1,3 +1,5 @@
+from typing import Dict
+
 import pytest
 from jax import numpy as jnp
 from jax.config import config
@@ -13,10 +15,43 @@ from src.kernels.approximate import (
     KernelisedSVGPKernel,
     LogSVGPKernel,
 )
+from src.kernels.standard import ARDKernel
+from src.utils.linear_operators import LowRankUpdateLinearOperator
 
 config.update("jax_enable_x64", True)
 
 
+@pytest.mark.parametrize(
+    "el_matrix_lower_triangle,el_matrix_log_diagonal",
+    [
+        [
+            jnp.array(
+                [
+                    [0.0, 0.0, 0.0],
+                    [0.3, 0.0, 0.0],
+                    [-1.2, 0.7, 0.0],
+                ]
+            ),
+            jnp.array([0.1, -0.5, 0.9]),
+        ],
+    ],
+)
+def test_cholesky_svgp_el_matrix_parameters_inverse(
+    el_matrix_lower_triangle: jnp.ndarray,
+    el_matrix_log_diagonal: jnp.ndarray,
+):
+    sigma_matrix = CholeskySVGPKernel._calculate_sigma_matrix_from_el_matrix_parameters(
+        el_matrix_lower_triangle=el_matrix_lower_triangle,
+        el_matrix_log_diagonal=el_matrix_log_diagonal,
+    )
+    (
+        actual_el_matrix_lower_triangle,
+        actual_el_matrix_log_diagonal,
+    ) = CholeskySVGPKernel._calculate_el_matrix_parameters(sigma_matrix)
+    assert jnp.allclose(actual_el_matrix_lower_triangle, el_matrix_lower_triangle)
+    assert jnp.allclose(actual_el_matrix_log_diagonal, el_matrix_log_diagonal)
+
+
 @pytest.mark.parametrize(
     "x_train,x_inducing,target_el_matrix_log_diagonal",
     [
@@ -434,3 +469,75 @@ def test_kernelised_svgp_kernel_grams(
         ),
         k,
     )
+
+
+@pytest.mark.parametrize(
+    "svgp_kernel_class,parameters,x_train,x_inducing,x",
+    [
+        [
+            svgp_kernel_class,
+            parameters,
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [5.0, 1.0, 9.0],
+                    [1.5, 2.5, 3.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [5.0, 1.0, 9.0],
+                    [1.5, 2.5, 3.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [5.3, 5.0, 6.0],
+                    [2.5, 4.5, 2.5],
+                    [1.0, 2.0, 3.5],
+                ]
+            ),
+        ]
+        for svgp_kernel_class, parameters in [
+            [
+                CholeskySVGPKernel,
+                {
+                    "el_matrix_lower_triangle": jnp.array([[0.0, 0.0], [0.3, 0.0]]),
+                    "el_matrix_log_diagonal": jnp.array([0.1, -0.5]),
+                },
+            ],
+            [
+                DiagonalSVGPKernel,
+                {"log_el_matrix_diagonal": jnp.array([0.1, -0.5])},
+            ],
+            [
+                LogSVGPKernel,
+                {"log_el_matrix": jnp.array([[0.1, 0.3], [0.3, -0.5]])},
+            ],
+        ]
+    ],
+)
+def test_svgp_kernel_gram_operator(
+    svgp_kernel_class,
+    parameters: Dict,
+    x_train: jnp.ndarray,
+    x_inducing: jnp.ndarray,
+    x: jnp.ndarray,
+):
+    regulariser_kernel = ARDKernel(number_of_dimensions=3)
+    svgp_kernel = svgp_kernel_class(
+        regulariser_kernel_parameters=regulariser_kernel.generate_parameters(
+            {"log_scaling": 0.0, "log_lengthscales": jnp.ones(3)}
+        ),
+        log_observation_noise=jnp.log(1),
+        regulariser_kernel=regulariser_kernel,
+        inducing_points=x_inducing,
+        training_points=x_train,
+    )
+    parameters = svgp_kernel.generate_parameters(parameters)
+    gram_operator = svgp_kernel.calculate_gram_operator(parameters, x=x)
+    assert isinstance(gram_operator, LowRankUpdateLinearOperator)
+    assert jnp.allclose(
+        gram_operator.to_dense(),
+        svgp_kernel.calculate_gram(parameters, x1=x, x2=x),
+    )
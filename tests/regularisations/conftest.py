@@ -0,0 +1,6 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def run_with_and_without_validation(validation_mode):
+    yield
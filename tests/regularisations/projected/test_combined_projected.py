@@ -0,0 +1,120 @@
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+
+from mockers.kernel import MockKernel, MockKernelParameters
+from mockers.mean import MockMean, MockMeanParameters
+from src.gps import ApproximateGPClassification, GPClassification
+from src.kernels import MultiOutputKernel, MultiOutputKernelParameters
+from src.regularisations.projected import (
+    CombinedProjectedRegularisation,
+    ProjectedBhattacharyyaRegularisation,
+    ProjectedGaussianWassersteinRegularisation,
+    ProjectedHellingerRegularisation,
+    ProjectedKLRegularisation,
+    ProjectedRenyiRegularisation,
+)
+from src.regularisations.schemas import RegularisationMode
+
+config.update("jax_enable_x64", True)
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,number_of_classes,x_train,y_train,x,objective",
+    [
+        [
+            jnp.log(jnp.array([0.1, 0.2, 0.4, 1.8])),
+            4,
+            jnp.array(
+                [
+                    [1.0, 3.0, 2.0],
+                    [1.5, 1.5, 9.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.5, 0.1, 0.2, 0.2],
+                    [0.1, 0.2, 0.3, 0.4],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                ]
+            ),
+            "hellinger",
+        ],
+    ],
+)
+def test_combined_projected_gp_classification(
+    log_observation_noise: float,
+    number_of_classes,
+    x_train: jnp.ndarray,
+    y_train: jnp.ndarray,
+    x: jnp.ndarray,
+    objective: str,
+):
+    regulariser = GPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+        x=x_train,
+        y=y_train,
+    )
+    gp = ApproximateGPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+    )
+    regulariser_parameters = regulariser.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMeanParameters(),
+        kernel=MultiOutputKernelParameters(
+            kernels=[MockKernelParameters()] * number_of_classes
+        ),
+    )
+    parameters = gp.Parameters(
+        mean=MockMeanParameters(),
+        kernel=MultiOutputKernelParameters(
+            kernels=[MockKernelParameters()] * number_of_classes
+        ),
+    )
+    projected_regularisations = {
+        name: regularisation_type(
+            gp=gp,
+            regulariser=regulariser,
+            regulariser_parameters=regulariser_parameters,
+            mode=RegularisationMode.posterior,
+        )
+        for name, regularisation_type in [
+            ("kl", ProjectedKLRegularisation),
+            ("renyi", ProjectedRenyiRegularisation),
+            ("hellinger", ProjectedHellingerRegularisation),
+            ("bhattacharyya", ProjectedBhattacharyyaRegularisation),
+            ("wasserstein", ProjectedGaussianWassersteinRegularisation),
+        ]
+    }
+    combined_regularisation = CombinedProjectedRegularisation(
+        projected_regularisations=projected_regularisations,
+        objective=objective,
+    )
+    combined_regularisations = (
+        combined_regularisation.calculate_projected_regularisations(
+            parameters=parameters,
+            x=x,
+        )
+    )
+    for name, projected_regularisation in projected_regularisations.items():
+        assert jnp.isclose(
+            combined_regularisations[name],
+            projected_regularisation.calculate_regularisation(
+                parameters=parameters,
+                x=x,
+            ),
+        )
+    assert jnp.isclose(
+        combined_regularisation.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        ),
+        combined_regularisations[objective],
+    )
@@ -1,3 +1,4 @@
+import jax
 import jax.numpy as jnp
 import pytest
 from jax.config import config
@@ -11,8 +12,14 @@ from src.gps import (
     GPRegression,
 )
 from src.kernels import MultiOutputKernel, MultiOutputKernelParameters
+from src.kernels.approximate import CholeskySVGPKernel
+from src.kernels.standard import ARDKernel, ARDKernelParameters
 from src.regularisations import GaussianWassersteinRegularisation
 from src.regularisations.schemas import RegularisationMode
+from src.utils.linear_operators import (
+    LowRankUpdateLinearOperator,
+    ScaledIdentityLinearOperator,
+)
 
 config.update("jax_enable_x64", True)
 
@@ -365,3 +372,283 @@ def test_gaussian_wasserstein_gp_classification(
         ),
         gaussian_wasserstein_regularisation,
     )
+
+
+@pytest.mark.parametrize(
+    "mean_p,mean_q,diagonal_p,factor_p,core_p,diagonal_q,factor_q,core_q",
+    [
+        [
+            jnp.array([1.0, 2.0, 0.5, 1.5, 0.3]),
+            jnp.array([0.5, 2.5, 0.1, 1.0, 0.0]),
+            0.5,
+            jnp.array(
+                [
+                    [1.0, 0.2],
+                    [0.3, 1.5],
+                    [2.0, 0.1],
+                    [0.4, 0.9],
+                    [1.1, 1.2],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 0.3],
+                    [0.3, 2.0],
+                ]
+            ),
+            1.2,
+            jnp.array(
+                [
+                    [0.5],
+                    [1.5],
+                    [0.2],
+                    [0.7],
+                    [1.0],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.8],
+                ]
+            ),
+        ],
+    ],
+)
+def test_low_rank_gaussian_wasserstein_metric(
+    mean_p: jnp.ndarray,
+    mean_q: jnp.ndarray,
+    diagonal_p: float,
+    factor_p: jnp.ndarray,
+    core_p: jnp.ndarray,
+    diagonal_q: float,
+    factor_q: jnp.ndarray,
+    core_q: jnp.ndarray,
+):
+    covariance_p = (
+        diagonal_p * jnp.eye(factor_p.shape[0]) + factor_p @ core_p @ factor_p.T
+    )
+    covariance_q = (
+        diagonal_q * jnp.eye(factor_q.shape[0]) + factor_q @ core_q @ factor_q.T
+    )
+    assert jnp.isclose(
+        GaussianWassersteinRegularisation.calculate_low_rank_gaussian_wasserstein_metric(
+            mean_train_p=mean_p,
+            covariance_train_p_diagonal=jnp.diag(covariance_p),
+            mean_train_q=mean_q,
+            covariance_train_q_diagonal=jnp.diag(covariance_q),
+            low_rank_covariance_p=LowRankUpdateLinearOperator(
+                base=ScaledIdentityLinearOperator(
+                    scale=diagonal_p, dimension=factor_p.shape[0]
+                ),
+                factor=factor_p,
+                core=core_p,
+            ),
+            low_rank_covariance_q=LowRankUpdateLinearOperator(
+                base=ScaledIdentityLinearOperator(
+                    scale=diagonal_q, dimension=factor_q.shape[0]
+                ),
+                factor=factor_q,
+                core=core_q,
+            ),
+            eigenvalue_regularisation=0,
+        ),
+        GaussianWassersteinRegularisation.calculate_gaussian_wasserstein_metric(
+            mean_train_p=mean_p,
+            covariance_train_p_diagonal=jnp.diag(covariance_p),
+            mean_train_q=mean_q,
+            covariance_train_q_diagonal=jnp.diag(covariance_q),
+            gram_batch_train_p=covariance_p,
+            gram_batch_train_q=covariance_q,
+            eigenvalue_regularisation=0,
+            use_symmetric_matrix_eigendecomposition=False,
+            include_eigendecomposition=True,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,x_inducing,y_inducing,x_train",
+    [
+        [
+            jnp.log(0.5),
+            jnp.array(
+                [
+                    [1.0, 3.0],
+                    [1.5, 1.5],
+                ]
+            ),
+            jnp.array([1.0, 1.5]),
+            jnp.array(
+                [
+                    [1.0, 2.0],
+                    [1.5, 2.5],
+                    [0.5, 1.0],
+                ]
+            ),
+        ],
+    ],
+)
+def test_low_rank_gaussian_wasserstein_matches_dense(
+    log_observation_noise: float,
+    x_inducing: jnp.ndarray,
+    y_inducing: jnp.ndarray,
+    x_train: jnp.ndarray,
+):
+    kernel = ARDKernel(number_of_dimensions=x_inducing.shape[1])
+    kernel_parameters = ARDKernelParameters(
+        log_scaling=jnp.log(1.0),
+        log_lengthscales=jnp.log(jnp.array([0.5, 0.8])),
+    )
+    regulariser = GPRegression(
+        mean=MockMean(),
+        kernel=kernel,
+        x=x_inducing,
+        y=y_inducing,
+    )
+    regulariser_parameters = regulariser.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMean.Parameters(),
+        kernel=kernel_parameters,
+    )
+    svgp_kernel = CholeskySVGPKernel(
+        regulariser_kernel=kernel,
+        regulariser_kernel_parameters=kernel_parameters,
+        log_observation_noise=log_observation_noise,
+        inducing_points=x_inducing,
+        training_points=x_train,
+        diagonal_regularisation=1e-10,
+    )
+    gp = ApproximateGPRegression(
+        mean=MockMean(),
+        kernel=svgp_kernel,
+    )
+    parameters = gp.Parameters(
+        mean=MockMean.Parameters(),
+        kernel=svgp_kernel.generate_parameters(),
+    )
+    # the Nyström residual vanishes at the inducing points, so the low rank structure is exact
+    x = jnp.concatenate((x_inducing, x_inducing), axis=0)
+    dense_gaussian_wasserstein = GaussianWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+        eigenvalue_regularisation=0,
+        use_symmetric_matrix_eigendecomposition=False,
+        include_eigendecomposition=True,
+        mode=RegularisationMode.posterior,
+    )
+    low_rank_gaussian_wasserstein = GaussianWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+        eigenvalue_regularisation=0,
+        include_eigendecomposition=True,
+        mode=RegularisationMode.posterior,
+        use_low_rank_structure=True,
+        low_rank_diagonal_regularisation=1e-10,
+    )
+    assert low_rank_gaussian_wasserstein.has_low_rank_structure
+    assert jnp.isclose(
+        low_rank_gaussian_wasserstein.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        ),
+        dense_gaussian_wasserstein.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        ),
+        atol=1e-4,
+    )
+    assert (
+        low_rank_gaussian_wasserstein.calculate_low_rank_approximation_error_bound(
+            parameters=parameters,
+            x=x,
+        )
+        < 1e-3
+    )
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,number_of_inducing_points,number_of_points,mode",
+    [
+        [jnp.log(0.5), 5, 40, RegularisationMode.prior],
+        [jnp.log(0.5), 5, 40, RegularisationMode.posterior],
+    ],
+)
+def test_low_rank_gaussian_wasserstein_error_bound(
+    log_observation_noise: float,
+    number_of_inducing_points: int,
+    number_of_points: int,
+    mode: RegularisationMode,
+):
+    x_inducing = jax.random.normal(
+        jax.random.PRNGKey(0), shape=(number_of_inducing_points, 2)
+    )
+    x = jax.random.normal(jax.random.PRNGKey(1), shape=(number_of_points, 2))
+    kernel = ARDKernel(number_of_dimensions=2)
+    kernel_parameters = ARDKernelParameters(
+        log_scaling=jnp.log(1.0),
+        log_lengthscales=jnp.log(jnp.array([0.5, 0.8])),
+    )
+    regulariser = GPRegression(
+        mean=MockMean(),
+        kernel=kernel,
+        x=x_inducing,
+        y=jnp.sin(x_inducing[:, 0]),
+    )
+    regulariser_parameters = regulariser.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMean.Parameters(),
+        kernel=kernel_parameters,
+    )
+    svgp_kernel = CholeskySVGPKernel(
+        regulariser_kernel=kernel,
+        regulariser_kernel_parameters=kernel_parameters,
+        log_observation_noise=log_observation_noise,
+        inducing_points=x_inducing,
+        training_points=x,
+        diagonal_regularisation=1e-10,
+    )
+    gp = ApproximateGPRegression(
+        mean=MockMean(),
+        kernel=svgp_kernel,
+    )
+    parameters = gp.Parameters(
+        mean=MockMean.Parameters(),
+        kernel=svgp_kernel.generate_parameters(),
+    )
+    # the Nyström residual of a generic batch does not vanish, so the low rank metric is an approximation
+    dense_gaussian_wasserstein = GaussianWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+        eigenvalue_regularisation=0,
+        include_eigendecomposition=True,
+        mode=mode,
+    )
+    low_rank_gaussian_wasserstein = GaussianWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=regulariser_parameters,
+        eigenvalue_regularisation=0,
+        include_eigendecomposition=True,
+        mode=mode,
+        use_low_rank_structure=True,
+        low_rank_diagonal_regularisation=1e-10,
+    )
+    error = jnp.abs(
+        low_rank_gaussian_wasserstein.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        )
+        - dense_gaussian_wasserstein.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        )
+    )
+    bound = low_rank_gaussian_wasserstein.calculate_low_rank_approximation_error_bound(
+        parameters=parameters,
+        x=x,
+    )
+    assert error > 1e-3
+    assert error <= bound
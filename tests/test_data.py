@@ -0,0 +1,69 @@
+import jax
+import numpy as np
+import pytest
+
+from src.utils.data import PrefetchedBatchIterator
+
+
+@pytest.mark.parametrize(
+    "dataset_size,batch_size,shuffle,drop_last,batch_sizes",
+    [
+        [10, 3, True, True, [3, 3, 3]],
+        [10, 3, False, False, [3, 3, 3, 1]],
+        [10, 5, True, False, [5, 5]],
+        [2, 5, False, True, [2]],
+    ],
+)
+def test_prefetched_batch_iterator(
+    dataset_size: int,
+    batch_size: int,
+    shuffle: bool,
+    drop_last: bool,
+    batch_sizes: list,
+):
+    x = np.arange(dataset_size * 2).reshape(dataset_size, 2)
+    y = np.arange(dataset_size)
+    with PrefetchedBatchIterator(
+        key=jax.random.PRNGKey(0),
+        data=(x, y),
+        batch_size=batch_size,
+        shuffle=shuffle,
+        drop_last=drop_last,
+    ) as batch_iterator:
+        batches = list(batch_iterator)
+    assert [batch_y.shape[0] for _, batch_y in batches] == batch_sizes
+    batch_x = np.concatenate([np.asarray(batch_x) for batch_x, _ in batches])
+    batch_y = np.concatenate([np.asarray(batch_y) for _, batch_y in batches])
+    assert np.array_equal(batch_x, x[batch_y])
+    assert len(set(batch_y.tolist())) == batch_y.shape[0]
+    if not shuffle:
+        assert np.array_equal(batch_y, y[: batch_y.shape[0]])
+
+
+def test_prefetched_batch_iterator_is_reproducible():
+    x = np.arange(20).reshape(10, 2)
+    y = np.arange(10)
+    batches = []
+    for _ in range(2):
+        with PrefetchedBatchIterator(
+            key=jax.random.PRNGKey(1),
+            data=(x, y),
+            batch_size=4,
+        ) as batch_iterator:
+            batches.append([np.asarray(batch_y) for _, batch_y in batch_iterator])
+    assert all(np.array_equal(a, b) for a, b in zip(*batches))
+
+
+def test_prefetched_batch_iterator_close_early():
+    x = np.arange(200).reshape(100, 2)
+    y = np.arange(100)
+    with PrefetchedBatchIterator(
+        key=jax.random.PRNGKey(0),
+        data=(x, y),
+        batch_size=1,
+        prefetch_size=2,
+    ) as batch_iterator:
+        next(batch_iterator)
+    assert not batch_iterator._thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(batch_iterator)
@@ -16,6 +16,8 @@ from src.gps import (
 )
 from src.kernels import MultiOutputKernel, MultiOutputKernelParameters
 
+pytestmark = pytest.mark.usefixtures("validation_mode")
+
 
 @pytest.mark.parametrize(
     "log_observation_noise,x_train,y_train,x,y,negative_log_likelihood",
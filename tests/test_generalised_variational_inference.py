@@ -1,10 +1,20 @@
 import jax.numpy as jnp
 import pytest
+from jax.config import config
 
 from mockers.empirical_risk import MockEmpiricalRisk
 from mockers.gp import MockGPParameters
+from mockers.kernel import MockKernel, MockKernelParameters
+from mockers.mean import MockMean, MockMeanParameters
 from mockers.regularisation import MockRegularisation
 from src import GeneralisedVariationalInference
+from src.empirical_risks import CrossEntropy
+from src.gps import ApproximateGPClassification, GPClassification
+from src.kernels import MultiOutputKernel, MultiOutputKernelParameters
+from src.regularisations import MultinomialWassersteinRegularisation
+from src.regularisations.schemas import RegularisationMode
+
+config.update("jax_enable_x64", True)
 
 
 @pytest.mark.parametrize(
@@ -36,3 +46,286 @@ def test_gvi(
         )
         == gvi_loss
     )
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,number_of_classes,x_train,y_train,x,y",
+    [
+        [
+            jnp.log(jnp.array([0.1, 0.2, 0.4, 1.8])),
+            4,
+            jnp.array(
+                [
+                    [1.0, 3.0, 2.0],
+                    [1.5, 1.5, 9.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.5, 0.1, 0.2, 0.2],
+                    [0.1, 0.2, 0.3, 0.4],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0, 0, 0, 1],
+                    [0, 1, 0, 0],
+                ]
+            ),
+        ],
+    ],
+)
+def test_gvi_shared_prediction(
+    log_observation_noise: float,
+    number_of_classes: int,
+    x_train: jnp.ndarray,
+    y_train: jnp.ndarray,
+    x: jnp.ndarray,
+    y: jnp.ndarray,
+):
+    regulariser = GPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+        x=x_train,
+        y=y_train,
+    )
+    gp = ApproximateGPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+    )
+    parameters = gp.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMeanParameters(),
+        kernel=MultiOutputKernelParameters(
+            kernels=[MockKernelParameters()] * number_of_classes
+        ),
+    )
+    regularisation = MultinomialWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=parameters,
+        mode=RegularisationMode.posterior,
+    )
+    empirical_risk = CrossEntropy(gp=gp)
+    gvi = GeneralisedVariationalInference(
+        regularisation=regularisation,
+        empirical_risk=empirical_risk,
+    )
+    assert gvi.shares_prediction
+    assert jnp.isclose(
+        gvi.calculate_loss(
+            parameters=parameters,
+            x=x,
+            y=y,
+        ),
+        empirical_risk.calculate_empirical_risk(
+            parameters=parameters,
+            x=x,
+            y=y,
+        )
+        + regularisation.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,number_of_classes,x_train,y_train,x,y,chunk_size",
+    [
+        [
+            jnp.log(jnp.array([0.1, 0.2, 0.4, 1.8])),
+            4,
+            jnp.array(
+                [
+                    [1.0, 3.0, 2.0],
+                    [1.5, 1.5, 9.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.5, 0.1, 0.2, 0.2],
+                    [0.1, 0.2, 0.3, 0.4],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                    [0.5, 1.0, 2.5],
+                    [2.0, 2.5, 1.0],
+                    [3.0, 1.5, 0.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0, 0, 0, 1],
+                    [0, 1, 0, 0],
+                    [1, 0, 0, 0],
+                    [0, 0, 1, 0],
+                    [0, 1, 0, 0],
+                ]
+            ),
+            chunk_size,
+        ]
+        for chunk_size in [None, 2, 5]
+    ],
+)
+def test_gvi_loss_terms(
+    log_observation_noise: float,
+    number_of_classes: int,
+    x_train: jnp.ndarray,
+    y_train: jnp.ndarray,
+    x: jnp.ndarray,
+    y: jnp.ndarray,
+    chunk_size: int,
+):
+    regulariser = GPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+        x=x_train,
+        y=y_train,
+    )
+    gp = ApproximateGPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+    )
+    parameters = gp.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMeanParameters(),
+        kernel=MultiOutputKernelParameters(
+            kernels=[MockKernelParameters()] * number_of_classes
+        ),
+    )
+    regularisation = MultinomialWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=parameters,
+        mode=RegularisationMode.posterior,
+    )
+    empirical_risk = CrossEntropy(gp=gp)
+    gvi = GeneralisedVariationalInference(
+        regularisation=regularisation,
+        empirical_risk=empirical_risk,
+    )
+    empirical_risk_term, regularisation_term = gvi.calculate_loss_terms(
+        parameters=parameters,
+        x=x,
+        y=y,
+        chunk_size=chunk_size,
+    )
+    assert jnp.isclose(
+        empirical_risk_term,
+        empirical_risk.calculate_empirical_risk(
+            parameters=parameters,
+            x=x,
+            y=y,
+        ),
+    )
+    assert jnp.isclose(
+        regularisation_term,
+        regularisation.calculate_regularisation(
+            parameters=parameters,
+            x=x,
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "log_observation_noise,number_of_classes,x_train,y_train,x,y,x_regularisation",
+    [
+        [
+            jnp.log(jnp.array([0.1, 0.2, 0.4, 1.8])),
+            4,
+            jnp.array(
+                [
+                    [1.0, 3.0, 2.0],
+                    [1.5, 1.5, 9.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.5, 0.1, 0.2, 0.2],
+                    [0.1, 0.2, 0.3, 0.4],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 2.0, 3.0],
+                    [1.5, 2.5, 3.5],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0, 0, 0, 1],
+                    [0, 1, 0, 0],
+                ]
+            ),
+            jnp.array(
+                [
+                    [2.0, 1.0, 0.5],
+                ]
+            ),
+        ],
+    ],
+)
+def test_gvi_separate_regularisation_batch(
+    log_observation_noise: float,
+    number_of_classes: int,
+    x_train: jnp.ndarray,
+    y_train: jnp.ndarray,
+    x: jnp.ndarray,
+    y: jnp.ndarray,
+    x_regularisation: jnp.ndarray,
+):
+    regulariser = GPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+        x=x_train,
+        y=y_train,
+    )
+    gp = ApproximateGPClassification(
+        mean=MockMean(number_output_dimensions=number_of_classes),
+        kernel=MultiOutputKernel(kernels=[MockKernel()] * number_of_classes),
+    )
+    parameters = gp.Parameters(
+        log_observation_noise=log_observation_noise,
+        mean=MockMeanParameters(),
+        kernel=MultiOutputKernelParameters(
+            kernels=[MockKernelParameters()] * number_of_classes
+        ),
+    )
+    regularisation = MultinomialWassersteinRegularisation(
+        gp=gp,
+        regulariser=regulariser,
+        regulariser_parameters=parameters,
+        mode=RegularisationMode.posterior,
+    )
+    empirical_risk = CrossEntropy(gp=gp)
+    gvi = GeneralisedVariationalInference(
+        regularisation=regularisation,
+        empirical_risk=empirical_risk,
+    )
+    assert jnp.isclose(
+        gvi.calculate_loss(
+            parameters=parameters,
+            x=x,
+            y=y,
+            x_regularisation=x_regularisation,
+        ),
+        empirical_risk.calculate_empirical_risk(
+            parameters=parameters,
+            x=x,
+            y=y,
+        )
+        + regularisation.calculate_regularisation(
+            parameters=parameters,
+            x=x_regularisation,
+        ),
+    )
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize(
+    "module,lazy_modules",
+    [
+        ["src", ["src.generalised_variational_inference", "jax"]],
+        [
+            "src.generalised_variational_inference",
+            ["orbax", "jax_metrics", "neural_tangents", "tensorflow"],
+        ],
+    ],
+)
+def test_lazy_imports(module: str, lazy_modules: List[str]):
+    completed_process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(*sorted(sys.modules), sep='\\n')",
+        ],
+        cwd=REPOSITORY_PATH,
+        env=dict(os.environ, PYTHONPATH=REPOSITORY_PATH),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported_modules = set(completed_process.stdout.splitlines())
+    assert not imported_modules & set(lazy_modules)
@@ -0,0 +1,59 @@
+import jax
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+from jax.experimental.compilation_cache import compilation_cache
+
+from src.utils.jit import jit_hoisting_constants
+
+config.update("jax_enable_x64", True)
+
+
+@pytest.fixture(autouse=True, params=[False, True], ids=["jit", "hoisting"])
+def initialised_compilation_cache(request, tmp_path):
+    # constants are only hoisted while the persistent compilation cache is initialised
+    if request.param:
+        compilation_cache.initialize_cache(str(tmp_path))
+    yield request.param
+    if request.param:
+        compilation_cache.reset_cache()
+
+
+@pytest.mark.parametrize(
+    "constant,x,power",
+    [
+        [jnp.arange(5.0), jnp.ones(5), 2],
+        [jnp.linspace(-1, 1, 3).reshape(3, 1), jnp.arange(6.0).reshape(3, 2), 3],
+    ],
+)
+def test_jit_hoisting_constants(
+    constant: jnp.ndarray,
+    x: jnp.ndarray,
+    power: int,
+):
+    function = lambda x_, power_: {"y": jnp.sum(constant * x_) ** power_}
+    compiled_function = jit_hoisting_constants(function, static_argnums=(1,))
+    assert jnp.allclose(compiled_function(x, power)["y"], function(x, power)["y"])
+    assert jnp.allclose(
+        jax.grad(lambda x_: compiled_function(x_, power)["y"])(x),
+        jax.grad(lambda x_: function(x_, power)["y"])(x),
+    )
+    assert jnp.allclose(
+        jax.vmap(lambda x_: compiled_function(x_, power)["y"])(jnp.stack([x, 2 * x])),
+        jax.vmap(lambda x_: function(x_, power)["y"])(jnp.stack([x, 2 * x])),
+    )
+
+
+def test_jit_hoisting_constants_uses_own_constants():
+    compiled_functions = [
+        jit_hoisting_constants(lambda x, constant_=constant: constant_ @ x)
+        for constant in [jnp.eye(3), 2 * jnp.eye(3)]
+    ]
+    assert jnp.allclose(compiled_functions[0](jnp.ones(3)), jnp.ones(3))
+    assert jnp.allclose(compiled_functions[1](jnp.ones(3)), 2 * jnp.ones(3))
+
+
+def test_jit_hoisting_constants_closing_over_tracer():
+    assert jnp.allclose(
+        jax.jit(lambda x: jit_hoisting_constants(lambda y: x * y)(x))(2.0), 4.0
+    )
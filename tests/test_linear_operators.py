@@ -0,0 +1,278 @@
+import jax
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+
+from src.utils.linear_operators import (
+    BlockDiagonalLinearOperator,
+    DenseLinearOperator,
+    DiagonalLinearOperator,
+    GridInterpolationLinearOperator,
+    KroneckerLinearOperator,
+    LinearOperator,
+    LowRankUpdateLinearOperator,
+    ScaledIdentityLinearOperator,
+    SumLinearOperator,
+)
+
+config.update("jax_enable_x64", True)
+
+DENSE_MATRIX = jnp.array(
+    [
+        [2.0, 0.5, 0.1],
+        [0.5, 1.5, 0.3],
+        [0.1, 0.3, 1.0],
+    ]
+)
+FACTOR = jnp.array(
+    [
+        [1.0, 0.2],
+        [0.3, 1.5],
+        [2.0, 0.1],
+    ]
+)
+COREGIONALISATION_MATRIX = jnp.array(
+    [
+        [1.0, 0.6],
+        [0.6, 0.8],
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    "operator",
+    [
+        DenseLinearOperator(DENSE_MATRIX),
+        DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+        ScaledIdentityLinearOperator(jnp.array(2.5), dimension=3),
+        LowRankUpdateLinearOperator(
+            base=DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+            factor=FACTOR,
+            core=jnp.array([[0.5, -0.1], [-0.1, 0.4]]),
+        ),
+        LowRankUpdateLinearOperator(
+            base=ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            factor=FACTOR,
+            core=jnp.array([[1.0, 1.0], [1.0, 1.0]]),
+        ),
+        BlockDiagonalLinearOperator(
+            [
+                DenseLinearOperator(DENSE_MATRIX[:2, :2]),
+                ScaledIdentityLinearOperator(jnp.array(2.0), dimension=1),
+            ]
+        ),
+        SumLinearOperator(
+            [
+                DenseLinearOperator(DENSE_MATRIX),
+                DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+            ]
+        ),
+    ],
+)
+def test_linear_operator_matches_dense(operator: LinearOperator):
+    matrix = operator.to_dense()
+    vector = jnp.array([1.0, -2.0, 0.5])
+    assert operator.shape == matrix.shape
+    assert jnp.allclose(operator @ FACTOR, matrix @ FACTOR)
+    assert jnp.allclose(operator.matmul(vector), matrix @ vector)
+    assert jnp.allclose(operator.diag(), jnp.diag(matrix))
+    assert jnp.allclose(operator.solve(FACTOR), jnp.linalg.solve(matrix, FACTOR))
+    assert jnp.allclose(operator.solve(vector), jnp.linalg.solve(matrix, vector))
+    assert jnp.allclose(operator.logdet(), jnp.linalg.slogdet(matrix)[1])
+    cholesky_decomposition = operator.cholesky().to_dense()
+    assert jnp.allclose(cholesky_decomposition, jnp.tril(cholesky_decomposition))
+    assert jnp.allclose(cholesky_decomposition @ cholesky_decomposition.T, matrix)
+
+
+@pytest.mark.parametrize(
+    "operator",
+    [
+        KroneckerLinearOperator(left=COREGIONALISATION_MATRIX, right=DENSE_MATRIX),
+        KroneckerLinearOperator(
+            left=COREGIONALISATION_MATRIX,
+            right=DENSE_MATRIX,
+            noise=jnp.array([0.1, 0.5]),
+        ),
+    ],
+)
+def test_kronecker_linear_operator_matches_dense(operator: KroneckerLinearOperator):
+    matrix = operator.to_dense()
+    factor = jnp.concatenate((FACTOR, -FACTOR), axis=0)
+    assert operator.shape == matrix.shape
+    assert jnp.allclose(matrix[:3, 3:], 0.6 * DENSE_MATRIX)
+    assert jnp.allclose(operator @ factor, matrix @ factor)
+    assert jnp.allclose(operator.diag(), jnp.diag(matrix))
+    assert jnp.allclose(operator.solve(factor), jnp.linalg.solve(matrix, factor))
+    assert jnp.allclose(
+        operator.solve(factor[:, 0]), jnp.linalg.solve(matrix, factor[:, 0])
+    )
+    assert jnp.allclose(operator.logdet(), jnp.linalg.slogdet(matrix)[1])
+
+
+GRID_INTERPOLATION_OPERATOR = GridInterpolationLinearOperator(
+    interpolation_indices=jnp.array([[0, 1], [2, 0], [1, 1]]),
+    interpolation_weights=jnp.array(
+        [
+            [[-0.06, 0.87, 0.22, -0.03], [0.0, 1.0, 0.0, 0.0]],
+            [[-0.07, 0.57, 0.57, -0.07], [-0.05, 0.6, 0.5, -0.05]],
+            [[0.0, 0.2, 0.8, 0.0], [-0.03, 0.22, 0.87, -0.06]],
+        ]
+    ),
+    toeplitz_columns=[
+        jnp.exp(-0.1 * jnp.arange(6) ** 2),
+        jnp.exp(-0.3 * jnp.arange(5) ** 2),
+    ],
+    noise=jnp.array(0.1),
+)
+
+
+def test_grid_interpolation_linear_operator_matches_dense():
+    matrix = GRID_INTERPOLATION_OPERATOR.to_dense()
+    assert GRID_INTERPOLATION_OPERATOR.shape == matrix.shape == (3, 3)
+    assert GRID_INTERPOLATION_OPERATOR.grid_shape == (6, 5)
+    assert jnp.allclose(GRID_INTERPOLATION_OPERATOR @ FACTOR, matrix @ FACTOR)
+    assert jnp.allclose(GRID_INTERPOLATION_OPERATOR.diag(), jnp.diag(matrix))
+    assert jnp.allclose(
+        GRID_INTERPOLATION_OPERATOR.solve(FACTOR), jnp.linalg.solve(matrix, FACTOR)
+    )
+    assert jnp.allclose(
+        GRID_INTERPOLATION_OPERATOR.solve(FACTOR[:, 0]),
+        jnp.linalg.solve(matrix, FACTOR[:, 0]),
+    )
+    # (3, 30), (30, 30)
+    interpolation_matrix = GRID_INTERPOLATION_OPERATOR.interpolate(jnp.eye(30))
+    grid_gram = GRID_INTERPOLATION_OPERATOR.grid_matmul(jnp.eye(30))
+    assert jnp.allclose(
+        interpolation_matrix @ grid_gram @ interpolation_matrix.T + 0.1 * jnp.eye(3),
+        matrix,
+    )
+    assert jnp.allclose(
+        GRID_INTERPOLATION_OPERATOR.interpolate_transpose(FACTOR),
+        interpolation_matrix.T @ FACTOR,
+    )
+    assert jnp.allclose(
+        GRID_INTERPOLATION_OPERATOR.interpolate_diag(grid_gram),
+        jnp.diag(matrix) - 0.1,
+    )
+
+
+@pytest.mark.parametrize(
+    "operator,other,operator_type",
+    [
+        [
+            DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            DiagonalLinearOperator,
+        ],
+        [
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            ScaledIdentityLinearOperator(jnp.array(1.5), dimension=3),
+            ScaledIdentityLinearOperator,
+        ],
+        [
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            LowRankUpdateLinearOperator(
+                base=DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+                factor=FACTOR,
+                core=jnp.eye(2),
+            ),
+            LowRankUpdateLinearOperator,
+        ],
+        [
+            BlockDiagonalLinearOperator(
+                [DenseLinearOperator(DENSE_MATRIX), DenseLinearOperator(DENSE_MATRIX)]
+            ),
+            BlockDiagonalLinearOperator(
+                [
+                    ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+                    ScaledIdentityLinearOperator(jnp.array(1.5), dimension=3),
+                ]
+            ),
+            BlockDiagonalLinearOperator,
+        ],
+        [
+            DenseLinearOperator(DENSE_MATRIX),
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            SumLinearOperator,
+        ],
+        [
+            KroneckerLinearOperator(left=COREGIONALISATION_MATRIX, right=DENSE_MATRIX),
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=6),
+            KroneckerLinearOperator,
+        ],
+        [
+            BlockDiagonalLinearOperator(
+                [
+                    ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+                    ScaledIdentityLinearOperator(jnp.array(1.5), dimension=3),
+                ]
+            ),
+            KroneckerLinearOperator(left=COREGIONALISATION_MATRIX, right=DENSE_MATRIX),
+            KroneckerLinearOperator,
+        ],
+        [
+            GRID_INTERPOLATION_OPERATOR,
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            GridInterpolationLinearOperator,
+        ],
+        [
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+            DiagonalLinearOperator,
+        ],
+        [
+            ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+            GRID_INTERPOLATION_OPERATOR,
+            GridInterpolationLinearOperator,
+        ],
+        [
+            BlockDiagonalLinearOperator(
+                [DenseLinearOperator(DENSE_MATRIX), DenseLinearOperator(DENSE_MATRIX)]
+            ),
+            KroneckerLinearOperator(left=COREGIONALISATION_MATRIX, right=DENSE_MATRIX),
+            SumLinearOperator,
+        ],
+        [
+            DiagonalLinearOperator(jnp.array([1.0, 2.0, 3.0])),
+            SumLinearOperator(
+                [
+                    DenseLinearOperator(DENSE_MATRIX),
+                    ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+                ]
+            ),
+            SumLinearOperator,
+        ],
+    ],
+)
+def test_linear_operator_addition(
+    operator: LinearOperator,
+    other: LinearOperator,
+    operator_type: type,
+):
+    operator_sum = operator + other
+    assert isinstance(operator_sum, operator_type)
+    assert jnp.allclose(operator_sum.to_dense(), operator.to_dense() + other.to_dense())
+
+
+def test_linear_operator_pytree():
+    operator = LowRankUpdateLinearOperator(
+        base=ScaledIdentityLinearOperator(jnp.array(0.5), dimension=3),
+        factor=FACTOR,
+        core=jnp.eye(2),
+    )
+    logdets = jax.vmap(
+        lambda scale: jax.jit(lambda operator_: operator_.logdet())(
+            LowRankUpdateLinearOperator(
+                base=ScaledIdentityLinearOperator(scale, dimension=3),
+                factor=operator.factor,
+                core=operator.core,
+            )
+        )
+    )(jnp.array([0.5, 1.0]))
+    assert jnp.allclose(logdets[0], jnp.linalg.slogdet(operator.to_dense())[1])
+    assert jnp.allclose(
+        jax.grad(
+            lambda scale: ScaledIdentityLinearOperator(scale, dimension=3).logdet()
+        )(2.0),
+        1.5,
+    )
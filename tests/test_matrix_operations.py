@@ -1,12 +1,18 @@
+import jax
 import jax.numpy as jnp
 import pytest
+from jax.config import config
 
 from src.utils.matrix_operations import (
     add_diagonal_regulariser,
+    cho_factor_with_adaptive_jitter,
     compute_covariance_eigenvalues,
+    compute_low_rank_product_eigenvalues,
     compute_product_eigenvalues,
 )
 
+config.update("jax_enable_x64", True)
+
 
 @pytest.mark.parametrize(
     "matrix,eigenvalues",
@@ -143,3 +149,172 @@ def test_add_diagonal_regulariser(
         ),
         regularised_matrix,
     )
+
+
+@pytest.mark.parametrize(
+    "diagonal_a,factor_a,core_a,diagonal_b,factor_b,core_b",
+    [
+        [
+            0.5,
+            jnp.array(
+                [
+                    [1.0, 0.2],
+                    [0.3, 1.5],
+                    [2.0, 0.1],
+                    [0.4, 0.9],
+                    [1.1, 1.2],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 0.3],
+                    [0.3, 2.0],
+                ]
+            ),
+            1.2,
+            jnp.array(
+                [
+                    [0.5],
+                    [1.5],
+                    [0.2],
+                    [0.7],
+                    [1.0],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.8],
+                ]
+            ),
+        ],
+        [
+            0.1,
+            jnp.array(
+                [
+                    [1.0, 0.2],
+                    [0.3, 1.5],
+                    [2.0, 0.1],
+                    [0.4, 0.9],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 0.3],
+                    [0.3, 2.0],
+                ]
+            ),
+            2.0,
+            jnp.array(
+                [
+                    [1.0, 0.2],
+                    [0.3, 1.5],
+                    [2.0, 0.1],
+                    [0.4, 0.9],
+                ]
+            ),
+            jnp.array(
+                [
+                    [0.5, -0.1],
+                    [-0.1, 0.4],
+                ]
+            ),
+        ],
+    ],
+)
+def test_compute_low_rank_product_eigenvalues(
+    diagonal_a: float,
+    factor_a: jnp.ndarray,
+    core_a: jnp.ndarray,
+    diagonal_b: float,
+    factor_b: jnp.ndarray,
+    core_b: jnp.ndarray,
+):
+    matrix_a = diagonal_a * jnp.eye(factor_a.shape[0]) + factor_a @ core_a @ factor_a.T
+    matrix_b = diagonal_b * jnp.eye(factor_b.shape[0]) + factor_b @ core_b @ factor_b.T
+    assert jnp.allclose(
+        jnp.sort(compute_covariance_eigenvalues(jnp.dot(matrix_a, matrix_b))),
+        jnp.sort(
+            compute_low_rank_product_eigenvalues(
+                diagonal_a=diagonal_a,
+                factor_a=factor_a,
+                core_a=core_a,
+                diagonal_b=diagonal_b,
+                factor_b=factor_b,
+                core_b=core_b,
+            )
+        ),
+        rtol=1e-05,
+        atol=1e-08,
+    )
+
+
+@pytest.mark.parametrize(
+    "matrix,tangent",
+    [
+        [
+            jnp.array(
+                [
+                    [2.0, 0.5, 0.1],
+                    [0.5, 1.5, 0.3],
+                    [0.1, 0.3, 1.0],
+                ]
+            ),
+            jnp.array(
+                [
+                    [1.0, 0.2, -0.4],
+                    [0.2, -0.5, 0.1],
+                    [-0.4, 0.1, 0.3],
+                ]
+            ),
+        ],
+    ],
+)
+def test_cho_factor_with_adaptive_jitter_positive_definite(
+    matrix: jnp.ndarray,
+    tangent: jnp.ndarray,
+):
+    cholesky_decomposition, tangent_cholesky_decomposition = jax.jvp(
+        lambda matrix_: cho_factor_with_adaptive_jitter(
+            matrix=matrix_,
+            jitter=1e-6,
+            maximum_number_of_jitter_increases=5,
+            jitter_growth_factor=10.0,
+        )[0],
+        (matrix,),
+        (tangent,),
+    )
+    expected_cholesky_decomposition, expected_tangent_cholesky_decomposition = jax.jvp(
+        jnp.linalg.cholesky, (matrix,), (tangent,)
+    )
+    assert jnp.allclose(cholesky_decomposition, expected_cholesky_decomposition)
+    assert jnp.allclose(
+        tangent_cholesky_decomposition, expected_tangent_cholesky_decomposition
+    )
+
+
+@pytest.mark.parametrize(
+    "matrix,jitter,maximum_number_of_jitter_increases,is_finite",
+    [
+        [jnp.ones((3, 3)), 1e-6, 5, True],
+        [jnp.ones((3, 3)), 1e-6, 0, False],
+        [jnp.ones((3, 3)), 1e-20, 1, False],
+    ],
+)
+def test_cho_factor_with_adaptive_jitter_singular(
+    matrix: jnp.ndarray,
+    jitter: float,
+    maximum_number_of_jitter_increases: int,
+    is_finite: bool,
+):
+    cholesky_decomposition, lower = cho_factor_with_adaptive_jitter(
+        matrix=matrix,
+        jitter=jitter,
+        maximum_number_of_jitter_increases=maximum_number_of_jitter_increases,
+        jitter_growth_factor=10.0,
+    )
+    assert bool(jnp.all(jnp.isfinite(cholesky_decomposition))) == is_finite
+    if is_finite:
+        assert lower
+        assert jnp.allclose(
+            cholesky_decomposition @ cholesky_decomposition.T, matrix, atol=1e-5
+        )
@@ -0,0 +1,70 @@
+import jax
+import jax.numpy as jnp
+import optax
+import pytest
+from jax.config import config
+
+from src.gps import GPRegression
+from src.kernels.standard import ARDKernel
+from src.means import ConstantMean
+
+config.update("jax_enable_x64", True)
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        GPRegression.Parameters(
+            log_observation_noise=jnp.log(0.5),
+            mean=ConstantMean.Parameters(constant=1.0),
+            kernel=ARDKernel.Parameters(
+                log_scaling=0.0, log_lengthscales=jnp.array([0.0, 1.0])
+            ),
+        ),
+    ],
+)
+def test_module_parameters_pytree_matches_dict(parameters: GPRegression.Parameters):
+    leaves_with_paths, _ = jax.tree_util.tree_flatten_with_path(parameters)
+    dict_leaves_with_paths, _ = jax.tree_util.tree_flatten_with_path(parameters.dict())
+    assert [path for path, _ in leaves_with_paths] == [
+        path for path, _ in dict_leaves_with_paths
+    ]
+    assert all(
+        jnp.array_equal(leaf, dict_leaf)
+        for (_, leaf), (_, dict_leaf) in zip(leaves_with_paths, dict_leaves_with_paths)
+    )
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        GPRegression.Parameters(
+            log_observation_noise=jnp.log(0.5),
+            mean=ConstantMean.Parameters(constant=1.0),
+            kernel=ARDKernel.Parameters(
+                log_scaling=0.0, log_lengthscales=jnp.array([0.0, 1.0])
+            ),
+        ),
+    ],
+)
+def test_module_parameters_through_transformations(
+    parameters: GPRegression.Parameters,
+):
+    gradients = jax.jit(
+        jax.grad(
+            lambda parameters_: parameters_.log_observation_noise
+            + parameters_.mean.constant
+            + jnp.sum(parameters_.kernel.log_lengthscales)
+        )
+    )(parameters)
+    assert isinstance(gradients, GPRegression.Parameters)
+    assert isinstance(gradients.kernel, ARDKernel.Parameters)
+    optimiser = optax.sgd(learning_rate=0.1)
+    updates, _ = optimiser.update(gradients, optimiser.init(parameters))
+    updated_parameters = optax.apply_updates(parameters, updates)
+    assert isinstance(updated_parameters, GPRegression.Parameters)
+    assert jnp.allclose(
+        updated_parameters.kernel.log_lengthscales,
+        parameters.kernel.log_lengthscales - 0.1,
+    )
+    assert jnp.allclose(updated_parameters.kernel.log_scaling, 0.0)
@@ -0,0 +1,142 @@
+import jax
+import jax.numpy as jnp
+import pytest
+from jax.config import config
+
+from src.utils.optimisation import (
+    calculate_natural_gradient_gaussian_update,
+    minimise_bracketed_scalar,
+    minimise_lbfgs,
+)
+
+config.update("jax_enable_x64", True)
+
+
+@pytest.mark.parametrize(
+    "x0,minimiser",
+    [
+        [
+            jnp.array([-1.2, 1.0]),
+            jnp.array([1.0, 1.0]),
+        ],
+        [
+            jnp.array([2.0, -1.5]),
+            jnp.array([1.0, 1.0]),
+        ],
+    ],
+)
+def test_minimise_lbfgs_rosenbrock(
+    x0: jnp.ndarray,
+    minimiser: jnp.ndarray,
+):
+    result = minimise_lbfgs(
+        function=lambda x: (1 - x[0]) ** 2 + 100 * (x[1] - x[0] ** 2) ** 2,
+        x0=x0,
+        maximum_number_of_iterations=200,
+        tolerance=1e-10,
+    )
+    assert result.converged
+    assert jnp.allclose(result.x, minimiser, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "a,b,x0",
+    [
+        [
+            jnp.array([[3.0, 1.0, 0.0], [1.0, 2.0, 0.5], [0.0, 0.5, 1.0]]),
+            jnp.array([1.0, -2.0, 0.5]),
+            jnp.zeros((3,)),
+        ],
+    ],
+)
+def test_minimise_lbfgs_quadratic(
+    a: jnp.ndarray,
+    b: jnp.ndarray,
+    x0: jnp.ndarray,
+):
+    result = minimise_lbfgs(
+        function=lambda x: 0.5 * x @ a @ x - b @ x,
+        x0=x0,
+        maximum_number_of_iterations=50,
+        tolerance=1e-12,
+    )
+    assert jnp.allclose(result.x, jnp.linalg.solve(a, b), atol=1e-6)
+    assert jnp.isfinite(result.value_history[: result.number_of_iterations]).all()
+
+
+def test_minimise_lbfgs_rejects_nan_steps():
+    result = minimise_lbfgs(
+        function=lambda x: jnp.where(x[0] > 2.0, jnp.nan, -x[0]),
+        x0=jnp.array([0.0]),
+        maximum_number_of_iterations=20,
+    )
+    assert jnp.isfinite(result.value)
+    assert result.x[0] <= 2.0
+
+
+@pytest.mark.parametrize(
+    "target_mean,target_covariance,number_of_steps",
+    [
+        [
+            jnp.array([1.0, -1.0, 0.5]),
+            jnp.array([[2.0, 0.5, 0.0], [0.5, 1.0, 0.2], [0.0, 0.2, 0.5]]),
+            6,
+        ],
+    ],
+)
+def test_natural_gradient_gaussian_update_kl(
+    target_mean: jnp.ndarray,
+    target_covariance: jnp.ndarray,
+    number_of_steps: int,
+):
+    target_precision = jnp.linalg.inv(target_covariance)
+
+    def kl(mean: jnp.ndarray, covariance: jnp.ndarray) -> jnp.ndarray:
+        return 0.5 * (
+            jnp.trace(target_precision @ covariance)
+            + (target_mean - mean) @ target_precision @ (target_mean - mean)
+            - jnp.linalg.slogdet(covariance)[1]
+        )
+
+    mean, covariance = jnp.zeros((3,)), jnp.eye(3)
+    for _ in range(number_of_steps):
+        mean_gradient, covariance_gradient = jax.grad(kl, argnums=(0, 1))(
+            mean, covariance
+        )
+        mean, covariance = calculate_natural_gradient_gaussian_update(
+            mean=mean,
+            covariance=covariance,
+            mean_gradient=mean_gradient,
+            covariance_gradient=covariance_gradient,
+            learning_rate=1.0,
+        )
+    assert jnp.allclose(mean, target_mean)
+    assert jnp.allclose(covariance, target_covariance)
+
+
+@pytest.mark.parametrize(
+    "function,lower,upper,minimiser",
+    [
+        [lambda x: jnp.square(x - 0.3), -5.0, 5.0, 0.3],
+        [lambda x: jnp.exp(x) - 2 * x, -10.0, 10.0, jnp.log(2.0)],
+        [lambda x: jnp.where(x < -1, jnp.nan, jnp.square(x - 4)), -3.0, 3.0, 3.0],
+        [lambda x: jnp.cos(x), 0.0, 6.0, jnp.pi],
+    ],
+)
+def test_minimise_bracketed_scalar(
+    function,
+    lower: float,
+    upper: float,
+    minimiser: float,
+):
+    assert jnp.isclose(
+        jax.jit(
+            lambda: minimise_bracketed_scalar(
+                function=function,
+                lower=lower,
+                upper=upper,
+            )
+        )(),
+        minimiser,
+        atol=1e-6,
+    )
@@ -0,0 +1,86 @@
+import jax.numpy as jnp
+import pydantic
+import pytest
+from jax.config import config
+
+from mockers.kernel import MockKernel, MockKernelParameters
+from mockers.mean import MockMean, MockMeanParameters
+from src.gps import ApproximateGPRegression
+from src.kernels.non_stationary import InnerProductKernel
+from src.utils.validation import (
+    ArgumentValidationMode,
+    argument_validation_mode,
+    validate_arguments,
+)
+
+config.update("jax_enable_x64", True)
+
+
+@validate_arguments
+def add_one(x: int) -> int:
+    return x + 1
+
+
+def test_argument_validation_mode_coerces_when_validating():
+    with argument_validation_mode(ArgumentValidationMode.always):
+        assert add_one("1") == 2
+        assert add_one("2") == 3
+
+
+def test_argument_validation_mode_passes_through_when_never():
+    with argument_validation_mode(ArgumentValidationMode.never):
+        assert add_one(1.5) == 2.5
+
+
+def test_argument_validation_mode_validates_first_call_when_once():
+    with argument_validation_mode(ArgumentValidationMode.once):
+        with pytest.raises(pydantic.ValidationError):
+            add_one("one")
+        assert add_one("1") == 2
+        assert add_one(1.5) == 2.5
+
+
+def test_argument_validation_mode_of_module():
+    kernel = InnerProductKernel()
+    with argument_validation_mode(
+        ArgumentValidationMode.never, module_name=add_one.__module__
+    ):
+        assert add_one(1.5) == 2.5
+        assert kernel.calculate_gram.is_validating
+        assert jnp.allclose(
+            kernel.calculate_gram(
+                parameters=kernel.generate_parameters({"log_scaling": 0.0}),
+                x1=jnp.ones((2, 3)),
+                x2=jnp.ones((2, 3)),
+            ),
+            3 * jnp.ones((2, 2)),
+        )
+    assert add_one("1") == 2
+
+
+@pytest.mark.parametrize(
+    "validation_mode",
+    [
+        ArgumentValidationMode.always,
+        ArgumentValidationMode.once,
+        ArgumentValidationMode.never,
+    ],
+)
+def test_argument_validation_mode_does_not_change_predictions(
+    validation_mode: ArgumentValidationMode,
+):
+    gp = ApproximateGPRegression(mean=MockMean(), kernel=MockKernel())
+    parameters = gp.Parameters(
+        log_observation_noise=jnp.log(1.0),
+        mean=MockMeanParameters(),
+        kernel=MockKernelParameters(),
+    )
+    x = jnp.ones((2, 3))
+    with argument_validation_mode(validation_mode):
+        covariances = [
+            gp.predict_probability(parameters, x=x).covariance for _ in range(2)
+        ]
+    # approximate Gaussian processes drop the observation noise whether or not the parameters are regenerated
+    for covariance in covariances:
+        assert jnp.array_equal(covariance, jnp.array([1.0, 1.0]))
+    assert jnp.isneginf(gp.generate_parameters(parameters.dict()).log_observation_noise)